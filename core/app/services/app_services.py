@@ -4,6 +4,7 @@ from __future__ import annotations
 from typing import Callable, Iterable, Optional, Set
 
 from core.app.session import ProfileSession, Part
+from core.io.save_worker import SaveWorker
 from core.profiles import ProfileContext
 
 from core.app.services.base_settings_service import BaseSettingsService
@@ -18,6 +19,7 @@ class AppServices:
     - 持有 ProfileSession（工作单元 + 脏标记）
     - 封装 BaseSettingsService / SkillsService / PointsService
     - 提供 “保存脏部分 / 回滚 / 通知脏状态” 等便捷方法
+    - 可选 SaveWorker：自动保存走后台写盘，失败经 notify_error 报告
     """
 
     def __init__(
@@ -25,11 +27,13 @@ class AppServices:
         *,
         ctx: ProfileContext,
         notify_error: Optional[Callable[[str, str], None]] = None,  # (msg, detail)
+        save_worker: Optional[SaveWorker] = None,
     ) -> None:
         # 统一的工作单元
-        self.session = ProfileSession(ctx)
+        self.session = ProfileSession(ctx, save_worker=save_worker)
 
         self._notify_error = notify_error or (lambda _m, _d="": None)
+        self.session.subscribe_save_result(self._on_background_save)
 
         self.base = BaseSettingsService(
             session=self.session,
@@ -147,6 +151,17 @@ class AppServices:
         self.session.rollback()
         self.notify_dirty()
 
+    def flush_saves(self, timeout_s: float = 5.0) -> bool:
+        """
+        等待后台自动保存全部落盘（切换/复制/重命名 profile 以及退出前调用）。
+        """
+        return self.session.flush(timeout_s=timeout_s)
+
+    def _on_background_save(self, parts: Set[Part], err: Optional[BaseException]) -> None:
+        if err is None:
+            return
+        self._notify_error("自动保存失败", str(err))
+
     # ---------- dirty broadcast ----------
 
     def notify_dirty(self) -> None:
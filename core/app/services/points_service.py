@@ -196,7 +196,7 @@ class PointsService:
             backup = True
 
         try:
-            self._session.commit(parts={"points"}, backup=backup, touch_meta=False)
+            self._session.commit(parts={"points"}, backup=backup, touch_meta=False, deferred=True)
             return True
         except Exception as e:
             self._notify_error("自动保存失败", str(e))
@@ -235,7 +235,7 @@ class PointsService:
 
     def reload_cmd(self) -> None:
         """
-        从 profile.json 重新加载 points 部分。
+        从磁盘重新加载 points 部分。
         """
         try:
             self._session.reload_parts({"points"})
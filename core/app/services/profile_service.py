@@ -20,6 +20,7 @@ class ProfileService:
     - ProfileService 不再依赖 EventBus
     - 不发布 PROFILE_CHANGED / PROFILE_LIST_CHANGED
     - 只负责：ProfileManager 文件系统操作 + bind ctx 到 AppServices
+    - 文件系统操作前先等待后台自动保存落盘，避免读到旧文件或与写入竞争
     """
 
     def __init__(self, *, pm: ProfileManager, services: AppServices) -> None:
@@ -35,27 +36,32 @@ class ProfileService:
 
     # -------- open/switch --------
     def open_and_bind(self, name: str) -> ProfileResult:
+        self._services.flush_saves()
         ctx = self._pm.open_profile(name)
         self._bind_ctx(ctx)
         return ProfileResult(ctx=ctx, names=self.list_profiles())
 
     # -------- create/copy/rename/delete --------
     def create_and_bind(self, name: str) -> ProfileResult:
+        self._services.flush_saves()
         ctx = self._pm.create_profile(name)
         self._bind_ctx(ctx)
         return ProfileResult(ctx=ctx, names=self.list_profiles())
 
     def copy_and_bind(self, src_name: str, dst_name: str) -> ProfileResult:
+        self._services.flush_saves()
         ctx = self._pm.copy_profile(src_name, dst_name)
         self._bind_ctx(ctx)
         return ProfileResult(ctx=ctx, names=self.list_profiles())
 
     def rename_and_bind(self, old_name: str, new_name: str) -> ProfileResult:
+        self._services.flush_saves()
         ctx = self._pm.rename_profile(old_name, new_name)
         self._bind_ctx(ctx)
         return ProfileResult(ctx=ctx, names=self.list_profiles())
 
     def delete_and_bind_fallback(self, name: str) -> ProfileResult:
+        self._services.flush_saves()
         self._pm.delete_profile(name)
         ctx = self._pm.current or self._pm.open_last_or_fallback()
         self._bind_ctx(ctx)
@@ -229,7 +229,7 @@ class SkillsService:
             backup = True
 
         try:
-            self._session.commit(parts={"skills"}, backup=backup, touch_meta=False)
+            self._session.commit(parts={"skills"}, backup=backup, touch_meta=False, deferred=True)
             return True
         except Exception as e:
             self._notify_error("自动保存失败", str(e))
@@ -268,7 +268,7 @@ class SkillsService:
 
     def reload_cmd(self) -> None:
         """
-        从 profile.json 重新加载 skills 部分。
+        从磁盘重新加载 skills 部分。
         """
         try:
             self._session.reload_parts({"skills"})
@@ -1,8 +1,8 @@
 # core/app/session.py
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Callable, Dict, Literal, Optional, Set
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, Literal, Optional, Set
 
 import logging
 
@@ -13,22 +13,38 @@ from core.models.skill import SkillsFile
 from core.profiles import ProfileContext
 from rotation_editor.core.models import RotationsFile
 from core.io.json_store import now_iso_utc
+from core.io.save_worker import SaveWorker
 
 log = logging.getLogger(__name__)
 
 Part = Literal["base", "skills", "points", "meta", "rotations"]
 
+_ALL_PARTS: tuple[Part, ...] = ("base", "skills", "points", "meta", "rotations")
+
+_PART_LOADERS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "base": BaseFile.from_dict,
+    "skills": SkillsFile.from_dict,
+    "points": PointsFile.from_dict,
+    "meta": ProfileMeta.from_dict,
+    "rotations": RotationsFile.from_dict,
+}
+
 
 @dataclass(frozen=True)
 class Snapshot:
     """
     用于 rollback 的内存快照（按部分拆开）。
+
+    - 各部分 dict 在快照之间结构共享：版本号未变化的部分直接沿用上一个快照的 dict
+    - versions 记录生成该 dict 时对应部分的版本号
+    - 快照中的 dict 视为只读（后台保存线程也会直接序列化它们）
     """
     base: Dict[str, Any]
     skills: Dict[str, Any]
     points: Dict[str, Any]
     meta: Dict[str, Any]
     rotations: Dict[str, Any]
+    versions: Dict[str, int] = field(default_factory=dict)
 
 
 class ProfileSession:
@@ -37,16 +53,22 @@ class ProfileSession:
 
     - 持有 ProfileContext（其中包含 Profile 聚合和 ProfileRepository）
     - 维护 dirty_parts / snapshot
-    - commit() 统一写入 profile.json
-    - reload_parts() 按需从 profile.json 局部刷新
+    - 每个部分有版本号：mark_dirty / touch_meta / reload 时递增；
+      快照只重新 to_dict 版本号变化的部分（copy-on-write），rollback 只还原脏部分
+    - commit() 经 ProfileRepository 写盘（split 布局下只写出提交的分区）
+    - reload_parts() 按需从磁盘局部刷新
     - subscribe_dirty(fn)：供 UI 订阅脏状态变更。
+    - 可选 SaveWorker：commit(deferred=True) 时写盘交给后台线程（合并连续提交）。
     """
 
-    def __init__(self, ctx: ProfileContext) -> None:
+    def __init__(self, ctx: ProfileContext, *, save_worker: Optional[SaveWorker] = None) -> None:
         self._ctx = ctx
         self._dirty: Set[Part] = set()
-        self._snap = self._take_snapshot()
+        self._versions: Dict[str, int] = {p: 0 for p in _ALL_PARTS}
+        self._snap = self._take_snapshot(force=set(_ALL_PARTS))
         self._listeners: list[Callable[[Set[Part]], None]] = []
+        self._save_worker = save_worker
+        self._save_listeners: list[Callable[[Set[Part], Optional[BaseException]], None]] = []
 
     # ---------- 基本属性 ----------
 
@@ -62,6 +84,19 @@ class ProfileSession:
     def repo(self):
         return self._ctx.repo
 
+    @property
+    def save_worker(self) -> Optional[SaveWorker]:
+        return self._save_worker
+
+    def set_save_worker(self, worker: Optional[SaveWorker]) -> None:
+        """
+        挂接/替换后台保存线程（None 表示所有 commit 都同步写盘）。
+        """
+        old = self._save_worker
+        if old is not None and old is not worker:
+            old.flush()
+        self._save_worker = worker
+
     # ---------- 上下文切换 ----------
 
     def set_context(self, ctx: ProfileContext) -> None:
@@ -70,7 +105,8 @@ class ProfileSession:
         """
         self._ctx = ctx
         self._dirty.clear()
-        self._snap = self._take_snapshot()
+        self._bump(_ALL_PARTS)
+        self._snap = self._take_snapshot(force=set(_ALL_PARTS))
         self._emit_dirty()
 
     # ---------- 订阅脏状态 ----------
@@ -86,6 +122,24 @@ class ProfileSession:
 
         return _unsub
 
+    def subscribe_save_result(
+        self,
+        fn: Callable[[Set[Part], Optional[BaseException]], None],
+    ) -> Callable[[], None]:
+        """
+        订阅后台保存结果：fn(parts, error)，error 为 None 表示写盘成功。
+        回调线程由 SaveWorker 的 scheduler 决定（UI 中为 Qt 主线程）。
+        """
+        self._save_listeners.append(fn)
+
+        def _unsub() -> None:
+            try:
+                self._save_listeners.remove(fn)
+            except ValueError:
+                pass
+
+        return _unsub
+
     def _emit_dirty(self) -> None:
         parts = set(self._dirty)
         for fn in list(self._listeners):
@@ -108,7 +162,19 @@ class ProfileSession:
     def is_dirty(self) -> bool:
         return bool(self._dirty)
 
+    def part_version(self, part: Part) -> int:
+        """
+        返回某部分的版本号（每次 mark_dirty / 重新加载都会递增）。
+        """
+        return int(self._versions.get(part, 0))
+
+    def _bump(self, parts) -> None:
+        for part in parts:
+            self._versions[part] = self._versions.get(part, 0) + 1
+
     def mark_dirty(self, part: Part) -> None:
+        # 已经是脏的也要递增版本：说明又有新的修改
+        self._bump((part,))
         before = set(self._dirty)
         self._dirty.add(part)
         if self._dirty != before:
@@ -127,67 +193,71 @@ class ProfileSession:
 
     # ---------- snapshot ----------
 
-    def _take_snapshot(self) -> Snapshot:
+    def _take_snapshot(self, *, force: Optional[Set[Part]] = None) -> Snapshot:
+        """
+        生成新快照：版本号与上一个快照一致且不在 force 中的部分直接复用旧 dict。
+        """
         p = self.profile
-        return Snapshot(
-            base=p.base.to_dict(),
-            skills=p.skills.to_dict(),
-            points=p.points.to_dict(),
-            meta=p.meta.to_dict(),
-            rotations=p.rotations.to_dict(),
-        )
+        old: Optional[Snapshot] = getattr(self, "_snap", None)
+        forced = set(force or ())
+
+        out: Dict[str, Dict[str, Any]] = {}
+        versions: Dict[str, int] = {}
+        for part in _ALL_PARTS:
+            ver = self._versions.get(part, 0)
+            if old is not None and part not in forced and old.versions.get(part) == ver:
+                out[part] = getattr(old, part)
+            else:
+                out[part] = getattr(p, part).to_dict()
+            versions[part] = ver
+
+        return Snapshot(versions=versions, **out)
+
+    def _snapshot_to_profile_dict(self, snap: Snapshot) -> Dict[str, Any]:
+        """
+        由 snapshot 组装 profile.json 的数据（与 Profile.to_dict 结构一致）。
+        snapshot 中的 dict 在提交后不再被修改，可以安全地交给后台线程序列化。
+        """
+        return {
+            "schema_version": int(self.profile.schema_version),
+            "meta": snap.meta,
+            "base": snap.base,
+            "skills": snap.skills,
+            "points": snap.points,
+            "rotations": snap.rotations,
+        }
 
     def refresh_snapshot(self, *, parts: Optional[Set[Part]] = None) -> None:
         """
         刷新部分 snapshot（或全部），不改变 dirty 标记。
         """
-        p = self.profile
+        target: Set[Part] = set(parts) if parts is not None else set(_ALL_PARTS)
         old = self._snap
-        target = set(parts) if parts is not None else {"base", "skills", "points", "meta", "rotations"}
-
-        base = p.base.to_dict() if "base" in target else old.base
-        skills = p.skills.to_dict() if "skills" in target else old.skills
-        points = p.points.to_dict() if "points" in target else old.points
-        meta = p.meta.to_dict() if "meta" in target else old.meta
-        rotations = p.rotations.to_dict() if "rotations" in target else old.rotations
-
-        self._snap = Snapshot(
-            base=base,
-            skills=skills,
-            points=points,
-            meta=meta,
-            rotations=rotations,
-        )
+        snap = self._take_snapshot(force=target)
+        # 只替换 target 部分，其余保持旧快照内容（即使其版本号已变化）
+        keep = {part: getattr(old, part) for part in _ALL_PARTS if part not in target}
+        versions = {part: (snap.versions[part] if part in target else old.versions.get(part, 0)) for part in _ALL_PARTS}
+        fresh = {part: getattr(snap, part) for part in _ALL_PARTS if part in target}
+        self._snap = Snapshot(versions=versions, **keep, **fresh)
 
     # ---------- rollback ----------
 
     def rollback(self) -> None:
         """
         回滚到最近一次 snapshot（仅内存，不触碰磁盘）。
+
+        只还原脏部分：未标脏的部分与快照一致，无需重新 from_dict。
         """
         p = self.profile
         s = self._snap
 
-        try:
-            p.base = BaseFile.from_dict(s.base)
-        except Exception:
-            log.exception("rollback base failed")
-        try:
-            p.skills = SkillsFile.from_dict(s.skills)
-        except Exception:
-            log.exception("rollback skills failed")
-        try:
-            p.points = PointsFile.from_dict(s.points)
-        except Exception:
-            log.exception("rollback points failed")
-        try:
-            p.meta = ProfileMeta.from_dict(s.meta)
-        except Exception:
-            log.exception("rollback meta failed")
-        try:
-            p.rotations = RotationsFile.from_dict(s.rotations)
-        except Exception:
-            log.exception("rollback rotations failed")
+        for part in [x for x in _ALL_PARTS if x in self._dirty]:
+            try:
+                setattr(p, part, _PART_LOADERS[part](getattr(s, part)))
+                # 内存对象已回到快照内容：版本号对齐快照，后续快照可直接复用
+                self._versions[part] = s.versions.get(part, self._versions.get(part, 0))
+            except Exception:
+                log.exception("rollback %s failed", part)
 
         self._dirty.clear()
         self._emit_dirty()
@@ -196,10 +266,12 @@ class ProfileSession:
 
     def reload_parts(self, parts: Set[Part]) -> None:
         """
-        从 profile.json 重新加载指定部分（base/skills/points/meta/rotations）：
+        从磁盘重新加载指定部分（base/skills/points/meta/rotations）：
         - 其它部分保持不变
         - 被 reload 的部分从 dirty 集合中移除
+        - 先等待后台待写任务落盘，保证读到的是最近一次提交
         """
+        self.flush()
         fresh = self.repo.load_or_create(self.ctx.profile_name, self.ctx.idgen)
         p = self.profile
 
@@ -219,7 +291,9 @@ class ProfileSession:
             p.meta = fresh.meta
             self._dirty.discard("meta")
 
-        self._snap = self._take_snapshot()
+        reloaded = {x for x in _ALL_PARTS if x in parts}
+        self._bump(reloaded)
+        self._snap = self._take_snapshot(force=reloaded)
         self._emit_dirty()
 
     # ---------- commit ----------
@@ -230,13 +304,17 @@ class ProfileSession:
         parts: Optional[Set[Part]] = None,
         backup: Optional[bool] = None,
         touch_meta: bool = True,
+        deferred: bool = False,
     ) -> None:
         """
         提交变更到磁盘。
 
-        现在统一写入 profile.json：
-        - parts 仍用于控制 dirty 标记（以及 UI 显示），但 IO 层始终写整个 Profile。
+        - parts 控制 dirty 标记，同时决定写出哪些分区：
+          split 布局只写这些分区（touch_meta=True 时附带 meta），single 布局仍写整个 profile.json。
         - touch_meta=True 时会更新 meta.updated_at（meta.created_at 为空时一并填充）。
+        - 写盘数据直接取自新的 snapshot（只 to_dict 提交部分与版本号变化的部分）。
+        - deferred=True 且挂接了 SaveWorker 时：本方法只排队写盘任务并立即清理 dirty，
+          失败时通过 subscribe_save_result 回调通知，并把对应部分重新标脏。
         """
         target: Set[Part] = set(self._dirty) if parts is None else set(parts)
         if not target:
@@ -256,13 +334,67 @@ class ProfileSession:
             if not p.meta.created_at:
                 p.meta.created_at = now
             p.meta.updated_at = now
+            self._bump(("meta",))
+
+        # 提交的部分强制重新序列化（调用方可能未 mark_dirty 就直接修改了模型）；
+        # 其它部分按版本号复用上一个快照
+        snap = self._take_snapshot(force=target)
+        data = self._snapshot_to_profile_dict(snap)
 
-        # 一次性写整个 Profile
-        self.repo.save(self.ctx.profile_name, p, backup=bool(backup))
+        repo = self.repo
+        name = self.ctx.profile_name
+        bk = bool(backup)
+        io_parts: Set[str] = set(target)
+        if touch_meta:
+            io_parts.add("meta")
+
+        def _write(parts: Optional[FrozenSet[str]]) -> None:
+            repo.save_dict(name, data, parts=parts, backup=bk)
+
+        worker = self._save_worker
+        if worker is None:
+            _write(frozenset(io_parts))
+        elif deferred:
+            ctx = self._ctx
+            done_parts = set(target)
+            worker.submit(
+                str(repo.path_for(name)),
+                _write,
+                parts=io_parts,
+                on_done=lambda err: self._on_deferred_saved(ctx, done_parts, err),
+            )
+        else:
+            worker.write_now(str(repo.path_for(name)), _write, parts=io_parts)
 
         # 清理对应 dirty 标记（其它未提交部分仍保留）
         for part in target:
             self._dirty.discard(part)
 
-        self._snap = self._take_snapshot()
-        self._emit_dirty()
\ No newline at end of file
+        self._snap = snap
+        self._emit_dirty()
+
+    def flush(self, timeout_s: float = 5.0) -> bool:
+        """
+        等待后台待写任务全部落盘（未挂接 SaveWorker 时直接返回 True）。
+        """
+        worker = self._save_worker
+        if worker is None:
+            return True
+        ok = worker.flush(timeout_s=timeout_s)
+        if not ok:
+            log.warning("ProfileSession.flush timed out (%.1fs)", float(timeout_s))
+        return ok
+
+    def _on_deferred_saved(self, ctx: ProfileContext, parts: Set[Part], err: Optional[BaseException]) -> None:
+        if err is not None and ctx is self._ctx:
+            # 内存中的数据仍是新的，只是没落盘：重新标脏，让用户可以再次保存
+            before = set(self._dirty)
+            self._dirty.update(parts)
+            if self._dirty != before:
+                self._emit_dirty()
+
+        for fn in list(self._save_listeners):
+            try:
+                fn(set(parts), err)
+            except Exception:
+                log.exception("save result listener failed")
@@ -2,51 +2,66 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Optional, Set, Tuple
-
-from pynput import keyboard
+from typing import Any, Dict, Optional, Set, Tuple
 
 MOD_ORDER = ("ctrl", "alt", "shift", "cmd")
 
-MOD_KEYS = {
-    keyboard.Key.shift, keyboard.Key.shift_l, keyboard.Key.shift_r,
-    keyboard.Key.ctrl, keyboard.Key.ctrl_l, keyboard.Key.ctrl_r,
-    keyboard.Key.alt, keyboard.Key.alt_l, keyboard.Key.alt_r,
-    keyboard.Key.cmd, keyboard.Key.cmd_l, keyboard.Key.cmd_r,
-}
-
-MOD_NAME = {
-    keyboard.Key.shift: "shift",
-    keyboard.Key.shift_l: "shift",
-    keyboard.Key.shift_r: "shift",
-    keyboard.Key.ctrl: "ctrl",
-    keyboard.Key.ctrl_l: "ctrl",
-    keyboard.Key.ctrl_r: "ctrl",
-    keyboard.Key.alt: "alt",
-    keyboard.Key.alt_l: "alt",
-    keyboard.Key.alt_r: "alt",
-    keyboard.Key.cmd: "cmd",
-    keyboard.Key.cmd_l: "cmd",
-    keyboard.Key.cmd_r: "cmd",
-}
-
-SPECIAL_NAME = {
-    keyboard.Key.esc: "esc",
-    keyboard.Key.enter: "enter",
-    keyboard.Key.tab: "tab",
-    keyboard.Key.space: "space",
-    keyboard.Key.backspace: "backspace",
-    keyboard.Key.delete: "delete",
-    keyboard.Key.insert: "insert",
-    keyboard.Key.home: "home",
-    keyboard.Key.end: "end",
-    keyboard.Key.page_up: "pageup",
-    keyboard.Key.page_down: "pagedown",
-    keyboard.Key.up: "up",
-    keyboard.Key.down: "down",
-    keyboard.Key.left: "left",
-    keyboard.Key.right: "right",
-}
+# 修饰键 / 特殊键表依赖 pynput 的 Key 枚举：
+# 延迟到首次调用 _key_tables() 时再导入 pynput（normalize/parse 等纯字符串工具不需要它，启动更快）
+_KEY_TABLES: Optional[Tuple[Set[Any], Dict[Any, str], Dict[Any, str]]] = None
+
+
+def _key_tables() -> Tuple[Set[Any], Dict[Any, str], Dict[Any, str]]:
+    """
+    返回 (mod_keys, mod_name, special_name)，首次调用时构建并缓存。
+    """
+    global _KEY_TABLES
+    if _KEY_TABLES is not None:
+        return _KEY_TABLES
+
+    from pynput import keyboard
+
+    mod_keys = {
+        keyboard.Key.shift, keyboard.Key.shift_l, keyboard.Key.shift_r,
+        keyboard.Key.ctrl, keyboard.Key.ctrl_l, keyboard.Key.ctrl_r,
+        keyboard.Key.alt, keyboard.Key.alt_l, keyboard.Key.alt_r,
+        keyboard.Key.cmd, keyboard.Key.cmd_l, keyboard.Key.cmd_r,
+    }
+
+    mod_name = {
+        keyboard.Key.shift: "shift",
+        keyboard.Key.shift_l: "shift",
+        keyboard.Key.shift_r: "shift",
+        keyboard.Key.ctrl: "ctrl",
+        keyboard.Key.ctrl_l: "ctrl",
+        keyboard.Key.ctrl_r: "ctrl",
+        keyboard.Key.alt: "alt",
+        keyboard.Key.alt_l: "alt",
+        keyboard.Key.alt_r: "alt",
+        keyboard.Key.cmd: "cmd",
+        keyboard.Key.cmd_l: "cmd",
+        keyboard.Key.cmd_r: "cmd",
+    }
+
+    special_name = {
+        keyboard.Key.esc: "esc",
+        keyboard.Key.enter: "enter",
+        keyboard.Key.tab: "tab",
+        keyboard.Key.space: "space",
+        keyboard.Key.backspace: "backspace",
+        keyboard.Key.delete: "delete",
+        keyboard.Key.insert: "insert",
+        keyboard.Key.home: "home",
+        keyboard.Key.end: "end",
+        keyboard.Key.page_up: "pageup",
+        keyboard.Key.page_down: "pagedown",
+        keyboard.Key.up: "up",
+        keyboard.Key.down: "down",
+        keyboard.Key.left: "left",
+        keyboard.Key.right: "right",
+    }
+    _KEY_TABLES = (mod_keys, mod_name, special_name)
+    return _KEY_TABLES
 
 
 def normalize(s: str) -> str:
@@ -85,6 +100,8 @@ def compose(mods: Set[str], main: str) -> str:
 
 
 def key_to_name(k) -> Optional[str]:
+    from pynput import keyboard
+
     # KeyCode: a-z/0-9/...
     if isinstance(k, keyboard.KeyCode):
         try:
@@ -95,8 +112,9 @@ def key_to_name(k) -> Optional[str]:
             return None
         return None
 
-    if k in SPECIAL_NAME:
-        return SPECIAL_NAME[k]
+    special = _key_tables()[2]
+    if k in special:
+        return special[k]
 
     # function keys: f1..f24 etc
     try:
@@ -0,0 +1,232 @@
+# File: core/input/hub.py
+from __future__ import annotations
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, Optional, Set, Tuple
+
+from core.input.hotkey import MOD_ORDER, normalize, parse
+
+log = logging.getLogger(__name__)
+
+# (修饰键集合, 主键)；修饰键集合为 None 表示“任意修饰键”（如取色会话的 Esc）
+HotkeyKey = Tuple[Optional[FrozenSet[str]], str]
+
+
+@dataclass(frozen=True)
+class HotkeyHandle:
+    """
+    register_hotkey 返回的注册句柄，用于 unregister。
+    """
+    id: int
+    key: HotkeyKey
+
+
+@dataclass(frozen=True)
+class _Entry:
+    id: int
+    handler: Callable[[], None]
+    repeat: bool
+
+
+class InputHub:
+    """
+    进程级全局键盘钩子：
+
+    - 只持有一个 pynput keyboard.Listener（第一次注册时启动，最后一个注册注销时停止）
+    - 修饰键状态只在这里维护一份；pynput Key -> 名称 的转换结果按 key 缓存
+    - 热键表为预先计算好的 {(mods, main): (handlers...)}，注册 / 注销时整体替换（copy-on-write），
+      钩子线程按键时只做一次 dict 查找，不加锁
+    - handler 在钩子线程上调用，必须很快返回（需要 UI 的请通过 dispatcher.call_soon 转发）；
+      handler 抛异常只记日志
+
+    按住主键时系统的自动连发默认不重复触发（repeat=True 的 handler 例外）。
+    """
+
+    def __init__(self, *, listener_factory: Optional[Callable[..., Any]] = None) -> None:
+        self._listener_factory = listener_factory
+        self._lock = threading.Lock()
+        self._listener: Any = None
+
+        self._next_id = 1
+        self._table: Dict[HotkeyKey, Tuple[_Entry, ...]] = {}
+
+        # 钩子线程状态（仅钩子线程写）
+        self._mods: Set[str] = set()
+        self._pressed: Set[str] = set()
+        self._name_cache: Dict[Any, Optional[str]] = {}
+
+    # ---------- 注册 ----------
+
+    def register_hotkey(self, hotkey: str, handler: Callable[[], None], *, any_mods: bool = False, repeat: bool = False) -> HotkeyHandle:
+        """
+        注册热键（字符串格式与 core.input.hotkey.parse 相同，如 "f9" / "ctrl+f9"）。
+
+        - any_mods=True：只匹配主键，忽略当前修饰键
+        - 同一组合可注册多个 handler，按注册顺序调用
+        解析失败抛 ValueError；系统钩子启动失败时抛出原异常（注册不生效）。
+        """
+        mods, main = parse(normalize(hotkey))
+        key: HotkeyKey = (None if any_mods else frozenset(mods), main)
+
+        with self._lock:
+            hid = self._next_id
+            self._next_id += 1
+            old = self._table
+            table = dict(old)
+            table[key] = table.get(key, ()) + (_Entry(id=hid, handler=handler, repeat=bool(repeat)),)
+            self._table = table
+            try:
+                self._ensure_listener_locked()
+            except Exception:
+                self._table = old
+                raise
+        return HotkeyHandle(id=hid, key=key)
+
+    def unregister(self, handle: Optional[HotkeyHandle]) -> None:
+        if handle is None:
+            return
+        lst = None
+        with self._lock:
+            entries = self._table.get(handle.key, ())
+            remain = tuple(e for e in entries if e.id != handle.id)
+            if len(remain) == len(entries):
+                return
+            table = dict(self._table)
+            if remain:
+                table[handle.key] = remain
+            else:
+                table.pop(handle.key, None)
+            self._table = table
+            if not table:
+                lst = self._listener
+                self._listener = None
+        if lst is not None:
+            self._stop_listener(lst)
+
+    def hotkey_count(self) -> int:
+        with self._lock:
+            return sum(len(v) for v in self._table.values())
+
+    def is_listening(self) -> bool:
+        with self._lock:
+            return self._listener is not None
+
+    def close(self) -> None:
+        """
+        注销全部热键并停止钩子（应用退出时调用）。
+        """
+        with self._lock:
+            self._table = {}
+            lst = self._listener
+            self._listener = None
+        if lst is not None:
+            self._stop_listener(lst)
+
+    # ---------- 名称级输入（钩子回调 / 测试 / 回放） ----------
+
+    def feed_press(self, name: str) -> None:
+        if not name:
+            return
+        if name in MOD_ORDER:
+            self._mods.add(name)
+            return
+
+        repeat = name in self._pressed
+        self._pressed.add(name)
+
+        table = self._table
+        if not table:
+            return
+        entries = table.get((frozenset(self._mods), name), ()) + table.get((None, name), ())
+        for e in entries:
+            if repeat and not e.repeat:
+                continue
+            try:
+                e.handler()
+            except Exception:
+                log.exception("InputHub: hotkey handler failed")
+
+    def feed_release(self, name: str) -> None:
+        if not name:
+            return
+        if name in MOD_ORDER:
+            self._mods.discard(name)
+        else:
+            self._pressed.discard(name)
+
+    # ---------- 内部：pynput ----------
+
+    def _key_name(self, key) -> Optional[str]:
+        try:
+            return self._name_cache[key]
+        except KeyError:
+            pass
+        except TypeError:
+            return self._resolve_name(key)
+        name = self._resolve_name(key)
+        self._name_cache[key] = name
+        return name
+
+    @staticmethod
+    def _resolve_name(key) -> Optional[str]:
+        from core.input.hotkey import _key_tables, key_to_name
+
+        mod = _key_tables()[1].get(key)
+        if mod:
+            return mod
+        return key_to_name(key)
+
+    def _on_press(self, key) -> None:
+        try:
+            self.feed_press(self._key_name(key) or "")
+        except Exception:
+            log.exception("InputHub: on_press failed")
+
+    def _on_release(self, key) -> None:
+        try:
+            self.feed_release(self._key_name(key) or "")
+        except Exception:
+            log.exception("InputHub: on_release failed")
+
+    def _ensure_listener_locked(self) -> None:
+        if self._listener is not None:
+            return
+        factory = self._listener_factory
+        if factory is None:
+            from pynput import keyboard
+
+            factory = keyboard.Listener
+
+        self._mods.clear()
+        self._pressed.clear()
+        lst = factory(on_press=self._on_press, on_release=self._on_release)
+        try:
+            lst.daemon = True
+        except Exception:
+            pass
+        lst.start()
+        self._listener = lst
+
+    @staticmethod
+    def _stop_listener(lst: Any) -> None:
+        try:
+            lst.stop()
+        except Exception:
+            log.exception("InputHub: failed to stop keyboard listener")
+
+
+_HUB: Optional[InputHub] = None
+_HUB_LOCK = threading.Lock()
+
+
+def get_input_hub() -> InputHub:
+    """
+    进程级共享的 InputHub（执行热键、取色会话等共用同一个系统钩子）。
+    """
+    global _HUB
+    with _HUB_LOCK:
+        if _HUB is None:
+            _HUB = InputHub()
+        return _HUB
@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Protocol
+
+log = logging.getLogger(__name__)
+
+
+class SchedulerLike(Protocol):
+    def call_soon(self, fn: Callable[[], None]) -> None: ...
+
+
+SaveDoneCallback = Callable[[Optional[BaseException]], None]
+# write(parts)：parts 为本次需要写出的分区（合并后的并集）；None 表示全部
+SaveWriteFn = Callable[[Optional[FrozenSet[str]]], None]
+
+
+def _merge_parts(a: Optional[FrozenSet[str]], b: Optional[FrozenSet[str]]) -> Optional[FrozenSet[str]]:
+    if a is None or b is None:
+        return None
+    return a | b
+
+
+@dataclass
+class _SaveJob:
+    key: str
+    seq: int
+    write: SaveWriteFn
+    parts: Optional[FrozenSet[str]] = None
+    callbacks: List[SaveDoneCallback] = field(default_factory=list)
+    merged: int = 0
+
+
+@dataclass
+class SaveWorkerStats:
+    submitted: int = 0
+    coalesced: int = 0
+    written: int = 0
+    skipped_stale: int = 0
+    failed: int = 0
+    last_write_ms: float = 0.0
+
+
+class SaveWorker:
+    """
+    写后（write-behind）保存线程：
+
+    - submit(key, write)：把一次写盘任务排队，立即返回（UI 线程不碰磁盘）
+      * 同一 key（通常是目标文件路径）在 coalesce_ms 窗口内的多次提交只保留最新一个
+      * write 必须只依赖提交时已冻结的数据（例如 to_dict 得到的快照），
+        这样 JSON 序列化 / fsync / os.replace 都在后台线程完成
+      * parts 为本次提交涉及的分区；合并时取并集，最新的 write 以并集调用，
+        保证被合并掉的旧提交所改动的分区也会写出
+    - write_now(key, write)：同步写盘（显式保存用），会取代同 key 的待写任务，
+      并通过序号保证后台线程不会再用旧数据覆盖
+    - flush()：等待所有待写任务落盘（切换 profile / 从磁盘重载 / 退出前调用）
+
+    完成/失败回调通过 scheduler.call_soon 投递（UI 里传 QtDispatcher）；
+    未提供 scheduler 时直接在保存线程上回调。
+    """
+
+    def __init__(
+        self,
+        *,
+        scheduler: Optional[SchedulerLike] = None,
+        coalesce_ms: int = 150,
+        name: str = "profile-save-worker",
+    ) -> None:
+        self._sch = scheduler
+        self._coalesce_s = max(0, int(coalesce_ms)) / 1000.0
+        self._name = name
+
+        self._cv = threading.Condition()
+        # 同一时刻只允许一个写入（后台或同步），配合 _written_seq 保证写入顺序
+        self._io_lock = threading.Lock()
+
+        self._pending: Dict[str, _SaveJob] = {}
+        self._inflight: Dict[str, _SaveJob] = {}
+        self._due: Dict[str, float] = {}
+        self._written_seq: Dict[str, int] = {}
+        self._seq = 0
+        self._busy = 0
+
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+        self.stats = SaveWorkerStats()
+
+    # ---------- 提交 ----------
+
+    def submit(
+        self,
+        key: str,
+        write: SaveWriteFn,
+        *,
+        parts: Optional[Iterable[str]] = None,
+        on_done: Optional[SaveDoneCallback] = None,
+    ) -> int:
+        """
+        排队一次写盘任务，返回任务序号。
+        """
+        k = str(key)
+        ps = None if parts is None else frozenset(parts)
+        with self._cv:
+            if self._closed:
+                raise RuntimeError("SaveWorker is closed")
+            self._seq += 1
+            seq = self._seq
+            self.stats.submitted += 1
+
+            old = self._pending.get(k)
+            job = _SaveJob(key=k, seq=seq, write=write, parts=ps)
+            if old is not None:
+                # 合并：旧任务的数据已被新快照覆盖，但其分区与回调仍需随本次写出
+                job.parts = _merge_parts(old.parts, ps)
+                job.callbacks.extend(old.callbacks)
+                job.merged = old.merged + 1
+                self.stats.coalesced += 1
+            if on_done is not None:
+                job.callbacks.append(on_done)
+
+            self._pending[k] = job
+            self._due[k] = time.monotonic() + self._coalesce_s
+            self._ensure_thread_locked()
+            self._cv.notify_all()
+        return seq
+
+    def write_now(self, key: str, write: SaveWriteFn, *, parts: Optional[Iterable[str]] = None) -> None:
+        """
+        同步写盘（在调用线程执行，异常直接抛出）。
+        同 key 的待写任务被本次写入取代，其回调得到与本次写入相同的结果；
+        被取代任务（以及尚未拿到 IO 锁的进行中任务）的分区会并入本次写入。
+        """
+        k = str(key)
+        ps = None if parts is None else frozenset(parts)
+        with self._cv:
+            self._seq += 1
+            seq = self._seq
+            superseded = self._pending.pop(k, None)
+            self._due.pop(k, None)
+            if superseded is not None:
+                ps = _merge_parts(ps, superseded.parts)
+            inflight = self._inflight.get(k)
+            if inflight is not None:
+                ps = _merge_parts(ps, inflight.parts)
+            self._busy += 1
+
+        err: Optional[BaseException] = None
+        try:
+            with self._io_lock:
+                write(ps)
+                self._written_seq[k] = max(seq, self._written_seq.get(k, 0))
+                self.stats.written += 1
+        except BaseException as e:
+            err = e
+            self.stats.failed += 1
+            raise
+        finally:
+            if superseded is not None:
+                self._dispatch(superseded.callbacks, err)
+            with self._cv:
+                self._busy -= 1
+                self._cv.notify_all()
+
+    # ---------- 等待 / 关闭 ----------
+
+    def has_pending(self) -> bool:
+        with self._cv:
+            return bool(self._pending) or self._busy > 0
+
+    def flush(self, timeout_s: float = 5.0) -> bool:
+        """
+        立即写出所有待写任务并等待完成；超时返回 False。
+        """
+        deadline = time.monotonic() + max(0.0, float(timeout_s))
+        with self._cv:
+            now = time.monotonic()
+            for k in self._due:
+                self._due[k] = now
+            self._cv.notify_all()
+            while self._pending or self._busy > 0:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    return False
+                if self._pending:
+                    self._ensure_thread_locked()
+                self._cv.wait(left)
+        return True
+
+    def close(self, timeout_s: float = 5.0) -> bool:
+        ok = self.flush(timeout_s=timeout_s)
+        with self._cv:
+            self._closed = True
+            self._cv.notify_all()
+            th = self._thread
+        if th is not None:
+            th.join(timeout=max(0.0, float(timeout_s)))
+        return ok
+
+    # ---------- 内部 ----------
+
+    def _ensure_thread_locked(self) -> None:
+        th = self._thread
+        if th is not None and th.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+        self._thread.start()
+
+    def _next_job_locked(self) -> Optional[_SaveJob]:
+        """
+        取出最早到期的任务；没有到期任务时返回 None。
+        """
+        if not self._pending:
+            return None
+        now = time.monotonic()
+        key = min(self._due, key=lambda k: self._due[k])
+        if self._due[key] > now:
+            return None
+        self._due.pop(key, None)
+        job = self._pending.pop(key)
+        self._inflight[key] = job
+        self._busy += 1
+        return job
+
+    def _run(self) -> None:
+        while True:
+            with self._cv:
+                job = self._next_job_locked()
+                while job is None:
+                    if self._closed and not self._pending:
+                        return
+                    timeout = None
+                    if self._due:
+                        timeout = max(0.0, min(self._due.values()) - time.monotonic())
+                    self._cv.wait(timeout)
+                    job = self._next_job_locked()
+
+            err: Optional[BaseException] = None
+            try:
+                with self._io_lock:
+                    if job.seq < self._written_seq.get(job.key, 0):
+                        # 已被更新的同步写入取代，不能再用旧快照覆盖
+                        self.stats.skipped_stale += 1
+                    else:
+                        t0 = time.perf_counter()
+                        job.write(job.parts)
+                        self.stats.last_write_ms = (time.perf_counter() - t0) * 1000.0
+                        self._written_seq[job.key] = job.seq
+                        self.stats.written += 1
+            except Exception as e:
+                err = e
+                self.stats.failed += 1
+                log.exception("background save failed (key=%s merged=%d)", job.key, job.merged)
+            finally:
+                # 先投递回调再标记空闲：flush() 返回时回调已被调用或已排入 scheduler
+                self._dispatch(job.callbacks, err)
+                with self._cv:
+                    if self._inflight.get(job.key) is job:
+                        self._inflight.pop(job.key, None)
+                    self._busy -= 1
+                    self._cv.notify_all()
+
+    def _dispatch(self, callbacks: List[SaveDoneCallback], err: Optional[BaseException]) -> None:
+        for cb in callbacks:
+            def _call(cb=cb) -> None:
+                try:
+                    cb(err)
+                except Exception:
+                    log.exception("save callback failed")
+
+            if self._sch is None:
+                _call()
+                continue
+            try:
+                self._sch.call_soon(_call)
+            except Exception:
+                log.exception("SaveWorker scheduler.call_soon failed")
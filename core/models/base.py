@@ -188,6 +188,10 @@ class ExecConfig:
     新增（发键模式）：
     - key_sender_mode: "pynput" | "hid"
     - hid_dll_path: HID DLL 路径（相对或绝对）
+
+    新增（运行遥测）：
+    - telemetry_enabled: 每次运行记录引擎事件与探针像素（默认关闭）
+    - telemetry_path: 遥测文件路径（已存在则自动顺延编号）
     """
     enabled: bool = False
     toggle_hotkey: str = ""
@@ -203,6 +207,9 @@ class ExecConfig:
     key_sender_mode: str = "pynput"
     hid_dll_path: str = "assets/lib/KeyDispenserDLL.dll"
 
+    telemetry_enabled: bool = False
+    telemetry_path: str = "telemetry/run.tlm"
+
     @staticmethod
     def from_dict(d: Dict[str, Any]) -> "ExecConfig":
         d = as_dict(d)
@@ -231,6 +238,9 @@ class ExecConfig:
 
             key_sender_mode=sender_mode,
             hid_dll_path=hid_path,
+
+            telemetry_enabled=as_bool(d.get("telemetry_enabled", False), False),
+            telemetry_path=as_str(d.get("telemetry_path", "telemetry/run.tlm"), "telemetry/run.tlm"),
         )
 
     def to_dict(self) -> Dict[str, Any]:
@@ -248,6 +258,9 @@ class ExecConfig:
 
             "key_sender_mode": self.key_sender_mode,
             "hid_dll_path": self.hid_dll_path,
+
+            "telemetry_enabled": bool(self.telemetry_enabled),
+            "telemetry_path": self.telemetry_path,
         }
 
 
@@ -1,15 +1,28 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Tuple
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Optional, Sequence, Tuple
+import logging
 import threading
+import time
 
-import mss
+if TYPE_CHECKING:
+    import mss
 
+log = logging.getLogger(__name__)
 
 # 模块级 TLS：同一线程内所有 ScreenCapture 实例共享一个 mss.mss()
 _TLS = threading.local()
 
+# 显示器拓扑缓存（进程级，所有线程 / ScreenCapture 实例共享）
+_TOPO_LOCK = threading.Lock()
+_TOPO: Optional["MonitorTopology"] = None
+_TOPO_STALE = False
+_TOPO_WATCHER: Optional[threading.Thread] = None
+# 后台线程周期性重新枚举显示器的间隔（检测热插拔 / 分辨率 / 排列变化）
+TOPOLOGY_CHECK_INTERVAL_S = 2.0
+
 
 @dataclass(frozen=True)
 class SampleSpec:
@@ -36,6 +49,134 @@ class Rect:
         return self.left <= x < self.right and self.top <= y < self.bottom
 
 
+def _norm_monitor_key(monitor_key: str) -> str:
+    return (monitor_key or "all").strip().lower()
+
+
+@dataclass(frozen=True)
+class MonitorTopology:
+    """
+    不可变的显示器拓扑快照：
+
+    - rects[0] 为全部显示器的包围矩形（"all"），rects[N] 为第 N 个显示器
+    - generation：拓扑版本号，显示器布局变化时递增（用于让旧的 CapturePlan 失效）
+    - rect_for(key)：O(1) 查表（"all" / "primary" / "monitor_N"，非法 key 回落到 "all"）
+    - key_for_abs(x, y)：按显示器边界切分的网格 + 二分查找定位绝对坐标所在的显示器
+    """
+    generation: int
+    rects: Tuple[Rect, ...]
+    _by_key: Dict[str, Rect] = field(default_factory=dict, repr=False, compare=False)
+    _xs: Tuple[int, ...] = field(default=(), repr=False, compare=False)
+    _ys: Tuple[int, ...] = field(default=(), repr=False, compare=False)
+    _cells: Dict[Tuple[int, int], str] = field(default_factory=dict, repr=False, compare=False)
+
+    @staticmethod
+    def from_monitors(monitors: Sequence[Mapping[str, Any]], *, generation: int) -> "MonitorTopology":
+        rects = tuple(
+            Rect(left=int(m["left"]), top=int(m["top"]), width=int(m["width"]), height=int(m["height"]))
+            for m in monitors
+        )
+        if not rects:
+            rects = (Rect(0, 0, 0, 0),)
+
+        by_key: Dict[str, Rect] = {"all": rects[0]}
+        by_key["primary"] = rects[1] if len(rects) > 1 else rects[0]
+        for idx in range(1, len(rects)):
+            by_key[f"monitor_{idx}"] = rects[idx]
+
+        # 空间索引：所有显示器的左右/上下边界把平面切成网格，每个格子至多归属一个显示器
+        xs = tuple(sorted({r.left for r in rects[1:]} | {r.right for r in rects[1:]}))
+        ys = tuple(sorted({r.top for r in rects[1:]} | {r.bottom for r in rects[1:]}))
+        cells: Dict[Tuple[int, int], str] = {}
+        for i in range(len(xs) - 1):
+            for j in range(len(ys) - 1):
+                x, y = xs[i], ys[j]
+                for idx in range(1, len(rects)):
+                    if rects[idx].contains_abs(x, y):
+                        cells[(i, j)] = "primary" if idx == 1 else f"monitor_{idx}"
+                        break
+
+        return MonitorTopology(
+            generation=int(generation),
+            rects=rects,
+            _by_key=by_key,
+            _xs=xs,
+            _ys=ys,
+            _cells=cells,
+        )
+
+    def same_layout(self, monitors: Sequence[Mapping[str, Any]]) -> bool:
+        if len(monitors) != len(self.rects):
+            return False
+        for m, r in zip(monitors, self.rects):
+            if (int(m["left"]), int(m["top"]), int(m["width"]), int(m["height"])) != (
+                r.left, r.top, r.width, r.height
+            ):
+                return False
+        return True
+
+    def rect_for(self, monitor_key: str) -> Rect:
+        key = _norm_monitor_key(monitor_key)
+        r = self._by_key.get(key)
+        return r if r is not None else self.rects[0]
+
+    def key_for_abs(self, x_abs: int, y_abs: int) -> Optional[str]:
+        i = bisect_right(self._xs, int(x_abs)) - 1
+        j = bisect_right(self._ys, int(y_abs)) - 1
+        if i < 0 or j < 0 or i >= len(self._xs) - 1 or j >= len(self._ys) - 1:
+            return None
+        return self._cells.get((i, j))
+
+
+def _new_mss() -> "mss.mss":
+    # 延迟导入：只在真正截屏时才加载 mss（加快启动）；mss>=10.2 起 mss.mss() 已弃用，优先用 mss.MSS
+    import mss
+
+    factory = getattr(mss, "MSS", None) or mss.mss
+    return factory()
+
+
+def _enumerate_monitors() -> List[Dict[str, Any]]:
+    # mss 实例只在第一次访问 monitors 时枚举并缓存结果：重新枚举用一个短命实例读取公开的 monitors，
+    # 线程局部的截屏实例不受影响
+    with _new_mss() as sct:
+        return [dict(m) for m in sct.monitors]
+
+
+def _refresh_topology() -> "MonitorTopology":
+    """
+    重新枚举显示器；布局变化时生成新 generation 的拓扑对象，否则沿用当前对象。
+    """
+    global _TOPO, _TOPO_STALE
+    monitors = _enumerate_monitors()
+    with _TOPO_LOCK:
+        cur = _TOPO
+        _TOPO_STALE = False
+        if cur is not None and cur.same_layout(monitors):
+            return cur
+        gen = cur.generation + 1 if cur is not None else 1
+        _TOPO = MonitorTopology.from_monitors(monitors, generation=gen)
+        return _TOPO
+
+
+def _watch_topology() -> None:
+    while True:
+        time.sleep(TOPOLOGY_CHECK_INTERVAL_S)
+        try:
+            _refresh_topology()
+        except Exception as e:
+            log.debug("monitor topology check failed: %s", e)
+
+
+def _ensure_topology_watcher() -> None:
+    global _TOPO_WATCHER
+    with _TOPO_LOCK:
+        if _TOPO_WATCHER is not None and _TOPO_WATCHER.is_alive():
+            return
+        _TOPO_WATCHER = threading.Thread(target=_watch_topology, name="monitor-topology", daemon=True)
+        _TOPO_WATCHER.start()
+
+
 class ScreenCapture:
     """
     Screen capture helper (mss), now using MODULE-LEVEL thread-local storage.
@@ -47,21 +188,33 @@ class ScreenCapture:
 
     APIs:
     - _get_sct(): get thread-local mss instance (created lazily)
+    - warm_current_thread(): create this thread's mss instance + topology ahead of the first grab
     - close_current_thread(): close only this thread's mss instance
     - close(): alias of close_current_thread()
+    - topology(): cached MonitorTopology shared by all threads; a background
+      thread re-enumerates monitors every TOPOLOGY_CHECK_INTERVAL_S seconds, and
+      the next call after invalidate_topology() (e.g. after a grab error)
+      re-enumerates inline
     """
 
     def __init__(self) -> None:
         # no per-instance TLS anymore
         pass
 
-    def _get_sct(self) -> mss.mss:
+    def _get_sct(self) -> "mss.mss":
         sct = getattr(_TLS, "sct", None)
         if sct is None:
-            sct = mss.mss()
+            sct = _new_mss()
             _TLS.sct = sct
         return sct
 
+    def warm_current_thread(self) -> None:
+        """
+        在调用线程上预先创建 mss 实例并枚举显示器（引擎启动预热用；失败时抛出原异常）。
+        """
+        self._get_sct()
+        self.topology()
+
     def close_current_thread(self) -> None:
         sct = getattr(_TLS, "sct", None)
         if sct is not None:
@@ -85,54 +238,41 @@ class ScreenCapture:
             return hi
         return v
 
-    def get_monitor_rect(self, monitor_key: str) -> Rect:
-        sct = self._get_sct()
-        key = (monitor_key or "all").strip().lower()
-        monitors = sct.monitors  # type: ignore[attr-defined]
-
-        if key == "all":
-            idx = 0
-        elif key == "primary":
-            idx = 1 if len(monitors) > 1 else 0
-        elif key.startswith("monitor_"):
-            try:
-                n = int(key.split("_", 1)[1])
-                idx = n if n >= 1 else 0
-            except Exception:
-                idx = 0
-        else:
-            idx = 0
-
-        if idx >= len(monitors):
-            idx = 0
-
-        m = monitors[idx]
-        return Rect(
-            left=int(m["left"]),
-            top=int(m["top"]),
-            width=int(m["width"]),
-            height=int(m["height"]),
-        )
+    # -------- monitor topology --------
 
-    def find_monitor_key_for_abs(self, x_abs: int, y_abs: int, *, default: str = "primary") -> str:
-        sct = self._get_sct()
-        monitors = sct.monitors  # type: ignore[attr-defined]
-        x_abs = int(x_abs)
-        y_abs = int(y_abs)
+    def topology(self) -> MonitorTopology:
+        """
+        返回当前显示器拓扑（缓存，只读一次锁）；首次访问或被标记失效时就地重新枚举，
+        周期性检测交给后台线程，不占用截屏路径。
+        """
+        with _TOPO_LOCK:
+            topo = _TOPO
+            if topo is not None and not _TOPO_STALE:
+                return topo
+
+        topo = _refresh_topology()
+        _ensure_topology_watcher()
+        return topo
 
-        for idx in range(1, len(monitors)):
-            m = monitors[idx]
-            rect = Rect(
-                left=int(m["left"]),
-                top=int(m["top"]),
-                width=int(m["width"]),
-                height=int(m["height"]),
-            )
-            if rect.contains_abs(x_abs, y_abs):
-                if idx == 1:
-                    return "primary"
-                return f"monitor_{idx}"
+    def topology_generation(self) -> int:
+        return self.topology().generation
 
+    @staticmethod
+    def invalidate_topology() -> None:
+        """
+        标记拓扑待重新枚举（截屏失败等场景调用；下次访问时检测变化）。
+        """
+        global _TOPO_STALE
+        with _TOPO_LOCK:
+            _TOPO_STALE = True
+
+    def get_monitor_rect(self, monitor_key: str) -> Rect:
+        return self.topology().rect_for(monitor_key)
+
+    def find_monitor_key_for_abs(self, x_abs: int, y_abs: int, *, default: str = "primary") -> str:
+        key = self.topology().key_for_abs(int(x_abs), int(y_abs))
+        if key is not None:
+            return key
         return (default or "primary").strip() or "primary"
 
     # -------- coordinate conversion --------
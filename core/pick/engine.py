@@ -7,11 +7,12 @@ import time
 from dataclasses import dataclass
 from typing import Callable, Optional, Protocol
 
-from pynput import keyboard, mouse
-
-from core.input.hotkey import MOD_KEYS, MOD_NAME, normalize, compose, key_to_name
+from core.input.hotkey import normalize
+from core.input.hub import HotkeyHandle, InputHub, get_input_hub
 from core.pick.capture import ScreenCapture
 from core.pick.models import PickSessionConfig, PickPreview, PickConfirmed
+from core.pick.scanner import CapturePlan, MonitorCapturePlan, PixelProbe, PixelScanner
+from core.pick.shared_capture import CaptureService
 
 log = logging.getLogger(__name__)
 
@@ -45,15 +46,31 @@ class PickEngine:
     - 后台线程通过 Scheduler.call_soon 调度 UI 回调
     - config 是每次会话的不可变快照（PickSessionConfig）
 
+    - capture_service 非空时，预览取样订阅共享截屏服务（与运行中的引擎共用同一次抓屏），
+      确认取色仍直接抓屏
+
     注意：
     - 任何后台线程中的异常都会：
         * 写入日志（log.exception）
         * 尝试通过 on_error 回调通知 UI（节流）
     """
 
-    def __init__(self, *, scheduler: Scheduler) -> None:
+    def __init__(
+        self,
+        *,
+        scheduler: Scheduler,
+        hub: Optional[InputHub] = None,
+        capture: Optional[ScreenCapture] = None,
+        capture_service: Optional[CaptureService] = None,
+    ) -> None:
         self._sch = scheduler
-        self._cap = ScreenCapture()
+        self._cap = capture or ScreenCapture()
+        self._service = capture_service
+        self._service_scanner = PixelScanner(self._cap) if capture_service is not None else None
+        self._consumer_id = f"pick-preview-{id(self):x}"
+        self._service_roi: Optional[tuple[str, int, int, int, int]] = None
+        # 键盘输入走进程级共享钩子：会话期间注册 Esc / 确认热键，结束时注销
+        self._hub = hub or get_input_hub()
 
         self._lock = threading.RLock()
         self._active = False
@@ -61,10 +78,9 @@ class PickEngine:
         self._cbs: Optional[PickCallbacks] = None
 
         self._stop_evt = threading.Event()
-        self._kbd_listener: Optional[keyboard.Listener] = None
+        self._hotkeys: list[HotkeyHandle] = []
         self._preview_thread: Optional[threading.Thread] = None
 
-        self._mods: set[str] = set()
         self._start_t = 0.0
         self._last_err_t = 0.0
 
@@ -108,21 +124,19 @@ class PickEngine:
             self._cfg = cfg2
             self._cbs = cbs
             self._stop_evt.clear()
-            self._mods.clear()
             self._start_t = time.monotonic()
             self._last_err_t = 0.0
 
         self._sch.call_soon(lambda: cbs.on_enter(cfg2))
 
-        # keyboard listener 线程
+        # 键盘热键：Esc（任意修饰键）取消，确认热键取色
         try:
-            self._kbd_listener = keyboard.Listener(
-                on_press=self._on_key_press,
-                on_release=self._on_key_release,
-            )
-            self._kbd_listener.start()
+            for hk, fn, any_mods in (("esc", self._on_cancel_key, True), (cfg2.confirm_hotkey, self._on_confirm_key, False)):
+                h = self._hub.register_hotkey(hk, fn, any_mods=any_mods)
+                with self._lock:
+                    self._hotkeys.append(h)
         except Exception as e:
-            log.exception("keyboard.Listener start failed in PickEngine.start")
+            log.exception("InputHub.register_hotkey failed in PickEngine.start")
             self._sch.call_soon(lambda: cbs.on_error(f"键盘监听启动失败: {e}"))
             self.stop(reason="kbd_listener_failed")
             return
@@ -154,20 +168,19 @@ class PickEngine:
             self._active = False
             self._cfg = None
             self._cbs = None
-            self._mods.clear()
             self._stop_evt.set()
 
-            kbd = self._kbd_listener
-            self._kbd_listener = None
+            hotkeys = self._hotkeys
+            self._hotkeys = []
 
             th = self._preview_thread
             self._preview_thread = None
 
-        if kbd is not None:
+        for h in hotkeys:
             try:
-                kbd.stop()
+                self._hub.unregister(h)
             except Exception:
-                log.exception("keyboard.Listener.stop failed in PickEngine.stop")
+                log.exception("InputHub.unregister failed in PickEngine.stop")
 
         if th is not None:
             try:
@@ -178,9 +191,15 @@ class PickEngine:
         if cbs is not None:
             self._sch.call_soon(lambda: cbs.on_exit(reason))
 
-    # ---------- keyboard listener callbacks (非 UI 线程) ----------
+    # ---------- InputHub 热键回调（钩子线程，非 UI 线程） ----------
+
+    def _on_cancel_key(self) -> None:
+        try:
+            self.cancel()
+        except Exception:
+            log.exception("exception in PickEngine._on_cancel_key")
 
-    def _on_key_press(self, key) -> None:
+    def _on_confirm_key(self) -> None:
         try:
             with self._lock:
                 if not self._active:
@@ -189,42 +208,15 @@ class PickEngine:
                 cbs = self._cbs
             if cfg is None or cbs is None:
                 return
-
-            if key == keyboard.Key.esc:
-                self.cancel()
-                return
-
-            if key in MOD_KEYS:
-                name = MOD_NAME.get(key, "")
-                if name:
-                    self._mods.add(name)
-                return
-
-            main = key_to_name(key)
-            if not main:
-                return
-
-            got = normalize(compose(self._mods, main))
-            if got == cfg.confirm_hotkey:
-                self._confirm_at_current_mouse(cfg, cbs)
+            self._confirm_at_current_mouse(cfg, cbs)
         except Exception:
-            log.exception("exception in PickEngine._on_key_press")
-
-    def _on_key_release(self, key) -> None:
-        try:
-            with self._lock:
-                if not self._active:
-                    return
-            if key in MOD_KEYS:
-                name = MOD_NAME.get(key, "")
-                if name and name in self._mods:
-                    self._mods.remove(name)
-        except Exception:
-            log.exception("exception in PickEngine._on_key_release")
+            log.exception("exception in PickEngine._on_confirm_key")
 
     # ---------- confirm ----------
 
     def _confirm_at_current_mouse(self, cfg: PickSessionConfig, cbs: PickCallbacks) -> None:
+        from pynput import mouse
+
         ctrl = mouse.Controller()
         try:
             x0, y0 = ctrl.position
@@ -290,6 +282,8 @@ class PickEngine:
     # ---------- preview loop ----------
 
     def _preview_loop(self) -> None:
+        from pynput import mouse
+
         ctrl = mouse.Controller()
         try:
             while True:
@@ -314,7 +308,7 @@ class PickEngine:
                     abs_y = int(abs_y)
 
                     mon_used, inside = self._resolve_monitor(abs_x, abs_y, cfg.monitor_requested)
-                    r, g, b = self._cap.get_rgb_scoped_abs(abs_x, abs_y, cfg.sample, mon_used, require_inside=False)
+                    r, g, b = self._sample_preview(abs_x, abs_y, cfg, mon_used)
                     rel_x, rel_y = self._cap.abs_to_rel(abs_x, abs_y, mon_used)
                     hx = f"#{r:02X}{g:02X}{b:02X}"
 
@@ -344,11 +338,53 @@ class PickEngine:
 
                 time.sleep(max(0.005, float(cfg.preview_throttle_ms) / 1000.0))
         finally:
+            self._release_service()
             try:
                 self._cap.close_current_thread()
             except Exception:
                 log.exception("ScreenCapture.close_current_thread failed in _preview_loop")
 
+    def _sample_preview(self, abs_x: int, abs_y: int, cfg: PickSessionConfig, mon_used: str) -> tuple[int, int, int]:
+        """
+        预览取样：有共享截屏服务时订阅光标周围的小 ROI 并读共享帧，否则直接抓屏。
+        """
+        svc = self._service
+        sc = self._service_scanner
+        if svc is None or sc is None:
+            return self._cap.get_rgb_scoped_abs(abs_x, abs_y, cfg.sample, mon_used, require_inside=False)
+
+        rect = self._cap.get_monitor_rect(mon_used)
+        x = _clamp(int(abs_x), rect.left, rect.right - 1)
+        y = _clamp(int(abs_y), rect.top, rect.bottom - 1)
+        rad = int(cfg.sample.radius) if cfg.sample.mode == "mean_square" else 0
+        rad = max(0, min(50, rad))
+        size = 2 * rad + 1
+        left = _clamp(x - rad, rect.left, max(rect.left, rect.right - size))
+        top = _clamp(y - rad, rect.top, max(rect.top, rect.bottom - size))
+
+        roi = (mon_used, left, top, size, size)
+        if roi != self._service_roi:
+            plan = CapturePlan(plans={
+                mon_used: MonitorCapturePlan(
+                    monitor=mon_used, mode="roi", roi_left=left, roi_top=top, roi_width=size, roi_height=size,
+                ),
+            })
+            svc.subscribe(self._consumer_id, plan)
+            self._service_roi = roi
+
+        fr = svc.get_frame(self._consumer_id, max_age_ms=max(1, int(cfg.preview_throttle_ms)))
+        return sc.sample_rgb(fr.snapshot, PixelProbe(monitor=mon_used, vx=x, vy=y, sample=cfg.sample))
+
+    def _release_service(self) -> None:
+        svc = self._service
+        if svc is None or self._service_roi is None:
+            return
+        self._service_roi = None
+        try:
+            svc.unsubscribe(self._consumer_id)
+        except Exception:
+            log.exception("CaptureService.unsubscribe failed in PickEngine")
+
     # ---------- monitor selection ----------
 
     def _resolve_monitor(self, abs_x: int, abs_y: int, requested: str) -> tuple[str, bool]:
@@ -1,11 +1,17 @@
 from __future__ import annotations
 
+from concurrent.futures import Future
 from dataclasses import dataclass
-from typing import Dict, Tuple
+from typing import Dict, List, Optional, Tuple
+import logging
+import queue
+import threading
 import time
 
 from core.pick.capture import ScreenCapture, SampleSpec
 
+log = logging.getLogger(__name__)
+
 
 @dataclass
 class MonitorCapturePlan:
@@ -20,6 +26,8 @@ class MonitorCapturePlan:
 @dataclass
 class CapturePlan:
     plans: Dict[str, MonitorCapturePlan]
+    # 构建时的显示器拓扑版本（MonitorTopology.generation）；0 表示未绑定拓扑
+    topology_gen: int = 0
 
 
 @dataclass
@@ -30,12 +38,18 @@ class MonitorFrame:
     width: int
     height: int
     raw: bytes
+    # 该帧抓取完成的时刻（time.time()）；0 表示未记录
+    ts: float = 0.0
 
 
 @dataclass
 class FrameSnapshot:
     frames: Dict[str, MonitorFrame]
     ts: float
+    # 各显示器帧时间戳的最大差（毫秒）；单帧 / 无帧时为 0
+    skew_ms: float = 0.0
+    # 是否由并行抓取得到
+    parallel: bool = False
 
 
 @dataclass(frozen=True)
@@ -46,16 +60,71 @@ class PixelProbe:
     sample: SampleSpec
 
 
-class PixelScanner:
-    def __init__(self, capture: ScreenCapture) -> None:
+class _GrabWorker:
+    """
+    单个显示器 ROI 的抓取线程：线程内持有自己的 mss 实例（ScreenCapture 的线程局部对象），
+    submit(box) 返回 Future[(raw_bytes, ts)]。
+    """
+
+    def __init__(self, capture: ScreenCapture, name: str) -> None:
         self._cap = capture
+        self._q: "queue.SimpleQueue[Optional[Tuple[Future, Dict[str, int]]]]" = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, box: Dict[str, int]) -> "Future[Tuple[bytes, float]]":
+        fut: "Future[Tuple[bytes, float]]" = Future()
+        self._q.put((fut, box))
+        return fut
+
+    def close(self) -> None:
+        self._q.put(None)
+
+    def _run(self) -> None:
+        try:
+            while True:
+                item = self._q.get()
+                if item is None:
+                    return
+                fut, box = item
+                if not fut.set_running_or_notify_cancel():
+                    continue
+                try:
+                    sct = self._cap._get_sct()  # type: ignore[attr-defined]
+                    img = sct.grab(box)
+                    fut.set_result((bytes(img.raw), time.time()))
+                except BaseException as e:
+                    fut.set_exception(e)
+        finally:
+            try:
+                self._cap.close_current_thread()
+            except Exception:
+                pass
 
-    def capture_with_plan(self, plan: CapturePlan) -> FrameSnapshot:
-        sct = self._cap._get_sct()  # type: ignore[attr-defined]
 
-        frames: Dict[str, MonitorFrame] = {}
-        ts = time.time()
+class PixelScanner:
+    """
+    按 CapturePlan 抓取各显示器 ROI，并在 FrameSnapshot 上取样。
+
+    parallel=True 时（多显示器 plan）：
+    - 每个显示器 ROI 使用一个常驻抓取线程（各自的线程局部 mss 实例），
+      第一个 ROI 在调用线程抓取，其余并发抓取，快照延迟约为最慢的单次抓取而非总和
+    - 各帧记录抓取完成时间；若帧间时间差超过 max_skew_ms，会把过早的帧重抓一次
+    - 最终帧间时间差写入 FrameSnapshot.skew_ms
+    close() 结束抓取线程（线程退出时释放其 mss 实例）。
+    """
+
+    def __init__(self, capture: ScreenCapture, *, parallel: bool = False, max_skew_ms: float = 8.0) -> None:
+        self._cap = capture
+        self._parallel = bool(parallel)
+        self._max_skew_ms = max(0.0, float(max_skew_ms))
 
+        self._workers_lock = threading.Lock()
+        self._workers: Dict[str, _GrabWorker] = {}
+
+    @staticmethod
+    def _plan_boxes(plan: CapturePlan) -> List[Tuple[str, Dict[str, int]]]:
+        out: List[Tuple[str, Dict[str, int]]] = []
         for mon, mp in plan.plans.items():
             left = int(mp.roi_left)
             top = int(mp.roi_top)
@@ -63,53 +132,141 @@ class PixelScanner:
             height = int(mp.roi_height)
             if width <= 0 or height <= 0:
                 continue
+            out.append((mon, {"left": left, "top": top, "width": width, "height": height}))
+        return out
 
-            box = {"left": left, "top": top, "width": width, "height": height}
-            img = sct.grab(box)
+    @staticmethod
+    def _make_frame(mon: str, box: Dict[str, int], raw: bytes, ts: float) -> MonitorFrame:
+        return MonitorFrame(
+            monitor_key=mon,
+            left=box["left"],
+            top=box["top"],
+            width=box["width"],
+            height=box["height"],
+            raw=raw,  # BGRA
+            ts=ts,
+        )
+
+    @staticmethod
+    def _skew_ms(frames: Dict[str, MonitorFrame]) -> float:
+        if len(frames) < 2:
+            return 0.0
+        stamps = [f.ts for f in frames.values()]
+        return (max(stamps) - min(stamps)) * 1000.0
+
+    def capture_with_plan(self, plan: CapturePlan) -> FrameSnapshot:
+        boxes = self._plan_boxes(plan)
+        if self._parallel and len(boxes) >= 2:
+            return self._capture_parallel(boxes)
+
+        sct = self._cap._get_sct()  # type: ignore[attr-defined]
 
-            frames[mon] = MonitorFrame(
-                monitor_key=mon,
-                left=left,
-                top=top,
-                width=width,
-                height=height,
-                raw=bytes(img.raw),  # BGRA
-            )
+        frames: Dict[str, MonitorFrame] = {}
+        ts = time.time()
 
-        return FrameSnapshot(frames=frames, ts=ts)
+        for mon, box in boxes:
+            img = sct.grab(box)
+            frames[mon] = self._make_frame(mon, box, bytes(img.raw), time.time())
+
+        return FrameSnapshot(frames=frames, ts=ts, skew_ms=self._skew_ms(frames))
+
+    def _worker_for(self, mon: str) -> _GrabWorker:
+        with self._workers_lock:
+            w = self._workers.get(mon)
+            if w is None:
+                w = _GrabWorker(self._cap, name=f"pixel-grab-{mon}")
+                self._workers[mon] = w
+            return w
+
+    def _grab_many(self, boxes: List[Tuple[str, Dict[str, int]]]) -> Dict[str, MonitorFrame]:
+        """
+        第一个 ROI 在调用线程抓取，其余交给各自的抓取线程；任一失败则抛出该异常。
+        """
+        futures: List[Tuple[str, Dict[str, int], Future]] = [
+            (mon, box, self._worker_for(mon).submit(box)) for mon, box in boxes[1:]
+        ]
+
+        frames: Dict[str, MonitorFrame] = {}
+        err: Optional[Exception] = None
+        mon0, box0 = boxes[0]
+        try:
+            img = self._cap._get_sct().grab(box0)  # type: ignore[attr-defined]
+            frames[mon0] = self._make_frame(mon0, box0, bytes(img.raw), time.time())
+        except Exception as e:
+            err = e
+
+        # 即使本线程抓取失败也要等待其余任务结束，避免遗留的结果串到下一次
+        for mon, box, fut in futures:
+            try:
+                raw, ts = fut.result()
+                frames[mon] = self._make_frame(mon, box, raw, ts)
+            except Exception as e:
+                if err is None:
+                    err = e
+        if err is not None:
+            raise err
+        return frames
+
+    def _capture_parallel(self, boxes: List[Tuple[str, Dict[str, int]]]) -> FrameSnapshot:
+        ts = time.time()
+        frames = self._grab_many(boxes)
+
+        skew = self._skew_ms(frames)
+        if self._max_skew_ms > 0 and skew > self._max_skew_ms:
+            # 超出允许的帧间时间差：重抓早于 (最新帧 - max_skew) 的帧
+            newest = max(f.ts for f in frames.values())
+            cutoff = newest - self._max_skew_ms / 1000.0
+            stale = [(mon, box) for mon, box in boxes if frames[mon].ts < cutoff]
+            if stale:
+                frames.update(self._grab_many(stale))
+                skew = self._skew_ms(frames)
+                if skew > self._max_skew_ms:
+                    log.debug("parallel grab skew %.1f ms exceeds bound %.1f ms", skew, self._max_skew_ms)
+
+        return FrameSnapshot(frames=frames, ts=ts, skew_ms=skew, parallel=True)
+
+    def close(self) -> None:
+        """
+        结束所有抓取线程（再次抓取时会按需重建）。
+        """
+        with self._workers_lock:
+            workers = list(self._workers.values())
+            self._workers.clear()
+        for w in workers:
+            w.close()
 
     def sample_rgb(self, snap: FrameSnapshot, probe: PixelProbe) -> Tuple[int, int, int]:
+        rgb = self.sample_rgb_in_frame(snap, probe)
+        if rgb is not None:
+            return rgb
+        # 关键改动：不在 ROI 帧内，直接 fallback，禁止 clamp（避免 silent wrong）
+        return self._cap.get_rgb_scoped_abs(
+            x_abs=int(probe.vx),
+            y_abs=int(probe.vy),
+            sample=probe.sample,
+            monitor_key=(probe.monitor or "primary").strip().lower() or "primary",
+            require_inside=False,
+        )
+
+    @classmethod
+    def sample_rgb_in_frame(cls, snap: FrameSnapshot, probe: PixelProbe) -> Optional[Tuple[int, int, int]]:
+        """
+        只在 snapshot 已有的帧上取样（不抓屏）；探针不在任何 ROI 帧内时返回 None。
+        """
         mk = (probe.monitor or "primary").strip().lower() or "primary"
         mf = snap.frames.get(mk)
         if mf is None:
-            return self._cap.get_rgb_scoped_abs(
-                x_abs=int(probe.vx),
-                y_abs=int(probe.vy),
-                sample=probe.sample,
-                monitor_key=mk,
-                require_inside=False,
-            )
+            return None
 
-        x_abs = int(probe.vx)
-        y_abs = int(probe.vy)
-
-        x_rel = x_abs - mf.left
-        y_rel = y_abs - mf.top
-
-        # 关键改动：不在 ROI 帧内，直接 fallback，禁止 clamp（避免 silent wrong）
+        x_rel = int(probe.vx) - mf.left
+        y_rel = int(probe.vy) - mf.top
         if x_rel < 0 or x_rel >= mf.width or y_rel < 0 or y_rel >= mf.height:
-            return self._cap.get_rgb_scoped_abs(
-                x_abs=int(probe.vx),
-                y_abs=int(probe.vy),
-                sample=probe.sample,
-                monitor_key=mk,
-                require_inside=False,
-            )
+            return None
 
         if probe.sample.mode == "mean_square" and int(probe.sample.radius) > 0:
-            return self._mean_square_in_frame(mf, x_rel=x_rel, y_rel=y_rel, radius=int(probe.sample.radius))
+            return cls._mean_square_in_frame(mf, x_rel=x_rel, y_rel=y_rel, radius=int(probe.sample.radius))
 
-        return self._single_in_frame(mf, x_rel=x_rel, y_rel=y_rel)
+        return cls._single_in_frame(mf, x_rel=x_rel, y_rel=y_rel)
 
     @staticmethod
     def _single_in_frame(mf: MonitorFrame, x_rel: int, y_rel: int) -> Tuple[int, int, int]:
@@ -0,0 +1,554 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+import logging
+import struct
+import threading
+import time
+
+from core.pick.capture import ScreenCapture
+from core.pick.scanner import CapturePlan, FrameSnapshot, MonitorCapturePlan, MonitorFrame, PixelScanner
+
+log = logging.getLogger(__name__)
+
+
+# ---------------- shared-memory layout ----------------
+#
+# header:
+#   seq        u64   seqlock 计数（奇数 = 正在写）
+#   frame_id   u64   已发布帧序号（从 1 开始）
+#   plan_gen   u64   该帧对应的并集 plan 版本
+#   mono_ms    f64   发布时刻（time.monotonic() * 1000，跨进程可比）
+#   ts         f64   FrameSnapshot.ts
+#   skew_ms    f64
+#   n_frames   u32
+#   flags      u32   bit0 = parallel, bit1 = retired（缓冲区已被更大的新段取代）
+# descriptors (MAX_MONITORS 个)：
+#   key 16s, left/top/width/height i32, ts f64, offset u64, length u64
+# data: 各显示器 ROI 的 BGRA 原始字节
+
+_HDR = struct.Struct("<QQQdddII")
+_DESC = struct.Struct("<16siiiidQQ")
+MAX_MONITORS = 8
+_DATA_OFFSET = 512
+assert _HDR.size + MAX_MONITORS * _DESC.size <= _DATA_OFFSET
+
+_FLAG_PARALLEL = 1
+_FLAG_RETIRED = 2
+
+
+def _mono_ms() -> float:
+    return time.monotonic() * 1000.0
+
+
+@dataclass(frozen=True)
+class SharedFrame:
+    """
+    从共享内存读出的一帧：
+    - frame_id : 发布序号
+    - plan_gen : 发布时的并集 plan 版本
+    - mono_ms  : 发布时刻（time.monotonic() * 1000）
+    - snapshot : 可直接交给 PixelScanner.sample_rgb 的 FrameSnapshot
+    """
+    frame_id: int
+    plan_gen: int
+    mono_ms: float
+    snapshot: FrameSnapshot
+
+    def age_ms(self, now_mono_ms: Optional[float] = None) -> float:
+        now = _mono_ms() if now_mono_ms is None else float(now_mono_ms)
+        return max(0.0, now - self.mono_ms)
+
+
+class SharedFrameBuffer:
+    """
+    单写多读的共享内存帧缓冲（seqlock）：
+
+    - 写端（CaptureService 线程）：seq 置奇数 -> 写描述符与像素 -> seq 置偶数
+    - 读端（任意线程 / 进程）：读 seq -> 拷贝 -> 再读 seq，两次相同且为偶数才算一致，否则重试
+      读端不加锁，写端也不会被读端阻塞
+    其它进程可用 SharedFrameBuffer.attach(name) 只读挂载。
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, *, owner: bool) -> None:
+        self._shm = shm
+        self._owner = bool(owner)
+        self._buf = shm.buf
+
+    @staticmethod
+    def create(capacity: int) -> "SharedFrameBuffer":
+        size = _DATA_OFFSET + max(0, int(capacity))
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        shm.buf[:_DATA_OFFSET] = bytes(_DATA_OFFSET)
+        return SharedFrameBuffer(shm, owner=True)
+
+    @staticmethod
+    def attach(name: str) -> "SharedFrameBuffer":
+        return SharedFrameBuffer(shared_memory.SharedMemory(name=name), owner=False)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def capacity(self) -> int:
+        return max(0, len(self._buf) - _DATA_OFFSET)
+
+    def _seq(self) -> int:
+        return struct.unpack_from("<Q", self._buf, 0)[0]
+
+    # ---------- writer ----------
+
+    def write(self, snap: FrameSnapshot, *, frame_id: int, plan_gen: int) -> None:
+        frames = list(snap.frames.values())[:MAX_MONITORS]
+        need = sum(len(f.raw) for f in frames)
+        if need > self.capacity:
+            raise ValueError(f"frame too large for shared buffer: {need} > {self.capacity}")
+
+        buf = self._buf
+        seq = self._seq()
+        struct.pack_into("<Q", buf, 0, seq + 1)
+
+        off = _DATA_OFFSET
+        for i, f in enumerate(frames):
+            n = len(f.raw)
+            buf[off:off + n] = f.raw
+            _DESC.pack_into(
+                buf, _HDR.size + i * _DESC.size,
+                f.monitor_key.encode("utf-8")[:16],
+                int(f.left), int(f.top), int(f.width), int(f.height),
+                float(f.ts), off, n,
+            )
+            off += n
+
+        flags = _FLAG_PARALLEL if snap.parallel else 0
+        _HDR.pack_into(
+            buf, 0,
+            seq + 1, int(frame_id), int(plan_gen), _mono_ms(),
+            float(snap.ts), float(snap.skew_ms), len(frames), flags,
+        )
+        struct.pack_into("<Q", buf, 0, seq + 2)
+
+    def retire(self) -> None:
+        """
+        标记本段已被新段取代（其它进程的读端据此重新查询段名）。
+        """
+        buf = self._buf
+        seq = self._seq()
+        struct.pack_into("<Q", buf, 0, seq + 1)
+        flags = struct.unpack_from("<I", buf, _HDR.size - 4)[0]
+        struct.pack_into("<I", buf, _HDR.size - 4, flags | _FLAG_RETIRED)
+        struct.pack_into("<Q", buf, 0, seq + 2)
+
+    # ---------- reader ----------
+
+    def is_retired(self) -> bool:
+        flags = struct.unpack_from("<I", self._buf, _HDR.size - 4)[0]
+        return bool(flags & _FLAG_RETIRED)
+
+    def read(self, *, max_retries: int = 64) -> Optional[SharedFrame]:
+        """
+        读取最新一帧；尚未发布 / 已退役 / 多次重试仍被写端打断时返回 None。
+        """
+        buf = self._buf
+        for attempt in range(max(1, int(max_retries))):
+            s1 = self._seq()
+            if s1 & 1:
+                time.sleep(0)
+                continue
+
+            _s, frame_id, plan_gen, mono, ts, skew, n, flags = _HDR.unpack_from(buf, 0)
+            if frame_id <= 0 or (flags & _FLAG_RETIRED):
+                return None
+
+            frames: Dict[str, MonitorFrame] = {}
+            for i in range(min(int(n), MAX_MONITORS)):
+                key, left, top, width, height, fts, off, ln = _DESC.unpack_from(buf, _HDR.size + i * _DESC.size)
+                mk = key.rstrip(b"\0").decode("utf-8", "replace")
+                frames[mk] = MonitorFrame(
+                    monitor_key=mk,
+                    left=left,
+                    top=top,
+                    width=width,
+                    height=height,
+                    raw=bytes(buf[off:off + ln]),
+                    ts=fts,
+                )
+
+            if self._seq() != s1:
+                continue
+
+            snap = FrameSnapshot(frames=frames, ts=ts, skew_ms=skew, parallel=bool(flags & _FLAG_PARALLEL))
+            return SharedFrame(frame_id=int(frame_id), plan_gen=int(plan_gen), mono_ms=float(mono), snapshot=snap)
+        return None
+
+    def close(self) -> None:
+        try:
+            self._buf = None  # type: ignore[assignment]
+            self._shm.close()
+        except Exception:
+            pass
+        if self._owner:
+            try:
+                self._shm.unlink()
+            except Exception:
+                pass
+
+
+# ---------------- capture service ----------------
+
+
+@dataclass
+class ConsumerStats:
+    """
+    单个订阅者的取帧统计（帧龄 = 读到的帧发布至今的时长）。
+    """
+    consumer_id: str
+    reads: int = 0
+    waits: int = 0
+    last_age_ms: float = 0.0
+    max_age_ms: float = 0.0
+    total_age_ms: float = 0.0
+
+    @property
+    def avg_age_ms(self) -> float:
+        return self.total_age_ms / self.reads if self.reads else 0.0
+
+
+@dataclass
+class _Subscription:
+    plan: CapturePlan
+    plan_gen: int
+    stats: ConsumerStats = field(default_factory=lambda: ConsumerStats(consumer_id=""))
+
+
+def union_plans(plans: List[CapturePlan]) -> CapturePlan:
+    """
+    各订阅者 plan 的并集：每个显示器取所有 ROI 的最小包围矩形；
+    任一订阅者为 full 时该显示器按 full 处理（包围矩形本身即整屏）。
+    """
+    acc: Dict[str, Tuple[int, int, int, int, bool]] = {}
+    topo_gen = 0
+    for p in plans:
+        topo_gen = max(topo_gen, int(getattr(p, "topology_gen", 0) or 0))
+        for mk, mp in (p.plans or {}).items():
+            if int(mp.roi_width) <= 0 or int(mp.roi_height) <= 0:
+                continue
+            l, t = int(mp.roi_left), int(mp.roi_top)
+            r, b = l + int(mp.roi_width), t + int(mp.roi_height)
+            full = (mp.mode or "").strip().lower() == "full"
+            cur = acc.get(mk)
+            if cur is None:
+                acc[mk] = (l, t, r, b, full)
+            else:
+                acc[mk] = (min(cur[0], l), min(cur[1], t), max(cur[2], r), max(cur[3], b), cur[4] or full)
+
+    out: Dict[str, MonitorCapturePlan] = {}
+    for mk, (l, t, r, b, full) in acc.items():
+        out[mk] = MonitorCapturePlan(
+            monitor=mk,
+            mode="full" if full else "roi",
+            roi_left=l,
+            roi_top=t,
+            roi_width=r - l,
+            roi_height=b - t,
+        )
+    return CapturePlan(plans=out, topology_gen=topo_gen)
+
+
+class CaptureService:
+    """
+    共享截屏服务（单独线程）：
+
+    - 多个消费者（多个引擎实例 / 预览 UI）各自 subscribe(consumer_id, plan)
+    - 服务按所有订阅 plan 的并集抓取一次，发布到共享内存（SharedFrameBuffer，seqlock），
+      所有消费者读同一帧：N 个消费者同一时刻只需要一次抓屏
+    - 按需抓取：get_frame 发现最新帧比 max_age_ms 旧（或早于自己的订阅）时唤醒服务线程，
+      同时到来的请求合并为一次抓取
+    - consumer_stats() 报告各消费者读到的帧龄
+    - 其它进程可用 SharedFrameBuffer.attach(service.buffer_name) 只读挂载同一缓冲区
+
+    抓取失败时，等待中的 get_frame 抛出 RuntimeError（由 CaptureManager 统一吞并 + backoff）。
+    """
+
+    def __init__(
+        self,
+        *,
+        capture: Optional[ScreenCapture] = None,
+        scanner: Optional[PixelScanner] = None,
+        initial_capacity: int = 4 * 1024 * 1024,
+        parallel_grab: bool = False,
+    ) -> None:
+        self._cap = capture or ScreenCapture()
+        # parallel_grab=True 时多显示器 ROI 并发抓取（每个显示器一个常驻抓取线程）
+        self._scanner = scanner or PixelScanner(self._cap, parallel=parallel_grab)
+        self._initial_capacity = max(1024, int(initial_capacity))
+
+        self._cond = threading.Condition(threading.Lock())
+        self._subs: Dict[str, _Subscription] = {}
+        self._plan_gen = 0
+        self._union: CapturePlan = CapturePlan(plans={})
+
+        self._buf: Optional[SharedFrameBuffer] = None
+        # 各段上正在进行的本进程读取数（get_frame 不持锁读取，读取期间 pin 住所在段）
+        self._readers: Dict[SharedFrameBuffer, int] = {}
+        # 已退役但仍有读端未读完的旧段：最后一个读端 unpin 时释放
+        self._retired: List[SharedFrameBuffer] = []
+        self._frame_id = 0
+        self._want = False
+        self._last_error = ""
+        self._error_gen = 0
+
+        self._stop = False
+        self._thread: Optional[threading.Thread] = None
+
+    # ---------- lifecycle ----------
+
+    def start(self) -> None:
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            if self._buf is None:
+                self._buf = SharedFrameBuffer.create(self._initial_capacity)
+            self._stop = False
+            self._thread = threading.Thread(target=self._run, name="capture-service", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stop = True
+            th = self._thread
+            self._thread = None
+            self._cond.notify_all()
+        if th is not None:
+            th.join(timeout=1.0)
+        # 正在被读取的段交给最后一个读端释放，其余立即释放
+        with self._cond:
+            bufs = ([self._buf] if self._buf is not None else []) + self._retired
+            self._buf = None
+            self._retired = [b for b in bufs if self._readers.get(b, 0) > 0]
+            free = [b for b in bufs if self._readers.get(b, 0) <= 0]
+        for b in free:
+            b.close()
+
+    def is_running(self) -> bool:
+        th = self._thread
+        return bool(th is not None and th.is_alive())
+
+    @property
+    def buffer_name(self) -> str:
+        with self._cond:
+            return self._buf.name if self._buf is not None else ""
+
+    # ---------- subscriptions ----------
+
+    def subscribe(self, consumer_id: str, plan: CapturePlan) -> None:
+        """
+        新增 / 更新订阅；并集 plan 变化后，下一次抓取即按新并集进行。
+        """
+        cid = (consumer_id or "").strip()
+        if not cid:
+            raise ValueError("consumer_id is required")
+        with self._cond:
+            self._plan_gen += 1
+            old = self._subs.get(cid)
+            stats = old.stats if old is not None else ConsumerStats(consumer_id=cid)
+            self._subs[cid] = _Subscription(plan=plan, plan_gen=self._plan_gen, stats=stats)
+            self._union = union_plans([s.plan for s in self._subs.values()])
+
+    def unsubscribe(self, consumer_id: str) -> None:
+        cid = (consumer_id or "").strip()
+        with self._cond:
+            if self._subs.pop(cid, None) is None:
+                return
+            self._plan_gen += 1
+            self._union = union_plans([s.plan for s in self._subs.values()])
+
+    def union_plan(self) -> CapturePlan:
+        with self._cond:
+            return self._union
+
+    def consumer_stats(self) -> Dict[str, ConsumerStats]:
+        with self._cond:
+            return {
+                cid: ConsumerStats(
+                    consumer_id=cid,
+                    reads=s.stats.reads,
+                    waits=s.stats.waits,
+                    last_age_ms=s.stats.last_age_ms,
+                    max_age_ms=s.stats.max_age_ms,
+                    total_age_ms=s.stats.total_age_ms,
+                )
+                for cid, s in self._subs.items()
+            }
+
+    # ---------- consumer API ----------
+
+    def get_frame(self, consumer_id: str, *, max_age_ms: int = 30, timeout_ms: int = 500) -> SharedFrame:
+        """
+        返回覆盖该订阅者 plan、且不比 max_age_ms 更旧的最新帧；必要时触发一次（合并的）抓取。
+        """
+        cid = (consumer_id or "").strip()
+        if not self.is_running():
+            self.start()
+
+        deadline = time.monotonic() + max(1, int(timeout_ms)) / 1000.0
+        waited = False
+
+        while True:
+            with self._cond:
+                sub = self._subs.get(cid)
+                if sub is None:
+                    raise KeyError(f"consumer not subscribed: {cid}")
+                need_gen = sub.plan_gen
+                buf = self._buf
+                if buf is not None:
+                    self._readers[buf] = self._readers.get(buf, 0) + 1
+            # seqlock 读取不持锁（读端之间、读端与订阅 / 统计互不阻塞）；pin 住的段不会被关闭
+            fr = None
+            if buf is not None:
+                try:
+                    fr = buf.read()
+                finally:
+                    self._unpin(buf)
+            if fr is not None and fr.plan_gen >= need_gen:
+                age = fr.age_ms()
+                if age <= max(0, int(max_age_ms)):
+                    self._record_read(cid, age, waited=waited)
+                    return fr
+
+            with self._cond:
+                if time.monotonic() >= deadline:
+                    raise TimeoutError("capture service: frame timeout")
+                seen_id = self._frame_id
+                seen_err = self._error_gen
+                self._want = True
+                self._cond.notify_all()
+                while self._frame_id == seen_id and self._error_gen == seen_err and not self._stop:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._error_gen != seen_err:
+                    raise RuntimeError(self._last_error or "capture_failed")
+                if self._stop:
+                    raise RuntimeError("capture service stopped")
+            waited = True
+
+    def _unpin(self, buf: SharedFrameBuffer) -> None:
+        with self._cond:
+            n = self._readers.get(buf, 0) - 1
+            if n > 0:
+                self._readers[buf] = n
+                return
+            self._readers.pop(buf, None)
+            if buf not in self._retired:
+                return
+            self._retired.remove(buf)
+        buf.close()
+
+    def _record_read(self, cid: str, age: float, *, waited: bool) -> None:
+        with self._cond:
+            sub = self._subs.get(cid)
+            if sub is None:
+                return
+            st = sub.stats
+            st.reads += 1
+            if waited:
+                st.waits += 1
+            st.last_age_ms = age
+            st.max_age_ms = max(st.max_age_ms, age)
+            st.total_age_ms += age
+
+    # ---------- service thread ----------
+
+    def _run(self) -> None:
+        try:
+            while True:
+                with self._cond:
+                    while not self._want and not self._stop:
+                        self._cond.wait()
+                    if self._stop:
+                        return
+                    self._want = False
+                    plan = self._union
+                    plan_gen = self._plan_gen
+
+                try:
+                    snap = self._scanner.capture_with_plan(plan)
+                    self._publish(snap, plan_gen)
+                except Exception as e:
+                    log.debug("capture service grab failed: %s", e)
+                    try:
+                        self._cap.invalidate_topology()
+                    except Exception:
+                        pass
+                    with self._cond:
+                        self._last_error = str(e)
+                        self._error_gen += 1
+                        self._cond.notify_all()
+                    continue
+
+                with self._cond:
+                    self._frame_id += 1
+                    self._cond.notify_all()
+        finally:
+            try:
+                self._scanner.close()
+            except Exception:
+                pass
+            try:
+                self._cap.close_current_thread()
+            except Exception:
+                pass
+
+    def _publish(self, snap: FrameSnapshot, plan_gen: int) -> None:
+        need = sum(len(f.raw) for f in snap.frames.values())
+        with self._cond:
+            buf = self._buf
+            frame_id = self._frame_id + 1
+        if buf is None:
+            return
+        if need > buf.capacity:
+            # 并集 ROI 变大：换更大的新段，旧段标记退役（其它进程的读端据此重新挂载）
+            new_buf = SharedFrameBuffer.create(int(need * 1.25))
+            # 先标记再换段：换段后旧段可能随最后一个读端 unpin 被释放
+            buf.retire()
+            with self._cond:
+                self._buf = new_buf
+                busy = self._readers.get(buf, 0) > 0
+                if busy:
+                    self._retired.append(buf)
+            if not busy:
+                buf.close()
+            buf = new_buf
+        buf.write(snap, frame_id=frame_id, plan_gen=plan_gen)
+
+
+_SERVICE: Optional[CaptureService] = None
+_SERVICE_LOCK = threading.Lock()
+
+
+def shared_capture_service() -> CaptureService:
+    """
+    进程级单例（按需启动）。
+    """
+    global _SERVICE
+    with _SERVICE_LOCK:
+        if _SERVICE is None:
+            _SERVICE = CaptureService()
+        return _SERVICE
+
+
+def stop_shared_capture_service() -> None:
+    """
+    停止进程级单例并释放共享内存（程序退出时调用；之后再取会重新创建）。
+    """
+    global _SERVICE
+    with _SERVICE_LOCK:
+        svc = _SERVICE
+        _SERVICE = None
+    if svc is not None:
+        svc.stop()
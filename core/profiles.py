@@ -41,7 +41,7 @@ class ProfileContext:
     - profile_name: 逻辑名称（目录名）
     - profile_dir : 物理目录路径
     - idgen       : 用于生成各种 ID 的 SnowflakeGenerator
-    - repo        : ProfileRepository（负责 profile.json 的读写）
+    - repo        : ProfileRepository（负责 profile 的读写，split 布局按分区存储）
     - profile     : 聚合后的 Profile 对象（meta/base/skills/points/rotations）
 
     为了兼容现有调用代码，这里提供 meta/base/skills/points/rotations
@@ -98,11 +98,11 @@ class ProfileContext:
     def rotations(self, value: RotationsFile) -> None:
         self.profile.rotations = value
 
-    # ---------- 旧的批量保存接口（现在用 profile.json） ----------
+    # ---------- 旧的批量保存接口 ----------
 
     def save_all(self, *, backup: bool = True) -> None:
         """
-        兼容旧接口：统一保存整个 Profile 到 profile.json。
+        兼容旧接口：保存整个 Profile（全部分区）。
         """
         self.repo.save(self.profile_name, self.profile, backup=backup)
 
@@ -111,8 +111,9 @@ class ProfileManager:
     """
     负责管理 profiles 根目录下的多个 Profile：
 
-    - 现在使用单一的 profiles/<name>/profile.json 存储：
-        * meta/base/skills/points/rotations 全部在一个文件中
+    - 使用 split 布局存储：profiles/<name>/manifest.json + parts/<part>.<version>.json
+        * meta/base/skills/points/rotations 各自独立文件，只重写变更的分区
+        * 旧的单文件 profiles/<name>/profile.json 在首次打开时自动迁移
     """
 
     def __init__(
@@ -132,7 +133,7 @@ class ProfileManager:
         self._idgen = idgen
 
         # 聚合仓储
-        self._repo = ProfileRepository(self._profiles_root)
+        self._repo = ProfileRepository(self._profiles_root, layout="split")
 
         self.current: Optional[ProfileContext] = None
 
@@ -178,7 +179,7 @@ class ProfileManager:
         profile_dir = self._profiles_root / name
         ensure_dir(profile_dir)
 
-        # 若 profile.json 不存在，ProfileRepository 会创建新的 Profile
+        # 若 profile 数据不存在，ProfileRepository 会创建新的 Profile
         ctx = self._load_profile_dir(profile_dir=profile_dir, profile_name=name)
         self._set_last_profile(name)
         self.current = ctx
@@ -256,7 +257,7 @@ class ProfileManager:
         # 通过聚合更新 meta.profile_name
         prof = self._repo.load_or_create(new_name, self._idgen)
         prof.meta.profile_name = new_name
-        self._repo.save(new_name, prof, backup=False)
+        self._repo.save_dict(new_name, prof.to_dict(), parts={"meta"}, backup=False)
 
         ctx = self._load_profile_dir(profile_dir=new_dir, profile_name=new_name)
         self._set_last_profile(new_name)
@@ -271,7 +272,7 @@ class ProfileManager:
 
     def _load_profile_dir(self, *, profile_dir: Path, profile_name: str) -> ProfileContext:
         """
-        使用 ProfileRepository 从 profile.json 加载 Profile 聚合。
+        使用 ProfileRepository 加载 Profile 聚合（必要时从 profile.json 迁移）。
         """
         profile = self._repo.load_or_create(profile_name, self._idgen)
 
@@ -1,19 +1,32 @@
 # core/repos/profile_repo.py
 from __future__ import annotations
 
+import logging
 import re
 from pathlib import Path
+from typing import Any, Dict, Iterable, Literal, Optional
 
 from core.idgen.snowflake import SnowflakeGenerator
-from core.io.json_store import ensure_dir, read_json, atomic_write_json
+from core.io.json_store import ensure_dir, read_json, atomic_write_json, now_iso_utc, JsonReadError
 from core.domain.profile import Profile
 
+log = logging.getLogger(__name__)
+
 
 # 为避免循环依赖，这里本地实现与 core.profiles 中一致的 sanitize_profile_name
 
 _ILLEGAL_FS_CHARS = r'<>:"/\\|?*'
 _ILLEGAL_FS_RE = re.compile(f"[{re.escape(_ILLEGAL_FS_CHARS)}]")
 
+ProfileLayout = Literal["single", "split"]
+
+# 分区顺序与 Profile.to_dict 中的字段一致
+PROFILE_PARTS = ("meta", "base", "skills", "points", "rotations")
+
+_MANIFEST_NAME = "manifest.json"
+_PARTS_DIR = "parts"
+_PART_FILE_RE = re.compile(r"^(?P<part>[a-z_]+)\.(?P<ver>\d+)\.json$")
+
 
 def _sanitize_profile_name(name: str) -> str:
     """Windows 友好的目录名清洗（本模块内部使用版）。"""
@@ -28,18 +41,32 @@ def _sanitize_profile_name(name: str) -> str:
 class ProfileRepository:
     """
     Profile 聚合仓储：
-    - 负责 profiles/<name>/profile.json 的读写
+    - 负责 profiles/<name>/ 下 Profile 的读写
     - 不关心 ProfileManager/AppState 等，只管单个 profile
+
+    两种存储布局：
+    - single：profiles/<name>/profile.json（整个 Profile 一个文件）
+    - split ：profiles/<name>/parts/<part>.<version>.json + profiles/<name>/manifest.json
+        * 每个分区（meta/base/skills/points/rotations）独立文件，文件名带版本号、写后不再修改
+        * manifest.json 记录每个分区当前版本；manifest 的原子替换是一次提交的生效点，
+          因此多分区提交要么全部可见、要么全部不可见
+        * 提交只写入并 fsync 变更的分区；backup=True 时保留上一版本分区文件作为备份（无需整文件拷贝）
+        * 读取时若只有 profile.json，会自动迁移为 split 布局（原文件改名为 profile.json.migrated）
     """
 
-    def __init__(self, profiles_root: Path) -> None:
+    def __init__(self, profiles_root: Path, *, layout: ProfileLayout = "single") -> None:
         self._root = profiles_root
+        self._layout: ProfileLayout = "split" if layout == "split" else "single"
         ensure_dir(self._root)
 
     @property
     def root(self) -> Path:
         return self._root
 
+    @property
+    def layout(self) -> ProfileLayout:
+        return self._layout
+
     # ---------- 路径 ----------
 
     def _dir_for(self, name: str) -> Path:
@@ -54,30 +81,179 @@ class ProfileRepository:
         """
         return self._dir_for(name) / "profile.json"
 
+    def manifest_path_for(self, name: str) -> Path:
+        """
+        返回 split 布局下 manifest.json 的路径。
+        """
+        return self._dir_for(name) / _MANIFEST_NAME
+
+    def parts_dir_for(self, name: str) -> Path:
+        return self._dir_for(name) / _PARTS_DIR
+
     # ---------- 读写 ----------
 
     def load_or_create(self, name: str, idgen: SnowflakeGenerator) -> Profile:
         """
-        读取 profiles/<name>/profile.json：
-        - 若文件不存在：创建一个全新的 Profile.new(name, idgen) 并写盘，再返回；
-        - 若存在：read_json -> Profile.from_dict。
+        读取 profiles/<name>/ 下的 Profile：
+        - 若不存在：创建一个全新的 Profile.new(name, idgen) 并写盘，再返回；
+        - 若存在 manifest.json：按 split 布局读取各分区；
+        - 否则读取 profile.json；split 模式下随即迁移为分区文件。
         """
         p = self.path_for(name)
         ensure_dir(p.parent)
+        manifest_path = self.manifest_path_for(name)
+
+        if manifest_path.exists():
+            return Profile.from_dict(self._load_split(name))
 
         if not p.exists():
             prof = Profile.new(name, idgen)
-            atomic_write_json(p, prof.to_dict(), backup=False)
+            self.save_dict(name, prof.to_dict(), backup=False)
             return prof
 
         data = read_json(p, default={})
         prof = Profile.from_dict(data)
+
+        if self._layout == "split":
+            self._migrate_single_to_split(name, data)
         return prof
 
     def save(self, name: str, profile: Profile, *, backup: bool = True) -> None:
         """
-        将 Profile 聚合写回 profiles/<name>/profile.json。
+        将 Profile 聚合完整写回（split 布局下写入全部分区）。
         """
+        self.save_dict(name, profile.to_dict(), backup=backup)
+
+    def save_dict(
+        self,
+        name: str,
+        data: Dict[str, Any],
+        *,
+        parts: Optional[Iterable[str]] = None,
+        backup: bool = True,
+    ) -> None:
+        """
+        将已序列化的 Profile dict 写回磁盘。
+
+        - data 为提交时冻结的快照（供后台保存线程使用，写入过程不再访问 Profile 对象）
+        - parts 仅对 split 布局生效：只写出这些分区（None 表示全部）；single 布局始终写整个文件
+        """
+        if self._layout == "split":
+            self._save_split(name, data, parts=parts, backup=backup)
+            return
+
         p = self.path_for(name)
         ensure_dir(p.parent)
-        atomic_write_json(p, profile.to_dict(), backup=backup)
\ No newline at end of file
+        atomic_write_json(p, data, backup=backup)
+
+    # ---------- split 布局 ----------
+
+    def _read_manifest(self, name: str) -> Dict[str, Any]:
+        path = self.manifest_path_for(name)
+        data = read_json(path, default={})
+        parts = data.get("parts", None)
+        if not isinstance(parts, dict):
+            raise JsonReadError(path=path, message="manifest.parts must be an object/dict")
+        return data
+
+    def _load_split(self, name: str) -> Dict[str, Any]:
+        manifest = self._read_manifest(name)
+        parts_dir = self.parts_dir_for(name)
+
+        out: Dict[str, Any] = {"schema_version": int(manifest.get("schema_version", 1) or 1)}
+        for part in PROFILE_PARTS:
+            ent = manifest["parts"].get(part)
+            if not isinstance(ent, dict) or not ent.get("file"):
+                out[part] = {}
+                continue
+            path = parts_dir / str(ent["file"])
+            if not path.exists():
+                raise JsonReadError(path=path, message=f"profile part file missing: {part}")
+            out[part] = read_json(path, default={})
+        return out
+
+    def _save_split(
+        self,
+        name: str,
+        data: Dict[str, Any],
+        *,
+        parts: Optional[Iterable[str]],
+        backup: bool,
+    ) -> None:
+        parts_dir = self.parts_dir_for(name)
+        ensure_dir(parts_dir)
+
+        manifest_path = self.manifest_path_for(name)
+        if manifest_path.exists():
+            manifest = self._read_manifest(name)
+        else:
+            manifest = {"parts": {}}
+            parts = None  # 首次写 split：必须写全部分区
+
+        wanted = None if parts is None else set(parts)
+        target = [x for x in PROFILE_PARTS if wanted is None or x in wanted]
+        if not target:
+            return
+
+        entries: Dict[str, Any] = dict(manifest.get("parts") or {})
+        previous: Dict[str, str] = {}
+        now = now_iso_utc()
+
+        # 1) 写新版本分区文件（文件名唯一，不影响当前 manifest 指向的旧文件）
+        for part in target:
+            old = entries.get(part) if isinstance(entries.get(part), dict) else {}
+            ver = int(old.get("version", 0) or 0) + 1
+            fname = f"{part}.{ver}.json"
+            payload = data.get(part, {}) or {}
+            atomic_write_json(parts_dir / fname, dict(payload), backup=False)
+            if old.get("file"):
+                previous[part] = str(old["file"])
+            entries[part] = {"file": fname, "version": ver, "updated_at": now}
+
+        # 2) 原子替换 manifest：本次提交在此刻生效
+        new_manifest = {
+            "layout": "split",
+            "schema_version": int(data.get("schema_version", manifest.get("schema_version", 1)) or 1),
+            "generation": int(manifest.get("generation", 0) or 0) + 1,
+            "parts": entries,
+        }
+        atomic_write_json(manifest_path, new_manifest, backup=False)
+
+        # 3) 清理不再引用的分区文件（backup=True 时保留上一版本）
+        keep = {str(e.get("file")) for e in entries.values() if isinstance(e, dict)}
+        if backup:
+            keep |= set(previous.values())
+        self._gc_parts(parts_dir, keep=keep, touched=set(target))
+
+    def _gc_parts(self, parts_dir: Path, *, keep: set, touched: set) -> None:
+        """
+        删除本次写入分区的过期版本文件（以及崩溃遗留的孤儿文件）。
+        未写入的分区保持原状（其上一版本备份不受影响）。
+        """
+        try:
+            items = list(parts_dir.iterdir())
+        except Exception:
+            return
+        for f in items:
+            m = _PART_FILE_RE.match(f.name)
+            if m is None or f.name in keep:
+                continue
+            if m.group("part") not in touched:
+                continue
+            try:
+                f.unlink(missing_ok=True)
+            except Exception:
+                log.warning("failed to remove stale profile part file: %s", f)
+
+    def _migrate_single_to_split(self, name: str, data: Dict[str, Any]) -> None:
+        """
+        profile.json -> split 布局：写入全部分区 + manifest，再把旧文件改名保留。
+        迁移失败不影响本次加载（下次启动会再次尝试）。
+        """
+        src = self.path_for(name)
+        try:
+            self._save_split(name, data, parts=None, backup=False)
+            src.replace(src.with_suffix(src.suffix + ".migrated"))
+            log.info("profile migrated to split layout: %s", self._dir_for(name))
+        except Exception:
+            log.exception("profile split migration failed: %s", self._dir_for(name))
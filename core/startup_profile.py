@@ -0,0 +1,123 @@
+# core/startup_profile.py
+from __future__ import annotations
+
+import importlib
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from types import ModuleType
+from typing import Iterator, List, Optional
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class StartupRecord:
+    """
+    一条启动耗时记录：
+
+    - kind     : "import" | "build" | "page" | "dialog" | "mark" ...
+    - name     : 模块名 / 页面 key / 里程碑名
+    - start_ms : 相对进程启动（本模块导入）时刻的开始时间
+    - dur_ms   : 耗时（mark 为 0）
+    - depth    : 嵌套层级（用于日志缩进）
+    """
+    kind: str
+    name: str
+    start_ms: float
+    dur_ms: float
+    depth: int = 0
+
+
+class StartupProfiler:
+    """
+    启动过程剖析器：
+
+    - span(kind, name)：记录一段耗时（import 模块 / 构造页面 / 构造窗口等），支持嵌套
+    - import_module(name)：带计时的 importlib.import_module
+    - mark(name)：记录里程碑（如 window_shown / first_paint）
+    - report()：把目前为止的记录一次性写入日志（通常在首次绘制后调用）
+      report 之后的 span（例如首次导航时才构造的页面）会逐条直接写日志
+
+    记录时间以本模块首次导入为 0 点，因此 main.py 应尽早导入本模块。
+    """
+
+    def __init__(self) -> None:
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        self._records: List[StartupRecord] = []
+        self._depth = 0
+        self._reported = False
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._t0) * 1000.0
+
+    @property
+    def records(self) -> List[StartupRecord]:
+        with self._lock:
+            return list(self._records)
+
+    @contextmanager
+    def span(self, kind: str, name: str) -> Iterator[None]:
+        with self._lock:
+            depth = self._depth
+            self._depth += 1
+        start = self.elapsed_ms()
+        try:
+            yield
+        finally:
+            dur = self.elapsed_ms() - start
+            rec = StartupRecord(kind=str(kind), name=str(name), start_ms=start, dur_ms=dur, depth=depth)
+            with self._lock:
+                self._depth = max(0, self._depth - 1)
+                self._records.append(rec)
+                reported = self._reported
+            if reported:
+                log.info("startup-profile (late) %s %s: %.1f ms", rec.kind, rec.name, rec.dur_ms)
+
+    def import_module(self, name: str) -> ModuleType:
+        with self.span("import", name):
+            return importlib.import_module(name)
+
+    def mark(self, name: str) -> float:
+        t = self.elapsed_ms()
+        with self._lock:
+            self._records.append(StartupRecord(kind="mark", name=str(name), start_ms=t, dur_ms=0.0, depth=0))
+            reported = self._reported
+        if reported:
+            log.info("startup-profile (late) mark %s @ %.1f ms", name, t)
+        return t
+
+    def report(self, logger: Optional[logging.Logger] = None) -> None:
+        """
+        按开始时间顺序输出所有记录（只输出一次）。
+        """
+        lg = logger or log
+        with self._lock:
+            if self._reported:
+                return
+            self._reported = True
+            records = sorted(self._records, key=lambda r: (r.start_ms, r.depth))
+
+        lg.info("startup-profile: %d records, total %.1f ms", len(records), self.elapsed_ms())
+        for r in records:
+            indent = "  " * r.depth
+            if r.kind == "mark":
+                lg.info("startup-profile %s@%8.1f ms  mark %s", indent, r.start_ms, r.name)
+            else:
+                lg.info(
+                    "startup-profile %s@%8.1f ms  %-6s %-48s %8.1f ms",
+                    indent, r.start_ms, r.kind, r.name, r.dur_ms,
+                )
+
+
+_PROFILER = StartupProfiler()
+
+
+def startup_profiler() -> StartupProfiler:
+    """
+    进程级单例。
+    """
+    return _PROFILER
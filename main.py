@@ -2,14 +2,20 @@
 from pathlib import Path
 import sys
 
-from PySide6.QtWidgets import QApplication
+# 尽早导入：启动剖析以此为 0 点
+from core.startup_profile import startup_profiler
 
-from core.logging_setup import setup_logging
-from core.idgen.snowflake import SnowflakeGenerator
-from core.repos.app_state_repo import AppStateRepo
-from core.profiles import ProfileManager
-from qtui.main_window import MainWindow
-from qtui.theme import apply_theme
+_prof = startup_profiler()
+
+with _prof.span("import", "PySide6.QtWidgets"):
+    from PySide6.QtCore import QTimer
+    from PySide6.QtWidgets import QApplication
+
+with _prof.span("import", "core"):
+    from core.logging_setup import setup_logging
+    from core.idgen.snowflake import SnowflakeGenerator
+    from core.repos.app_state_repo import AppStateRepo
+    from core.profiles import ProfileManager
 
 def main():
     app_data_dir = Path("app_data")
@@ -25,29 +31,45 @@ def main():
     idgen = SnowflakeGenerator(worker_id=app_state.worker_id)
 
     # Profile 管理
-    pm = ProfileManager(
-        app_data_dir=app_data_dir,
-        app_state_repo=app_state_repo,
-        app_state=app_state,
-        idgen=idgen,
-    )
-    ctx = pm.open_last_or_fallback()
+    with _prof.span("build", "ProfileManager.open_last_or_fallback"):
+        pm = ProfileManager(
+            app_data_dir=app_data_dir,
+            app_state_repo=app_state_repo,
+            app_state=app_state,
+            idgen=idgen,
+        )
+        ctx = pm.open_last_or_fallback()
 
     # Qt 应用
-    app = QApplication(sys.argv)
+    with _prof.span("build", "QApplication"):
+        app = QApplication(sys.argv)
+
+    # 主窗口模块（页面 / 插件 / 引擎等在其内部按需导入）
+    MainWindow = _prof.import_module("qtui.main_window").MainWindow
+    apply_theme = _prof.import_module("qtui.theme").apply_theme
 
     theme_name = ctx.base.ui.theme or "darkly"  # 先记下来，后面再用主题系统
      # 先根据当前 profile 的配置应用主题
-    apply_theme(app, theme_name)
-    
-    win = MainWindow(
-        theme_name=theme_name,
-        profile_manager=pm,
-        profile_ctx=ctx,
-        app_state_repo=app_state_repo,
-        app_state=app_state,
-    )
+    with _prof.span("build", "apply_theme"):
+        apply_theme(app, theme_name)
+
+    with _prof.span("build", "MainWindow"):
+        win = MainWindow(
+            theme_name=theme_name,
+            profile_manager=pm,
+            profile_ctx=ctx,
+            app_state_repo=app_state_repo,
+            app_state=app_state,
+        )
     win.show()
+    _prof.mark("window_shown")
+
+    # 事件循环首次空闲时窗口已完成首次绘制：记录并输出启动剖析
+    def _on_first_idle() -> None:
+        _prof.mark("first_paint")
+        _prof.report()
+
+    QTimer.singleShot(0, _on_first_idle)
 
     try:
         app.exec()
@@ -56,4 +78,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -2,29 +2,75 @@
 from __future__ import annotations
 
 import logging
-from typing import Callable
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, Optional
 
-from PySide6.QtCore import QObject, Signal, Slot
+from PySide6.QtCore import QObject, Qt, QTimer, Signal, Slot
 
 
 log = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True)
+class CoalesceStats:
+    """
+    call_coalesced 统计：
+    - submitted : 提交次数
+    - merged    : 提交时同 key 已有未执行的回调，被新回调覆盖的次数（旧回调不再执行）
+    - dropped   : 未执行就被 discard_coalesced 丢弃的回调数
+    - executed  : 实际执行的回调数
+    - batches   : 批量冲刷次数
+    """
+    submitted: int = 0
+    merged: int = 0
+    dropped: int = 0
+    executed: int = 0
+    batches: int = 0
+
+
 class QtDispatcher(QObject):
     """
     简单的 UI 线程调度器：
     - 其他线程调用 call_soon(fn)
     - fn 会被排队到 Qt 主线程执行
 
+    高频状态更新用 call_coalesced(key, fn)：
+    - 每个 key 只保留最新的回调（latest-wins），在一次事件循环回调里批量执行
+    - 两次批量冲刷之间至少间隔 1000 / max_fps ms（限制 UI 刷新帧率）
+    - min_interval_ms > 0 时该 key 的两次执行至少间隔这么久（首次立即执行，之后到期再执行最新一条），
+      用于不需要跟满帧率的订阅者（状态面板等）
+    - call_soon 的回调执行前会先冲刷已合并的更新，保证两者的相对顺序（尚未到期的限频 key 除外）
+
     任何在回调中抛出的异常：
     - 会被捕获并记录到日志（不让异常终止事件循环）
     """
 
     _sig_call = Signal(object)  # fn: Callable[[], None]
+    _sig_drain = Signal()
 
-    def __init__(self, parent: QObject | None = None) -> None:
+    def __init__(self, parent: QObject | None = None, *, max_fps: int = 60) -> None:
         super().__init__(parent)
         self._sig_call.connect(self._on_call)
+        # 始终排队：UI 线程自己提交的合并更新也推迟到下一次事件循环回调
+        self._sig_drain.connect(self._on_drain_requested, Qt.ConnectionType.QueuedConnection)
+
+        self._min_interval_ms = 1000.0 / float(max(1, int(max_fps)))
+        self._co_lock = threading.Lock()
+        self._co_pending: Dict[Hashable, Callable[[], None]] = {}
+        self._co_scheduled = False
+        self._co_last_drain = 0.0
+        # 限频 key：最小间隔（秒）与上次执行时刻；_co_timer_due 为已安排的到期冲刷时刻
+        self._co_min_gap: Dict[Hashable, float] = {}
+        self._co_last_run: Dict[Hashable, float] = {}
+        self._co_timer_due: Optional[float] = None
+
+        self._n_submitted = 0
+        self._n_merged = 0
+        self._n_dropped = 0
+        self._n_executed = 0
+        self._n_batches = 0
 
     def call_soon(self, fn: Callable[[], None]) -> None:
         if fn is None:
@@ -32,10 +78,102 @@ class QtDispatcher(QObject):
         # 任意线程都可以发这个信号
         self._sig_call.emit(fn)
 
+    def call_coalesced(self, key: Hashable, fn: Callable[[], None], *, min_interval_ms: float = 0.0) -> None:
+        """
+        任意线程可调用：登记 key 的最新回调；同 key 未执行的旧回调被覆盖。
+        """
+        if fn is None:
+            return
+        with self._co_lock:
+            self._n_submitted += 1
+            if key in self._co_pending:
+                self._n_merged += 1
+            self._co_pending[key] = fn
+            if min_interval_ms > 0:
+                self._co_min_gap[key] = float(min_interval_ms) / 1000.0
+            else:
+                self._co_min_gap.pop(key, None)
+            if self._co_scheduled:
+                return
+            self._co_scheduled = True
+        self._sig_drain.emit()
+
+    def discard_coalesced(self, key: Hashable) -> bool:
+        """
+        丢弃 key 尚未执行的回调（例如引擎停止后不再需要的进度刷新）；返回是否丢弃了回调。
+        """
+        with self._co_lock:
+            self._co_min_gap.pop(key, None)
+            self._co_last_run.pop(key, None)
+            if self._co_pending.pop(key, None) is None:
+                return False
+            self._n_dropped += 1
+            return True
+
+    def coalesce_stats(self) -> CoalesceStats:
+        with self._co_lock:
+            return CoalesceStats(
+                submitted=self._n_submitted,
+                merged=self._n_merged,
+                dropped=self._n_dropped,
+                executed=self._n_executed,
+                batches=self._n_batches,
+            )
+
     @Slot(object)
     def _on_call(self, fn: Callable[[], None]) -> None:
+        self._drain_coalesced()
         try:
             fn()
         except Exception:
             # 记录异常，但不让 Qt 事件循环崩溃
-            log.exception("QtDispatcher call failed")
\ No newline at end of file
+            log.exception("QtDispatcher call failed")
+
+    @Slot()
+    def _on_drain_requested(self) -> None:
+        wait_ms = self._co_last_drain * 1000.0 + self._min_interval_ms - time.monotonic() * 1000.0
+        if wait_ms > 1.0:
+            QTimer.singleShot(int(wait_ms), self._drain_coalesced)
+            return
+        self._drain_coalesced()
+
+    def _on_co_timer(self) -> None:
+        with self._co_lock:
+            self._co_timer_due = None
+        self._drain_coalesced()
+
+    def _drain_coalesced(self) -> None:
+        now = time.monotonic()
+        timer_ms = 0
+        with self._co_lock:
+            self._co_scheduled = False
+            if not self._co_pending:
+                return
+            batch = []
+            next_due: Optional[float] = None
+            for key, fn in list(self._co_pending.items()):
+                gap = self._co_min_gap.get(key, 0.0)
+                if gap > 0:
+                    due = self._co_last_run.get(key, 0.0) + gap
+                    if due > now:
+                        next_due = due if next_due is None else min(next_due, due)
+                        continue
+                    self._co_last_run[key] = now
+                del self._co_pending[key]
+                batch.append(fn)
+            if next_due is not None and (self._co_timer_due is None or next_due < self._co_timer_due):
+                self._co_timer_due = next_due
+                timer_ms = max(1, int((next_due - now) * 1000.0) + 1)
+            if batch:
+                self._co_last_drain = now
+                self._n_batches += 1
+                self._n_executed += len(batch)
+
+        if timer_ms > 0:
+            QTimer.singleShot(timer_ms, self._on_co_timer)
+
+        for fn in batch:
+            try:
+                fn()
+            except Exception:
+                log.exception("QtDispatcher coalesced call failed")
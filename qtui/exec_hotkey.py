@@ -1,12 +1,11 @@
 from __future__ import annotations
 
 import threading
-from typing import Callable, Optional, Set
-
-from pynput import keyboard
+from typing import Callable, Optional
 
 from core.profiles import ProfileContext
-from core.input.hotkey import normalize, parse, key_to_name  # 复用已有工具
+from core.input.hotkey import normalize, parse  # 复用已有工具
+from core.input.hub import HotkeyHandle, InputHub, get_input_hub
 from qtui.dispatcher import QtDispatcher
 import logging  # 新增
 
@@ -21,10 +20,9 @@ class ExecHotkeyController:
         * toggle_hotkey: 字符串热键，如 "f9" / "ctrl+f9" / "alt+shift+1"
       解析规则复用 core.input.hotkey.normalize/parse。
 
-    - 使用 pynput.keyboard.Listener 全局监听键盘：
-        * on_press / on_release 中维护当前按下的修饰键集合 + 主键；
-        * 当当前按键状态与配置的 (mods, main) 完全一致时，
-          通过 QtDispatcher 在 UI 线程调用 toggle_cb()。
+    - 在进程级 InputHub 上注册该热键（与取色会话共用同一个系统钩子）：
+        * 修饰键状态与“按住期间只触发一次”由 InputHub 统一维护；
+        * 组合匹配时通过 QtDispatcher 在 UI 线程调用 toggle_cb()。
 
     注意：
     - 允许组合键（ctrl+f9 等），也允许只有主键（"f9"）。
@@ -37,37 +35,27 @@ class ExecHotkeyController:
         dispatcher: QtDispatcher,
         get_ctx: Callable[[], ProfileContext],
         toggle_cb: Callable[[], None],
+        hub: Optional[InputHub] = None,
     ) -> None:
         self._dispatcher = dispatcher
         self._get_ctx = get_ctx
         self._toggle_cb = toggle_cb
+        self._hub = hub or get_input_hub()
 
-        self._listener: Optional[keyboard.Listener] = None
         self._lock = threading.Lock()
-
-        # 配置解析后的结果
-        self._enabled: bool = False
-        self._mods_cfg: Set[str] = set()
-        self._main_cfg: str = ""
-
-        # 当前按下状态
-        self._pressed_mods: Set[str] = set()
-        self._pressed_main: Optional[str] = None
-        self._fired: bool = False  # 当前组合按住期间是否已经触发过一次，防止连发
+        self._handle: Optional[HotkeyHandle] = None
+        self._hotkey: str = ""
 
         self.refresh_from_ctx()
-        self._start_listener()
 
     # ---------- 公共 API ----------
 
     def refresh_from_ctx(self) -> None:
         """
         从当前 ProfileContext.base.exec 刷新配置：
-        - enabled & toggle_hotkey。
+        - enabled & toggle_hotkey；配置变化时在 InputHub 上重新注册。
         """
-        enabled = False
-        mods_cfg: Set[str] = set()
-        main_cfg = ""
+        hotkey = ""
 
         try:
             ctx = self._get_ctx()
@@ -85,88 +73,46 @@ class ExecHotkeyController:
                     enabled_flag = bool(getattr(ex, "enabled", False))
                     hk_raw = (getattr(ex, "toggle_hotkey", "") or "").strip()
                     if enabled_flag and hk_raw:
-                        # 规范化并解析，例如 "ctrl+f9"
+                        # 规范化并校验，例如 "ctrl+f9"
                         hk_norm = normalize(hk_raw)
-                        mods, main = parse(hk_norm)
-                        enabled = True
-                        mods_cfg = set(mods)
-                        main_cfg = main
-                    else:
-                        enabled = False
+                        parse(hk_norm)
+                        hotkey = hk_norm
                 except Exception:
-                    enabled = False
-                    mods_cfg = set()
-                    main_cfg = ""
+                    hotkey = ""
 
         with self._lock:
-            self._enabled = enabled
-            self._mods_cfg = mods_cfg
-            self._main_cfg = main_cfg
-            # 配置变化后重置当前按键状态
-            self._pressed_mods.clear()
-            self._pressed_main = None
-            self._fired = False
-
-    def close(self) -> None:
-        """
-        停止监听器；关闭应用时调用。
-        """
-        lst = self._listener
-        self._listener = None
-        if lst is not None:
-            try:
-                lst.stop()
-            except Exception:
-                log.exception("ExecHotkeyController.close: failed to stop keyboard.Listener")
-    # ---------- 内部：pynput 监听 ----------
+            if hotkey == self._hotkey and (self._handle is not None or not hotkey):
+                return
+            old = self._handle
+            self._handle = None
+            self._hotkey = hotkey
 
-    def _start_listener(self) -> None:
-        if self._listener is not None:
+        self._hub.unregister(old)
+        if not hotkey:
             return
-
-        self._listener = keyboard.Listener(
-            on_press=self._on_press,
-            on_release=self._on_release,
-        )
-        self._listener.daemon = True
-        self._listener.start()
-
-    def _on_press(self, key) -> None:
-        name = key_to_name(key)
-        if not name:
+        try:
+            handle = self._hub.register_hotkey(hotkey, self._on_hotkey)
+        except Exception:
+            log.exception("ExecHotkeyController: failed to register hotkey %r", hotkey)
             return
+        with self._lock:
+            self._handle = handle
 
+    def close(self) -> None:
+        """
+        注销热键；关闭应用时调用（最后一个注册注销后 InputHub 会停止系统钩子）。
+        """
         with self._lock:
-            if not self._enabled or not self._main_cfg:
-                return
+            handle = self._handle
+            self._handle = None
+            self._hotkey = ""
+        try:
+            self._hub.unregister(handle)
+        except Exception:
+            log.exception("ExecHotkeyController.close: failed to unregister hotkey")
 
-            # 更新当前按键状态
-            # 修饰键：ctrl / alt / shift / cmd
-            if name in ("ctrl", "alt", "shift", "cmd"):
-                self._pressed_mods.add(name)
-            else:
-                # 普通键或功能键：作为主键
-                self._pressed_main = name
-
-            # 比较是否与配置匹配
-            if self._pressed_main == self._main_cfg and self._pressed_mods == self._mods_cfg:
-                if not self._fired:
-                    self._fired = True
-                    # 在 Qt 主线程执行 toggle_cb
-                    self._dispatcher.call_soon(self._toggle_cb)
-
-    def _on_release(self, key) -> None:
-        name = key_to_name(key)
-        if not name:
-            return
+    # ---------- 内部：InputHub 回调（钩子线程） ----------
 
-        with self._lock:
-            if name in ("ctrl", "alt", "shift", "cmd"):
-                self._pressed_mods.discard(name)
-            else:
-                if self._pressed_main == name:
-                    self._pressed_main = None
-
-            # 组合完全释放后，允许下一次触发
-            if not self._pressed_mods and self._pressed_main is None:
-                self._fired = False
\ No newline at end of file
+    def _on_hotkey(self) -> None:
+        # 在 Qt 主线程执行 toggle_cb
+        self._dispatcher.call_soon(self._toggle_cb)
@@ -1,8 +1,8 @@
 from __future__ import annotations
 
-import json
 import logging
-from typing import Optional, Dict, Any, Iterable, Callable, Tuple, Set
+from pathlib import Path
+from typing import Optional, Dict, Any, Iterable, Callable, Set
 
 from PySide6.QtWidgets import (
     QDialog,
@@ -24,6 +24,7 @@ from core.profiles import ProfileContext
 from core.app.services.app_services import AppServices
 from core.models.skill import Skill
 from qtui.icons import resource_path
+from qtui.extensions.gw2_skill_index import Gw2SkillIndex, load_skill_index
 
 log = logging.getLogger(__name__)
 
@@ -143,6 +144,8 @@ class Gw2SkillImportDialog(QDialog):
     GW2 技能导入插件：
 
     - 从 assets/json/gw2/skills_all.json / professions_all.json 读取数据
+      （经 gw2_skill_index 预编译为带倒排索引的缓存，源文件不变时直接读取缓存）
+    - 过滤通过索引求交完成，不再逐条扫描全部技能
     - 过滤条件：职业 + 技能类型 + 武器 + 文本搜索（都有“全部”选项，可组合过滤）
     - 列表展示：ID / 名称 / 职业 / 槽位 / 冷却(s) / 描述摘要
     - 支持多选 & 批量导入到当前 Profile 的技能列表（仅填充通用字段）
@@ -163,23 +166,21 @@ class Gw2SkillImportDialog(QDialog):
         ctx: ProfileContext,
         services: AppServices,
         on_imported: Optional[Callable[[], None]] = None,
+        cache_dir: Optional[Path] = None,
     ) -> None:
         super().__init__(parent)
 
         self._ctx = ctx
         self._services = services
         self._on_imported = on_imported or (lambda: None)
+        self._cache_dir = cache_dir
 
         self.setWindowTitle("GW2 技能导入（插件）")
         self.setMinimumWidth(1000)
         self.setMinimumHeight(640)
 
-        # 数据容器
-        self._skills: list[Dict[str, Any]] = []
-        self._skills_by_id: Dict[str, Dict[str, Any]] = {}
-        self._professions: Dict[str, Any] = {}
-        # (profession_en, weapon_name) -> set(skill_id_str)
-        self._weapon_skills: Dict[Tuple[str, str], Set[str]] = {}
+        # 技能索引（技能记录 + 职业/武器/槽位/类型/名称倒排索引）
+        self._db = Gw2SkillIndex()
 
         self._build_ui()
         self._load_data()
@@ -303,38 +304,13 @@ class Gw2SkillImportDialog(QDialog):
 
     def _load_data(self) -> None:
         """
-        从 assets/json/gw2/skills_all.json / professions_all.json 读取数据。
+        加载技能索引（基于 assets/json/gw2/skills_all.json / professions_all.json）。
         """
         skills_path = resource_path("assets/json/gw2/skills_all.json")
         profs_path = resource_path("assets/json/gw2/professions_all.json")
 
-        self._skills = []
-        self._skills_by_id = {}
-        self._professions = {}
-        self._weapon_skills = {}
-
-        # 读取 skills_all.json
         try:
-            if not skills_path.is_file():
-                raise FileNotFoundError(f"skills_all.json 不存在: {skills_path}")
-            data = json.loads(skills_path.read_text(encoding="utf-8"))
-
-            if isinstance(data, list):
-                self._skills = [x for x in data if isinstance(x, dict)]
-            elif isinstance(data, dict):
-                if "skills" in data and isinstance(data["skills"], list):
-                    self._skills = [x for x in data["skills"] if isinstance(x, dict)]
-                else:
-                    self._skills = [v for v in data.values() if isinstance(v, dict)]
-            else:
-                self._skills = []
-
-            for s in self._skills:
-                sid = s.get("id", None)
-                if sid is None:
-                    continue
-                self._skills_by_id[str(sid)] = s
-
+            self._db = load_skill_index(skills_path, profs_path, cache_dir=self._cache_dir)
         except Exception as e:
             log.exception("加载 skills_all.json 失败")
             QMessageBox.critical(
@@ -343,40 +319,7 @@ class Gw2SkillImportDialog(QDialog):
                 f"加载技能数据失败：{e}",
                 QMessageBox.Ok,
             )
-            self._skills = []
-            self._skills_by_id = {}
-
-        # 读取 professions_all.json
-        try:
-            if profs_path.is_file():
-                pdata = json.loads(profs_path.read_text(encoding="utf-8"))
-                if isinstance(pdata, dict):
-                    self._professions = pdata
-                else:
-                    self._professions = {}
-            else:
-                self._professions = {}
-        except Exception:
-            log.exception("加载 professions_all.json 失败")
-            self._professions = {}
-
-        # 预构建 (profession, weapon) -> {skill_ids}
-        self._weapon_skills.clear()
-        for prof_en, pval in self._professions.items():
-            try:
-                wmap = pval.get("weapons", {}) or {}
-                if not isinstance(wmap, dict):
-                    continue
-                for wname, wdata in wmap.items():
-                    skills_arr = wdata.get("skills", []) or []
-                    sids: Set[str] = set()
-                    for sk in skills_arr:
-                        if isinstance(sk, dict) and "id" in sk:
-                            sids.add(str(sk["id"]))
-                    if sids:
-                        self._weapon_skills[(prof_en, wname)] = sids
-            except Exception:
-                log.exception("预构建 weapon_skills 失败：prof=%s", prof_en)
+            self._db = Gw2SkillIndex()
 
     # ---------- 过滤逻辑 ----------
 
@@ -390,22 +333,8 @@ class Gw2SkillImportDialog(QDialog):
         # 全部职业
         self._cmb_prof.addItem("全部职业", userData=None)
 
-        prof_names_en: set[str] = set()
-
-        # 优先使用 professions_all.json 的 key 列表（英文）
-        for name in sorted(self._professions.keys()):
-            if not name:
-                continue
-            prof_names_en.add(str(name))
-
-        # 如果 professions_all.json 为空，则从 skills_all.json 中汇总 professions 字段
-        if not prof_names_en:
-            for s in self._skills:
-                for p in s.get("professions", []) or []:
-                    if isinstance(p, str) and p:
-                        prof_names_en.add(p)
-
-        for name_en in sorted(prof_names_en):
+        # 优先使用 professions_all.json 的职业列表（英文）；为空时从技能的 professions 字段汇总
+        for name_en in self._db.profession_names():
             disp = prof_display_name(name_en)
             self._cmb_prof.addItem(disp, userData=name_en)
 
@@ -429,12 +358,9 @@ class Gw2SkillImportDialog(QDialog):
             self._cmb_weapon.blockSignals(False)
             return
 
-        pval = self._professions.get(prof_filter, {}) or {}
-        wmap = pval.get("weapons", {}) or {}
-        if isinstance(wmap, dict):
-            for wname in sorted(wmap.keys()):
-                disp = weapon_display_name(str(wname))
-                self._cmb_weapon.addItem(disp, userData=wname)
+        for wname in self._db.weapons_for(prof_filter):
+            disp = weapon_display_name(str(wname))
+            self._cmb_weapon.addItem(disp, userData=wname)
 
         self._cmb_weapon.blockSignals(False)
 
@@ -477,61 +403,10 @@ class Gw2SkillImportDialog(QDialog):
         # 搜索关键字
         kw = (self._edit_search.text() or "").strip().lower()
 
-        for s in self._skills:
-            # profession 过滤：GW2 技能 JSON 的 professions 字段
-            if prof_filter:
-                s_profs = s.get("professions", []) or []
-                if prof_filter not in s_profs:
-                    continue
-
-            # weapon 过滤：使用 professions_all.json 的 (profession, weapon) -> skill_ids 映射
-            if prof_filter and weapon_filter:
-                key = (prof_filter, weapon_filter)
-                allowed_ids = self._weapon_skills.get(key)
-                if not allowed_ids:
-                    continue
-                sid = s.get("id", None)
-                if sid is None or str(sid) not in allowed_ids:
-                    continue
-
-            # 技能类型过滤
-            if type_filter and not self._skill_matches_type_filter(s, type_filter):
-                continue
-
-            # 搜索过滤：name / id / description
-            if kw:
-                name = str(s.get("name", "") or "").lower()
-                desc = str(s.get("description", "") or "").lower()
-                sid = str(s.get("id", "") or "")
-                if kw not in name and kw not in desc and kw not in sid.lower():
-                    continue
-
-            yield s
-
-    def _skill_matches_type_filter(self, s: Dict[str, Any], kind: str) -> bool:
-        """
-        根据 kind 过滤技能类型。
-        """
-        t = (s.get("type") or "").strip().lower()
-        slot = (s.get("slot") or "").strip().lower()
-
-        if kind == "weapon":
-            return slot.startswith("weapon_") or t == "weapon"
-        if kind == "heal":
-            return t == "heal" or slot == "heal"
-        if kind == "utility":
-            return t == "utility" or slot == "utility"
-        if kind == "elite":
-            return t == "elite" or slot == "elite"
-        if kind == "profession":
-            return t == "profession" or slot.startswith("profession_")
-        if kind == "other":
-            if t in ("weapon", "heal", "utility", "elite", "profession"):
-                return False
-            if slot.startswith("weapon_") or slot in ("heal", "utility", "elite") or slot.startswith("profession_"):
-                return False
-            return True
-        return True
+        # 职业 / 武器 / 类型走倒排索引求交；搜索走名称片段索引 + 候选集描述比对
+        skills = self._db.skills
+        for pos in self._db.query(profession=prof_filter, kind=type_filter, weapon=weapon_filter, text=kw):
+            yield skills[pos]
 
     # ---------- 列表刷新 ----------
 
@@ -541,7 +416,7 @@ class Gw2SkillImportDialog(QDialog):
         """
         self._tree.clear()
 
-        total = len(self._skills)
+        total = len(self._db.skills)
         filtered = 0
 
         for s in self._iter_filtered_skills():
@@ -688,7 +563,7 @@ class Gw2SkillImportDialog(QDialog):
                 errors += 1
                 continue
 
-            gw2 = self._skills_by_id.get(sid_str)
+            gw2 = self._db.get(sid_str)
             if gw2 is None:
                 errors += 1
                 continue
@@ -0,0 +1,501 @@
+"""
+qtui.extensions.gw2_skill_index
+
+GW2 技能库的预编译索引（供 Gw2SkillImportDialog 使用）：
+
+- 从 skills_all.json / professions_all.json 构建紧凑记录 + 倒排索引：
+    * by_id      : 技能 id -> 位置
+    * by_prof    : 职业 -> 位置列表
+    * by_weapon  : "职业\\t武器" -> 位置列表（来自 professions_all.json 的武器技能）
+    * by_slot    : 槽位(小写) -> 位置列表
+    * by_kind    : 技能类型（weapon/heal/utility/elite/profession/other）-> 位置列表
+    * name_grams : 名称/ID 的单字 + 二元片段 -> 位置列表（名称搜索用）
+    * desc_grams : 描述的单字 + 二元片段 -> 位置列表（描述搜索用）
+- 索引写入缓存文件，以源文件 mtime/size（变化时再比对 sha1）为键，源文件不变时直接读取缓存
+- 同一进程内再次打开对话框时直接复用内存中的索引
+
+也可作为构建步骤单独运行：
+
+    python -m qtui.extensions.gw2_skill_index [--cache-dir app_data/cache]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from core.io.json_store import atomic_write_json
+
+log = logging.getLogger(__name__)
+
+INDEX_FORMAT = 2
+INDEX_FILE_NAME = "gw2_skill_index.json"
+
+SKILL_KINDS = ("weapon", "heal", "utility", "elite", "profession", "other")
+
+# 紧凑记录只保留导入/展示需要的字段；facts 只保留冷却与半径
+_KEEP_FIELDS = ("id", "name", "description", "icon", "professions", "slot", "type")
+_KEEP_FACTS = ("recharge", "distance")
+
+
+# ---------- 技能类型判定 ----------
+
+def skill_matches_kind(s: Dict[str, Any], kind: str) -> bool:
+    """
+    根据 kind 判定技能类型（weapon/heal/utility/elite/profession/other）。
+    """
+    t = (s.get("type") or "").strip().lower()
+    slot = (s.get("slot") or "").strip().lower()
+
+    if kind == "weapon":
+        return slot.startswith("weapon_") or t == "weapon"
+    if kind == "heal":
+        return t == "heal" or slot == "heal"
+    if kind == "utility":
+        return t == "utility" or slot == "utility"
+    if kind == "elite":
+        return t == "elite" or slot == "elite"
+    if kind == "profession":
+        return t == "profession" or slot.startswith("profession_")
+    if kind == "other":
+        if t in ("weapon", "heal", "utility", "elite", "profession"):
+            return False
+        if slot.startswith("weapon_") or slot in ("heal", "utility", "elite") or slot.startswith("profession_"):
+            return False
+        return True
+    return True
+
+
+def _grams(text: str) -> Set[str]:
+    """
+    单字 + 二元片段（对中英文名称都适用，可支持任意子串查询）。
+    """
+    out: Set[str] = set(text)
+    for i in range(len(text) - 1):
+        out.add(text[i:i + 2])
+    return out
+
+
+def _weapon_key(prof: str, weapon: str) -> str:
+    return f"{prof}\t{weapon}"
+
+
+def _compact_skill(s: Dict[str, Any]) -> Dict[str, Any]:
+    rec = {k: s[k] for k in _KEEP_FIELDS if k in s}
+    facts = s.get("facts", []) or []
+    if isinstance(facts, list):
+        kept = [
+            f for f in facts
+            if isinstance(f, dict) and (f.get("type") or "").lower() in _KEEP_FACTS
+        ]
+        if kept:
+            rec["facts"] = kept
+    return rec
+
+
+# ---------- 索引 ----------
+
+@dataclass
+class Gw2SkillIndex:
+    """
+    已构建的技能索引（只读）。
+
+    - skills      : 紧凑技能记录（顺序与 skills_all.json 一致，过滤结果按此顺序返回）
+    - professions : 职业英文名 -> 武器英文名列表
+    """
+    skills: List[Dict[str, Any]] = field(default_factory=list)
+    professions: Dict[str, List[str]] = field(default_factory=dict)
+    by_id: Dict[str, int] = field(default_factory=dict)
+    by_prof: Dict[str, List[int]] = field(default_factory=dict)
+    by_weapon: Dict[str, List[int]] = field(default_factory=dict)
+    by_slot: Dict[str, List[int]] = field(default_factory=dict)
+    by_kind: Dict[str, List[int]] = field(default_factory=dict)
+    name_grams: Dict[str, List[int]] = field(default_factory=dict)
+    desc_grams: Dict[str, List[int]] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        # 运行期辅助数据（不写入缓存）
+        self._names = [str(s.get("name", "") or "").lower() for s in self.skills]
+        self._ids = [str(s.get("id", "") or "").lower() for s in self.skills]
+        self._descs = [str(s.get("description", "") or "").lower() for s in self.skills]
+        self._sets: Dict[Tuple[str, str], Set[int]] = {}
+
+    # ---------- 查询 ----------
+
+    def get(self, sid: str) -> Optional[Dict[str, Any]]:
+        pos = self.by_id.get(str(sid))
+        return None if pos is None else self.skills[pos]
+
+    def profession_names(self) -> List[str]:
+        """
+        职业列表：优先使用 professions_all.json；为空时从技能的 professions 字段汇总。
+        """
+        names = [p for p in self.professions if p]
+        if not names:
+            names = [p for p in self.by_prof if p]
+        return sorted(names)
+
+    def weapons_for(self, prof: str) -> List[str]:
+        return sorted(self.professions.get(prof, []) or [])
+
+    def query(
+        self,
+        *,
+        profession: str = "",
+        kind: str = "",
+        weapon: str = "",
+        slot: str = "",
+        text: str = "",
+    ) -> List[int]:
+        """
+        返回满足全部条件的技能位置（升序）。空字符串表示不限。
+
+        - weapon 仅在同时给出 profession 时生效（与 professions_all.json 的武器技能表对应）
+        - text 为大小写不敏感的子串匹配（名称 / ID / 描述）：
+          名称与 ID 走 name_grams 索引，描述走 desc_grams 索引，候选再逐条比对子串
+        """
+        postings: List[Tuple[str, str]] = []
+        if profession:
+            postings.append(("prof", profession))
+            if weapon:
+                postings.append(("weapon", _weapon_key(profession, weapon)))
+        if kind:
+            postings.append(("kind", kind))
+        if slot:
+            postings.append(("slot", slot.strip().lower()))
+
+        cands = self._intersect(postings)
+        kw = (text or "").strip().lower()
+        if not kw:
+            return list(range(len(self.skills))) if cands is None else sorted(cands)
+
+        hits = self._gram_candidates("gram", kw) | self._gram_candidates("desc_gram", kw)
+        if cands is not None:
+            hits &= cands
+        return sorted(
+            i for i in hits
+            if kw in self._names[i] or kw in self._ids[i] or kw in self._descs[i]
+        )
+
+    def _posting_set(self, kind: str, key: str) -> Set[int]:
+        k = (kind, key)
+        s = self._sets.get(k)
+        if s is None:
+            table = {
+                "prof": self.by_prof,
+                "weapon": self.by_weapon,
+                "kind": self.by_kind,
+                "slot": self.by_slot,
+                "gram": self.name_grams,
+                "desc_gram": self.desc_grams,
+            }[kind]
+            s = set(table.get(key, ()))
+            self._sets[k] = s
+        return s
+
+    def _intersect(self, postings: List[Tuple[str, str]]) -> Optional[Set[int]]:
+        """
+        多个倒排列表求交（从最小的集合开始）；没有条件时返回 None（表示全部）。
+        """
+        if not postings:
+            return None
+        sets = sorted((self._posting_set(k, v) for k, v in postings), key=len)
+        out = set(sets[0])
+        for s in sets[1:]:
+            if not out:
+                break
+            out &= s
+        return out
+
+    def _gram_candidates(self, table: str, kw: str) -> Set[int]:
+        """
+        包含 kw 全部二元片段的位置（kw 只有一个字时用单字片段）；table 为 "gram" 或 "desc_gram"。
+        """
+        if len(kw) == 1:
+            return set(self._posting_set(table, kw))
+        grams = [(table, kw[i:i + 2]) for i in range(len(kw) - 1)]
+        return self._intersect(grams) or set()
+
+    # ---------- 序列化 ----------
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "skills": self.skills,
+            "professions": self.professions,
+            "by_id": self.by_id,
+            "by_prof": self.by_prof,
+            "by_weapon": self.by_weapon,
+            "by_slot": self.by_slot,
+            "by_kind": self.by_kind,
+            "name_grams": self.name_grams,
+            "desc_grams": self.desc_grams,
+        }
+
+    @staticmethod
+    def from_dict(d: Dict[str, Any]) -> "Gw2SkillIndex":
+        return Gw2SkillIndex(
+            skills=list(d.get("skills", []) or []),
+            professions=dict(d.get("professions", {}) or {}),
+            by_id=dict(d.get("by_id", {}) or {}),
+            by_prof=dict(d.get("by_prof", {}) or {}),
+            by_weapon=dict(d.get("by_weapon", {}) or {}),
+            by_slot=dict(d.get("by_slot", {}) or {}),
+            by_kind=dict(d.get("by_kind", {}) or {}),
+            name_grams=dict(d.get("name_grams", {}) or {}),
+            desc_grams=dict(d.get("desc_grams", {}) or {}),
+        )
+
+
+def _extract_skill_list(data: Any) -> List[Dict[str, Any]]:
+    if isinstance(data, list):
+        return [x for x in data if isinstance(x, dict)]
+    if isinstance(data, dict):
+        if "skills" in data and isinstance(data["skills"], list):
+            return [x for x in data["skills"] if isinstance(x, dict)]
+        return [v for v in data.values() if isinstance(v, dict)]
+    return []
+
+
+def build_index(skills_data: Any, professions_data: Any) -> Gw2SkillIndex:
+    """
+    从原始 JSON 数据构建索引（不做任何 IO）。
+    """
+    skills: List[Dict[str, Any]] = []
+    by_id: Dict[str, int] = {}
+    by_prof: Dict[str, List[int]] = {}
+    by_slot: Dict[str, List[int]] = {}
+    by_kind: Dict[str, List[int]] = {k: [] for k in SKILL_KINDS}
+    name_grams: Dict[str, List[int]] = {}
+    desc_grams: Dict[str, List[int]] = {}
+
+    for s in _extract_skill_list(skills_data):
+        sid = s.get("id", None)
+        if sid is None:
+            continue
+        sid_str = str(sid)
+        if sid_str in by_id:
+            continue
+        pos = len(skills)
+        rec = _compact_skill(s)
+        skills.append(rec)
+        by_id[sid_str] = pos
+
+        profs = rec.get("professions", []) or []
+        if isinstance(profs, list):
+            for p in dict.fromkeys(x for x in profs if isinstance(x, str) and x):
+                by_prof.setdefault(p, []).append(pos)
+
+        slot = (rec.get("slot") or "").strip().lower()
+        if slot:
+            by_slot.setdefault(slot, []).append(pos)
+
+        for kind in SKILL_KINDS:
+            if skill_matches_kind(rec, kind):
+                by_kind[kind].append(pos)
+
+        name = str(rec.get("name", "") or "").lower()
+        for g in _grams(name) | _grams(sid_str.lower()):
+            name_grams.setdefault(g, []).append(pos)
+
+        desc = str(rec.get("description", "") or "").lower()
+        for g in _grams(desc):
+            desc_grams.setdefault(g, []).append(pos)
+
+    professions: Dict[str, List[str]] = {}
+    by_weapon: Dict[str, List[int]] = {}
+    if isinstance(professions_data, dict):
+        for prof_en, pval in professions_data.items():
+            try:
+                wmap = (pval or {}).get("weapons", {}) or {}
+                if not isinstance(wmap, dict):
+                    professions[str(prof_en)] = []
+                    continue
+                professions[str(prof_en)] = [str(w) for w in wmap.keys()]
+                for wname, wdata in wmap.items():
+                    ids = {
+                        str(sk["id"])
+                        for sk in (wdata or {}).get("skills", []) or []
+                        if isinstance(sk, dict) and "id" in sk
+                    }
+                    positions = sorted(by_id[x] for x in ids if x in by_id)
+                    if positions:
+                        by_weapon[_weapon_key(str(prof_en), str(wname))] = positions
+            except Exception:
+                log.exception("构建武器技能索引失败：prof=%s", prof_en)
+
+    return Gw2SkillIndex(
+        skills=skills,
+        professions=professions,
+        by_id=by_id,
+        by_prof=by_prof,
+        by_weapon=by_weapon,
+        by_slot=by_slot,
+        by_kind=by_kind,
+        name_grams=name_grams,
+        desc_grams=desc_grams,
+    )
+
+
+# ---------- 缓存 ----------
+
+def _source_stamp(path: Path, *, with_hash: bool) -> Dict[str, Any]:
+    if not path.is_file():
+        return {"missing": True}
+    st = path.stat()
+    out: Dict[str, Any] = {"mtime_ns": int(st.st_mtime_ns), "size": int(st.st_size)}
+    if with_hash:
+        out["sha1"] = hashlib.sha1(path.read_bytes()).hexdigest()
+    return out
+
+
+def _stamp_matches(cached: Dict[str, Any], path: Path) -> Tuple[bool, bool]:
+    """
+    返回 (是否一致, 是否需要刷新缓存中的 mtime)。
+    mtime/size 相同直接认为一致；否则比对内容 sha1（例如重新解压/拷贝导致 mtime 变化）。
+    """
+    cur = _source_stamp(path, with_hash=False)
+    if cur.get("missing") or cached.get("missing"):
+        return bool(cur.get("missing")) and bool(cached.get("missing")), False
+    if cur["mtime_ns"] == cached.get("mtime_ns") and cur["size"] == cached.get("size"):
+        return True, False
+    if cur["size"] != cached.get("size"):
+        return False, False
+    full = _source_stamp(path, with_hash=True)
+    return full.get("sha1") == cached.get("sha1"), True
+
+
+_MEMO_LOCK = threading.Lock()
+# (skills_path, professions_path) -> (源文件 mtime/size 签名, 索引)
+_MEMO: Dict[Tuple[str, str], Tuple[Tuple[Any, ...], Gw2SkillIndex]] = {}
+
+
+def _memo_sig(skills_path: Path, professions_path: Path) -> Tuple[Any, ...]:
+    a = _source_stamp(skills_path, with_hash=False)
+    b = _source_stamp(professions_path, with_hash=False)
+    return (a.get("mtime_ns"), a.get("size"), b.get("mtime_ns"), b.get("size"))
+
+
+def _read_cache(
+    cache_path: Path, skills_path: Path, professions_path: Path
+) -> Tuple[Optional[Gw2SkillIndex], bool]:
+    """
+    读取缓存文件；返回 (索引 或 None, 是否需要刷新签名)。
+    """
+    try:
+        if not cache_path.is_file():
+            return None, False
+        data = json.loads(cache_path.read_text(encoding="utf-8"))
+        if not isinstance(data, dict) or data.get("format") != INDEX_FORMAT:
+            return None, False
+        sources = data.get("sources", {}) or {}
+        ok_s, touch_s = _stamp_matches(sources.get("skills", {}) or {}, skills_path)
+        if not ok_s:
+            return None, False
+        ok_p, touch_p = _stamp_matches(sources.get("professions", {}) or {}, professions_path)
+        if not ok_p:
+            return None, False
+        return Gw2SkillIndex.from_dict(data.get("index", {}) or {}), (touch_s or touch_p)
+    except Exception:
+        log.warning("GW2 技能索引缓存无效，将重新构建: %s", cache_path, exc_info=True)
+        return None, False
+
+
+def _write_cache(cache_path: Path, skills_path: Path, professions_path: Path, idx: Gw2SkillIndex) -> None:
+    try:
+        payload = {
+            "format": INDEX_FORMAT,
+            "sources": {
+                "skills": _source_stamp(skills_path, with_hash=True),
+                "professions": _source_stamp(professions_path, with_hash=True),
+            },
+            "index": idx.to_dict(),
+        }
+        atomic_write_json(cache_path, payload, backup=False, indent=None, sort_keys=False)
+    except Exception:
+        log.exception("写入 GW2 技能索引缓存失败: %s", cache_path)
+
+
+def load_skill_index(
+    skills_path: Path,
+    professions_path: Path,
+    *,
+    cache_dir: Optional[Path] = None,
+    rebuild: bool = False,
+) -> Gw2SkillIndex:
+    """
+    加载技能索引：进程内缓存 -> 缓存文件 -> 从源 JSON 构建（并写回缓存文件）。
+
+    - skills_all.json 不存在时抛出 FileNotFoundError
+    - professions_all.json 可缺省（武器/职业列表为空时从技能数据汇总职业）
+    - cache_dir 为 None 时只使用进程内缓存
+    """
+    if not skills_path.is_file():
+        raise FileNotFoundError(f"skills_all.json 不存在: {skills_path}")
+
+    key = (str(skills_path), str(professions_path))
+    sig = _memo_sig(skills_path, professions_path)
+    if not rebuild:
+        with _MEMO_LOCK:
+            hit = _MEMO.get(key)
+        if hit is not None and hit[0] == sig:
+            return hit[1]
+
+    t0 = time.perf_counter()
+    cache_path = cache_dir / INDEX_FILE_NAME if cache_dir is not None else None
+    idx: Optional[Gw2SkillIndex] = None
+    stale_stamp = False
+    if cache_path is not None and not rebuild:
+        idx, stale_stamp = _read_cache(cache_path, skills_path, professions_path)
+
+    source = "cache"
+    if idx is None:
+        source = "build"
+        skills_data = json.loads(skills_path.read_text(encoding="utf-8"))
+        profs_data: Any = {}
+        if professions_path.is_file():
+            try:
+                profs_data = json.loads(professions_path.read_text(encoding="utf-8"))
+            except Exception:
+                log.exception("加载 professions_all.json 失败")
+                profs_data = {}
+        idx = build_index(skills_data, profs_data)
+        if cache_path is not None:
+            _write_cache(cache_path, skills_path, professions_path, idx)
+    elif stale_stamp and cache_path is not None:
+        _write_cache(cache_path, skills_path, professions_path, idx)
+
+    log.info(
+        "GW2 技能索引已加载（%s）：%d 个技能，%.1f ms",
+        source, len(idx.skills), (time.perf_counter() - t0) * 1000.0,
+    )
+    with _MEMO_LOCK:
+        _MEMO[key] = (sig, idx)
+    return idx
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    构建步骤：预先生成索引缓存文件（打包或更新 assets 后运行）。
+    """
+    root = Path(__file__).resolve().parents[2]
+    ap = argparse.ArgumentParser(description="Build GW2 skill index cache")
+    ap.add_argument("--skills", type=Path, default=root / "assets/json/gw2/skills_all.json")
+    ap.add_argument("--professions", type=Path, default=root / "assets/json/gw2/professions_all.json")
+    ap.add_argument("--cache-dir", type=Path, default=Path("app_data") / "cache")
+    args = ap.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    idx = load_skill_index(args.skills, args.professions, cache_dir=args.cache_dir, rebuild=True)
+    log.info("GW2 技能索引缓存已写入：%d 个技能 -> %s", len(idx.skills), args.cache_dir / INDEX_FILE_NAME)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -161,6 +161,7 @@ class RotationSimulationDialog(QDialog):
         # 时间轴视图
         self._timeline = SimulationTimelineView(self)
         self._timeline.eventClicked.connect(self._on_timeline_event_clicked)
+        self._timeline.zoomChanged.connect(self._update_zoom_label)
         splitter.addWidget(self._timeline)
 
         # 事件表格
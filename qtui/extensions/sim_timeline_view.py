@@ -1,8 +1,10 @@
 from __future__ import annotations
 
-from typing import List, Optional
+import math
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Tuple
 
-from PySide6.QtCore import Qt, Signal
+from PySide6.QtCore import Qt, Signal, QPointF, QRectF
 from PySide6.QtGui import (
     QColor,
     QBrush,
@@ -10,6 +12,7 @@ from PySide6.QtGui import (
     QFont,
     QPainter,
     QPalette,
+    QWheelEvent,
 )
 from PySide6.QtWidgets import (
     QApplication,
@@ -27,13 +30,20 @@ class SimulationTimelineView(QGraphicsView):
     """
     简单的推演时间轴视图：
 
-    - 横轴：时间(ms)，按固定比例映射为像素；
+    - 横轴：时间(ms)，按固定比例映射为像素（支持缩放）；
     - 纵向：单行事件块（简单起见，不分轨道/模式的行）；
     - 每个 SimEvent 绘制为一个矩形块，颜色按 outcome 分类；
-    - 支持点击矩形块发出 eventClicked(index) 信号，index 为事件序号。
+    - 支持点击矩形块发出 eventClicked(index) 信号，index 为事件在 set_events 列表中的位置。
+
+    性能：
+    - 只为当前视口（左右各多一屏）内的事件创建 item，滚动/缩放时增量增删；
+    - 事件过密（平均每个事件不足 _lod_px_per_event 像素）时改为按像素桶聚合的密度条；
+    - highlight_index 通过按时间排序的索引二分查找，不遍历 item；
+      点击命中按场景的绘制顺序取最上层的块（高亮块 z 值更高，会盖住相邻块）。
     """
 
     eventClicked = Signal(int)  # index in events list
+    zoomChanged = Signal()      # 缩放比例变化时发出（不带参数）
 
     def __init__(self, parent=None) -> None:
         super().__init__(parent)
@@ -42,16 +52,45 @@ class SimulationTimelineView(QGraphicsView):
         self.setScene(self._scene)
 
         self._events: List[SimEvent] = []
-        self._index_to_item: dict[int, QGraphicsRectItem] = {}
+        # 按时间排序的索引：_sorted_t[k] 为第 _order[k] 个事件的时间
+        self._order: List[int] = []
+        self._sorted_t: List[int] = []
+        # 事件在时间顺序中的名次，作为块的 z 值：重叠时时间较晚的块在上层（与创建顺序无关）
+        self._rank: List[int] = []
+        self._max_t: int = 0
+
+        # 已创建的事件块：key=事件在列表中的位置
+        self._index_to_item: Dict[int, QGraphicsRectItem] = {}
+        self._lod_items: List[QGraphicsItem] = []
+        self._ruler_items: List[QGraphicsItem] = []
+        self._window: Optional[Tuple[int, int, bool]] = None
 
         # 时间缩放：1s ≈ 80px
-        self._time_scale_px_per_ms: float = 0.08
+        self._time_scale_default: float = 0.08
+        self._time_scale_px_per_ms: float = self._time_scale_default
+        self._time_scale_min: float = 0.0005  # 1s ≈ 0.5px（长推演整体概览）
+        self._time_scale_max: float = 1.0     # 1s ≈ 1000px
+
+        # 布局参数
+        self._left_margin = 60.0
+        self._top_ruler = 24.0
+        self._row_y = self._top_ruler + 40.0
+        self._block_h = 26.0
+        self._min_width = 40.0
+
+        # LOD：平均每个事件可用像素低于该值时切换为密度条；密度条桶宽（像素）
+        self._lod_px_per_event = 6.0
+        self._lod_bucket_px = 6.0
 
         # 当前高亮的块
+        self._current_index: Optional[int] = None
         self._current_item: Optional[QGraphicsRectItem] = None
         self._normal_pen = QPen(QColor(210, 210, 210), 1.0)
         self._highlight_pen = QPen(QColor(255, 230, 80), 2.0)
 
+        self._font = QFont(self.font())
+        self._font.setPointSize(max(self._font.pointSize() - 1, 7))
+
         # 渲染设置
         self.setRenderHint(QPainter.Antialiasing, True)
         self.setViewportUpdateMode(QGraphicsView.BoundingRectViewportUpdate)
@@ -69,177 +108,343 @@ class SimulationTimelineView(QGraphicsView):
         else:
             self.setBackgroundBrush(QColor(40, 40, 40))
 
+        self.horizontalScrollBar().valueChanged.connect(self._on_scrolled)
+
     # ---------- 对外 API ----------
 
     def set_events(self, events: List[SimEvent]) -> None:
         """
-        重建时间轴内容。
+        设置事件列表（只建立时间索引，item 按视口按需创建）。
         """
         self._events = list(events or [])
+        self._order = sorted(range(len(self._events)), key=lambda i: int(self._events[i].t_ms))
+        self._sorted_t = [int(self._events[i].t_ms) for i in self._order]
+        self._rank = [0] * len(self._events)
+        for k, i in enumerate(self._order):
+            self._rank[i] = k
+        self._max_t = self._sorted_t[-1] if self._sorted_t else 0
+        self._current_index = None
+        self._rebuild()
+
+    def highlight_index(self, index: int) -> None:
+        """
+        高亮指定事件（列表位置）对应的块；不在视口内时先滚动过去。
+        """
+        self._clear_highlight()
+        idx = int(index)
+        if idx < 0 or idx >= len(self._events):
+            self._current_index = None
+            return
+
+        self._current_index = idx
+        x = self._x_for_time(int(self._events[idx].t_ms))
+        rect = QRectF(x, self._row_y, self._min_width, self._block_h).adjusted(-20, -20, 20, 20)
+        try:
+            self.ensureVisible(rect, 10, 10)
+        except Exception:
+            pass
+        # 滚动可能已触发窗口刷新；未滚动时也确保窗口是最新的
+        self._refresh_window()
+        self._apply_highlight()
+
+    # ---------- 缩放 ----------
+
+    def set_time_scale(self, scale: float) -> None:
+        try:
+            s = float(scale)
+        except Exception:
+            return
+        s = min(max(s, self._time_scale_min), self._time_scale_max)
+        if abs(s - self._time_scale_px_per_ms) < 1e-9:
+            return
+
+        # 以视口中心时间为锚点缩放
+        center_t = self._time_for_x(self.mapToScene(self.viewport().rect().center()).x())
+        self._time_scale_px_per_ms = s
+        self._rebuild()
+        try:
+            self.centerOn(self._x_for_time(int(center_t)), self._row_y)
+        except Exception:
+            pass
+        self._refresh_window()
+        self.zoomChanged.emit()
+
+    def zoom_in(self, factor: float = 1.25) -> None:
+        self.set_time_scale(self._time_scale_px_per_ms * factor)
+
+    def zoom_out(self, factor: float = 1.25) -> None:
+        self.set_time_scale(self._time_scale_px_per_ms / factor)
+
+    def reset_zoom(self) -> None:
+        self.set_time_scale(self._time_scale_default)
+
+    def zoom_ratio(self) -> float:
+        if self._time_scale_default <= 0:
+            return 1.0
+        return self._time_scale_px_per_ms / self._time_scale_default
+
+    # ---------- 坐标换算 ----------
+
+    def _x_for_time(self, t_ms: int) -> float:
+        return self._left_margin + float(t_ms) * self._time_scale_px_per_ms
+
+    def _time_for_x(self, x: float) -> float:
+        scale = self._time_scale_px_per_ms
+        if scale <= 0:
+            return 0.0
+        return (float(x) - self._left_margin) / scale
+
+    def _sorted_range(self, t0: float, t1: float) -> Tuple[int, int]:
+        """
+        返回时间落在 [t0, t1] 内的事件在 _sorted_t 中的下标区间 [lo, hi)。
+        """
+        return bisect_left(self._sorted_t, math.floor(t0)), bisect_right(self._sorted_t, math.ceil(t1))
+
+    # ---------- 内部绘制 ----------
+
+    def _rebuild(self) -> None:
+        """
+        数据或缩放变化：清空已创建的 item，重新设置场景范围并按视口刷新。
+        """
         self._scene.clear()
         self._index_to_item.clear()
+        self._lod_items = []
+        self._ruler_items = []
+        self._window = None
         self._current_item = None
 
         if not self._events:
             self._scene.setSceneRect(0, 0, 400, 120)
             return
 
-        max_t = max(int(e.t_ms) for e in self._events)
-        if max_t <= 0:
-            max_t = 1000
-
-        left_margin = 60.0
-        top_ruler = 24.0
-        row_y = top_ruler + 40.0
-        block_h = 26.0
-        min_width = 40.0
-
-        font = QFont(self.font())
-        font.setPointSize(max(font.pointSize() - 1, 7))
-
-        # 先画时间标尺
-        x_extent = self._draw_time_ruler(
-            font=font,
-            left=left_margin,
-            top=top_ruler,
-            max_time_ms=max_t,
-        )
+        max_t = self._max_t if self._max_t > 0 else 1000
+        total_width = self._x_for_time(max_t) + self._min_width + 40.0
+        total_height = self._row_y + self._block_h + 40.0
+        self._scene.setSceneRect(0, 0, max(total_width, 400.0), max(total_height, 150.0))
+
+        self._refresh_window()
+        if self._current_index is not None:
+            self._apply_highlight()
+
+    def _visible_time_window(self) -> Tuple[float, float]:
+        vp = self.viewport()
+        w = float(vp.width()) if vp is not None and vp.width() > 0 else 800.0
+        left = float(self.mapToScene(0, 0).x())
+        # 左右各多预留一屏，减少滚动时的增删次数
+        x0 = left - w
+        x1 = left + 2.0 * w
+        return self._time_for_x(x0 - self._min_width), self._time_for_x(x1)
+
+    def _on_scrolled(self, _value: int) -> None:
+        self._refresh_window()
+        if self._current_index is not None and self._current_item is None:
+            self._apply_highlight()
+
+    def _refresh_window(self) -> None:
+        if not self._events:
+            return
 
-        # 绘制事件块
-        x_max = 0.0
-        for ev in self._events:
-            t_ms = int(ev.t_ms)
-            x = left_margin + t_ms * self._time_scale_px_per_ms
-
-            w = min_width
-
-            rect = QGraphicsRectItem(0, 0, w, block_h)
-            rect.setPos(x, row_y)
-            rect.setPen(self._normal_pen)
-            rect.setBrush(QBrush(self._color_for_outcome(ev.outcome)))
-            rect.setData(0, int(ev.index))  # 使用事件 index 作为标识
-
-            # tooltip
-            tip_lines = [
-                f"#{ev.index} @ {ev.t_ms} ms",
-                f"scope={ev.scope}",
-                f"mode_id={ev.mode_id or ''}",
-                f"track_id={ev.track_id or ''}",
-                f"label={ev.label}",
-                f"kind={ev.node_kind}",
-                f"outcome={ev.outcome}",
-            ]
-            if ev.reason:
-                tip_lines.append(f"reason={ev.reason}")
-            rect.setToolTip("\n".join(tip_lines))
-
-            self._scene.addItem(rect)
-            self._index_to_item[int(ev.index)] = rect
-
-            # 文本
-            text = ev.label or ev.node_kind or ""
-            text_item = QGraphicsSimpleTextItem(text, rect)
-            text_item.setFont(font)
-            tb = text_item.boundingRect()
-            text_item.setPos(
-                (w - tb.width()) / 2.0,
-                (block_h - tb.height()) / 2.0,
-            )
-            text_item.setBrush(QColor(255, 255, 255))
-
-            x_max = max(x_max, x + w)
-
-        total_width = max(x_extent, x_max + 40.0)
-        total_height = row_y + block_h + 40.0
-        self._scene.setSceneRect(0, 0, total_width, max(total_height, 150.0))
+        t0, t1 = self._visible_time_window()
+        # 量化窗口：滚动不足 1/4 屏时不必刷新
+        quant = max(1.0, (t1 - t0) / 12.0)
+        qt0 = int(math.floor(t0 / quant) * quant)
+        qt1 = int(math.ceil(t1 / quant) * quant)
 
-    def highlight_index(self, index: int) -> None:
-        """
-        高亮指定事件 index 对应的块。
-        """
-        if self._current_item is not None:
-            try:
-                self._current_item.setPen(self._normal_pen)
-                self._current_item.setZValue(0)
-            except Exception:
-                pass
-        self._current_item = None
+        lo, hi = self._sorted_range(qt0, qt1)
+        span_px = max(1.0, (qt1 - qt0) * self._time_scale_px_per_ms)
+        use_lod = (hi - lo) > 0 and span_px / float(hi - lo) < self._lod_px_per_event
 
-        item = self._index_to_item.get(int(index))
-        if item is None:
+        window = (qt0, qt1, use_lod)
+        if window == self._window:
             return
+        self._window = window
 
-        try:
-            item.setPen(self._highlight_pen)
-            item.setZValue(10)
-            self._current_item = item
-            rect = item.sceneBoundingRect().adjusted(-20, -20, 20, 20)
-            self.ensureVisible(rect, xMargin=10, yMargin=10)
-        except Exception:
-            pass
+        self._sync_ruler(qt0, qt1)
+        if use_lod:
+            self._drop_detail_items(keep=set())
+            self._draw_density(qt0, qt1, lo, hi)
+        else:
+            self._drop_lod_items()
+            self._sync_detail_items(lo, hi)
+
+    def _drop_lod_items(self) -> None:
+        for it in self._lod_items:
+            self._scene.removeItem(it)
+        self._lod_items = []
+
+    def _drop_detail_items(self, *, keep: set) -> None:
+        for idx in [i for i in self._index_to_item if i not in keep]:
+            item = self._index_to_item.pop(idx)
+            if item is self._current_item:
+                self._current_item = None
+            self._scene.removeItem(item)
+
+    def _sync_detail_items(self, lo: int, hi: int) -> None:
+        wanted = set(self._order[lo:hi])
+        self._drop_detail_items(keep=wanted)
+        for idx in self._order[lo:hi]:
+            if idx not in self._index_to_item:
+                self._index_to_item[idx] = self._make_event_item(idx)
+
+    def _make_event_item(self, idx: int) -> QGraphicsRectItem:
+        ev = self._events[idx]
+        w = self._min_width
+        block_h = self._block_h
+
+        rect = QGraphicsRectItem(0, 0, w, block_h)
+        rect.setPos(self._x_for_time(int(ev.t_ms)), self._row_y)
+        rect.setPen(self._normal_pen)
+        rect.setBrush(QBrush(self._color_for_outcome(ev.outcome)))
+        rect.setData(0, idx)  # 使用列表位置作为标识（与表格行一致）
+        rect.setZValue(self._base_z(idx))
+
+        # tooltip
+        tip_lines = [
+            f"#{ev.index} @ {ev.t_ms} ms",
+            f"scope={ev.scope}",
+            f"mode_id={ev.mode_id or ''}",
+            f"track_id={ev.track_id or ''}",
+            f"label={ev.label}",
+            f"kind={ev.node_kind}",
+            f"outcome={ev.outcome}",
+        ]
+        if ev.reason:
+            tip_lines.append(f"reason={ev.reason}")
+        rect.setToolTip("\n".join(tip_lines))
+
+        self._scene.addItem(rect)
+
+        # 文本
+        text = ev.label or ev.node_kind or ""
+        text_item = QGraphicsSimpleTextItem(text, rect)
+        text_item.setFont(self._font)
+        tb = text_item.boundingRect()
+        text_item.setPos(
+            (w - tb.width()) / 2.0,
+            (block_h - tb.height()) / 2.0,
+        )
+        text_item.setBrush(QColor(255, 255, 255))
+        return rect
 
-    # ---------- 内部绘制 ----------
+    def _draw_density(self, t0: int, t1: int, lo: int, hi: int) -> None:
+        """
+        低缩放级别：按像素桶统计事件数，画成高度与数量成正比的密度条。
+        """
+        self._drop_lod_items()
+
+        bucket_ms = max(1.0, self._lod_bucket_px / self._time_scale_px_per_ms)
+        counts: Dict[int, int] = {}
+        for k in range(lo, hi):
+            b = int(self._sorted_t[k] // bucket_ms)
+            counts[b] = counts.get(b, 0) + 1
+        if not counts:
+            return
 
-    def _draw_time_ruler(
-        self,
-        *,
-        font: QFont,
-        left: float,
-        top: float,
-        max_time_ms: int,
-    ) -> float:
+        peak = max(counts.values())
+        brush = QBrush(QColor(80, 160, 230))
+        pen = QPen(Qt.NoPen)
+        bottom = self._row_y + self._block_h
+        for b, n in counts.items():
+            h = max(2.0, self._block_h * (n / float(peak)))
+            x = self._x_for_time(int(b * bucket_ms))
+            bar = QGraphicsRectItem(0, 0, max(1.0, self._lod_bucket_px - 1.0), h)
+            bar.setPos(x, bottom - h)
+            bar.setPen(pen)
+            bar.setBrush(brush)
+            start_ms = int(b * bucket_ms)
+            bar.setToolTip(f"{n} 个事件 @ {start_ms}~{int(start_ms + bucket_ms)} ms（放大查看详情）")
+            self._scene.addItem(bar)
+            self._lod_items.append(bar)
+
+    def _sync_ruler(self, t0: int, t1: int) -> None:
         """
-        绘制顶部时间刻度线，返回建议的横向扩展宽度。
+        只绘制窗口内的时间刻度；刻度间隔随缩放自适应（标签间距不小于约 60px）。
         """
+        for it in self._ruler_items:
+            self._scene.removeItem(it)
+        self._ruler_items = []
+
         scale = float(self._time_scale_px_per_ms)
         if scale <= 0:
-            return left + 400.0
-
-        import math
+            return
 
-        max_ms = max(1, int(max_time_ms))
-        # 取秒级刻度
         step_ms = 1000
-        max_step = max(1, int(math.ceil(max_ms / float(step_ms))))
-
-        pen_axis = QPen(QColor(150, 150, 150), 1.0)
-        pen_grid = QPen(QColor(70, 70, 70), 1.0, Qt.DashLine)
+        for cand in (1000, 2000, 5000, 10000, 30000, 60000, 120000, 300000, 600000):
+            step_ms = cand
+            if cand * scale >= 60.0:
+                break
 
-        axis_y = top - 2.0
+        max_ms = max(1, int(self._max_t if self._max_t > 0 else 1000))
+        axis_y = self._top_ruler - 2.0
         grid_bottom = axis_y + 80.0
 
-        # 顶部横线
-        self._scene.addLine(left, axis_y, left + max_ms * scale + 40.0, axis_y, pen_axis)
+        pen_axis = QPen(QColor(150, 150, 150), 1.0)
+        pen_grid = QPen(QColor(70, 70, 70), 1.0, Qt.DashLine)
 
-        font_small = QFont(font)
-        font_small.setPointSize(max(font.pointSize() - 1, 6))
+        font_small = QFont(self._font)
+        font_small.setPointSize(max(self._font.pointSize() - 1, 6))
 
-        x_max = left
+        # 顶部横线（仅窗口内）
+        x_left = self._x_for_time(max(0, t0))
+        x_right = min(self._x_for_time(t1), self._x_for_time(max_ms) + 40.0)
+        if x_right > x_left:
+            self._ruler_items.append(self._scene.addLine(x_left, axis_y, x_right, axis_y, pen_axis))
 
-        for i in range(0, max_step + 1):
+        first = max(0, int(math.floor(max(0, t0) / step_ms)))
+        last = min(int(math.ceil(max_ms / float(step_ms))), int(math.ceil(t1 / float(step_ms))))
+        for i in range(first, last + 1):
             t = i * step_ms
-            x = left + t * scale
-            x_max = max(x_max, x)
+            x = self._x_for_time(t)
 
             # 竖线 + 小刻度
-            self._scene.addLine(x, axis_y, x, grid_bottom, pen_grid)
-            self._scene.addLine(x, axis_y, x, axis_y - 4.0, pen_axis)
+            self._ruler_items.append(self._scene.addLine(x, axis_y, x, grid_bottom, pen_grid))
+            self._ruler_items.append(self._scene.addLine(x, axis_y, x, axis_y - 4.0, pen_axis))
 
             # 标签
-            text = f"{i}s"
+            secs = t // 1000
+            text = f"{secs}s" if secs < 60 else f"{secs // 60}m{secs % 60:02d}s"
             txt_item = QGraphicsSimpleTextItem(text)
             txt_item.setFont(font_small)
             tb = txt_item.boundingRect()
-            tx = x - tb.width() / 2.0
-            ty = axis_y - 4.0 - tb.height()
-            txt_item.setPos(tx, ty)
+            txt_item.setPos(x - tb.width() / 2.0, axis_y - 4.0 - tb.height())
             txt_item.setBrush(QColor(200, 200, 200))
             txt_item.setAcceptedMouseButtons(Qt.NoButton)
             txt_item.setFlag(QGraphicsItem.ItemIsSelectable, False)
             txt_item.setFlag(QGraphicsItem.ItemIsFocusable, False)
             self._scene.addItem(txt_item)
+            self._ruler_items.append(txt_item)
 
-        return x_max + 40.0
+    # ---------- 高亮 ----------
+
+    def _clear_highlight(self) -> None:
+        if self._current_item is not None:
+            try:
+                self._current_item.setPen(self._normal_pen)
+                self._current_item.setZValue(self._base_z(int(self._current_item.data(0))))
+            except Exception:
+                pass
+        self._current_item = None
+
+    def _base_z(self, idx: int) -> float:
+        """
+        普通块的 z 值 ∈ [0, 1)，按时间名次递增；高亮块固定为 2。
+        """
+        return self._rank[idx] / float(len(self._rank) + 1)
+
+    def _apply_highlight(self) -> None:
+        idx = self._current_index
+        if idx is None:
+            return
+        item = self._index_to_item.get(idx)
+        if item is None:
+            # LOD 模式或不在窗口内：只记住 index，等窗口刷新后再应用
+            return
+        try:
+            item.setPen(self._highlight_pen)
+            item.setZValue(2.0)
+            self._current_item = item
+        except Exception:
+            pass
 
     def _color_for_outcome(self, outcome: str) -> QColor:
         o = (outcome or "").strip().upper()
@@ -263,20 +468,63 @@ class SimulationTimelineView(QGraphicsView):
 
     # ---------- 交互 ----------
 
+    def _hit_test(self, scene_x: float, scene_y: float) -> Optional[int]:
+        """
+        命中事件：
+        - 明细模式：按场景的绘制顺序（最上层优先，含高亮块的 z 值）取第一个事件块；
+        - 密度条模式：通过时间索引判断该位置是否有事件（块覆盖 [x(t), x(t)+min_width]）。
+        """
+        if not self._events:
+            return None
+        if scene_y < self._row_y or scene_y > self._row_y + self._block_h:
+            return None
+
+        if self._window is None or not self._window[2]:
+            for item in self._scene.items(QPointF(scene_x, scene_y), Qt.IntersectsItemShape, Qt.DescendingOrder):
+                # 点在块内文字上时取其所属的块
+                while item.parentItem() is not None:
+                    item = item.parentItem()
+                idx = item.data(0)
+                if isinstance(idx, int) and self._index_to_item.get(idx) is item:
+                    return idx
+            return None
+
+        t_hi = self._time_for_x(scene_x)
+        t_lo = self._time_for_x(scene_x - self._min_width)
+        lo, hi = self._sorted_range(t_lo, t_hi)
+        if hi <= lo:
+            return None
+        return self._order[hi - 1]
+
     def mousePressEvent(self, event) -> None:
         if event.button() == Qt.LeftButton:
             scene_pos = self.mapToScene(event.pos())
-            item = self._scene.itemAt(scene_pos, self.transform())
-
-            # 若点在文字上，则尝试取父矩形
-            if isinstance(item, QGraphicsSimpleTextItem) and isinstance(item.parentItem(), QGraphicsRectItem):
-                item = item.parentItem()
-
-            if isinstance(item, QGraphicsRectItem):
-                idx = item.data(0)
-                if isinstance(idx, int):
-                    self.eventClicked.emit(idx)
-                    self.highlight_index(idx)
+            idx = self._hit_test(scene_pos.x(), scene_pos.y())
+            if idx is not None:
+                if self._window is not None and self._window[2]:
+                    # 密度条模式：放大到该位置，不直接选中
+                    self.centerOn(scene_pos.x(), self._row_y)
+                    self.zoom_in(4.0)
                     return
+                self.eventClicked.emit(idx)
+                self.highlight_index(idx)
+                return
+
+        super().mousePressEvent(event)
+
+    def wheelEvent(self, event: QWheelEvent) -> None:
+        mods = QApplication.keyboardModifiers()
+        if mods & Qt.ControlModifier:
+            delta = event.angleDelta().y()
+            if delta > 0:
+                self.zoom_in(1.1)
+            elif delta < 0:
+                self.zoom_out(1.1)
+            event.accept()
+            return
+        super().wheelEvent(event)
 
-        super().mousePressEvent(event)
\ No newline at end of file
+    def resizeEvent(self, event) -> None:
+        super().resizeEvent(event)
+        self._window = None
+        self._refresh_window()
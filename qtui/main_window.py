@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Dict, Optional
+from typing import TYPE_CHECKING, Callable, Dict, Optional
 
 from PySide6.QtWidgets import (
     QApplication,
@@ -14,36 +14,47 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 from PySide6.QtGui import QIcon, QCloseEvent
+from PySide6.QtCore import QTimer
 
 import logging
 
 from core.app.services.app_services import AppServices
 from core.app.services.profile_service import ProfileService
+from core.io.save_worker import SaveWorker
 from core.pick.capture import SampleSpec
 from core.pick.models import PickSessionConfig
 from core.profiles import ProfileContext
+from core.startup_profile import startup_profiler
 
 from qtui.dispatcher import QtDispatcher
 from qtui.nav_panel import NavPanel
 from qtui.notify import UiNotify
-from qtui.pick.coordinator import QtPickCoordinator, UiPickPolicySnapshot
 from qtui.profile_controller import ProfileController
 from qtui.status_bar import StatusController
 from qtui.theme import apply_theme
 from qtui.window_state import WindowStateController
 from qtui.unsaved_guard import UnsavedChangesGuard
 from qtui.icons import load_icon, resource_path
-from rotation_editor.ui.presets_page import RotationPresetsPage
-from rotation_editor.ui.editor.main_page import RotationEditorPage
 
-from qtui.exec_hotkey import ExecHotkeyController
-from qtui.quick_exec_panel import QuickExecPanel
-
-from qtui.extensions.gw2_skill_import_dialog import Gw2SkillImportDialog  # 新增：GW2 插件对话框
-from qtui.extensions.rotation_simulation_dialog import RotationSimulationDialog  # 新增：循环推演对话框
+# 以下模块较重（rotation 引擎 / pynput / mss / 插件对话框），在首次使用时才导入
+if TYPE_CHECKING:
+    from qtui.exec_hotkey import ExecHotkeyController
+    from qtui.pick.coordinator import QtPickCoordinator, UiPickPolicySnapshot
+    from qtui.quick_exec_panel import QuickExecPanel
 
 log = logging.getLogger(__name__)
 
+# 页面顺序即 QStackedWidget 中的顺序
+_PAGE_KEYS = ("base", "skills", "points", "rotation", "rotation_editor")
+
+_PAGE_LOG_NAMES = {
+    "base": "base page",
+    "skills": "skills page",
+    "points": "points page",
+    "rotation": "rotation presets page",
+    "rotation_editor": "rotation editor page",
+}
+
 
 class MainWindow(QMainWindow):
     """
@@ -57,6 +68,8 @@ class MainWindow(QMainWindow):
     - 几何：WindowStateController 负责记忆窗口大小/位置
     - 未保存变更：UnsavedChangesGuard 负责提示保存/放弃/取消
     - 插件 / 扩展：如 GW2 技能导入
+    - 启动优化：除默认页外的页面、插件对话框、取色协调器、快捷执行面板都在首次使用时构造；
+      执行热键监听器（pynput）在首次事件循环后再创建。构造耗时记录到 startup_profiler。
     """
 
     def __init__(
@@ -86,20 +99,19 @@ class MainWindow(QMainWindow):
         self.status = StatusController(self)
         self.notify = UiNotify(dispatcher=self.dispatcher, status=self.status)
 
+        # 后台保存线程：自动保存的写盘/fsync 不占用 UI 线程，结果经 dispatcher 回到主线程
+        self._save_worker = SaveWorker(scheduler=self.dispatcher)
+
         # 服务层（注意：AppServices 内部持有 ProfileSession）
         self.services = AppServices(
             ctx=self._ctx,
             notify_error=lambda m, d="": self.notify.error(m, detail=d),
+            save_worker=self._save_worker,
         )
         self.profile_service = ProfileService(pm=self._pm, services=self.services)
 
-        # 取色协调器
-        self._pick_coord = QtPickCoordinator(
-            root=self,
-            dispatcher=self.dispatcher,
-            status=self.status,
-            ui_policy_provider=self._ui_policy_snapshot,
-        )
+        # 取色协调器（首次取色时创建）
+        self._pick_coord: Optional[QtPickCoordinator] = None
 
         # 窗口几何控制
         self._win_state = WindowStateController(
@@ -121,10 +133,13 @@ class MainWindow(QMainWindow):
             notify=self.notify,
         )
 
-        # 执行启停热键控制器（初始化为 None，稍后在 _setup_central_widget 后创建）
+        # 执行启停热键控制器（初始化为 None，首次事件循环后创建）
         self._exec_hotkey: Optional[ExecHotkeyController] = None
         self._quick_panel: Optional[QuickExecPanel] = None
 
+        # 已构造的页面：key -> QWidget（未构造的页面在 stack 中是占位 QWidget）
+        self._pages: Dict[str, QWidget] = {}
+
         # 脏状态标题“*”
         try:
             self.services.session.subscribe_dirty(self._on_store_dirty)
@@ -144,15 +159,8 @@ class MainWindow(QMainWindow):
             backup_provider=lambda: bool(getattr(self._ctx.base.io, "backup_on_save", True)),
         )
 
-        # 执行启停热键控制器：在页面创建完成后再初始化
-        try:
-            self._exec_hotkey = ExecHotkeyController(
-                dispatcher=self.dispatcher,
-                get_ctx=lambda: self._ctx,
-                toggle_cb=self._toggle_exec_by_hotkey,
-            )
-        except Exception:
-            self._exec_hotkey = None
+        # 执行启停热键控制器：导入 pynput + 启动全局监听较慢，放到首次事件循环之后
+        QTimer.singleShot(0, self._init_exec_hotkey)
 
         # 使用 WindowStateController 恢复窗口几何
         self._win_state.apply_initial_geometry()
@@ -199,76 +207,17 @@ class MainWindow(QMainWindow):
         self._stack = QStackedWidget(self)
         layout.addWidget(self._stack, 1)
 
-        from qtui.pages.base_settings_page import BaseSettingsPage
-        from qtui.pages.skills_page import SkillsPage
-        from qtui.pages.points_page import PointsPage
-
         self._page_indices: Dict[str, int] = {}
 
-        # 三个实际页面
-        self._page_base = BaseSettingsPage(
-            ctx=self._ctx,
-            services=self.services,
-            notify=self.notify,
-            parent=self,
-        )
-        self._page_skills = SkillsPage(
-            ctx=self._ctx,
-            services=self.services,
-            notify=self.notify,
-            start_pick=self._start_pick_for_record,
-            parent=self,
-        )
-        self._page_points = PointsPage(
-            ctx=self._ctx,
-            services=self.services,
-            notify=self.notify,
-            start_pick=self._start_pick_for_record,
-            parent=self,
-        )
-
-        # 循环/轨道方案管理页（rotation_editor）
-        self._page_rotation = RotationPresetsPage(
-            ctx=self._ctx,
-            session=self.services.session,
-            notify=self.notify,
-            open_editor=self._open_rotation_editor,
-            parent=self,
-        )
-
-        # 循环编辑器页（Mode/Track/Node 列表版）
-        self._page_rotation_editor = RotationEditorPage(
-            ctx=self._ctx,
-            session=self.services.session,
-            notify=self.notify,
-            dispatcher=self.dispatcher,  # 将 QtDispatcher 作为 Scheduler 传给执行引擎
-            parent=self,
-        )
-
-        self._page_indices["base"] = self._stack.addWidget(self._page_base)
-        self._page_indices["skills"] = self._stack.addWidget(self._page_skills)
-        self._page_indices["points"] = self._stack.addWidget(self._page_points)
-        self._page_indices["rotation"] = self._stack.addWidget(self._page_rotation)
-        self._page_indices["rotation_editor"] = self._stack.addWidget(self._page_rotation_editor)
+        # 先为每个页面放一个占位，保证 stack 索引固定；默认页立即构造，其它页面首次导航时构造
+        for key in _PAGE_KEYS:
+            self._page_indices[key] = self._stack.addWidget(QWidget(self._stack))
+        self._ensure_page("base")
 
         # 默认显示基础配置
         self._stack.setCurrentIndex(self._page_indices["base"])
         self._nav.set_active_page("base")
 
-        # 快捷执行面板：初始创建并隐藏
-        try:
-            # 不再把 MainWindow 作为 parent，让它成为独立顶层窗口，
-            # 这样主窗口最小化时，它不会跟着一起最小化。
-            self._quick_panel = QuickExecPanel(
-                ctx=self._ctx,
-                engine_host=self._page_rotation_editor,
-                open_editor_cb=self._open_rotation_editor,
-                parent=None,
-            )
-            self._quick_panel.hide()
-        except Exception:
-            self._quick_panel = None
-
         # 信号连接
         self._nav.page_selected.connect(self._on_page_selected)
         self._nav.profile_selected.connect(self._on_profile_selected)
@@ -278,6 +227,149 @@ class MainWindow(QMainWindow):
 
         self.setCentralWidget(central)
 
+    # ---------- 页面按需构造 ----------
+
+    def _page_factory(self, key: str) -> Optional[Callable[[], QWidget]]:
+        if key == "base":
+            def _make() -> QWidget:
+                from qtui.pages.base_settings_page import BaseSettingsPage
+                return BaseSettingsPage(
+                    ctx=self._ctx,
+                    services=self.services,
+                    notify=self.notify,
+                    parent=self,
+                )
+            return _make
+
+        if key == "skills":
+            def _make() -> QWidget:
+                from qtui.pages.skills_page import SkillsPage
+                return SkillsPage(
+                    ctx=self._ctx,
+                    services=self.services,
+                    notify=self.notify,
+                    start_pick=self._start_pick_for_record,
+                    parent=self,
+                )
+            return _make
+
+        if key == "points":
+            def _make() -> QWidget:
+                from qtui.pages.points_page import PointsPage
+                return PointsPage(
+                    ctx=self._ctx,
+                    services=self.services,
+                    notify=self.notify,
+                    start_pick=self._start_pick_for_record,
+                    parent=self,
+                )
+            return _make
+
+        if key == "rotation":
+            # 循环/轨道方案管理页（rotation_editor）
+            def _make() -> QWidget:
+                from rotation_editor.ui.presets_page import RotationPresetsPage
+                return RotationPresetsPage(
+                    ctx=self._ctx,
+                    session=self.services.session,
+                    notify=self.notify,
+                    open_editor=self._open_rotation_editor,
+                    parent=self,
+                )
+            return _make
+
+        if key == "rotation_editor":
+            # 循环编辑器页（Mode/Track/Node 列表版）
+            def _make() -> QWidget:
+                from rotation_editor.ui.editor.main_page import RotationEditorPage
+                return RotationEditorPage(
+                    ctx=self._ctx,
+                    session=self.services.session,
+                    notify=self.notify,
+                    dispatcher=self.dispatcher,  # 将 QtDispatcher 作为 Scheduler 传给执行引擎
+                    parent=self,
+                )
+            return _make
+
+        return None
+
+    def _ensure_page(self, key: str) -> Optional[QWidget]:
+        """
+        返回页面实例；尚未构造时用当前 ctx 构造并替换 stack 中的占位。
+        """
+        page = self._pages.get(key)
+        if page is not None:
+            return page
+
+        factory = self._page_factory(key)
+        idx = self._page_indices.get(key)
+        if factory is None or idx is None:
+            return None
+
+        with startup_profiler().span("page", key):
+            page = factory()
+
+        placeholder = self._stack.widget(idx)
+        current = self._stack.currentIndex()
+        self._stack.insertWidget(idx, page)
+        if placeholder is not None:
+            self._stack.removeWidget(placeholder)
+            placeholder.deleteLater()
+        if current == idx:
+            self._stack.setCurrentIndex(idx)
+
+        self._pages[key] = page
+        return page
+
+    def _page(self, key: str) -> Optional[QWidget]:
+        """
+        已构造的页面（未构造返回 None，不触发构造）。
+        """
+        return self._pages.get(key)
+
+    # ---------- 延迟创建的控制器 ----------
+
+    def _init_exec_hotkey(self) -> None:
+        if self._exec_hotkey is not None:
+            return
+        try:
+            with startup_profiler().span("build", "ExecHotkeyController"):
+                from qtui.exec_hotkey import ExecHotkeyController
+
+                self._exec_hotkey = ExecHotkeyController(
+                    dispatcher=self.dispatcher,
+                    get_ctx=lambda: self._ctx,
+                    toggle_cb=self._toggle_exec_by_hotkey,
+                )
+        except Exception:
+            log.exception("failed to create ExecHotkeyController")
+            self._exec_hotkey = None
+
+    def _get_pick_coord(self) -> "QtPickCoordinator":
+        if self._pick_coord is None:
+            with startup_profiler().span("build", "QtPickCoordinator"):
+                from qtui.pick.coordinator import QtPickCoordinator
+
+                self._pick_coord = QtPickCoordinator(
+                    root=self,
+                    dispatcher=self.dispatcher,
+                    status=self.status,
+                    ui_policy_provider=self._ui_policy_snapshot,
+                )
+        return self._pick_coord
+
+    def _make_quick_panel(self) -> "QuickExecPanel":
+        from qtui.quick_exec_panel import QuickExecPanel
+
+        # 不把 MainWindow 作为 parent，让它成为独立顶层窗口，
+        # 这样主窗口最小化时，它不会跟着一起最小化。
+        return QuickExecPanel(
+            ctx=self._ctx,
+            engine_host=self._ensure_page("rotation_editor"),
+            open_editor_cb=self._open_rotation_editor,
+            parent=None,
+        )
+
     # ---------- Profile 列表 UI ----------
 
     def _refresh_profiles_ui(self, select: Optional[str]) -> None:
@@ -322,6 +414,13 @@ class MainWindow(QMainWindow):
             self.notify.error(f"未知页面: {key}")
             return
 
+        try:
+            self._ensure_page(key)
+        except Exception as e:
+            log.exception("failed to build page: %s", key)
+            self.notify.error(f"无法打开页面: {key}", detail=str(e))
+            return
+
         self._stack.setCurrentIndex(idx)
         self._nav.set_active_page(key)
 
@@ -404,10 +503,12 @@ class MainWindow(QMainWindow):
 
     # ---------- 取色 UI 策略快照 ----------
 
-    def _ui_policy_snapshot(self) -> UiPickPolicySnapshot:
+    def _ui_policy_snapshot(self) -> "UiPickPolicySnapshot":
         """
         从当前 ProfileContext 抽取取色相关的 UI 避让/预览策略快照。
         """
+        from qtui.pick.coordinator import UiPickPolicySnapshot
+
         b = self._ctx.base
         av = getattr(getattr(b, "pick", None), "avoidance", None)
 
@@ -518,7 +619,7 @@ class MainWindow(QMainWindow):
             mouse_avoid_settle_ms=mouse_avoid_settle_ms,
         )
 
-        self._pick_coord.request_pick(cfg=cfg, on_confirm=on_confirm)
+        self._get_pick_coord().request_pick(cfg=cfg, on_confirm=on_confirm)
 
     # ---------- 未保存变更守卫辅助 ----------
 
@@ -531,61 +632,30 @@ class MainWindow(QMainWindow):
     def _flush_all_pages(self) -> None:
         """
         将各页面的表单状态刷新到模型中（不保存到磁盘）。
-        供 UnsavedChangesGuard 使用。
+        供 UnsavedChangesGuard 使用。未构造的页面没有表单状态，直接跳过。
         """
-        try:
-            self._page_base.flush_to_model()
-        except Exception:
-            log.exception("MainWindow._flush_all_pages: base page flush_to_model failed")
-
-        try:
-            self._page_skills.flush_to_model()
-        except Exception:
-            log.exception("MainWindow._flush_all_pages: skills page flush_to_model failed")
-
-        try:
-            self._page_points.flush_to_model()
-        except Exception:
-            log.exception("MainWindow._flush_all_pages: points page flush_to_model failed")
-
-        try:
-            self._page_rotation.flush_to_model()
-        except Exception:
-            log.exception("MainWindow._flush_all_pages: rotation presets page flush_to_model failed")
-
-        try:
-            self._page_rotation_editor.flush_to_model()
-        except Exception:
-            log.exception("MainWindow._flush_all_pages: rotation editor page flush_to_model failed")
+        for key in _PAGE_KEYS:
+            page = self._page(key)
+            if page is None:
+                continue
+            try:
+                page.flush_to_model()
+            except Exception:
+                log.exception("MainWindow._flush_all_pages: %s flush_to_model failed", _PAGE_LOG_NAMES[key])
 
     def _set_pages_context(self, ctx: ProfileContext) -> None:
         """
         在 rollback 之后刷新页面绑定的 ctx 对象。
+        未构造的页面会在首次构造时直接使用最新的 ctx。
         """
-        try:
-            self._page_base.set_context(ctx)
-        except Exception:
-            log.exception("MainWindow._set_pages_context: set_context failed for base page")
-
-        try:
-            self._page_skills.set_context(ctx)
-        except Exception:
-            log.exception("MainWindow._set_pages_context: set_context failed for skills page")
-
-        try:
-            self._page_points.set_context(ctx)
-        except Exception:
-            log.exception("MainWindow._set_pages_context: set_context failed for points page")
-
-        try:
-            self._page_rotation.set_context(ctx)
-        except Exception:
-            log.exception("MainWindow._set_pages_context: set_context failed for rotation presets page")
-
-        try:
-            self._page_rotation_editor.set_context(ctx)
-        except Exception:
-            log.exception("MainWindow._set_pages_context: set_context failed for rotation editor page")
+        for key in _PAGE_KEYS:
+            page = self._page(key)
+            if page is None:
+                continue
+            try:
+                page.set_context(ctx)
+            except Exception:
+                log.exception("MainWindow._set_pages_context: set_context failed for %s", _PAGE_LOG_NAMES[key])
 
     # ---------- 从方案页打开循环编辑器 ----------
 
@@ -600,15 +670,22 @@ class MainWindow(QMainWindow):
         if not pid:
             return
 
+        try:
+            editor = self._ensure_page("rotation_editor")
+        except Exception as e:
+            log.exception("failed to build RotationEditorPage in _open_rotation_editor")
+            self.notify.error("无法打开循环编辑器", detail=str(e))
+            return
+
         # 确保循环编辑器使用最新的 ProfileContext
         try:
-            self._page_rotation_editor.set_context(self._ctx)
+            editor.set_context(self._ctx)
         except Exception:
             log.exception("set_context failed for RotationEditorPage in _open_rotation_editor")
 
         # 让编辑器选中并打开指定的 preset
         try:
-            self._page_rotation_editor.open_preset(pid)
+            editor.open_preset(pid)
         except Exception:
             log.exception("open_preset failed in _open_rotation_editor")
 
@@ -631,13 +708,23 @@ class MainWindow(QMainWindow):
         打开 GW2 技能导入插件窗口。
         导入完成后会刷新技能配置页的列表。
         """
+        def _on_imported() -> None:
+            # 技能页尚未构造时无需刷新（首次打开时会按最新数据构建）
+            page = self._page("skills")
+            if page is not None:
+                page.refresh_tree()
+
         try:
-            dlg = Gw2SkillImportDialog(
-                parent=self,
-                ctx=self._ctx,
-                services=self.services,
-                on_imported=self._page_skills.refresh_tree,  # 导入后刷新列表
-            )
+            with startup_profiler().span("dialog", "Gw2SkillImportDialog"):
+                from qtui.extensions.gw2_skill_import_dialog import Gw2SkillImportDialog
+
+                dlg = Gw2SkillImportDialog(
+                    parent=self,
+                    ctx=self._ctx,
+                    services=self.services,
+                    on_imported=_on_imported,  # 导入后刷新列表
+                    cache_dir=self._pm.profiles_root.parent / "cache",
+                )
             dlg.exec()
         except Exception as e:
             log.exception("failed to open Gw2SkillImportDialog")
@@ -658,11 +745,14 @@ class MainWindow(QMainWindow):
                 notify_dirty=lambda: None,
                 notify_error=lambda m, d="": self.notify.error(m, detail=d),
             )
-            dlg = RotationSimulationDialog(
-                parent=self,
-                ctx=self._ctx,
-                rotation_service=svc,
-            )
+            with startup_profiler().span("dialog", "RotationSimulationDialog"):
+                from qtui.extensions.rotation_simulation_dialog import RotationSimulationDialog
+
+                dlg = RotationSimulationDialog(
+                    parent=self,
+                    ctx=self._ctx,
+                    rotation_service=svc,
+                )
             dlg.exec()
         except Exception as e:
             log.exception("failed to open RotationSimulationDialog")
@@ -674,7 +764,7 @@ class MainWindow(QMainWindow):
         """
         关闭事件：
         1) 先通过 UnsavedChangesGuard 检查未保存更改；
-        2) 再关闭取色协调器、快捷执行面板和执行热键监听器；
+        2) 等待后台保存落盘，再关闭取色协调器、快捷执行面板和执行热键监听器；
         3) 最后持久化窗口几何到 app_state.json。
         """
         # 先检查未保存更改
@@ -689,12 +779,28 @@ class MainWindow(QMainWindow):
                 event.ignore()
                 return
 
+        # 等待后台自动保存落盘
+        try:
+            if not self._save_worker.close(timeout_s=5.0):
+                log.warning("SaveWorker did not finish pending writes before exit")
+        except Exception:
+            log.exception("failed to close SaveWorker in MainWindow.closeEvent")
+
         # 停止取色协调器
         try:
-            self._pick_coord.close()
+            if self._pick_coord is not None:
+                self._pick_coord.close()
         except Exception:
             log.exception("failed to close QtPickCoordinator in MainWindow.closeEvent")
 
+        # 停止共享截屏服务（释放共享内存段）
+        try:
+            from core.pick.shared_capture import stop_shared_capture_service
+
+            stop_shared_capture_service()
+        except Exception:
+            log.exception("failed to stop shared capture service in MainWindow.closeEvent")
+
         # 关闭快捷执行面板（如果存在）
         try:
             if hasattr(self, "_quick_panel") and self._quick_panel is not None:
@@ -727,8 +833,9 @@ class MainWindow(QMainWindow):
         停止(Stop) 仍需用户在循环编辑器中手动点击“停止”按钮。
         """
         try:
-            page = self._page_rotation_editor
+            page = self._ensure_page("rotation_editor")
         except Exception:
+            log.exception("failed to build RotationEditorPage for exec hotkey")
             return
         if page is None:
             return
@@ -745,14 +852,10 @@ class MainWindow(QMainWindow):
         """
         if self._quick_panel is None:
             try:
-                # 同样使用 parent=None，保持独立顶层窗口特性
-                self._quick_panel = QuickExecPanel(
-                    ctx=self._ctx,
-                    engine_host=self._page_rotation_editor,
-                    open_editor_cb=self._open_rotation_editor,
-                    parent=None,
-                )
+                with startup_profiler().span("build", "QuickExecPanel"):
+                    self._quick_panel = self._make_quick_panel()
             except Exception:
+                log.exception("failed to create QuickExecPanel")
                 self.notify.error("无法创建快捷执行面板")
                 return
 
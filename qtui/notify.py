@@ -14,7 +14,7 @@ from qtui.theme import apply_theme as apply_theme_fn
 class UiNotify:
     """
     线程安全 UI 通知：
-    - info / error / status_msg：通过 StatusController 显示到状态栏
+    - info / error / status_msg：通过 StatusController 显示到状态栏（status_msg 按最新一条合并）
     - apply_theme：根据 theme 名称应用 Qt 主题
     - 所有方法都可以在任意线程调用，内部用 QtDispatcher 切回 UI 线程
     """
@@ -31,7 +31,8 @@ class UiNotify:
         s = (msg or "").strip()
         if not s:
             return
-        self.dispatcher.call_soon(lambda: self.status.status_msg(s, ttl_ms=ttl_ms))
+        # 瞬时状态文本：高频调用（如每个执行节点）只显示最新一条
+        self.dispatcher.call_coalesced("status_msg", lambda: self.status.status_msg(s, ttl_ms=ttl_ms))
 
     def error(self, msg: str, *, detail: str = "", ttl_ms: int = 6000) -> None:
         s = (msg or "").strip()
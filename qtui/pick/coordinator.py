@@ -12,6 +12,7 @@ import logging
 
 from core.pick.engine import PickEngine, PickCallbacks
 from core.pick.models import PickSessionConfig, PickPreview, PickConfirmed
+from core.pick.shared_capture import shared_capture_service
 
 from qtui.dispatcher import QtDispatcher
 from qtui.status_bar import StatusController
@@ -50,7 +51,8 @@ class QtPickCoordinator(QObject):
         self._status = status
         self._ui_policy_provider = ui_policy_provider
 
-        self._engine = PickEngine(scheduler=dispatcher)
+        # 预览取样与执行引擎共用进程级截屏服务：同时运行时只抓一次屏
+        self._engine = PickEngine(scheduler=dispatcher, capture_service=shared_capture_service())
         self._preview: Optional[PickPreviewWindow] = None
 
         self._prev_geo = None
@@ -34,6 +34,8 @@ class QuickExecPanel(QWidget):
         * get_engine_state_snapshot() -> Dict[str, Any]
         * get_last_executed_node_label() -> str
         * get_key_sender_info() -> Dict[str,str]  (mode/detail)
+        * 可选 watch_state(fn) -> 取消订阅函数、get_state_version() -> int：
+          状态变化推送（有变化才重绘）；不提供时退回 300ms 轮询
     - open_editor_cb: Callable[[str], None]，打开编辑器到指定 preset 的回调
     """
 
@@ -60,11 +62,14 @@ class QuickExecPanel(QWidget):
 
         self._build_ui()
 
-        # 定时刷新引擎状态
+        # 状态刷新：优先由 engine_host 推送变化；定时器只做低频兜底（并跳过版本号未变的轮询）
+        self._push = hasattr(engine_host, "watch_state")
+        self._unwatch: Optional[Callable[[], None]] = None
+        self._seen_version: Optional[int] = None
+
         self._timer = QTimer(self)
-        self._timer.setInterval(300)  # 300ms 刷新一次
-        self._timer.timeout.connect(self._refresh_state)
-        self._timer.start()
+        self._timer.setInterval(2000 if self._push else 300)
+        self._timer.timeout.connect(self._poll_state)
 
         # 初次加载
         self.set_context(self._ctx)
@@ -153,6 +158,7 @@ class QuickExecPanel(QWidget):
         name = getattr(ctx, "profile_name", "") or ""
         self._lbl_profile.setText(name or "(未命名 Profile)")
         self._reload_presets()
+        self._refresh_state()
 
     def _reload_presets(self) -> None:
         self._building = True
@@ -239,11 +245,50 @@ class QuickExecPanel(QWidget):
 
     # ---------- 状态刷新 ----------
 
+    def showEvent(self, event) -> None:
+        super().showEvent(event)
+        if self._push and self._unwatch is None:
+            try:
+                self._unwatch = self._engine_host.watch_state(self._refresh_state)
+            except Exception:
+                self._unwatch = None
+        self._timer.start()
+        self._refresh_state()
+
+    def hideEvent(self, event) -> None:
+        # 隐藏时不订阅也不轮询：空闲时不占 CPU
+        self._timer.stop()
+        unwatch, self._unwatch = self._unwatch, None
+        if unwatch is not None:
+            try:
+                unwatch()
+            except Exception:
+                pass
+        super().hideEvent(event)
+
+    def _state_version(self) -> Optional[int]:
+        fn = getattr(self._engine_host, "get_state_version", None)
+        if fn is None:
+            return None
+        try:
+            return int(fn())
+        except Exception:
+            return None
+
+    def _poll_state(self) -> None:
+        v = self._state_version()
+        if v is not None and v == self._seen_version:
+            return
+        self._refresh_state()
+
     def _refresh_state(self) -> None:
         """
-        定时从 engine_host 获取状态快照，更新按钮可用性和状态文本。
+        从 engine_host 获取状态快照，更新按钮可用性和状态文本。
         并同步最近执行节点、实际运行的 preset 和发键模式信息。
         """
+        # 先取版本号再读状态：读取期间的变化会让下一次推送 / 轮询再刷新一次
+        self._seen_version = self._state_version()
+
         snap: Dict[str, Any]
         try:
             if hasattr(self._engine_host, "get_engine_state_snapshot"):
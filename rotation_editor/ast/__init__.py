@@ -16,11 +16,14 @@ from .nodes import (
 from .probes import ProbeRequirements, collect_probes_from_expr
 from .codec import decode_expr, encode_expr
 from .compiler import CompileResult, compile_expr_json
+from .optimizer import SelectivityStats, estimate_cost, optimize_expr
 from .evaluator import (
     TriBool,
     tri_to_bool,
     EvalContext,
     evaluate,
+    AtomMemo,
+    AtomMemoStats,
     PixelSampler,
     MetricProvider,
     BaselineProvider,
@@ -48,10 +51,15 @@ __all__ = [
     "encode_expr",
     "CompileResult",
     "compile_expr_json",
+    "SelectivityStats",
+    "estimate_cost",
+    "optimize_expr",
     "TriBool",
     "tri_to_bool",
     "EvalContext",
     "evaluate",
+    "AtomMemo",
+    "AtomMemoStats",
     "PixelSampler",
     "MetricProvider",
     "BaselineProvider",
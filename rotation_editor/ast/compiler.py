@@ -19,6 +19,7 @@ from .nodes import (
     SkillMetricGE,
 )
 from .probes import ProbeRequirements
+from .optimizer import optimize_expr
 
 
 _ALLOWED_METRICS = {"success", "attempt_started", "key_sent_ok", "cast_started", "fail"}
@@ -39,12 +40,14 @@ def compile_expr_json(
     *,
     ctx: Optional[ProfileContext] = None,
     path: str = "$",
+    optimize: bool = True,
 ) -> CompileResult:
     """
     编译入口：
     - 先 decode（语法检查）
-    - 再 semantic validate（引用/范围/约束）
-    - 最后提取 probes
+    - 再 semantic validate（引用/范围/约束；诊断路径对应原始 JSON）
+    - optimize=True 时做等价变换（常量折叠 / 扁平化 / 按代价排序，见 optimize_expr）
+    - 最后提取 probes（基于优化后的树：被常量折叠掉的分支不再需要抓屏）
     """
     expr, diags = decode_expr(expr_json, path=path or "$")
     probes = ProbeRequirements()
@@ -53,6 +56,8 @@ def compile_expr_json(
         return CompileResult(expr=None, diagnostics=diags, probes=probes)
 
     _semantic_validate(expr, ctx=ctx, diags=diags, path=path or "$")
+    if optimize:
+        expr = optimize_expr(expr)
     _collect_probes(expr, probes=probes)
     return CompileResult(expr=expr, diagnostics=diags, probes=probes)
 
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Callable, Dict, Optional, Protocol, Tuple, Literal
+from typing import Any, Callable, Dict, Hashable, Optional, Protocol, Tuple, Literal
 
 from core.profiles import ProfileContext
 from core.pick.capture import SampleSpec
@@ -18,6 +18,7 @@ from .nodes import (
     SkillMetricGE,
     SkillMetric,
 )
+from .optimizer import SelectivityStats
 
 RGB = Tuple[int, int, int]
 
@@ -96,6 +97,74 @@ def tri_to_bool(v: TriBool, *, unknown_as: bool = False) -> bool:
     return bool(v.value)
 
 
+@dataclass
+class AtomMemoStats:
+    """
+    AtomMemo 的累计命中统计（跨帧累加，便于调试面板展示命中率）。
+    """
+    frames: int = 0
+    atom_hits: int = 0
+    atom_misses: int = 0
+    sample_hits: int = 0
+    sample_misses: int = 0
+
+    @property
+    def atom_hit_rate(self) -> float:
+        n = self.atom_hits + self.atom_misses
+        return (self.atom_hits / n) if n > 0 else 0.0
+
+    @property
+    def sample_hit_rate(self) -> float:
+        n = self.sample_hits + self.sample_misses
+        return (self.sample_hits / n) if n > 0 else 0.0
+
+
+class AtomMemo:
+    """
+    同一帧 snapshot 内共享的原子求值表（运行期的公共子表达式消除）：
+
+    - 以 (snapshot_id, atom) 为键：同一帧内 ready/start/complete/网关条件中重复出现的
+      PixelMatchPoint / PixelMatchSkill 只采样 + 容差比较一次
+    - 采样结果另以 (monitor, x, y, sample) 为键缓存：CastBarChanged 依赖 baseline，
+      结果不能共享，但同一点位的取样可以共享
+    - 指标类原子（SkillMetricGE）不随 snapshot 变化，不做缓存
+    """
+
+    def __init__(self, snapshot_id: int, *, stats: Optional[AtomMemoStats] = None) -> None:
+        self._sid = int(snapshot_id)
+        self._results: Dict[Expr, TriBool] = {}
+        self._samples: Dict[Hashable, Optional[RGB]] = {}
+        self._stats = stats if stats is not None else AtomMemoStats()
+
+    @property
+    def snapshot_id(self) -> int:
+        return self._sid
+
+    @property
+    def stats(self) -> AtomMemoStats:
+        return self._stats
+
+    def lookup(self, atom: Expr) -> Optional[TriBool]:
+        r = self._results.get(atom)
+        if r is None:
+            self._stats.atom_misses += 1
+        else:
+            self._stats.atom_hits += 1
+        return r
+
+    def store(self, atom: Expr, result: TriBool) -> None:
+        self._results[atom] = result
+
+    def sample(self, key: Hashable, fn: Callable[[], Optional[RGB]]) -> Optional[RGB]:
+        if key in self._samples:
+            self._stats.sample_hits += 1
+            return self._samples[key]
+        self._stats.sample_misses += 1
+        v = fn()
+        self._samples[key] = v
+        return v
+
+
 @dataclass
 class EvalContext:
     """
@@ -104,11 +173,15 @@ class EvalContext:
     - sampler: 基于 snapshot 的取样器（或实时取样器）
     - metrics: 技能指标提供者（success/attempt/cast_started 等）
     - baseline: CastBarChanged 等需要的 baseline 提供者（可选）
+    - memo: 同一 snapshot 共享的原子求值表（可选；必须与 sampler 使用的 snapshot 对应）
+    - selectivity: 可选的 SelectivityStats；非空时记录 And/Or 各子项的结果，供 optimize_expr 重排
     """
     profile: ProfileContext
     sampler: PixelSampler
     metrics: Optional[MetricProvider] = None
     baseline: Optional[BaselineProvider] = None
+    memo: Optional[AtomMemo] = None
+    selectivity: Optional[SelectivityStats] = None
 
 
 def evaluate(expr: Expr, ctx: EvalContext) -> TriBool:
@@ -137,9 +210,12 @@ def evaluate(expr: Expr, ctx: EvalContext) -> TriBool:
         return TriBool.f() if r.is_true() else TriBool.t()
 
     if isinstance(expr, And):
+        sel = ctx.selectivity
         saw_unknown: Optional[TriBool] = None
         for c in expr.children:
             r = evaluate(c, ctx)
+            if sel is not None:
+                sel.record(c, r)
             if r.is_false():
                 return r
             if r.is_unknown() and saw_unknown is None:
@@ -147,9 +223,12 @@ def evaluate(expr: Expr, ctx: EvalContext) -> TriBool:
         return saw_unknown if saw_unknown is not None else TriBool.t()
 
     if isinstance(expr, Or):
+        sel = ctx.selectivity
         saw_unknown: Optional[TriBool] = None
         for c in expr.children:
             r = evaluate(c, ctx)
+            if sel is not None:
+                sel.record(c, r)
             if r.is_true():
                 return r
             if r.is_unknown() and saw_unknown is None:
@@ -161,11 +240,19 @@ def evaluate(expr: Expr, ctx: EvalContext) -> TriBool:
 
 
 def _eval_atom(expr: Expr, ctx: EvalContext) -> TriBool:
-    if isinstance(expr, PixelMatchPoint):
-        return _eval_pixel_match_point(expr, ctx)
-
-    if isinstance(expr, PixelMatchSkill):
-        return _eval_pixel_match_skill(expr, ctx)
+    if isinstance(expr, (PixelMatchPoint, PixelMatchSkill)):
+        memo = ctx.memo
+        if memo is not None:
+            hit = memo.lookup(expr)
+            if hit is not None:
+                return hit
+        if isinstance(expr, PixelMatchPoint):
+            r = _eval_pixel_match_point(expr, ctx)
+        else:
+            r = _eval_pixel_match_skill(expr, ctx)
+        if memo is not None:
+            memo.store(expr, r)
+        return r
 
     if isinstance(expr, CastBarChanged):
         return _eval_cast_bar_changed(expr, ctx)
@@ -344,10 +431,12 @@ class SnapshotPixelSampler:
     """
     基于 PixelScanner + snapshot 的采样器适配：
     - 用于“同一帧 snapshot”内反复评估多个 atom，不重复截屏。
+    - 传入 memo 时，同一帧内相同 (monitor, x, y, sample) 的取样只做一次。
     """
-    def __init__(self, *, scanner, snapshot: Any) -> None:
+    def __init__(self, *, scanner, snapshot: Any, memo: Optional[AtomMemo] = None) -> None:
         self._scanner = scanner
         self._snapshot = snapshot
+        self._memo = memo
 
     def sample_rgb_abs(
         self,
@@ -358,6 +447,13 @@ class SnapshotPixelSampler:
         sample: SampleSpec,
         require_inside: bool = False,
     ) -> Optional[RGB]:
+        memo = self._memo
+        if memo is not None:
+            key = (str(monitor_key or "primary"), int(x_abs), int(y_abs), sample.mode, int(sample.radius))
+            return memo.sample(key, lambda: self._sample(monitor_key, x_abs, y_abs, sample))
+        return self._sample(monitor_key, x_abs, y_abs, sample)
+
+    def _sample(self, monitor_key: str, x_abs: int, y_abs: int, sample: SampleSpec) -> Optional[RGB]:
         try:
             from core.pick.scanner import PixelProbe
         except Exception:
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Tuple
+
+from .nodes import (
+    Expr,
+    And,
+    Or,
+    Not,
+    Const,
+    PixelMatchPoint,
+    PixelMatchSkill,
+    CastBarChanged,
+    SkillMetricGE,
+)
+
+# 原子的估计求值代价（相对值）：
+# - SkillMetricGE：StateStore 查表，不抓屏
+# - PixelMatchPoint / PixelMatchSkill：需要采样，但同一帧内由 AtomMemo 共享（大概率已缓存）
+# - CastBarChanged：依赖 baseline，结果不能跨表达式共享，每次都要采样比较
+COST_CONST = 0
+COST_METRIC = 1
+COST_PIXEL_CACHED = 10
+COST_PIXEL_UNCACHED = 20
+
+# 没有足够样本时假设的短路概率
+_DEFAULT_P = 0.5
+
+
+class SelectivityStats:
+    """
+    运行期选择性统计：记录 And/Or 子表达式的三值结果次数（键为子表达式本身，frozen dataclass 可哈希）。
+
+    - record(expr, tri)：evaluator 在 EvalContext.selectivity 非空时对每个被求值的子项调用；
+      按对象身份找到计数，结构哈希（需遍历整棵子树）每个节点对象只算一次
+    - bind(expr)：optimize_expr 在排定子项时预先登记，求值热路径上不再计算哈希
+    - p_true / p_false：样本数 >= min_samples 时返回估计概率，否则 None
+    - optimize_expr(expr, selectivity=...) 据此把“更可能短路”的子项排到前面
+
+    注意：由于短路，排在后面的子项只在前面没有短路时才被求值，统计是条件概率；用于排序足够。
+    """
+
+    def __init__(self, *, min_samples: int = 16) -> None:
+        self._min = int(max(1, min_samples))
+        # expr -> [true, false, unknown]
+        self._counts: Dict[Expr, List[int]] = {}
+        # id(expr) -> (expr, 计数)：持有 expr 引用，保证 id 不会被复用
+        self._by_id: Dict[int, Tuple[Expr, List[int]]] = {}
+
+    def _slot(self, expr: Expr) -> List[int]:
+        hit = self._by_id.get(id(expr))
+        if hit is not None and hit[0] is expr:
+            return hit[1]
+        c = self._counts.get(expr)
+        if c is None:
+            c = [0, 0, 0]
+            self._counts[expr] = c
+        if len(self._by_id) > 4 * len(self._counts) + 64:
+            # 旧的表达式对象（被重新优化替换掉的）不再求值：整体丢弃，按需重建
+            self._by_id.clear()
+        self._by_id[id(expr)] = (expr, c)
+        return c
+
+    def bind(self, expr: Expr) -> None:
+        self._slot(expr)
+
+    def record(self, expr: Expr, tri) -> None:
+        c = self._slot(expr)
+        v = getattr(tri, "value", None)
+        if v is True:
+            c[0] += 1
+        elif v is False:
+            c[1] += 1
+        else:
+            c[2] += 1
+
+    def samples(self, expr: Expr) -> int:
+        c = self._counts.get(expr)
+        return int(sum(c)) if c is not None else 0
+
+    def p_true(self, expr: Expr) -> Optional[float]:
+        c = self._counts.get(expr)
+        n = sum(c) if c is not None else 0
+        if n < self._min:
+            return None
+        return c[0] / float(n)
+
+    def p_false(self, expr: Expr) -> Optional[float]:
+        c = self._counts.get(expr)
+        n = sum(c) if c is not None else 0
+        if n < self._min:
+            return None
+        return c[1] / float(n)
+
+    def clear(self) -> None:
+        self._counts.clear()
+        self._by_id.clear()
+
+
+def estimate_cost(expr: Expr) -> int:
+    """
+    表达式的估计代价（最坏情况：所有子项都被求值）。
+    """
+    if isinstance(expr, Const):
+        return COST_CONST
+    if isinstance(expr, SkillMetricGE):
+        return COST_METRIC
+    if isinstance(expr, (PixelMatchPoint, PixelMatchSkill)):
+        return COST_PIXEL_CACHED
+    if isinstance(expr, CastBarChanged):
+        return COST_PIXEL_UNCACHED
+    if isinstance(expr, Not):
+        return estimate_cost(expr.child)
+    if isinstance(expr, (And, Or)):
+        return sum(estimate_cost(c) for c in expr.children)
+    return COST_PIXEL_UNCACHED
+
+
+def optimize_expr(expr: Expr, *, selectivity: Optional[SelectivityStats] = None) -> Expr:
+    """
+    等价变换（Kleene 三值结果不变）：
+
+    - 常量折叠：Not(Const)；And 中的 Const(False) / Or 中的 Const(True) 直接短路成常量，
+      And 中的 Const(True) / Or 中的 Const(False) 删除；删空后 And -> True，Or -> False
+    - 双重否定：Not(Not(x)) -> x（Kleene 下 Unknown 取反两次仍是 Unknown）
+    - 扁平化：And(a, And(b, c)) -> And(a, b, c)（Or 同理）；去掉重复子项（幂等）；单子项直接提升
+    - 按代价排序 And/Or 子项：指标原子（查表）优先，其次可共享缓存的像素原子，再次不可缓存的像素原子；
+      有 selectivity 统计时按 代价 / 短路概率 排序（And 看 False 概率，Or 看 True 概率）
+
+    重排只影响求值顺序与 Unknown/False 的 reason 文本，不影响三值结果。
+    结果不变的子树原样返回（同一对象），重新优化时 SelectivityStats 的登记仍然有效。
+    """
+    if isinstance(expr, Not):
+        c = optimize_expr(expr.child, selectivity=selectivity)
+        if isinstance(c, Const):
+            return Const(not c.value)
+        if isinstance(c, Not):
+            return c.child
+        return expr if c is expr.child else Not(c)
+
+    if isinstance(expr, (And, Or)):
+        is_and = isinstance(expr, And)
+        kind = And if is_and else Or
+        absorb = False if is_and else True   # And 遇 False / Or 遇 True 直接短路
+
+        flat: List[Expr] = []
+        seen = set()
+        for ch in expr.children:
+            c = optimize_expr(ch, selectivity=selectivity)
+            parts: Tuple[Expr, ...] = c.children if isinstance(c, kind) else (c,)
+            for p in parts:
+                if isinstance(p, Const):
+                    if p.value is absorb:
+                        return Const(absorb)
+                    continue
+                if p in seen:
+                    continue
+                seen.add(p)
+                flat.append(p)
+
+        if not flat:
+            return Const(not absorb)
+        if len(flat) == 1:
+            return flat[0]
+        ordered = tuple(_order_children(flat, is_and=is_and, selectivity=selectivity))
+        if selectivity is not None:
+            for c in ordered:
+                selectivity.bind(c)
+        if len(ordered) == len(expr.children) and all(a is b for a, b in zip(ordered, expr.children)):
+            return expr
+        return kind(children=ordered)
+
+    return expr
+
+
+def _order_children(children: List[Expr], *, is_and: bool, selectivity: Optional[SelectivityStats]) -> List[Expr]:
+    def key(c: Expr) -> float:
+        cost = float(max(1, estimate_cost(c)))
+        if selectivity is None:
+            return cost
+        p = selectivity.p_false(c) if is_and else selectivity.p_true(c)
+        if p is None:
+            p = _DEFAULT_P
+        # 永不短路的子项放最后（同代价内保持原顺序）
+        return cost / max(p, 1e-3)
+
+    # sorted 稳定：代价相同的子项保持编辑器里的原顺序
+    return sorted(children, key=key)
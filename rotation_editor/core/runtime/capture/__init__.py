@@ -6,8 +6,11 @@ from .manager import (
     SnapshotOk,
     CaptureUnavailable,
     SnapshotResult,
+    PlanCacheStats,
+    plan_covers,
 )
 from .state_sink import StateStoreCaptureSink
+from .health import CaptureHealth, CaptureHealthSummary, GRAB_MS_BUCKETS
 
 __all__ = [
     "CapturePlanBuilder",
@@ -16,5 +19,10 @@ __all__ = [
     "SnapshotOk",
     "CaptureUnavailable",
     "SnapshotResult",
+    "PlanCacheStats",
+    "plan_covers",
     "StateStoreCaptureSink",
+    "CaptureHealth",
+    "CaptureHealthSummary",
+    "GRAB_MS_BUCKETS",
 ]
\ No newline at end of file
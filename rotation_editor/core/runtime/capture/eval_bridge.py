@@ -1,12 +1,14 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Optional, Any
+from typing import Any, List, Optional, Sequence
 
 from core.profiles import ProfileContext
 
 from rotation_editor.ast import (
+    AtomMemo,
     Expr,
+    SelectivityStats,
     TriBool,
     EvalContext,
     evaluate,
@@ -61,11 +63,13 @@ def ensure_plan_for_probes(
     *,
     capman: CaptureManager,
     probes: ProbeRequirements,
+    keep_if_covered: bool = False,
 ) -> None:
     """
     确保 capture plan 与 probes 匹配（如无变化则不会重建）。
+    keep_if_covered=True：当前 plan 已覆盖 probes 时保持不变。
     """
-    capman.update_plan(probes)
+    capman.update_plan(probes, keep_if_covered=keep_if_covered)
 
 
 def eval_expr_with_capture(
@@ -75,6 +79,10 @@ def eval_expr_with_capture(
     capman: CaptureManager,
     metrics: Optional[MetricProvider] = None,
     baseline: Optional[BaselineProvider] = None,
+    share_memo: bool = True,
+    max_age_ms: Optional[int] = None,
+    newer_than_ms: Optional[int] = None,
+    selectivity: Optional[SelectivityStats] = None,
 ) -> EvalWithCaptureResult:
     """
     组合工具：
@@ -85,39 +93,101 @@ def eval_expr_with_capture(
     关键点：
     - CaptureUnavailable -> 返回 Unknown（tri.value=None），并带 error/detail
     - snapshot=None -> 仍可求值（像素相关原子 Unknown，但 metric 原子可用）
+    - share_memo=True 时使用 CaptureManager 的每帧共享 AtomMemo（跨表达式复用像素原子结果）
+    - max_age_ms / newer_than_ms：本次求值对帧新鲜度的要求（见 CaptureManager.get_snapshot）
+    - selectivity：可选，记录 And/Or 子项结果（供 optimize_expr 按运行期统计重排）
     """
-    snap_res: SnapshotResult = capman.get_snapshot()
+    return eval_exprs_with_capture(
+        [expr],
+        profile=profile,
+        capman=capman,
+        metrics=metrics,
+        baseline=baseline,
+        share_memo=share_memo,
+        max_age_ms=max_age_ms,
+        newer_than_ms=newer_than_ms,
+        selectivity=selectivity,
+    )[0]
+
+
+def eval_exprs_with_capture(
+    exprs: Sequence[Expr],
+    *,
+    profile: ProfileContext,
+    capman: CaptureManager,
+    metrics: Optional[MetricProvider] = None,
+    baseline: Optional[BaselineProvider] = None,
+    share_memo: bool = True,
+    max_age_ms: Optional[int] = None,
+    newer_than_ms: Optional[int] = None,
+    selectivity: Optional[SelectivityStats] = None,
+) -> List[EvalWithCaptureResult]:
+    """
+    批量版本：只取一次 snapshot，所有表达式在同一帧上求值（结果与 exprs 一一对应）。
+    调用方应先用 ensure_plan_for_probes 合并所有表达式的 probes。
+    """
+    snap_res: SnapshotResult = capman.get_snapshot(max_age_ms=max_age_ms, newer_than_ms=newer_than_ms)
 
     if isinstance(snap_res, CaptureUnavailable):
         tri = TriBool.u(f"capture_unavailable:{snap_res.error}")
-        return EvalWithCaptureResult(
+        err = EvalWithCaptureResult(
             tri=tri,
             snapshot_age_ms=0,
             capture_error=snap_res.error,
             capture_detail=snap_res.detail,
         )
+        return [err for _ in exprs]
 
     # SnapshotOk
     snapshot = snap_res.snapshot
     snapshot_age_ms = int(snap_res.snapshot_age_ms)
 
+    memo: Optional[AtomMemo] = None
     if snapshot is None:
         sampler: PixelSampler = NullPixelSampler()  # type: ignore[assignment]
     else:
+        # 同一帧 snapshot 的所有求值共享一张原子表（同一像素原子只采样/比较一次）
+        memo = capman.atom_memo_for(int(getattr(snap_res, "seq", 0) or 0)) if share_memo else None
         # 使用 CaptureManager 内部的 PixelScanner 对 snapshot 进行 sample_rgb
-        sampler = SnapshotPixelSampler(scanner=capman.get_scanner(), snapshot=snapshot)
+        sampler = SnapshotPixelSampler(scanner=capman.get_scanner(), snapshot=snapshot, memo=memo)
 
     ectx = EvalContext(
         profile=profile,
         sampler=sampler,
         metrics=metrics,
         baseline=baseline,
+        memo=memo,
+        selectivity=selectivity,
     )
 
-    tri = evaluate(expr, ectx)
-    return EvalWithCaptureResult(
-        tri=tri,
-        snapshot_age_ms=snapshot_age_ms,
-        capture_error="",
-        capture_detail="",
-    )
\ No newline at end of file
+    return [
+        EvalWithCaptureResult(
+            tri=evaluate(e, ectx),
+            snapshot_age_ms=snapshot_age_ms,
+            capture_error="",
+            capture_detail="",
+        )
+        for e in exprs
+    ]
+
+
+def eval_expr_without_capture(
+    expr: Expr,
+    *,
+    profile: ProfileContext,
+    metrics: Optional[MetricProvider] = None,
+    baseline: Optional[BaselineProvider] = None,
+) -> EvalWithCaptureResult:
+    """
+    不抓屏的预求值：像素原子一律 Unknown，只用指标 / 常量求值。
+
+    Kleene 逻辑下，若此时结果已确定（True/False），则无论像素原子取何值结果都相同；
+    调用方可据此跳过 plan 更新与截屏，只有结果为 Unknown 时才走 eval_expr_with_capture。
+    """
+    ectx = EvalContext(
+        profile=profile,
+        sampler=NullPixelSampler(),  # type: ignore[arg-type]
+        metrics=metrics,
+        baseline=baseline,
+    )
+    return EvalWithCaptureResult(tri=evaluate(expr, ectx))
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+# 抓取耗时直方图的桶上界（ms）；最后一个桶为溢出桶（> 最后一个上界）
+GRAB_MS_BUCKETS: Tuple[int, ...] = (1, 2, 5, 10, 20, 50, 100)
+
+
+def _mono_ms() -> int:
+    return int(time.monotonic() * 1000)
+
+
+@dataclass(frozen=True)
+class CaptureHealthSummary:
+    """
+    一个汇总窗口（上次汇总 -> t_ms）内的 capture 健康状况：
+    - grabs / hits / errors：窗口内实际截屏 / 缓存命中 / 失败次数，及对应速率
+    - age_*：窗口内返回给调用方的 snapshot 年龄
+    - grab_ms_*：窗口内实际截屏耗时；grab_ms_hist 按 GRAB_MS_BUCKETS 分桶（长度 +1）
+    - error_streak：当前连续失败次数（0 表示正常）；max_error_streak：运行以来最长连续失败
+    - total_*：运行以来累计
+    """
+    t_ms: int
+    window_ms: int
+    grabs: int
+    hits: int
+    errors: int
+    grabs_per_s: float
+    hits_per_s: float
+    age_mean_ms: float
+    age_max_ms: int
+    grab_ms_mean: float
+    grab_ms_max: float
+    grab_ms_hist: Tuple[int, ...]
+    error_streak: int
+    max_error_streak: int
+    total_grabs: int
+    total_hits: int
+    total_errors: int
+    last_error: str = ""
+
+    def to_extra(self) -> Dict[str, Any]:
+        return {
+            "window_ms": int(self.window_ms),
+            "grabs": int(self.grabs),
+            "hits": int(self.hits),
+            "errors": int(self.errors),
+            "grabs_per_s": round(float(self.grabs_per_s), 2),
+            "hits_per_s": round(float(self.hits_per_s), 2),
+            "age_mean_ms": round(float(self.age_mean_ms), 2),
+            "age_max_ms": int(self.age_max_ms),
+            "grab_ms_mean": round(float(self.grab_ms_mean), 3),
+            "grab_ms_max": round(float(self.grab_ms_max), 3),
+            "grab_ms_buckets": list(GRAB_MS_BUCKETS),
+            "grab_ms_hist": list(self.grab_ms_hist),
+            "error_streak": int(self.error_streak),
+            "max_error_streak": int(self.max_error_streak),
+            "total_grabs": int(self.total_grabs),
+            "total_hits": int(self.total_hits),
+            "total_errors": int(self.total_errors),
+            "last_error": self.last_error,
+        }
+
+
+class CaptureHealth:
+    """
+    把每次 get_snapshot 的结果折叠成滚动计数器，而不是逐次发事件：
+
+    - record_ok(age, grabbed, grab_ms)：缓存命中（grabbed=False）或实际截屏成功；
+      返回刚结束的连续失败次数（>0 表示发生了 error -> ok 转换，调用方应立即上报“恢复”）
+    - record_error(error)：截屏 / plan 构建失败；返回 True 表示 ok -> error 转换（调用方立即上报）
+    - due_summary(now)：距上次汇总已满 summary_interval_ms 时返回窗口汇总并开启新窗口，否则 None
+    - peek()：当前窗口的汇总（不重置），给 UI 查询
+
+    线程安全（CaptureManager 可能被 UI 线程误用）。
+    """
+
+    def __init__(self, *, summary_interval_ms: int = 1000) -> None:
+        self._interval_ms = int(max(0, summary_interval_ms))
+        self._lock = threading.Lock()
+
+        self._window_start_ms = _mono_ms()
+        self._reset_window_locked()
+
+        self._in_error = False
+        self._error_streak = 0
+        self._max_error_streak = 0
+        self._last_error = ""
+
+        self._total_grabs = 0
+        self._total_hits = 0
+        self._total_errors = 0
+
+    @property
+    def summary_interval_ms(self) -> int:
+        return self._interval_ms
+
+    def _reset_window_locked(self) -> None:
+        self._grabs = 0
+        self._hits = 0
+        self._errors = 0
+        self._age_sum = 0
+        self._age_n = 0
+        self._age_max = 0
+        self._grab_ms_sum = 0.0
+        self._grab_ms_max = 0.0
+        self._hist: List[int] = [0] * (len(GRAB_MS_BUCKETS) + 1)
+
+    def record_ok(self, snapshot_age_ms: int, *, grabbed: bool = False, grab_ms: float = 0.0) -> int:
+        age = int(max(0, snapshot_age_ms))
+        with self._lock:
+            if grabbed:
+                self._grabs += 1
+                self._total_grabs += 1
+                g = float(max(0.0, grab_ms))
+                self._grab_ms_sum += g
+                if g > self._grab_ms_max:
+                    self._grab_ms_max = g
+                i = 0
+                while i < len(GRAB_MS_BUCKETS) and g > GRAB_MS_BUCKETS[i]:
+                    i += 1
+                self._hist[i] += 1
+            else:
+                self._hits += 1
+                self._total_hits += 1
+            self._age_sum += age
+            self._age_n += 1
+            if age > self._age_max:
+                self._age_max = age
+
+            ended = self._error_streak if self._in_error else 0
+            self._in_error = False
+            self._error_streak = 0
+            return int(ended)
+
+    def record_error(self, error: str) -> bool:
+        with self._lock:
+            self._errors += 1
+            self._total_errors += 1
+            self._error_streak += 1
+            if self._error_streak > self._max_error_streak:
+                self._max_error_streak = self._error_streak
+            self._last_error = str(error or "")
+            entered = not self._in_error
+            self._in_error = True
+            return entered
+
+    def error_streak(self) -> int:
+        with self._lock:
+            return int(self._error_streak)
+
+    def due_summary(self, now_ms: Optional[int] = None) -> Optional[CaptureHealthSummary]:
+        now = _mono_ms() if now_ms is None else int(now_ms)
+        with self._lock:
+            if now - self._window_start_ms < self._interval_ms:
+                return None
+            if self._grabs + self._hits + self._errors <= 0:
+                # 空窗口（引擎暂停等）不发汇总，只推进窗口起点
+                self._window_start_ms = now
+                return None
+            out = self._summary_locked(now)
+            self._window_start_ms = now
+            self._reset_window_locked()
+            return out
+
+    def flush(self, now_ms: Optional[int] = None) -> Optional[CaptureHealthSummary]:
+        """
+        立即结束当前窗口（例如引擎停止时）；空窗口返回 None。
+        """
+        now = _mono_ms() if now_ms is None else int(now_ms)
+        with self._lock:
+            if self._grabs + self._hits + self._errors <= 0:
+                return None
+            out = self._summary_locked(now)
+            self._window_start_ms = now
+            self._reset_window_locked()
+            return out
+
+    def peek(self, now_ms: Optional[int] = None) -> CaptureHealthSummary:
+        now = _mono_ms() if now_ms is None else int(now_ms)
+        with self._lock:
+            return self._summary_locked(now)
+
+    def _summary_locked(self, now: int) -> CaptureHealthSummary:
+        win = int(max(1, now - self._window_start_ms))
+        secs = win / 1000.0
+        return CaptureHealthSummary(
+            t_ms=int(now),
+            window_ms=win,
+            grabs=int(self._grabs),
+            hits=int(self._hits),
+            errors=int(self._errors),
+            grabs_per_s=self._grabs / secs,
+            hits_per_s=self._hits / secs,
+            age_mean_ms=(self._age_sum / self._age_n) if self._age_n > 0 else 0.0,
+            age_max_ms=int(self._age_max),
+            grab_ms_mean=(self._grab_ms_sum / self._grabs) if self._grabs > 0 else 0.0,
+            grab_ms_max=float(self._grab_ms_max),
+            grab_ms_hist=tuple(self._hist),
+            error_streak=int(self._error_streak),
+            max_error_streak=int(self._max_error_streak),
+            total_grabs=int(self._total_grabs),
+            total_hits=int(self._total_hits),
+            total_errors=int(self._total_errors),
+            last_error=self._last_error,
+        )
@@ -2,14 +2,16 @@ from __future__ import annotations
 
 import time
 import threading
-from dataclasses import dataclass
+from collections import OrderedDict
+from dataclasses import dataclass, replace
 from typing import Any, Optional, Tuple
 
 from core.profiles import ProfileContext
 from core.pick.capture import ScreenCapture
 from core.pick.scanner import PixelScanner, CapturePlan
+from core.pick.shared_capture import CaptureService
 
-from rotation_editor.ast import ProbeRequirements
+from rotation_editor.ast import AtomMemo, AtomMemoStats, ProbeRequirements
 
 from .plan_builder import CapturePlanBuilder, PlanBuildResult
 
@@ -18,12 +20,66 @@ def _mono_ms() -> int:
     return int(time.monotonic() * 1000)
 
 
+ProbeSig = Tuple[frozenset, frozenset]
+
+
+def _probe_sig(probes: ProbeRequirements) -> ProbeSig:
+    return (frozenset(probes.point_ids or set()), frozenset(probes.skill_pixel_ids or set()))
+
+
+def _sig_covers(outer: Optional[ProbeSig], inner: ProbeSig) -> bool:
+    return outer is not None and inner[0] <= outer[0] and inner[1] <= outer[1]
+
+
+def plan_covers(outer: Optional[CapturePlan], inner: CapturePlan) -> bool:
+    """
+    outer 抓到的帧是否足以服务 inner：inner 的每个显示器在 outer 中都有，且 ROI 被包含。
+    （用于切换 plan 后继续复用同一帧 snapshot。）
+    """
+    if outer is None:
+        return False
+    og = int(getattr(outer, "topology_gen", 0) or 0)
+    ig = int(getattr(inner, "topology_gen", 0) or 0)
+    if og and ig and og != ig:
+        return False
+    for mk, mp in (inner.plans or {}).items():
+        op = (outer.plans or {}).get(mk)
+        if op is None:
+            return False
+        if int(op.roi_left) > int(mp.roi_left) or int(op.roi_top) > int(mp.roi_top):
+            return False
+        if int(op.roi_left) + int(op.roi_width) < int(mp.roi_left) + int(mp.roi_width):
+            return False
+        if int(op.roi_top) + int(op.roi_height) < int(mp.roi_top) + int(mp.roi_height):
+            return False
+    return True
+
+
+@dataclass
+class PlanCacheStats:
+    """
+    plan 缓存统计：
+    - hits: update_plan 命中 LRU，直接复用已构建的 plan
+    - builds: 实际调用 CapturePlanBuilder.build 的次数
+    - evictions: LRU 淘汰次数
+    - pinned_skips: 固定并集 plan 已覆盖 probes 而跳过的次数
+    - snapshot_reuses: 切换 plan 后仍复用旧帧（旧帧 ROI 覆盖新 plan 且未过期）的次数
+    """
+    hits: int = 0
+    builds: int = 0
+    evictions: int = 0
+    pinned_skips: int = 0
+    snapshot_reuses: int = 0
+
+
 @dataclass(frozen=True)
 class SnapshotOk:
     snapshot: Any
     captured_ms: int
     snapshot_age_ms: int
     plan: CapturePlan
+    # 帧序号：每次实际截屏递增（缓存命中时与上次相同）；0 表示空 snapshot
+    seq: int = 0
 
 
 @dataclass(frozen=True)
@@ -42,7 +98,7 @@ class CaptureEventSink:
     可选的事件回调（先留接口，后续接 StateStore/EventBus）：
     """
     def on_plan_updated(self, probes: ProbeRequirements, plan: CapturePlan) -> None: ...
-    def on_capture_ok(self, snapshot_age_ms: int) -> None: ...
+    def on_capture_ok(self, snapshot_age_ms: int, *, grabbed: bool = False, grab_ms: float = 0.0) -> None: ...
     def on_capture_error(self, error: str, detail: str) -> None: ...
 
 
@@ -52,6 +108,15 @@ class CaptureManager:
     - capture plan（由 probes 驱动）
     - snapshot 缓存（减少重复截屏）
     - capture 异常吞并 + backoff（避免引擎崩溃/忙等）
+    - 显示器拓扑变化（plan.topology_gen 过期）时自动按最近一次 probes 重建 plan；
+      截屏失败时标记拓扑待重新枚举
+    - 每帧 snapshot 一个共享的 AtomMemo（atom_memo_for(seq)）：同一帧内所有表达式求值
+      共享像素原子的取样与比较结果，命中统计见 get_atom_memo_stats()
+    - 可选 service（CaptureService）：不再自己抓屏，而是以 consumer_id 订阅共享截屏服务，
+      多个引擎 / 预览共用同一次抓取（plan 变化即重新订阅）
+    - 已构建的 plan 按 probes 签名放进 LRU（plan_cache_size），节点间来回切换不再重复 build；
+      pin_plan(probes) 固定一个并集 plan，被它覆盖的 update_plan 直接忽略
+    - snapshot 复用只看新鲜度：切换 plan 时不丢弃旧帧，只要旧帧的 ROI 覆盖当前 plan 且未超过 TTL 即可复用
 
     线程模型：
     - 预期在引擎线程使用（仍加锁，避免 UI 线程误用导致竞态）。
@@ -68,12 +133,20 @@ class CaptureManager:
         base_backoff_ms: int = 50,
         max_backoff_ms: int = 1000,
         sink: Optional[CaptureEventSink] = None,
+        parallel_grab: bool = False,
+        service: Optional[CaptureService] = None,
+        consumer_id: str = "",
+        plan_cache_size: int = 16,
     ) -> None:
         self._ctx = ctx
         self._cap = capture or ScreenCapture()
-        self._scanner = scanner or PixelScanner(self._cap)
+        # parallel_grab=True：多显示器 plan 时各显示器 ROI 并发抓取（单显示器时与串行一致）；
+        # 默认串行，避免为每个显示器常驻一个抓取线程
+        self._scanner = scanner or PixelScanner(self._cap, parallel=parallel_grab)
         self._builder = plan_builder or CapturePlanBuilder()
         self._sink = sink
+        self._service = service
+        self._consumer_id = (consumer_id or "").strip() or f"capman-{id(self):x}"
 
         self._ttl_ms = int(max(0, snapshot_cache_ttl_ms))
         self._base_backoff_ms = int(max(0, base_backoff_ms))
@@ -82,12 +155,27 @@ class CaptureManager:
         self._lock = threading.Lock()
 
         # plan cache
-        self._last_probes_sig: Optional[Tuple[frozenset[str], frozenset[str]]] = None
+        self._last_probes_sig: Optional[ProbeSig] = None
+        self._last_probes: Optional[ProbeRequirements] = None
         self._plan: CapturePlan = CapturePlan(plans={})
+        self._plan_cache: "OrderedDict[ProbeSig, CapturePlan]" = OrderedDict()
+        self._plan_cache_size = int(max(0, plan_cache_size))
+        self._plan_stats = PlanCacheStats()
 
-        # snapshot cache
+        # 固定并集 plan（pin_plan）
+        self._pinned_sig: Optional[ProbeSig] = None
+        self._pinned_probes: Optional[ProbeRequirements] = None
+
+        # snapshot cache（_snap_plan：抓取该帧时使用的 plan）
         self._last_snapshot: Any = None
+        self._snap_plan: Optional[CapturePlan] = None
         self._last_capture_ms: int = 0
+        self._snap_seq: int = 0
+        self._last_seq: int = 0
+
+        # per-snapshot atom memo
+        self._memo: Optional[AtomMemo] = None
+        self._memo_stats = AtomMemoStats()
 
         # failure backoff
         self._fail_count: int = 0
@@ -102,66 +190,183 @@ class CaptureManager:
         return self._scanner
 
     def invalidate_plan(self) -> None:
+        """
+        points/skills 变化后调用：坐标可能已变，LRU 中的 plan 一并作废。
+        """
         with self._lock:
             self._last_probes_sig = None
+            self._plan_cache.clear()
+            self._snap_plan = None
 
-    def update_plan(self, probes: ProbeRequirements) -> None:
+    def update_plan(self, probes: ProbeRequirements, *, keep_if_covered: bool = False) -> None:
         """
         若 probes 与上次相同则不重建。
+        keep_if_covered=True 时，若当前 plan 已覆盖 probes（子集）也不重建
+        （例如引擎 lookahead 已按多个节点的并集建好 plan，执行器随后的单节点 probes 无需再切换）。
+        已 pin_plan 时：被固定并集覆盖的 probes 一律忽略；未覆盖的并入并集后重建（并集只增不减）。
+        签名在 LRU 中且拓扑未变时直接复用已构建的 plan。
 
         修正点：
         - 当 CapturePlanBuilder.build 抛异常时，不再更新 _last_probes_sig，
           这样同一组 probes 后续仍会尝试重新构建 plan，而不是“永远停留在失败状态”。
         """
-        p_points = frozenset((probes.point_ids or set()))
-        p_skillpix = frozenset((probes.skill_pixel_ids or set()))
-        sig = (p_points, p_skillpix)
+        sig = _probe_sig(probes)
 
         with self._lock:
-            if self._last_probes_sig == sig:
+            if self._pinned_sig is not None:
+                if _sig_covers(self._pinned_sig, sig) and self._last_probes_sig is not None:
+                    self._plan_stats.pinned_skips += 1
+                    return
+                pinned = ProbeRequirements().merge(self._pinned_probes).merge(probes)
+                self._pinned_probes = pinned
+                self._pinned_sig = _probe_sig(pinned)
+                probes, sig = pinned, self._pinned_sig
+
+            cur = self._last_probes_sig
+            if keep_if_covered and _sig_covers(cur, sig):
+                return
+            self._last_probes = probes
+            if cur == sig:
                 return
+            cached = self._plan_cache.get(sig)
 
-        # build outside lock (可能较慢)
-        res: PlanBuildResult
-        try:
-            res = self._builder.build(ctx=self._ctx, probes=probes, capture=self._cap)
-        except Exception as e:
-            # plan 构建失败也不抛；不更新 _last_probes_sig，这样后续仍会尝试重建
+        plan: Optional[CapturePlan] = None
+        if cached is not None and self._plan_topology_current(cached):
+            plan = cached
             with self._lock:
-                self._plan = CapturePlan(plans={})
-                self._last_error = "plan_build_failed"
-                self._last_detail = str(e)
+                self._plan_cache.move_to_end(sig)
+                self._plan_stats.hits += 1
+        else:
+            # build outside lock (可能较慢)
+            res: PlanBuildResult
+            try:
+                res = self._builder.build(ctx=self._ctx, probes=probes, capture=self._cap)
+            except Exception as e:
+                # plan 构建失败也不抛；不更新 _last_probes_sig，这样后续仍会尝试重建
+                with self._lock:
+                    self._plan = CapturePlan(plans={})
+                    self._last_error = "plan_build_failed"
+                    self._last_detail = str(e)
 
-            if self._sink is not None:
-                try:
-                    self._sink.on_capture_error("plan_build_failed", str(e))
-                except Exception:
-                    pass
-            return
+                if self._sink is not None:
+                    try:
+                        self._sink.on_capture_error("plan_build_failed", str(e))
+                    except Exception:
+                        pass
+                return
+            plan = res.plan
+            with self._lock:
+                self._plan_stats.builds += 1
+                if self._plan_cache_size > 0:
+                    self._plan_cache[sig] = plan
+                    self._plan_cache.move_to_end(sig)
+                    while len(self._plan_cache) > self._plan_cache_size:
+                        self._plan_cache.popitem(last=False)
+                        self._plan_stats.evictions += 1
+
+        if self._service is not None:
+            try:
+                self._service.subscribe(self._consumer_id, plan)
+            except Exception as e:
+                with self._lock:
+                    self._last_error = "service_subscribe_failed"
+                    self._last_detail = str(e)
 
         with self._lock:
-            self._plan = res.plan
+            self._plan = plan
             self._last_probes_sig = sig
-
-            # plan 改变时，丢弃旧 snapshot（避免 roi 改变导致坐标不一致）
-            self._last_snapshot = None
-            self._last_capture_ms = 0
+            # 不丢弃旧 snapshot：get_snapshot 会检查旧帧 ROI 是否覆盖新 plan（不覆盖才重抓）
 
         if self._sink is not None:
             try:
-                self._sink.on_plan_updated(probes, res.plan)
+                self._sink.on_plan_updated(probes, plan)
             except Exception:
                 pass
 
+    def pin_plan(self, probes: ProbeRequirements) -> None:
+        """
+        固定一个稳定的并集 plan（例如引擎启动时按整个方案的 probes 构建）：
+        之后被它覆盖的 update_plan 不再切换 plan，snapshot 复用只由 TTL 决定。
+        """
+        with self._lock:
+            self._pinned_probes = ProbeRequirements().merge(probes)
+            self._pinned_sig = _probe_sig(self._pinned_probes)
+            self._last_probes_sig = None
+        self.update_plan(probes)
+
+    def unpin_plan(self) -> None:
+        with self._lock:
+            self._pinned_sig = None
+            self._pinned_probes = None
+
+    def is_plan_pinned(self) -> bool:
+        with self._lock:
+            return self._pinned_sig is not None
+
+    def get_plan_cache_stats(self) -> PlanCacheStats:
+        with self._lock:
+            return replace(self._plan_stats)
+
+    def _plan_topology_current(self, plan: CapturePlan) -> bool:
+        gen = int(getattr(plan, "topology_gen", 0) or 0)
+        if gen <= 0:
+            return True
+        try:
+            return self._cap.topology_generation() == gen
+        except Exception:
+            return False
+
+    def last_probes(self) -> Optional[ProbeRequirements]:
+        """
+        最近一次 update_plan 使用的 probes（遥测按它采样探针值）。
+        """
+        with self._lock:
+            return self._last_probes
+
     def get_plan(self) -> CapturePlan:
         with self._lock:
             return self._plan
 
-    def get_snapshot(self) -> SnapshotResult:
+    def _refresh_plan_if_topology_changed(self, plan: CapturePlan) -> CapturePlan:
+        """
+        plan 绑定的显示器拓扑已过期（热插拔 / 分辨率变化）时，按最近一次 probes 重建。
+        """
+        gen = int(getattr(plan, "topology_gen", 0) or 0)
+        if gen <= 0 or not getattr(plan, "plans", None):
+            return plan
+        try:
+            if self._cap.topology_generation() == gen:
+                return plan
+        except Exception:
+            return plan
+
+        with self._lock:
+            probes = self._pinned_probes if self._pinned_probes is not None else self._last_probes
+            self._last_probes_sig = None
+            # 旧拓扑下构建的 plan 全部作废
+            self._plan_cache.clear()
+        if probes is None:
+            return plan
+        self.update_plan(probes)
+        return self.get_plan()
+
+    def get_snapshot(
+        self,
+        *,
+        max_age_ms: Optional[int] = None,
+        newer_than_ms: Optional[int] = None,
+    ) -> SnapshotResult:
         """
         获取最新 snapshot（带缓存/退避），永不抛异常。
+
+        新鲜度按调用方需求决定（而不是只有一个全局 TTL）：
+        - max_age_ms：可接受的缓存帧最大年龄；None 表示使用 snapshot_cache_ttl_ms
+          （例如 ready 判断可以接受较旧的帧，减少重复截屏）
+        - newer_than_ms：只接受在该时刻（_mono_ms 时钟）之后抓取的帧
+          （例如 start 检测要求“按键之后的帧”，避免用按键前的旧帧得出“未变化”）
         """
         now = _mono_ms()
+        max_age = self._ttl_ms if max_age_ms is None else int(max(0, max_age_ms))
 
         with self._lock:
             # backoff gate
@@ -174,16 +379,27 @@ class CaptureManager:
                 )
 
             plan = self._plan
+
+        plan = self._refresh_plan_if_topology_changed(plan)
+
+        with self._lock:
             last_snap = self._last_snapshot
             last_ms = int(self._last_capture_ms)
+            last_seq = int(self._last_seq)
+            snap_plan = self._snap_plan
+
+        fresh_enough = newer_than_ms is None or last_ms > int(newer_than_ms)
 
-        # cache hit
-        if last_snap is not None and last_ms > 0 and self._ttl_ms > 0:
+        # cache hit：只看新鲜度与覆盖范围（旧帧 ROI 覆盖当前 plan 即可复用）
+        if last_snap is not None and last_ms > 0 and max_age > 0 and fresh_enough:
             age = now - last_ms
-            if age >= 0 and age <= self._ttl_ms:
+            if age >= 0 and age <= max_age and (snap_plan is plan or plan_covers(snap_plan, plan)):
+                if snap_plan is not plan:
+                    with self._lock:
+                        self._plan_stats.snapshot_reuses += 1
                 if self._sink is not None:
                     try:
-                        self._sink.on_capture_ok(int(age))
+                        self._sink.on_capture_ok(int(age), grabbed=False)
                     except Exception:
                         pass
                 return SnapshotOk(
@@ -191,6 +407,7 @@ class CaptureManager:
                     captured_ms=last_ms,
                     snapshot_age_ms=int(age),
                     plan=plan,
+                    seq=last_seq,
                 )
 
         # no probes -> allow returning "empty snapshot"
@@ -203,9 +420,19 @@ class CaptureManager:
             return SnapshotOk(snapshot=None, captured_ms=now, snapshot_age_ms=0, plan=plan)
 
         # capture
+        t0 = time.perf_counter()
         try:
-            snap = self._scanner.capture_with_plan(plan)
+            grab_max_age = max_age
+            if newer_than_ms is not None:
+                grab_max_age = min(grab_max_age, now - int(newer_than_ms))
+            snap, frame_age = self._grab(plan, max_age_ms=grab_max_age)
         except Exception as e:
+            # 显示器可能已变化：下次访问拓扑时重新枚举
+            try:
+                self._cap.invalidate_topology()
+            except Exception:
+                pass
+
             # failure -> backoff
             with self._lock:
                 self._fail_count += 1
@@ -231,26 +458,100 @@ class CaptureManager:
 
         # success
         with self._lock:
+            self._snap_seq += 1
+            seq = self._snap_seq
+            captured = now - int(frame_age)
             self._last_snapshot = snap
-            self._last_capture_ms = now
+            self._snap_plan = plan
+            self._last_capture_ms = captured
+            self._last_seq = seq
             self._fail_count = 0
             self._next_allowed_ms = 0
             self._last_error = ""
             self._last_detail = ""
 
+        grab_ms = (time.perf_counter() - t0) * 1000.0
         if self._sink is not None:
             try:
-                self._sink.on_capture_ok(0)
+                self._sink.on_capture_ok(int(frame_age), grabbed=True, grab_ms=grab_ms)
             except Exception:
                 pass
 
-        return SnapshotOk(snapshot=snap, captured_ms=now, snapshot_age_ms=0, plan=plan)
+        return SnapshotOk(snapshot=snap, captured_ms=captured, snapshot_age_ms=int(frame_age), plan=plan, seq=seq)
+
+    def _grab(self, plan: CapturePlan, *, max_age_ms: int) -> Tuple[Any, int]:
+        """
+        抓取一帧，返回 (snapshot, 帧龄 ms)：
+        - 自己抓：帧龄 0
+        - 共享服务：读服务已发布的并集帧（覆盖本 plan；不比 max_age_ms 旧，必要时触发一次抓取）
+        """
+        if self._service is None:
+            return self._scanner.capture_with_plan(plan), 0
+        # 服务帧龄为浮点，至少给 1ms 余量，否则刚抓到的帧也可能被判为“过旧”
+        fr = self._service.get_frame(self._consumer_id, max_age_ms=max(1, int(max_age_ms)))
+        return fr.snapshot, int(fr.age_ms())
+
+    def peek_snapshot(self) -> Tuple[Any, int]:
+        """
+        返回缓存中的最近一帧及其抓取时刻 (snapshot, captured_ms)，不触发抓取；没有时 snapshot 为 None。
+        """
+        with self._lock:
+            return self._last_snapshot, int(self._last_capture_ms)
+
+    @property
+    def consumer_id(self) -> str:
+        return self._consumer_id
+
+    def atom_memo_for(self, seq: int) -> AtomMemo:
+        """
+        返回帧序号 seq 对应的共享 AtomMemo（帧变化时新建，旧帧的表随之丢弃）。
+        """
+        s = int(seq)
+        with self._lock:
+            m = self._memo
+            if m is None or m.snapshot_id != s:
+                m = AtomMemo(s, stats=self._memo_stats)
+                self._memo = m
+                self._memo_stats.frames += 1
+            return m
+
+    def get_atom_memo_stats(self) -> AtomMemoStats:
+        with self._lock:
+            return replace(self._memo_stats)
+
+    def warmup(self) -> SnapshotResult:
+        """
+        启动预热（在引擎线程上调用）：创建本线程的截屏实例，并按当前 plan 试抓一帧。
+        试抓的帧进入 snapshot 缓存；plan 为空时不创建截屏实例。永不抛异常。
+        """
+        plan = self.get_plan()
+        if getattr(plan, "plans", None) and self._service is None:
+            try:
+                self._cap.warm_current_thread()
+            except Exception:
+                # 交给下面的 get_snapshot 按正常的失败 / 退避路径上报
+                pass
+        return self.get_snapshot(max_age_ms=0)
 
     def close_current_thread(self) -> None:
         """
-        释放 capture 线程资源（对齐你旧引擎 finally 逻辑）。
+        释放 capture 线程资源（对齐你旧引擎 finally 逻辑），并结束并行抓取线程；
+        使用共享服务时退订（下次 update_plan 会重新订阅）。
         """
+        if self._service is not None:
+            try:
+                self._service.unsubscribe(self._consumer_id)
+            except Exception:
+                pass
+            with self._lock:
+                self._last_probes_sig = None
         try:
             self._cap.close_current_thread()
+        except Exception:
+            pass
+        try:
+            close = getattr(self._scanner, "close", None)
+            if callable(close):
+                close()
         except Exception:
             pass
\ No newline at end of file
@@ -58,6 +58,8 @@ class CapturePlanBuilder:
     - 计算包含所有 probe 的最小包围矩形
     - 若 ROI 面积占屏比 < roi_ratio_threshold -> mode="roi"
       否则 mode="full"
+
+    plan 记录构建时的显示器拓扑版本（topology_gen），拓扑变化后由 CaptureManager 重建。
     """
     def __init__(self, *, roi_ratio_threshold: float = 0.4, include_profile_cast_bar: bool = True) -> None:
         self._roi_ratio_threshold = float(roi_ratio_threshold)
@@ -71,6 +73,7 @@ class CapturePlanBuilder:
         capture: Optional[ScreenCapture] = None,
     ) -> PlanBuildResult:
         sc = capture or ScreenCapture()
+        topo = sc.topology()
 
         by_mon: Dict[str, List[ProbeMeta]] = {}
 
@@ -123,7 +126,7 @@ class CapturePlanBuilder:
         plans: Dict[str, MonitorCapturePlan] = {}
 
         for mk, metas in by_mon.items():
-            rect = sc.get_monitor_rect(mk)
+            rect = topo.rect_for(mk)
             W = int(getattr(rect, "width", 0) or 0)
             H = int(getattr(rect, "height", 0) or 0)
             if W <= 0 or H <= 0:
@@ -169,4 +172,7 @@ class CapturePlanBuilder:
                 roi_height=int(roi_h),
             )
 
-        return PlanBuildResult(plan=CapturePlan(plans=plans), probes_by_monitor=by_mon)
\ No newline at end of file
+        return PlanBuildResult(
+            plan=CapturePlan(plans=plans, topology_gen=topo.generation),
+            probes_by_monitor=by_mon,
+        )
\ No newline at end of file
@@ -8,6 +8,7 @@ from rotation_editor.ast import ProbeRequirements
 
 from rotation_editor.core.runtime.state.store import StateStore
 from rotation_editor.core.runtime.capture.manager import CaptureEventSink
+from rotation_editor.core.runtime.capture.health import CaptureHealth
 
 
 @dataclass
@@ -15,10 +16,17 @@ class StateStoreCaptureSink(CaptureEventSink):
     """
     CaptureManager -> StateStore 的事件适配器：
     - plan 更新：记录 CAPTURE_PLAN_UPDATED
-    - capture ok：记录 CAPTURE_OK（带 snapshot_age_ms）
-    - capture error：记录 CAPTURE_ERROR（带 error/detail）
+    - capture ok / error：折叠进 CaptureHealth 滚动计数器，不再逐次发事件；
+      每 summary_interval_ms 发一条 CAPTURE_SUMMARY（速率 / snapshot 年龄 / 抓取耗时直方图 / 连续失败）
+    - 状态转换立即上报：ok -> error 记录 CAPTURE_ERROR（带 error/detail），error -> ok 记录 CAPTURE_RECOVERED
     """
     store: StateStore
+    summary_interval_ms: int = 1000
+    health: Optional[CaptureHealth] = None
+
+    def __post_init__(self) -> None:
+        if self.health is None:
+            self.health = CaptureHealth(summary_interval_ms=self.summary_interval_ms)
 
     def on_plan_updated(self, probes: ProbeRequirements, plan: CapturePlan) -> None:
         extra: Dict[str, Any] = {
@@ -29,8 +37,26 @@ class StateStoreCaptureSink(CaptureEventSink):
         }
         self.store.capture_plan_updated(message="capture_plan_updated", extra=extra)
 
-    def on_capture_ok(self, snapshot_age_ms: int) -> None:
-        self.store.capture_ok(int(snapshot_age_ms))
+    def on_capture_ok(self, snapshot_age_ms: int, *, grabbed: bool = False, grab_ms: float = 0.0) -> None:
+        ended = self.health.record_ok(int(snapshot_age_ms), grabbed=grabbed, grab_ms=grab_ms)
+        if ended > 0:
+            self.store.capture_recovered(error_streak=ended)
+        self._maybe_summary()
 
     def on_capture_error(self, error: str, detail: str) -> None:
-        self.store.capture_error(error=str(error or "capture_error"), detail=str(detail or ""))
\ No newline at end of file
+        if self.health.record_error(str(error or "capture_error")):
+            self.store.capture_error(error=str(error or "capture_error"), detail=str(detail or ""))
+        self._maybe_summary()
+
+    def flush(self) -> None:
+        """
+        立即发出当前窗口的汇总（引擎停止时调用，避免丢掉最后不足一个周期的统计）。
+        """
+        s = self.health.flush()
+        if s is not None:
+            self.store.capture_summary(s.to_extra())
+
+    def _maybe_summary(self) -> None:
+        s = self.health.due_summary()
+        if s is not None:
+            self.store.capture_summary(s.to_extra())
\ No newline at end of file
@@ -1,22 +1,41 @@
 from __future__ import annotations
 
+import copy
+import logging
 import threading
-from dataclasses import dataclass
-from typing import Callable, Optional, Protocol, Any, Dict
+import time
+from dataclasses import dataclass, replace
+from typing import Callable, Iterator, Optional, Protocol, Any, Dict, List, Sequence, Tuple
 
 from core.profiles import ProfileContext
+from core.pick.capture import SampleSpec
+from core.pick.scanner import PixelProbe, PixelScanner
+from core.pick.shared_capture import CaptureService
 
 from rotation_editor.core.models import RotationPreset, SkillNode, GatewayNode, Condition
 from rotation_editor.core.runtime.keyboard import KeySender, PynputKeySender
 
-from rotation_editor.core.runtime.state import StateStore
-from rotation_editor.core.runtime.capture import CaptureManager, StateStoreCaptureSink
-from rotation_editor.core.runtime.executor.skill_attempt import SkillAttemptExecutor, SkillAttemptConfig
+from rotation_editor.core.runtime.state import StateStore, TelemetryRecorder
+from rotation_editor.core.runtime.capture import CaptureManager, PlanCacheStats, SnapshotOk, StateStoreCaptureSink
+from rotation_editor.core.runtime.executor.skill_attempt import SkillAttemptExecutor, SkillAttemptConfig, PendingAttempt, AttemptStep
+from rotation_editor.core.runtime.executor.cast_lock import CastLock, CastLockStats, LockTicket, PRIORITY_GLOBAL, PRIORITY_MODE
 
 from rotation_editor.ast.codec import decode_expr
-from rotation_editor.ast import collect_probes_from_expr
+from rotation_editor.ast import (
+    Expr,
+    ProbeRequirements,
+    SelectivityStats,
+    TriBool,
+    collect_probes_from_expr,
+    optimize_expr,
+)
 from rotation_editor.ast.nodes import And, Or, Not, Const, SkillMetricGE
-from rotation_editor.core.runtime.capture.eval_bridge import eval_expr_with_capture, ensure_plan_for_probes
+from rotation_editor.core.runtime.capture.eval_bridge import (
+    eval_expr_with_capture,
+    eval_exprs_with_capture,
+    eval_expr_without_capture,
+    ensure_plan_for_probes,
+)
 
 from rotation_editor.core.services.validation_service import ValidationService
 
@@ -28,9 +47,12 @@ from .runtime_state import (
     GlobalRuntimeState,
     ModeRuntimeState,
 )
-from .scheduler import Scheduler
+from .scheduler import Scheduler, ScheduleItem
+from .lookahead import LookaheadConfig, ReadinessPrefetcher, TrackLookahead
 from .executor.types import ExecutionResult
 
+log = logging.getLogger(__name__)
+
 
 class SchedulerLike(Protocol):
     def call_soon(self, fn: Callable[[], None]) -> None: ...
@@ -51,12 +73,70 @@ class ExecutionCursor:
     node_index: int
 
 
+@dataclass
+class _GatewayExpr:
+    """
+    网关条件的编译缓存：src 为原始 AST JSON（变化即重新编译），
+    base 为静态优化后的树，expr 为按运行期选择性统计重排后的当前版本。
+    """
+    src: Dict[str, Any]
+    base: Expr
+    expr: Expr
+    probes: ProbeRequirements
+    evals: int = 0
+
+
+@dataclass
+class _TrackAttempt:
+    """
+    某条轨道上进行中的非阻塞施法尝试：
+    - rt：发起时的轨道运行时对象（模式切换后对象被替换 -> 尝试作废）
+    - node_index：发起时的节点位置（完成时 cursor 已被网关跳走则不再推进）
+    """
+    pending: PendingAttempt
+    wake_ms: int
+    rt: Any
+    node_index: int
+
+
 @dataclass
 class EngineConfig:
     poll_interval_ms: int = 20
     stop_on_error: bool = True
     gateway_poll_delay_ms: int = 10
 
+    # 跨轨道就绪预取：同一帧上批量判断各到期轨道接下来几个技能节点的 ready
+    lookahead: LookaheadConfig = LookaheadConfig()
+
+    # capture plan 模式：
+    # - "node"：按当前节点的 probes 切换 plan（已构建的 plan 走 LRU 复用）
+    # - "preset_union"：启动时按整个方案所有节点 / 条件的 probes 并集固定一个 plan，运行中不再切换
+    capture_plan_mode: str = "node"
+
+    # capture 健康汇总（CAPTURE_SUMMARY）的发布周期
+    capture_summary_interval_ms: int = 1000
+
+    # 多显示器 plan 时各显示器 ROI 并发抓取（每个显示器一个常驻抓取线程）；
+    # 使用共享截屏服务时由服务自身的设置决定
+    parallel_grab: bool = False
+
+    # 网关条件：每求值多少次按运行期选择性统计重新排序一次 And/Or 子项（0 表示只做静态优化）
+    gateway_reoptimize_every: int = 64
+
+    # 非阻塞施法尝试：按键后等待开始 / 完成信号期间不占住引擎线程，
+    # 由调度器在下一次检测时刻唤醒继续推进，其它轨道（网关等）可在读条期间穿插执行。
+    # False 时保持旧行为：整个尝试在引擎线程上阻塞执行完毕。
+    nonblocking_attempts: bool = True
+
+    # 启动预热：在引擎线程上、第一次调度之前完成 capture plan、截屏实例 + 试抓一帧、
+    # 表达式编译、发键器预解析，让“启动 -> 第一次按键”的耗时稳定（见 StateStore 的 time_to_first_key_ms）。
+    # False 时只构建 capture plan，其余在首次使用时惰性完成。
+    warm_start: bool = True
+
+    # 运行遥测：非空时每次运行开始启动 TelemetryRecorder 写入该路径（已存在则顺延编号），
+    # 运行结束时 flush 并停止。构造时显式传入 recorder 则以传入的为准。
+    telemetry_path: str = ""
+
 
 class MacroEngineNew:
     def __init__(
@@ -69,6 +149,8 @@ class MacroEngineNew:
         key_sender: Optional[KeySender] = None,
         config: Optional[EngineConfig] = None,
         attempt_cfg: Optional[SkillAttemptConfig] = None,
+        capture_service: Optional[CaptureService] = None,
+        recorder: Optional[TelemetryRecorder] = None,
     ) -> None:
         self._ctx = ctx
         self._sch = scheduler
@@ -85,8 +167,19 @@ class MacroEngineNew:
 
         self._thread: Optional[threading.Thread] = None
 
-        self._cast_lock = threading.Lock()
-        self._capman = CaptureManager(ctx=self._ctx, sink=StateStoreCaptureSink(store=self._store))
+        self._cast_lock = CastLock()
+        # capture_service 非空时，多个引擎实例共用同一个截屏服务（每个引擎一个 consumer）
+        self._capture_sink = StateStoreCaptureSink(
+            store=self._store,
+            summary_interval_ms=self._cfg.capture_summary_interval_ms,
+        )
+        self._capman = CaptureManager(
+            ctx=self._ctx,
+            sink=self._capture_sink,
+            service=capture_service,
+            consumer_id=f"engine-{id(self):x}",
+            parallel_grab=self._cfg.parallel_grab,
+        )
         self._attempt_exec = SkillAttemptExecutor(
             ctx=self._ctx,
             store=self._store,
@@ -98,6 +191,13 @@ class MacroEngineNew:
         )
 
         self._scheduler = Scheduler()
+        self._lookahead = ReadinessPrefetcher(
+            cfg=self._cfg.lookahead,
+            ready_expr_for=self._attempt_exec.ready_expr_for,
+            evaluate_batch=self._eval_ready_batch,
+            node_probes=self._skill_node_probes,
+            predict_ready_ms=self._predict_ready_ms,
+        )
 
         self._global_rt: Optional[GlobalRuntimeState] = None
         self._active_mode_id: Optional[str] = None
@@ -105,6 +205,22 @@ class MacroEngineNew:
 
         self._validator = ValidationService()
 
+        # 网关条件编译缓存 + 选择性统计（仅引擎线程访问）
+        self._gw_exprs: Dict[Tuple[str, str], _GatewayExpr] = {}
+        self._gw_selectivity = SelectivityStats()
+
+        # 进行中的非阻塞施法尝试 (scope, track_id) -> _TrackAttempt；
+        # 以及因锁忙在 CastLock 上排队而 HOLD 的轨道 -> (排队时的节点位置, 排队凭证)（轮到它时立即唤醒；
+        # cursor 离开该节点后凭证作废）。仅引擎线程访问
+        self._attempts: Dict[Tuple[str, str], _TrackAttempt] = {}
+        self._lock_waiters: Dict[Tuple[str, str], Tuple[int, LockTicket]] = {}
+
+        # 可选遥测：每次运行期间订阅 StateStore 事件总线，并按 probe_interval_ms 记录探针像素值
+        if recorder is None and (self._cfg.telemetry_path or "").strip():
+            recorder = TelemetryRecorder(self._cfg.telemetry_path.strip())
+        self._recorder = recorder
+        self._last_probe_rec_ms = 0
+
     @property
     def store(self) -> StateStore:
         return self._store
@@ -116,6 +232,7 @@ class MacroEngineNew:
     def start(self, preset: RotationPreset) -> None:
         if self.is_running():
             return
+        requested_ms = self._now()
 
         report = self._validator.validate_preset(preset, ctx=self._ctx)
         if report.has_errors():
@@ -123,18 +240,18 @@ class MacroEngineNew:
             self._sch.call_soon(lambda d=detail: self._cb.on_error("循环方案校验失败，已拒绝启动", d))
             return
 
-        # 预热 capture plan（减少启动后第一帧延迟；并让 capture 错误尽早出现在事件流）
-        try:
-            ensure_plan_for_probes(capman=self._capman, probes=report.probes)
-        except Exception:
-            pass
-
         self._stop_evt.clear()
         self._paused = False
         self._step_once = False
         self._stop_reason = "finished"
 
-        self._thread = threading.Thread(target=self._run_loop, args=(preset,), daemon=True)
+        # capture plan 等预热在引擎线程上做（_warm_start），不阻塞调用方（UI / 热键线程）
+        self._thread = threading.Thread(
+            target=self._run_loop,
+            args=(preset,),
+            kwargs={"probes": report.probes, "requested_ms": requested_ms},
+            daemon=True,
+        )
         self._thread.start()
 
     def stop(self, reason: str = "user_stop") -> None:
@@ -143,6 +260,8 @@ class MacroEngineNew:
         self._stop_reason = reason
         self._store.engine_stopping(reason)
         self._stop_evt.set()
+        # 唤醒正在排队等施法锁的执行器，让其立即看到 stop
+        self._cast_lock.interrupt()
         th = self._thread
         if th is not None:
             try:
@@ -183,6 +302,11 @@ class MacroEngineNew:
         self._sch.call_soon(lambda: self._cb.on_error(msg, detail))
 
     def _emit_node(self, cursor: ExecutionCursor, node: Any) -> None:
+        # 节点进度只需最新一条：支持 call_coalesced 的调度器（QtDispatcher）按引擎合并，避免 UI 队列堆积
+        co = getattr(self._sch, "call_coalesced", None)
+        if co is not None:
+            co(("engine_node", id(self)), lambda: self._cb.on_node_executed(cursor, node))
+            return
         self._sch.call_soon(lambda: self._cb.on_node_executed(cursor, node))
 
     def _now(self) -> int:
@@ -261,24 +385,155 @@ class MacroEngineNew:
         if not isinstance(expr_json, dict) or not expr_json:
             return False
 
-        expr, _diags = decode_expr(expr_json, path="$")
-        if expr is None:
+        ge = self._gateway_expr((getattr(gw, "id", "") or "", cid), expr_json)
+        if ge is None:
             return False
 
-        probes = collect_probes_from_expr(expr)
-        ensure_plan_for_probes(capman=self._capman, probes=probes)
+        # 先只用指标 / 常量求值：结果已确定时（Kleene），像素原子取何值都不影响，跳过 plan 更新与截屏
+        pre = eval_expr_without_capture(ge.expr, profile=self._ctx, metrics=self._store, baseline=None)
+        if pre.tri.value is not None:
+            return pre.tri.value is True
 
-        out = eval_expr_with_capture(expr, profile=self._ctx, capman=self._capman, metrics=self._store, baseline=None)
+        ensure_plan_for_probes(capman=self._capman, probes=ge.probes)
+
+        out = eval_expr_with_capture(
+            ge.expr,
+            profile=self._ctx,
+            capman=self._capman,
+            metrics=self._store,
+            baseline=None,
+            selectivity=self._gw_selectivity,
+        )
         return out.tri.value is True
 
+    def _gateway_expr(self, key: Tuple[str, str], expr_json: Dict[str, Any]) -> Optional[_GatewayExpr]:
+        """
+        取网关条件的优化后 Expr（解码 + 常量折叠 / 扁平化 / 按代价排序只在 JSON 变化时做一次）；
+        每 gateway_reoptimize_every 次求值按选择性统计重新排序。
+        """
+        ge = self._compile_gateway_expr(key, expr_json)
+        if ge is None:
+            return None
+
+        ge.evals += 1
+        every = int(self._cfg.gateway_reoptimize_every or 0)
+        if every > 0 and ge.evals % every == 0:
+            try:
+                ge.expr = optimize_expr(ge.base, selectivity=self._gw_selectivity)
+            except Exception:
+                log.exception("gateway expr reoptimize failed")
+        return ge
+
+    def _compile_gateway_expr(self, key: Tuple[str, str], expr_json: Dict[str, Any]) -> Optional[_GatewayExpr]:
+        ge = self._gw_exprs.get(key)
+        if ge is None or ge.src != expr_json:
+            expr, _diags = decode_expr(expr_json, path="$")
+            if expr is None:
+                self._gw_exprs.pop(key, None)
+                return None
+            base = optimize_expr(expr)
+            ge = _GatewayExpr(src=copy.deepcopy(expr_json), base=base, expr=base, probes=collect_probes_from_expr(base))
+            self._gw_exprs[key] = ge
+        return ge
+
+    # ---------------- Warm start ----------------
+
+    def _warm_start(self, preset: RotationPreset, probes: Optional[ProbeRequirements]) -> None:
+        """
+        第一次调度之前的预热（引擎线程）：
+        - capture plan：preset_union 模式固定并集 plan，否则按校验报告的 probes 构建
+        - compile：所有技能节点的 start / complete 表达式与网关条件解码 + 优化进缓存
+        - keys：发键器预解析方案用到的触发键
+        - capture：创建本线程的截屏实例并按当前 plan 试抓一帧（帧进入缓存，首个 tick 可直接复用）
+        各步骤耗时与结果写入 ENGINE_WARMED 事件；任何一步失败只记日志，不阻止启动。
+        """
+        t_begin = time.perf_counter()
+        info: Dict[str, Any] = {}
+
+        def lap(name: str, t0: float) -> float:
+            t1 = time.perf_counter()
+            info[f"{name}_ms"] = round((t1 - t0) * 1000.0, 2)
+            return t1
+
+        base = probes or ProbeRequirements()
+        t = time.perf_counter()
+        try:
+            if (self._cfg.capture_plan_mode or "").strip().lower() == "preset_union":
+                self._capman.pin_plan(self._preset_probes(preset, base))
+            else:
+                self._capman.unpin_plan()
+                ensure_plan_for_probes(capman=self._capman, probes=base)
+        except Exception:
+            log.exception("capture plan warmup failed")
+        t = lap("plan", t)
+
+        if not self._cfg.warm_start:
+            # 不预编译也要丢弃上一次运行（可能是另一个方案）的节点表达式缓存
+            self._attempt_exec.clear_node_exprs()
+            self._store.engine_warmed(int((time.perf_counter() - t_begin) * 1000.0), extra=info)
+            return
+
+        skill_nodes: List[SkillNode] = []
+        n_gateways = 0
+        try:
+            for n in self._preset_nodes(preset):
+                if isinstance(n, SkillNode):
+                    skill_nodes.append(n)
+                elif isinstance(n, GatewayNode):
+                    expr_json = self._load_gateway_condition_expr(preset, n)
+                    if isinstance(expr_json, dict) and expr_json:
+                        key = (getattr(n, "id", "") or "", (getattr(n, "condition_id", "") or "").strip())
+                        if self._compile_gateway_expr(key, expr_json) is not None:
+                            n_gateways += 1
+            info["node_exprs"] = self._attempt_exec.precompile_nodes(skill_nodes)
+            info["gateway_exprs"] = n_gateways
+        except Exception:
+            log.exception("expr precompile failed")
+        t = lap("compile", t)
+
+        try:
+            bad = self._attempt_exec.prepare_keys((n.skill_id or "").strip() for n in skill_nodes)
+            if bad:
+                info["unsupported_keys"] = list(bad)
+        except Exception:
+            log.exception("key sender warmup failed")
+        t = lap("keys", t)
+
+        snap = self._capman.warmup()
+        info["capture_ok"] = isinstance(snap, SnapshotOk)
+        lap("capture", t)
+
+        warmup_ms = int((time.perf_counter() - t_begin) * 1000.0)
+        log.info("engine warm start: %d ms %s", warmup_ms, info)
+        self._store.engine_warmed(warmup_ms, extra=info)
+
+    @staticmethod
+    def _preset_nodes(preset: RotationPreset) -> Iterator[Any]:
+        tracks = list(preset.global_tracks or [])
+        for m in (preset.modes or []):
+            tracks.extend(m.tracks or [])
+        for t in tracks:
+            yield from (t.nodes or [])
+
     # ---------------- Engine loop ----------------
 
-    def _run_loop(self, preset: RotationPreset) -> None:
+    def _run_loop(
+        self,
+        preset: RotationPreset,
+        *,
+        probes: Optional[ProbeRequirements] = None,
+        requested_ms: Optional[int] = None,
+    ) -> None:
         preset_id = (preset.id or "").strip()
-        self._store.engine_started(preset_id)
+        self._start_telemetry()
+        self._store.engine_started(preset_id, requested_ms=requested_ms)
         self._emit_started(preset_id)
 
         try:
+            self._warm_start(preset, probes)
+            if self._stop_evt.is_set():
+                return
+
             now = self._now()
             self._apply_entry(preset, now_ms=now)
 
@@ -298,11 +553,21 @@ class MacroEngineNew:
 
             while not self._stop_evt.is_set():
                 if self._paused and not self._step_once:
+                    # 暂停只是不再发起新节点；已按键的尝试继续推进到结束（释放施法锁）
+                    self._drive_attempts(self._now())
                     self._stop_evt.wait(self._cfg.poll_interval_ms / 1000.0)
                     continue
 
                 now = self._now()
 
+                if self._attempts:
+                    self._drive_attempts(now)
+                    if self._stop_evt.is_set():
+                        break
+
+                if self._recorder is not None:
+                    self._maybe_record_probes(now)
+
                 if getattr(preset, "max_run_seconds", 0) > 0:
                     if now - start_ms >= int(preset.max_run_seconds) * 1000:
                         self._stop_reason = "max_run_seconds"
@@ -314,9 +579,13 @@ class MacroEngineNew:
                     self._stop_evt.set()
                     break
 
-                item = self._scheduler.choose_next(now_ms=now, global_rt=global_rt, mode_rt=self._mode_rt)
+                item, skipped = self._choose_with_lookahead(preset_id=preset_id, now_ms=now)
+                exec_nodes += skipped
                 if item is None:
                     wake = self._scheduler.next_wakeup_ms(global_rt=global_rt, mode_rt=self._mode_rt)
+                    if self._attempts:
+                        aw = min(a.wake_ms for a in self._attempts.values())
+                        wake = aw if wake is None else min(wake, aw)
                     if wake is None:
                         break
                     if now < wake:
@@ -374,15 +643,240 @@ class MacroEngineNew:
                 self._stop_reason = "error"
                 self._stop_evt.set()
         finally:
+            self._abort_attempts("stopped")
             try:
                 self._capman.close_current_thread()
             except Exception:
                 pass
+            try:
+                self._capture_sink.flush()
+            except Exception:
+                pass
 
             reason = self._stop_reason or "finished"
             self._store.engine_stopped(reason)
+            self._stop_telemetry()
             self._emit_stopped(reason)
 
+    # ---------------- Telemetry ----------------
+
+    def _start_telemetry(self) -> None:
+        rec = self._recorder
+        if rec is None:
+            return
+        try:
+            rec.attach(self._store.bus)
+            rec.start()
+        except Exception:
+            log.exception("TelemetryRecorder.start failed")
+            rec.detach()
+        self._last_probe_rec_ms = 0
+
+    def _stop_telemetry(self) -> None:
+        """
+        运行结束：写出环形缓冲中剩余的事件 / 探针，停止后台线程并关闭文件。
+        """
+        rec = self._recorder
+        if rec is None:
+            return
+        try:
+            rec.flush()
+        except Exception:
+            log.exception("TelemetryRecorder.flush failed")
+        try:
+            rec.stop()
+        except Exception:
+            log.exception("TelemetryRecorder.stop failed")
+
+    def _maybe_record_probes(self, now_ms: int) -> None:
+        """
+        每 probe_interval_ms 把缓存中最近一帧（不额外抓屏）交给遥测记录器；
+        探针取样在记录器的后台写线程上进行，引擎线程只做一次入队。
+        """
+        rec = self._recorder
+        if rec is None or now_ms - self._last_probe_rec_ms < rec.probe_interval_ms:
+            return
+        self._last_probe_rec_ms = now_ms
+
+        probes = self._capman.last_probes()
+        if probes is None:
+            return
+        snap, captured_ms = self._capman.peek_snapshot()
+        if snap is None or captured_ms <= 0:
+            return
+
+        points = getattr(self._ctx.points, "points", []) or []
+        skills = getattr(self._ctx.skills, "skills", []) or []
+        point_ids = sorted(probes.point_ids or ())
+        skill_ids = sorted(probes.skill_pixel_ids or ())
+
+        def sample() -> List[Tuple[str, Optional[Tuple[int, int, int]]]]:
+            targets = []
+            by_pid = {p.id: p for p in points if getattr(p, "id", "")}
+            for pid in point_ids:
+                p = by_pid.get(pid)
+                if p is not None:
+                    targets.append((f"point:{pid}", p))
+            by_sid = {s.id: s for s in skills if getattr(s, "id", "")}
+            for sid in skill_ids:
+                s = by_sid.get(sid)
+                if s is not None and getattr(s, "pixel", None) is not None:
+                    targets.append((f"skill:{sid}", s.pixel))
+
+            out = []
+            for key, src in targets:
+                try:
+                    sm = getattr(src, "sample", None)
+                    probe = PixelProbe(
+                        monitor=(getattr(src, "monitor", None) or "primary"),
+                        vx=int(getattr(src, "vx", 0)),
+                        vy=int(getattr(src, "vy", 0)),
+                        sample=SampleSpec(mode=getattr(sm, "mode", "single"), radius=int(getattr(sm, "radius", 0) or 0)),
+                    )
+                    rgb = PixelScanner.sample_rgb_in_frame(snap, probe)
+                except Exception:
+                    rgb = None
+                out.append((key, rgb))
+            return out
+
+        rec.record_probe_batch(now_ms, sample)
+
+    # ---------------- Lookahead ----------------
+
+    def _skill_node_probes(self, node: SkillNode) -> ProbeRequirements:
+        return self._attempt_exec.node_probes(
+            skill_id=(node.skill_id or "").strip(),
+            node_id=(node.id or "").strip(),
+            node_start_expr_json=getattr(node, "start_expr", None),
+            node_complete_expr_json=getattr(node, "complete_expr", None),
+        )
+
+    def _preset_probes(self, preset: RotationPreset, base: ProbeRequirements) -> ProbeRequirements:
+        """
+        整个方案的 probes 并集：校验报告里的条件 / 节点表达式 + 每个技能节点的默认 ready / start / complete。
+        """
+        out = ProbeRequirements().merge(base)
+        for n in self._preset_nodes(preset):
+            if isinstance(n, SkillNode):
+                try:
+                    out.merge(self._skill_node_probes(n))
+                except Exception:
+                    pass
+        return out
+
+    def _eval_ready_batch(self, exprs: Sequence[Expr], probes: ProbeRequirements) -> List[TriBool]:
+        ensure_plan_for_probes(capman=self._capman, probes=probes)
+        outs = eval_exprs_with_capture(
+            exprs,
+            profile=self._ctx,
+            capman=self._capman,
+            metrics=self._store,
+            max_age_ms=self._attempt_exec.ready_snapshot_max_age_ms,
+        )
+        return [o.tri for o in outs]
+
+    def _predict_ready_ms(self, skill_id: str) -> Optional[int]:
+        """
+        按 cast.cooldown_ms + 最近一次开始施法时刻预测技能何时就绪（未配置冷却则无法预测）。
+        """
+        skills = getattr(self._ctx.skills, "skills", []) or []
+        skill = next((s for s in skills if (getattr(s, "id", "") or "") == skill_id), None)
+        if skill is None:
+            return None
+        try:
+            cd = int(getattr(getattr(skill, "cast", None), "cooldown_ms", 0) or 0)
+        except Exception:
+            cd = 0
+        if cd <= 0:
+            return None
+        last = self._store.get_last_cast_ms(skill_id)
+        if last is None:
+            return None
+        return int(last) + cd
+
+    def _choose_with_lookahead(self, *, preset_id: str, now_ms: int) -> Tuple[Optional[ScheduleItem], int]:
+        """
+        选择下一条要执行的轨道：
+
+        - lookahead 关闭：与 Scheduler.choose_next 相同
+        - 开启：对所有到期轨道做一次批量就绪预取
+            * 第一条有可执行节点的轨道：跳过其前面的未就绪节点后返回
+            * 窗口内都未就绪的轨道：整体跳过，并睡到预测就绪时刻（或 poll_not_ready_ms）
+            * 其它有可执行节点的轨道保持不动，留给下一轮
+
+        返回 (item, 本次跳过的节点数)。
+        """
+        global_rt = self._global_rt
+        if global_rt is None:
+            return None, 0
+
+        if not self._lookahead.config.enabled:
+            if self._attempts:
+                items = self._scheduler.due_items(now_ms=now_ms, global_rt=global_rt, mode_rt=self._mode_rt)
+                return next((it for it in items if (it.scope, it.track_id) not in self._attempts), None), 0
+            return self._scheduler.choose_next(now_ms=now_ms, global_rt=global_rt, mode_rt=self._mode_rt), 0
+
+        items = self._scheduler.due_items(now_ms=now_ms, global_rt=global_rt, mode_rt=self._mode_rt)
+        if self._attempts:
+            items = [it for it in items if (it.scope, it.track_id) not in self._attempts]
+        if not items:
+            return None, 0
+
+        try:
+            looks = self._lookahead.prefetch(items, global_rt=global_rt, mode_rt=self._mode_rt, now_ms=now_ms)
+        except Exception:
+            log.exception("readiness lookahead failed")
+            return items[0], 0
+
+        chosen: Optional[ScheduleItem] = None
+        skipped = 0
+        for look in looks:
+            if look.runnable:
+                if chosen is None:
+                    skipped += self._apply_lookahead_skips(preset_id=preset_id, look=look)
+                    chosen = look.item
+                continue
+
+            skipped += self._apply_lookahead_skips(preset_id=preset_id, look=look)
+            delay = self._lookahead.idle_delay_ms(look, now_ms=now_ms, poll_not_ready_ms=self._attempt_exec.poll_not_ready_ms)
+            self._set_next_time(scope=look.item.scope, track_id=look.item.track_id, next_time_ms=now_ms + delay)
+
+        return chosen, skipped
+
+    def _apply_lookahead_skips(self, *, preset_id: str, look: TrackLookahead) -> int:
+        """
+        把预取判定为未就绪的节点按 SKIPPED_NOT_READY 处理（记录到 StateStore 并推进轨道），
+        与执行器逐个跳过的效果相同，只是不再为每个节点等待 poll_not_ready_ms。
+        """
+        scope = look.item.scope
+        tid = look.item.track_id
+        n = 0
+        for idx, node, reason in look.skip:
+            if scope == "global":
+                rt = self._global_rt.get(tid) if self._global_rt is not None else None
+                if rt is None or rt.current_node_index() != idx:
+                    break
+                mode_id = None
+            else:
+                rt = self._mode_rt.tracks.get(tid) if self._mode_rt is not None else None
+                if rt is None or rt.current_node_index() != idx:
+                    break
+                mode_id = self._mode_rt.mode_id
+
+            self._cancel_lock_wait((scope, tid))
+            sid = (node.skill_id or "").strip()
+            nid = (node.id or "").strip()
+            self._store.mark_node_exec(sid, node_id=nid)
+            self._store.mark_ready_false(sid, node_id=nid, reason=reason)
+
+            rt.advance()
+            if scope != "global" and self._mode_rt is not None:
+                self._mode_rt.ensure_step_runnable()
+
+            self._emit_node(ExecutionCursor(preset_id=preset_id, mode_id=mode_id, track_id=tid, node_index=idx), node)
+            n += 1
+        return n
+
     # ---------------- Execute one node ----------------
 
     def _exec_one_node(
@@ -396,16 +890,22 @@ class MacroEngineNew:
         now_ms: int,
     ) -> None:
         if isinstance(node, SkillNode):
-            res: ExecutionResult = self._attempt_exec.exec_skill_node(
+            self._run_skill_attempt(
+                scope=scope,
+                track_id=track_id,
+                node_index=node_index,
+                now_ms=now_ms,
                 skill_id=(node.skill_id or "").strip(),
                 node_id=(node.id or "").strip(),
                 override_cast_ms=node.override_cast_ms,
                 node_start_expr_json=getattr(node, "start_expr", None),
                 node_complete_expr_json=getattr(node, "complete_expr", None),
             )
-            self._apply_exec_result(scope=scope, track_id=track_id, res=res, now_ms=now_ms)
             return
 
+        # 轨道已跳到非技能节点：放弃该轨道在施法锁上的排队
+        self._cancel_lock_wait((scope, track_id))
+
         if isinstance(node, GatewayNode):
             self._exec_gateway(preset=preset, scope=scope, track_id=track_id, gw=node, now_ms=now_ms)
             return
@@ -455,6 +955,136 @@ class MacroEngineNew:
             rt2.advance()
             self._mode_rt.ensure_step_runnable()
 
+    # ---------------- Non-blocking attempts ----------------
+
+    def _track_rt(self, scope: str, track_id: str) -> Any:
+        if scope == "global":
+            return self._global_rt.get(track_id) if self._global_rt is not None else None
+        return self._mode_rt.tracks.get(track_id) if self._mode_rt is not None else None
+
+    def _run_skill_attempt(
+        self,
+        *,
+        scope: str,
+        track_id: str,
+        node_index: int,
+        now_ms: int,
+        **kwargs: Any,
+    ) -> None:
+        """
+        执行技能节点（或网关 exec_skill）：
+
+        - 阻塞模式：exec_skill_node 跑完整个尝试后应用结果
+        - 非阻塞模式：begin_skill_node 按键后若需要等待信号，则登记为该轨道的进行中尝试并 HOLD，
+          由 _drive_attempts 在 wake_ms 继续推进；轨道在此期间不会被再次调度
+        """
+        prio = PRIORITY_GLOBAL if scope == "global" else PRIORITY_MODE
+        kwargs.setdefault("lane", f"{scope}:{track_id}")
+        if not self._cfg.nonblocking_attempts:
+            res: ExecutionResult = self._attempt_exec.exec_skill_node(lock_priority=prio, **kwargs)
+            self._apply_exec_result(scope=scope, track_id=track_id, res=res, now_ms=now_ms)
+            return
+
+        key = (scope, track_id)
+        ticket: Optional[LockTicket] = None
+        waiting = self._lock_waiters.get(key)
+        if waiting is not None:
+            if waiting[0] == int(node_index):
+                ticket = self._lock_waiters.pop(key)[1]
+            else:
+                # 凭证属于 cursor 已离开的节点：作废，本节点重新排队（并照常计入执行次数）
+                self._cancel_lock_wait(key)
+        step = self._attempt_exec.begin_skill_node(
+            lock_priority=prio,
+            blocking=False,
+            lock_ticket=ticket,
+            **kwargs,
+        )
+        if step.lock_ticket is not None:
+            self._lock_waiters[key] = (int(node_index), step.lock_ticket)
+        if step.pending is None:
+            res = step.result or ExecutionResult(outcome="ERROR", advance="ADVANCE", next_delay_ms=50, reason="attempt_lost")
+            self._apply_exec_result(scope=scope, track_id=track_id, res=res, now_ms=now_ms)
+            # 瞬发 / 按键失败：锁在本次调用内已取得又释放，轮到的排队轨道要立即唤醒
+            if step.lock_ticket is None and not self._cast_lock.locked():
+                self._wake_lock_waiters(now_ms)
+            return
+
+        rt = self._track_rt(scope, track_id)
+        if rt is None:
+            self._attempt_exec.abort(step.pending, "track_missing")
+            return
+        self._attempts[(scope, track_id)] = _TrackAttempt(
+            pending=step.pending,
+            wake_ms=int(step.wake_ms),
+            rt=rt,
+            node_index=int(node_index),
+        )
+        rt.next_time_ms = int(step.wake_ms)
+
+    def _drive_attempts(self, now_ms: int) -> None:
+        """
+        推进所有已到唤醒时刻的进行中尝试；轨道已不存在（模式切换 / 被移除）的尝试直接作废。
+        """
+        for key in list(self._attempts.keys()):
+            a = self._attempts.get(key)
+            if a is None:
+                continue
+            scope, tid = key
+            if self._track_rt(scope, tid) is not a.rt:
+                self._attempts.pop(key, None)
+                self._attempt_exec.abort(a.pending, "track_switched")
+                self._wake_lock_waiters(now_ms)
+                continue
+            if now_ms < a.wake_ms:
+                continue
+
+            step: AttemptStep = self._attempt_exec.resume(a.pending)
+            if step.pending is not None:
+                a.wake_ms = int(step.wake_ms)
+                a.rt.next_time_ms = int(step.wake_ms)
+                continue
+
+            self._attempts.pop(key, None)
+            res = step.result or ExecutionResult(outcome="ERROR", advance="ADVANCE", next_delay_ms=50, reason="attempt_lost")
+            done_ms = self._now()
+            # 读条期间 cursor 已被其它轨道的网关跳走：尊重跳转，不再推进
+            if res.advance == "ADVANCE" and a.rt.current_node_index() != a.node_index:
+                res = replace(res, advance="HOLD")
+            self._apply_exec_result(scope=scope, track_id=tid, res=res, now_ms=done_ms)
+            self._wake_lock_waiters(done_ms)
+
+    def _wake_lock_waiters(self, now_ms: int) -> None:
+        """
+        施法锁释放：唤醒排在 CastLock 队首的 HOLD 轨道（代替阻塞模式下的释放交接）。
+        顺序由 CastLock 决定（priority + 到达顺序），其余轨道继续排队；轨道已不存在的凭证作废。
+        """
+        if not self._lock_waiters:
+            return
+        for key, (node_index, ticket) in list(self._lock_waiters.items()):
+            rt = self._track_rt(*key)
+            if rt is None or rt.current_node_index() != node_index:
+                self._cancel_lock_wait(key)
+                continue
+            if self._cast_lock.is_next(ticket) and int(rt.next_time_ms) > int(now_ms):
+                rt.next_time_ms = int(now_ms)
+
+    def _cancel_lock_wait(self, key: Tuple[str, str]) -> None:
+        waiting = self._lock_waiters.pop(key, None)
+        if waiting is not None:
+            self._cast_lock.cancel(waiting[1])
+
+    def _abort_attempts(self, reason: str) -> None:
+        attempts = list(self._attempts.values())
+        self._attempts.clear()
+        for key in list(self._lock_waiters.keys()):
+            self._cancel_lock_wait(key)
+        for a in attempts:
+            try:
+                self._attempt_exec.abort(a.pending, reason)
+            except Exception:
+                log.exception("abort pending attempt failed")
+
     # ---------------- Gateway actions ----------------
 
     def _exec_gateway(
@@ -617,19 +1247,18 @@ class MacroEngineNew:
             # 使用 SkillAttemptExecutor 执行该技能：
             # - skill_id 按 exec_skill_id
             # - node_id 用网关自身 id，便于在调试里区分这是“网关触发”的技能
-            res = self._attempt_exec.exec_skill_node(
+            rt = self._track_rt(scope, track_id)
+            self._run_skill_attempt(
+                scope=scope,
+                track_id=track_id,
+                node_index=rt.current_node_index() if rt is not None else -1,
+                now_ms=now_ms,
                 skill_id=exec_sid,
                 node_id=(getattr(gw, "id", "") or "").strip(),
                 override_cast_ms=None,
                 node_start_expr_json=None,
                 node_complete_expr_json=None,
             )
-            self._apply_exec_result(
-                scope=scope,
-                track_id=track_id,
-                res=res,
-                now_ms=now_ms,
-            )
             return
 
         self._apply_exec_result(
@@ -645,6 +1274,8 @@ class MacroEngineNew:
         if not tid or not nid:
             return
 
+        # cursor 离开排队的节点：放弃该轨道在施法锁上的排队
+        self._cancel_lock_wait((scope, tid))
         if scope == "global":
             rt = self._global_rt.get(tid) if self._global_rt is not None else None
             if rt is not None:
@@ -669,6 +1300,7 @@ class MacroEngineNew:
         rt = self._mode_rt.tracks.get(tid)
         if rt is None:
             return
+        self._cancel_lock_wait(("mode", tid))
         if rt.jump_to_node_id(nid):
             self._mode_rt.maybe_backstep(tid)
 
@@ -706,18 +1338,28 @@ class MacroEngineNew:
         except Exception:
             return False
             
+    def get_cast_lock_stats(self) -> CastLockStats:
+        """
+        给 UI 调试面板使用：施法锁的等待/持锁统计。
+        """
+        return self._cast_lock.stats()
+
+    def get_plan_cache_stats(self) -> PlanCacheStats:
+        """
+        给 UI 调试面板使用：capture plan LRU / 固定并集 plan 的命中统计。
+        """
+        return self._capman.get_plan_cache_stats()
+
     def invalidate_capture_plan(self) -> None:
         """
         供 UI 在 points/skills/rotations 变更时显式刷新 capture plan。
         - 调用 CaptureManager.invalidate_plan()
         - 若失败仅记录日志，不抛到 UI
         """
-        import logging
-
         try:
             self._capman.invalidate_plan()
         except Exception:
-            logging.getLogger(__name__).exception("invalidate_capture_plan failed")
+            log.exception("invalidate_capture_plan failed")
 
     def get_engine_state_snapshot(self) -> Dict[str, Any]:
         """
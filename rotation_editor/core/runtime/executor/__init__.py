@@ -1,8 +1,10 @@
 from __future__ import annotations
 
 from .types import ExecutionResult, Outcome, Advance
-from .lock_policy import LockPolicy, LockPolicyConfig, decide_on_lock_busy
-from .skill_attempt import SkillAttemptExecutor, SkillAttemptConfig
+from .cast_lock import CastLock, CastLockStats, LockTicket, PRIORITY_GLOBAL, PRIORITY_MODE
+from .lock_policy import LockPolicy, LockPolicyConfig, decide_on_lock_busy, acquire_on_lock_busy
+from .poll_schedule import AdaptivePollConfig, PollSchedule
+from .skill_attempt import SkillAttemptExecutor, SkillAttemptConfig, PendingAttempt, AttemptStep
 
 __all__ = [
     "ExecutionResult",
@@ -11,6 +13,16 @@ __all__ = [
     "LockPolicy",
     "LockPolicyConfig",
     "decide_on_lock_busy",
+    "acquire_on_lock_busy",
+    "CastLock",
+    "CastLockStats",
+    "LockTicket",
+    "PRIORITY_GLOBAL",
+    "PRIORITY_MODE",
+    "AdaptivePollConfig",
+    "PollSchedule",
     "SkillAttemptExecutor",
     "SkillAttemptConfig",
+    "PendingAttempt",
+    "AttemptStep",
 ]
\ No newline at end of file
@@ -0,0 +1,294 @@
+from __future__ import annotations
+
+import heapq
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Literal, Optional, Tuple
+
+
+# 与 Scheduler 一致：global 轨道优先于 mode 轨道
+PRIORITY_GLOBAL = 0
+PRIORITY_MODE = 1
+
+TicketState = Literal["ACQUIRED", "WAITING", "EXPIRED"]
+
+
+@dataclass
+class CastLockStats:
+    """
+    施法锁统计：
+
+    - acquired      : 成功获取次数（含立即获取）
+    - contended     : 需要排队等待的次数
+    - timeouts      : 等待超时 / 被中断的次数
+    - total_wait_ms : 排队等待的累计时长
+    - max_wait_ms   : 单次最长等待
+    - total_hold_ms : 持锁累计时长
+    - waiters       : 当前排队人数
+    """
+    acquired: int = 0
+    contended: int = 0
+    timeouts: int = 0
+    total_wait_ms: float = 0.0
+    max_wait_ms: float = 0.0
+    total_hold_ms: float = 0.0
+    waiters: int = 0
+
+    @property
+    def avg_wait_ms(self) -> float:
+        return self.total_wait_ms / self.contended if self.contended else 0.0
+
+
+@dataclass(frozen=True)
+class LockTicket:
+    """
+    非阻塞排队凭证（CastLock.enqueue 返回）：与阻塞等待者在同一个 (priority, 到达顺序) 队列里排队，
+    持有者之后用 try_acquire_ticket 重试；deadline（perf_counter 时钟）到期后凭证自动出队。
+    """
+    priority: int
+    seq: int
+    deadline: Optional[float] = None
+
+    @property
+    def key(self) -> Tuple[int, int]:
+        return (self.priority, self.seq)
+
+
+class CastLock:
+    """
+    全局施法锁（取代裸 threading.Lock + 轮询等待）：
+
+    - 释放时 notify 等待者，锁在释放的同一时刻交给下一位，而不是晚一个轮询间隔
+    - 等待者按 (priority, 到达顺序) 排队：priority 小的先得（PRIORITY_GLOBAL < PRIORITY_MODE），
+      同优先级 FIFO
+    - try_acquire 不插队：有人排队时直接失败
+    - interrupt() 唤醒所有等待者（引擎停止时调用），等待者检查 stop_evt 后返回
+    - stats() 返回等待/持锁统计
+    - enqueue / try_acquire_ticket / cancel：不阻塞线程的排队（非阻塞引擎在同一线程上调度多条轨道，
+      不能在锁上睡眠）；凭证与阻塞等待者共用同一个队列，优先级与超时语义相同
+    """
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition(threading.Lock())
+        self._held = False
+        self._owner = ""
+        self._held_since = 0.0
+        self._queue: List[Tuple[int, int]] = []   # heap of (priority, seq)
+        self._seq = 0
+        self._interrupt_gen = 0
+        self._stats = CastLockStats()
+        # 非阻塞凭证：(priority, seq) -> (入队时刻, 到期时刻)
+        self._tickets: Dict[Tuple[int, int], Tuple[float, Optional[float]]] = {}
+
+    # ---------- 查询 ----------
+
+    def locked(self) -> bool:
+        with self._cond:
+            return self._held
+
+    @property
+    def owner(self) -> str:
+        with self._cond:
+            return self._owner
+
+    def stats(self) -> CastLockStats:
+        with self._cond:
+            s = self._stats
+            return CastLockStats(
+                acquired=s.acquired,
+                contended=s.contended,
+                timeouts=s.timeouts,
+                total_wait_ms=s.total_wait_ms,
+                max_wait_ms=s.max_wait_ms,
+                total_hold_ms=s.total_hold_ms,
+                waiters=len(self._queue),
+            )
+
+    # ---------- 获取 / 释放 ----------
+
+    def _take_locked(self, owner: str) -> None:
+        self._held = True
+        self._owner = owner
+        self._held_since = time.perf_counter()
+        self._stats.acquired += 1
+
+    def _remove_queued_locked(self, key: Tuple[int, int]) -> None:
+        self._queue.remove(key)
+        heapq.heapify(self._queue)
+
+    def _purge_expired_locked(self, now: float) -> None:
+        expired = [k for k, (_t0, dl) in self._tickets.items() if dl is not None and dl <= now]
+        if not expired:
+            return
+        for k in expired:
+            t0, _dl = self._tickets.pop(k)
+            self._remove_queued_locked(k)
+            self._record_wait_locked(t0, now)
+            self._stats.timeouts += 1
+        self._cond.notify_all()
+
+    def _next_ticket_deadline_locked(self) -> Optional[float]:
+        dls = [dl for (_t0, dl) in self._tickets.values() if dl is not None]
+        return min(dls) if dls else None
+
+    def _record_wait_locked(self, t0: float, now: float) -> None:
+        waited = (now - t0) * 1000.0
+        self._stats.total_wait_ms += waited
+        self._stats.max_wait_ms = max(self._stats.max_wait_ms, waited)
+
+    def try_acquire(self, *, owner: str = "") -> bool:
+        with self._cond:
+            self._purge_expired_locked(time.perf_counter())
+            if self._held or self._queue:
+                return False
+            self._take_locked(owner)
+            return True
+
+    def acquire(
+        self,
+        *,
+        priority: int = PRIORITY_GLOBAL,
+        timeout_ms: Optional[int] = None,
+        stop_evt: Optional[threading.Event] = None,
+        owner: str = "",
+    ) -> bool:
+        """
+        排队获取锁；超时 / stop_evt 置位（配合 interrupt）返回 False。
+        timeout_ms=None 表示一直等。
+        """
+        t0 = time.perf_counter()
+        deadline = None if timeout_ms is None else t0 + max(0, int(timeout_ms)) / 1000.0
+
+        with self._cond:
+            if not self._held and not self._queue:
+                self._take_locked(owner)
+                return True
+
+            self._seq += 1
+            ticket = (int(priority), self._seq)
+            heapq.heappush(self._queue, ticket)
+            self._stats.contended += 1
+            gen = self._interrupt_gen
+
+            try:
+                while True:
+                    self._purge_expired_locked(time.perf_counter())
+                    if not self._held and self._queue[0] == ticket:
+                        heapq.heappop(self._queue)
+                        waited = (time.perf_counter() - t0) * 1000.0
+                        self._stats.total_wait_ms += waited
+                        self._stats.max_wait_ms = max(self._stats.max_wait_ms, waited)
+                        self._take_locked(owner)
+                        return True
+
+                    if (stop_evt is not None and stop_evt.is_set()) or gen != self._interrupt_gen:
+                        break
+
+                    # 队首的非阻塞凭证到期时也要醒来（凭证持有者不会再来 notify）
+                    wake_at = self._next_ticket_deadline_locked()
+                    if deadline is not None:
+                        if deadline - time.perf_counter() <= 0:
+                            break
+                        wake_at = deadline if wake_at is None else min(wake_at, deadline)
+                    if wake_at is None:
+                        self._cond.wait()
+                    else:
+                        self._cond.wait(max(0.0, wake_at - time.perf_counter()))
+
+                # 放弃排队
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+                waited = (time.perf_counter() - t0) * 1000.0
+                self._stats.total_wait_ms += waited
+                self._stats.max_wait_ms = max(self._stats.max_wait_ms, waited)
+                self._stats.timeouts += 1
+                # 队首可能换人了
+                self._cond.notify_all()
+                return False
+            except BaseException:
+                if ticket in self._queue:
+                    self._queue.remove(ticket)
+                    heapq.heapify(self._queue)
+                    self._cond.notify_all()
+                raise
+
+    # ---------- 非阻塞排队 ----------
+
+    def enqueue(self, *, priority: int = PRIORITY_GLOBAL, timeout_ms: Optional[int] = None) -> LockTicket:
+        """
+        排队但不等待；timeout_ms=None 表示凭证不过期（需要调用方在放弃时 cancel）。
+        """
+        now = time.perf_counter()
+        deadline = None if timeout_ms is None else now + max(0, int(timeout_ms)) / 1000.0
+        with self._cond:
+            self._seq += 1
+            key = (int(priority), self._seq)
+            heapq.heappush(self._queue, key)
+            self._tickets[key] = (now, deadline)
+            self._stats.contended += 1
+            return LockTicket(priority=key[0], seq=key[1], deadline=deadline)
+
+    def try_acquire_ticket(self, ticket: LockTicket, *, owner: str = "") -> TicketState:
+        """
+        凭证排到队首且锁空闲时获取锁（ACQUIRED，凭证随之失效）；否则 WAITING；
+        凭证已到期 / 已取消返回 EXPIRED。
+        """
+        now = time.perf_counter()
+        with self._cond:
+            self._purge_expired_locked(now)
+            key = ticket.key
+            if key not in self._tickets:
+                return "EXPIRED"
+            if self._held or self._queue[0] != key:
+                return "WAITING"
+            heapq.heappop(self._queue)
+            t0, _dl = self._tickets.pop(key)
+            self._record_wait_locked(t0, now)
+            self._take_locked(owner)
+            return "ACQUIRED"
+
+    def is_next(self, ticket: LockTicket) -> bool:
+        """
+        凭证是否排在队首（锁释放后应由它的持有者来取）。
+        """
+        with self._cond:
+            self._purge_expired_locked(time.perf_counter())
+            return bool(self._queue) and self._queue[0] == ticket.key
+
+    def cancel(self, ticket: Optional[LockTicket]) -> None:
+        """
+        放弃排队（凭证已获取 / 已到期时为空操作）。
+        """
+        if ticket is None:
+            return
+        with self._cond:
+            if self._tickets.pop(ticket.key, None) is None:
+                return
+            self._remove_queued_locked(ticket.key)
+            self._cond.notify_all()
+
+    def release(self) -> None:
+        with self._cond:
+            if not self._held:
+                raise RuntimeError("CastLock.release: lock is not held")
+            self._stats.total_hold_ms += (time.perf_counter() - self._held_since) * 1000.0
+            self._held = False
+            self._owner = ""
+            if self._queue:
+                self._cond.notify_all()
+
+    def interrupt(self) -> None:
+        """
+        唤醒所有等待者并让它们放弃本次等待（引擎停止时调用）。
+        """
+        with self._cond:
+            self._interrupt_gen += 1
+            self._cond.notify_all()
+
+    def __enter__(self) -> "CastLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.release()
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import threading
 from dataclasses import dataclass
-from typing import Literal, Tuple
+from typing import Literal, Optional, Tuple
 
 from .types import Advance, ExecutionResult
+from .cast_lock import CastLock, PRIORITY_GLOBAL
 
 
 LockPolicy = Literal[
@@ -19,7 +21,9 @@ class LockPolicyConfig:
 
     # WAIT_LOCK 用：
     wait_timeout_ms: int = 300      # 等锁最多多久
-    wait_poll_ms: int = 15          # 等锁期间轮询间隔
+    # 只用于非阻塞引擎（nonblocking_attempts）：排队等锁时的兜底重检间隔，正常在锁释放时立即唤醒，不轮询。
+    # 阻塞模式在 CastLock.acquire 的条件变量上等待（释放即交接），不使用该值。
+    wait_poll_ms: int = 200
 
     # skip 类策略用：
     skip_delay_ms: int = 50         # 锁忙跳过后下一次调度延迟
@@ -36,4 +40,37 @@ def decide_on_lock_busy(cfg: LockPolicyConfig) -> ExecutionResult:
     if pol == "SKIP_BUT_HOLD":
         return ExecutionResult(outcome="SKIPPED_LOCK_BUSY", advance="HOLD", next_delay_ms=max(10, int(cfg.skip_delay_ms)), reason="lock_busy_hold")
     # default: SKIP_AND_ADVANCE
-    return ExecutionResult(outcome="SKIPPED_LOCK_BUSY", advance="ADVANCE", next_delay_ms=max(10, int(cfg.skip_delay_ms)), reason="lock_busy_advance")
\ No newline at end of file
+    return ExecutionResult(outcome="SKIPPED_LOCK_BUSY", advance="ADVANCE", next_delay_ms=max(10, int(cfg.skip_delay_ms)), reason="lock_busy_advance")
+
+
+def acquire_on_lock_busy(
+    lock: CastLock,
+    cfg: LockPolicyConfig,
+    *,
+    priority: int = PRIORITY_GLOBAL,
+    stop_evt: Optional[threading.Event] = None,
+    owner: str = "",
+) -> Optional[ExecutionResult]:
+    """
+    try_acquire 失败后按策略处理：
+
+    - WAIT_LOCK：在 CastLock 上按 priority 排队等待（释放即交接，不按 wait_poll_ms 轮询），最多 wait_timeout_ms
+        * 拿到锁 -> 返回 None（调用方负责 release）
+        * 停止 -> STOPPED；超时 -> SKIPPED_LOCK_BUSY(HOLD, wait_lock_timeout)
+    - 其它策略：返回 decide_on_lock_busy(cfg)
+    """
+    pol = (cfg.policy or "SKIP_AND_ADVANCE").strip().upper()
+    if pol != "WAIT_LOCK":
+        return decide_on_lock_busy(cfg)
+
+    ok = lock.acquire(
+        priority=int(priority),
+        timeout_ms=max(1, int(cfg.wait_timeout_ms)),
+        stop_evt=stop_evt,
+        owner=owner,
+    )
+    if ok:
+        return None
+    if stop_evt is not None and stop_evt.is_set():
+        return ExecutionResult(outcome="STOPPED", advance="HOLD", next_delay_ms=0, reason="stopped")
+    return ExecutionResult(outcome="SKIPPED_LOCK_BUSY", advance="HOLD", next_delay_ms=max(10, int(cfg.skip_delay_ms)), reason="wait_lock_timeout")
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+
+@dataclass(frozen=True)
+class AdaptivePollConfig:
+    enabled: bool = True
+
+    # 某技能至少积累多少次观测后才启用预测（否则按固定 poll_ms 轮询）
+    min_samples: int = 5
+
+    # 预期窗口内的轮询间隔
+    dense_poll_ms: int = 5
+
+    # 预期窗口两侧的额外余量（样本是插值后的信号变化时刻，误差约为半个轮询间隔，余量不宜过大）
+    margin_ms: int = 5
+
+    # 预期窗口之外两次检测的最大间隔（即最坏情况下的检测延迟上限）
+    start_max_gap_ms: int = 20
+    complete_max_gap_ms: int = 80
+
+
+class PollSchedule:
+    """
+    信号等待的轮询节奏：
+
+    - 无预测（expect=None）：固定 base_poll_ms（与旧行为一致）
+    - 有预测窗口 [lo, hi]（相对等待起点的毫秒数）：
+        * 窗口前：稀疏轮询，单次间隔不超过 max_gap_ms，且不越过窗口起点
+        * 窗口内（含 margin）：按 dense_poll_ms 密集轮询
+        * 窗口后：回到 base_poll_ms（信号迟到时按原节奏继续检测）
+    - margin 不超过 base_poll_ms 的一半：否则短等待（如 20ms 的开始信号超时）里窗口会
+      覆盖整个等待期，退化成从头到尾的密集 / 固定轮询
+    """
+
+    def __init__(
+        self,
+        *,
+        base_poll_ms: int,
+        expect: Optional[Tuple[int, int]] = None,
+        dense_poll_ms: int = 5,
+        max_gap_ms: int = 50,
+        margin_ms: int = 10,
+    ) -> None:
+        self._base = max(1, int(base_poll_ms))
+        self._dense = max(1, min(self._base, int(dense_poll_ms)))
+        self._max_gap = max(self._dense, int(max_gap_ms))
+        self._win: Optional[Tuple[int, int]] = None
+        if expect is not None:
+            lo, hi = int(expect[0]), int(expect[1])
+            m = min(max(0, int(margin_ms)), self._base // 2)
+            self._win = (max(0, lo - m), max(lo, hi) + m)
+
+    @property
+    def window(self) -> Optional[Tuple[int, int]]:
+        return self._win
+
+    def next_delay_ms(self, elapsed_ms: int) -> int:
+        e = max(0, int(elapsed_ms))
+        win = self._win
+        if win is None:
+            return self._base
+
+        lo, hi = win
+        if e < lo:
+            return max(self._dense, min(self._max_gap, lo - e))
+        if e <= hi:
+            return self._dense
+        return self._base
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import copy
 import threading
+import time
 from dataclasses import dataclass
-from typing import Optional, Dict, Set, Literal, Tuple, Any
+from typing import Optional, Dict, Iterable, List, Set, Literal, Tuple, Any
 
 from core.profiles import ProfileContext
 from core.pick.capture import SampleSpec
@@ -18,7 +20,9 @@ from rotation_editor.ast import (
     CastBarChanged,
     DictBaselineProvider,
     TriBool,
+    ProbeRequirements,
     collect_probes_from_expr,
+    optimize_expr,
 )
 from rotation_editor.ast.codec import decode_expr
 
@@ -28,7 +32,9 @@ from rotation_editor.core.runtime.state import StateStore
 from rotation_editor.core.runtime.state.store import mono_ms
 
 from .types import ExecutionResult
-from .lock_policy import LockPolicyConfig, decide_on_lock_busy
+from .lock_policy import LockPolicyConfig, acquire_on_lock_busy, decide_on_lock_busy
+from .cast_lock import CastLock, LockTicket, PRIORITY_GLOBAL
+from .poll_schedule import AdaptivePollConfig, PollSchedule
 
 
 StartSignalMode = Literal["pixel", "cast_bar", "none"]
@@ -46,6 +52,9 @@ class StartSignalConfig:
     cast_bar_point_id: str = ""
     cast_bar_tolerance: int = 15
 
+    # start 检测只接受按键之后抓取的帧（按键前的旧帧会得出假的“未变化”）
+    require_frame_after_key: bool = True
+
 
 @dataclass(frozen=True)
 class CompleteSignalConfig:
@@ -56,20 +65,35 @@ class CompleteSignalConfig:
     cast_bar_point_id: str = ""
     cast_bar_tolerance: int = 15
 
+    # complete 检测可接受的帧年龄；None 表示使用 CaptureManager 的默认 TTL
+    snapshot_max_age_ms: Optional[int] = None
+
 
 @dataclass(frozen=True)
 class SkillAttemptConfig:
     default_gap_ms: int = 50
     poll_not_ready_ms: int = 50
 
+    # READY_CHECK 可接受的帧年龄（就绪状态变化慢，允许复用 lookahead / 上一节点的帧，减少重复截屏）
+    ready_snapshot_max_age_ms: int = 60
+
     lock: LockPolicyConfig = LockPolicyConfig()
 
     start: StartSignalConfig = StartSignalConfig()
     complete: CompleteSignalConfig = CompleteSignalConfig()
 
+    # 按历史观测的 按键->开始 / 开始->完成 延迟调整轮询节奏（预期窗口外稀疏、窗口内密集）
+    adaptive_poll: AdaptivePollConfig = AdaptivePollConfig()
+
     # 事件节流：start/complete 检测每隔多少 ms 记录一次
     sample_log_throttle_ms: int = 80
 
+    # 预输入窗口（游戏的技能队列）：在预测的读条结束前这么多 ms 提前结算本次尝试，
+    # 释放施法锁并立即调度下一节点（不再等 default_gap_ms），让下一技能的按键在读条结束前发出。
+    # 预测结束时刻 = 开始信号 + 历史“开始->完成”延迟的高分位（样本不足时用读条时长）。
+    # 只作用于不依赖完成信号的结算（ASSUME_SUCCESS / HYBRID_ASSUME）；0 表示关闭。
+    queue_window_ms: int = 0
+
 
 def _wait_ms(stop_evt: Optional[threading.Event], ms: int) -> bool:
     ms = int(ms)
@@ -103,6 +127,76 @@ def _float_clamp(v: float, lo: float, hi: float) -> float:
     return x
 
 
+AttemptPhase = Literal["START_WAIT", "RETRY_GAP", "COMPLETE_ASSUME", "COMPLETE_WAIT"]
+
+
+@dataclass(frozen=True)
+class _NodeExpr:
+    """
+    节点级 start / complete 表达式的编译缓存：src 为原始 AST JSON 的副本（变化即重新编译）。
+    """
+    src: Dict[str, Any]
+    expr: Optional[Expr]
+
+
+@dataclass
+class PendingAttempt:
+    """
+    一次进行中（已持有施法锁、已按键）的施法尝试的可恢复状态。
+
+    由 SkillAttemptExecutor.begin_skill_node / resume 推进；调用方只需在 AttemptStep.wake_ms
+    之后再次 resume，其余时间引擎线程可以去调度其它轨道。
+    """
+    attempt_id: str
+    skill: Any
+    skill_id: str
+    node_id: str
+    readbar_ms: int
+    start_expr: Expr
+    complete_expr: Optional[Expr]
+    retries_left: int
+    cast_bar_points: Set[str]
+    # 本次尝试需要的 probes：每次恢复检测前重新确保 plan 覆盖（其它轨道可能已切换 plan）
+    probes: Optional[ProbeRequirements] = None
+
+    phase: AttemptPhase = "START_WAIT"
+    retry_index: int = 0
+    baseline: Optional[DictBaselineProvider] = None
+    key_sent_ms: int = 0
+
+    # 当前等待阶段
+    t0_ms: int = 0
+    deadline_ms: int = 0
+    sched: Optional[PollSchedule] = None
+    polls: int = 0
+    last_log_ms: int = 0
+    # 上一次未命中检测所用帧的时刻：信号变化发生在它与命中帧之间，统计延迟时取两者中点
+    miss_frame_ms: int = 0
+
+    # 预测的读条结束时刻（进入完成阶段时确定，预输入据此提前结算）
+    cast_end_ms: int = 0
+
+    lock_held: bool = True
+
+
+@dataclass(frozen=True)
+class AttemptStep:
+    """
+    状态机推进一步的结果：
+    - result 非空：尝试已结束（施法锁已释放）
+    - 否则 pending 为进行中的尝试，调用方应在 wake_ms（mono_ms 时钟）时 resume
+    - lock_ticket 非空：锁忙，已在 CastLock 上排队（result 为 HOLD）；调用方重试同一节点时原样传回
+    """
+    result: Optional[ExecutionResult] = None
+    pending: Optional[PendingAttempt] = None
+    wake_ms: int = 0
+    lock_ticket: Optional[LockTicket] = None
+
+    @property
+    def done(self) -> bool:
+        return self.result is not None
+
+
 class SkillAttemptExecutor:
     def __init__(
         self,
@@ -110,7 +204,7 @@ class SkillAttemptExecutor:
         ctx: ProfileContext,
         store: StateStore,
         key_sender: KeySender,
-        cast_lock: threading.Lock,
+        cast_lock: CastLock,
         capman: CaptureManager,
         cfg: SkillAttemptConfig,
         stop_evt: Optional[threading.Event] = None,
@@ -123,6 +217,95 @@ class SkillAttemptExecutor:
         self._cfg = cfg
         self._stop_evt = stop_evt
 
+        # 当前持有施法锁的进行中尝试（非阻塞模式）；锁被它占用时其它节点排队而不是跳过
+        self._lock_holder_attempt: str = ""
+
+        # 节点级 expr JSON 的编译缓存：(node_id, "start"/"complete") -> _NodeExpr（优化后的 Expr / 解码失败为 None）。
+        # 命中要求 JSON 内容与缓存的副本相同（就地编辑后自动重新编译）；每个节点只保留最新一份
+        self._node_exprs: Dict[Tuple[str, str], _NodeExpr] = {}
+
+    @property
+    def poll_not_ready_ms(self) -> int:
+        return max(10, int(self._cfg.poll_not_ready_ms))
+
+    @property
+    def queue_window_ms(self) -> int:
+        return max(0, int(self._cfg.queue_window_ms))
+
+    @property
+    def ready_snapshot_max_age_ms(self) -> int:
+        return max(0, int(self._cfg.ready_snapshot_max_age_ms))
+
+    def ready_expr_for(self, skill_id: str) -> Optional[Expr]:
+        """
+        exec_skill_node 在 READY_CHECK 阶段使用的 ready 表达式（供引擎 lookahead 预取）。
+        技能不存在或已禁用时返回 None（这些情况由 exec_skill_node 自己处理）。
+        """
+        sid = (skill_id or "").strip()
+        skill = self._find_skill(sid)
+        if skill is None or not bool(getattr(skill, "enabled", True)):
+            return None
+        return self._default_ready_expr(skill_id=sid)
+
+    def node_probes(
+        self,
+        *,
+        skill_id: str,
+        node_id: str = "",
+        node_start_expr_json: Any = None,
+        node_complete_expr_json: Any = None,
+    ) -> ProbeRequirements:
+        """
+        exec_skill_node 对该节点需要的全部 probes（ready + start + complete）。
+        """
+        sid = (skill_id or "").strip()
+        nid = (node_id or "").strip()
+        probes = collect_probes_from_expr(self._default_ready_expr(skill_id=sid))
+        probes.merge(collect_probes_from_expr(
+            self._decode_node_expr(node_start_expr_json, fallback=self._default_start_expr(skill_id=sid), node_id=nid, kind="start")
+        ))
+        probes.merge(collect_probes_from_expr(
+            self._decode_node_expr(node_complete_expr_json, fallback=self._default_complete_expr(), node_id=nid, kind="complete")
+        ))
+        return probes
+
+    def clear_node_exprs(self) -> None:
+        """
+        丢弃节点级表达式的编译缓存（加载方案 / 启动引擎时调用）。
+        """
+        self._node_exprs.clear()
+
+    def precompile_nodes(self, nodes: Iterable[Any]) -> int:
+        """
+        启动预热：清空并重建节点级 start / complete 表达式的编译缓存，返回编译的表达式数量。
+        """
+        self._node_exprs.clear()
+        n = 0
+        for node in nodes:
+            nid = (getattr(node, "id", "") or "").strip()
+            for kind in ("start", "complete"):
+                obj = getattr(node, f"{kind}_expr", None)
+                if nid and isinstance(obj, dict) and obj:
+                    self._compile_node_expr(obj, node_id=nid, kind=kind)
+                    n += 1
+        return n
+
+    def prepare_keys(self, skill_ids: Iterable[str]) -> List[str]:
+        """
+        启动预热：让 key_sender 预先解析这些技能的触发键（key_sender 提供 prepare 时），
+        返回无法发送的键。
+        """
+        keys: List[str] = []
+        for sid in skill_ids:
+            skill = self._find_skill((sid or "").strip())
+            key = (getattr(getattr(skill, "trigger", None), "key", "") or "").strip()
+            if key and key not in keys:
+                keys.append(key)
+        prepare = getattr(self._key_sender, "prepare", None)
+        if prepare is None or not keys:
+            return []
+        return list(prepare(keys) or [])
+
     def exec_skill_node(
         self,
         *,
@@ -138,22 +321,120 @@ class SkillAttemptExecutor:
         ready_expr: Optional[Expr] = None,
         start_expr: Optional[Expr] = None,
         complete_expr: Optional[Expr] = None,
+
+        # 施法锁排队优先级（PRIORITY_GLOBAL / PRIORITY_MODE，与调度器一致）
+        lock_priority: int = PRIORITY_GLOBAL,
+
+        # 发起尝试的轨道（如 "global:t1"），按轨道统计 读条结束 -> 下一次按键 的间隔
+        lane: str = "",
     ) -> ExecutionResult:
+        """
+        阻塞式执行：在调用线程上把状态机一直推进到结束（等待期间 sleep）。
+        引擎的非阻塞模式改用 begin_skill_node + resume。
+        """
+        step = self.begin_skill_node(
+            skill_id=skill_id,
+            node_id=node_id,
+            override_cast_ms=override_cast_ms,
+            node_start_expr_json=node_start_expr_json,
+            node_complete_expr_json=node_complete_expr_json,
+            ready_expr=ready_expr,
+            start_expr=start_expr,
+            complete_expr=complete_expr,
+            lock_priority=lock_priority,
+            blocking=True,
+            lane=lane,
+        )
+        try:
+            while step.result is None and step.pending is not None:
+                _wait_ms(self._stop_evt, step.wake_ms - mono_ms())
+                step = self.resume(step.pending)
+        except BaseException:
+            if step.pending is not None:
+                self._release_pending(step.pending)
+            raise
+        return step.result if step.result is not None else ExecutionResult(
+            outcome="ERROR", advance="ADVANCE", next_delay_ms=50, reason="attempt_lost"
+        )
+
+    def begin_skill_node(
+        self,
+        *,
+        skill_id: str,
+        node_id: str,
+        override_cast_ms: Optional[int] = None,
+        node_start_expr_json: Any = None,
+        node_complete_expr_json: Any = None,
+        ready_expr: Optional[Expr] = None,
+        start_expr: Optional[Expr] = None,
+        complete_expr: Optional[Expr] = None,
+        lock_priority: int = PRIORITY_GLOBAL,
+        blocking: bool = False,
+        lock_ticket: Optional[LockTicket] = None,
+        lane: str = "",
+    ) -> AttemptStep:
+        """
+        执行 READY_CHECK -> 取施法锁 -> 采 baseline -> 按键，然后返回：
+        - 已结束（未就绪 / 锁忙 / 瞬发 / 失败）：AttemptStep.result
+        - 进入 START_WAIT：AttemptStep.pending + wake_ms（施法锁由 pending 持有，直到尝试结束）
+
+        blocking=False 时锁忙不会让线程在 CastLock 上睡眠（引擎线程还要推进持锁的那个尝试）：
+        - 锁被进行中的尝试占用，或策略为 WAIT_LOCK：用 CastLock.enqueue 排队，返回 HOLD + lock_ticket，
+          调用方在锁释放（或 wait_poll_ms）后带着 lock_ticket 重试同一节点；凭证保留原优先级与到期时刻
+        - 其它情况按 decide_on_lock_busy 的策略处理
+        """
+        step = self._begin_skill_node(
+            skill_id=skill_id,
+            node_id=node_id,
+            override_cast_ms=override_cast_ms,
+            node_start_expr_json=node_start_expr_json,
+            node_complete_expr_json=node_complete_expr_json,
+            ready_expr=ready_expr,
+            start_expr=start_expr,
+            complete_expr=complete_expr,
+            lock_priority=lock_priority,
+            blocking=blocking,
+            lock_ticket=lock_ticket,
+            lane=lane,
+        )
+        if lock_ticket is not None and step.lock_ticket is None:
+            # 不再排队（未就绪 / 停止 / 已拿到锁）：凭证已用掉时 cancel 为空操作
+            self._lock.cancel(lock_ticket)
+        return step
+
+    def _begin_skill_node(
+        self,
+        *,
+        skill_id: str,
+        node_id: str,
+        override_cast_ms: Optional[int],
+        node_start_expr_json: Any,
+        node_complete_expr_json: Any,
+        ready_expr: Optional[Expr],
+        start_expr: Optional[Expr],
+        complete_expr: Optional[Expr],
+        lock_priority: int,
+        blocking: bool,
+        lock_ticket: Optional[LockTicket],
+        lane: str,
+    ) -> AttemptStep:
         sid = (skill_id or "").strip()
         nid = (node_id or "").strip()
 
-        self._store.mark_node_exec(sid, node_id=nid)
+        # 排队重试的是同一次节点执行，不重复计数
+        if lock_ticket is None:
+            self._store.mark_node_exec(sid, node_id=nid)
 
         if self._stop_evt is not None and self._stop_evt.is_set():
-            return ExecutionResult(outcome="STOPPED", advance="HOLD", next_delay_ms=0, reason="stopped")
+            return AttemptStep(result=ExecutionResult(outcome="STOPPED", advance="HOLD", next_delay_ms=0, reason="stopped"))
 
         skill = self._find_skill(sid)
         if skill is None:
-            return ExecutionResult(outcome="ERROR", advance="ADVANCE", next_delay_ms=50, reason="skill_missing")
+            return AttemptStep(result=ExecutionResult(outcome="ERROR", advance="ADVANCE", next_delay_ms=50, reason="skill_missing"))
 
         if not bool(getattr(skill, "enabled", True)):
             self._store.mark_skipped_disabled(sid, node_id=nid)
-            return ExecutionResult(outcome="SKIPPED_DISABLED", advance="ADVANCE", next_delay_ms=max(10, int(self._cfg.poll_not_ready_ms)), reason="disabled")
+            return AttemptStep(result=ExecutionResult(outcome="SKIPPED_DISABLED", advance="ADVANCE", next_delay_ms=max(10, int(self._cfg.poll_not_ready_ms)), reason="disabled"))
 
         # ---- derive default exprs (ready) ----
         ready_e = ready_expr or self._default_ready_expr(skill_id=sid)
@@ -161,70 +442,150 @@ class SkillAttemptExecutor:
         # ---- node-level expr JSON 优先（start/complete）----
         start_e = start_expr
         if start_e is None:
-            start_e = self._decode_node_expr(node_start_expr_json, fallback=self._default_start_expr(skill_id=sid))
+            start_e = self._decode_node_expr(node_start_expr_json, fallback=self._default_start_expr(skill_id=sid), node_id=nid, kind="start")
 
         complete_e = complete_expr
         if complete_e is None:
             default_ce = self._default_complete_expr()
-            complete_e = self._decode_node_expr(node_complete_expr_json, fallback=default_ce)
+            complete_e = self._decode_node_expr(node_complete_expr_json, fallback=default_ce, node_id=nid, kind="complete")
 
         # ---- ensure plan ----
+        # 当前 plan 已覆盖（引擎 lookahead 已按并集建好）时不切换 plan，保住已缓存的 snapshot
         probes = collect_probes_from_expr(ready_e)
         probes.merge(collect_probes_from_expr(start_e))
         probes.merge(collect_probes_from_expr(complete_e))
-        ensure_plan_for_probes(capman=self._capman, probes=probes)
+        ensure_plan_for_probes(capman=self._capman, probes=probes, keep_if_covered=True)
 
         # ---- READY_CHECK ----
-        ready_tri = eval_expr_with_capture(ready_e, profile=self._ctx, capman=self._capman, metrics=self._store).tri
+        ready_tri = eval_expr_with_capture(
+            ready_e,
+            profile=self._ctx,
+            capman=self._capman,
+            metrics=self._store,
+            max_age_ms=self.ready_snapshot_max_age_ms,
+        ).tri
         if ready_tri.value is not True:
             reason = "not_ready" if ready_tri.value is False else (ready_tri.reason or "ready_unknown")
             self._store.mark_ready_false(sid, node_id=nid, reason=reason)
-            return ExecutionResult(outcome="SKIPPED_NOT_READY", advance="ADVANCE", next_delay_ms=max(10, int(self._cfg.poll_not_ready_ms)), reason=reason)
+            return AttemptStep(result=ExecutionResult(outcome="SKIPPED_NOT_READY", advance="ADVANCE", next_delay_ms=max(10, int(self._cfg.poll_not_ready_ms)), reason=reason))
 
         # ---- lock ----
-        if not self._lock.acquire(timeout=0):
-            self._store.mark_skipped_lock_busy(sid, node_id=nid)
-
-            pol = (self._cfg.lock.policy or "SKIP_AND_ADVANCE").strip().upper()
-            if pol == "WAIT_LOCK":
-                return self._wait_lock_then_attempt(
-                    skill=skill,
-                    skill_id=sid,
-                    node_id=nid,
-                    override_cast_ms=override_cast_ms,
-                    start_expr=start_e,
-                    complete_expr=complete_e,
+        if lock_ticket is not None:
+            state = self._lock.try_acquire_ticket(lock_ticket, owner=sid)
+            if state == "WAITING":
+                return self._hold_for_lock(lock_ticket)
+            if state == "EXPIRED":
+                self._store.mark_skipped_lock_busy(sid, node_id=nid)
+                return AttemptStep(result=ExecutionResult(outcome="SKIPPED_LOCK_BUSY", advance="HOLD", next_delay_ms=max(10, int(self._cfg.lock.skip_delay_ms)), reason="wait_lock_timeout"))
+        elif not self._lock.try_acquire(owner=sid):
+            if blocking:
+                self._store.mark_skipped_lock_busy(sid, node_id=nid)
+                busy = acquire_on_lock_busy(
+                    self._lock,
+                    self._cfg.lock,
+                    priority=lock_priority,
+                    stop_evt=self._stop_evt,
+                    owner=sid,
                 )
-
-            return decide_on_lock_busy(self._cfg.lock)
+                if busy is not None:
+                    return AttemptStep(result=busy)
+            else:
+                wait_lock = (self._cfg.lock.policy or "").strip().upper() == "WAIT_LOCK"
+                # 锁空闲却取不到 = 前面有排队的轨道：同样排队，保持先来后到
+                own = bool(self._lock_holder_attempt) or not self._lock.locked()
+                if not (wait_lock or own):
+                    self._store.mark_skipped_lock_busy(sid, node_id=nid)
+                    return AttemptStep(result=decide_on_lock_busy(self._cfg.lock))
+                # 与阻塞模式一致：锁被本引擎的进行中尝试占用时一直排队（它必然会结束），WAIT_LOCK 按 wait_timeout_ms 到期
+                ticket = self._lock.enqueue(
+                    priority=lock_priority,
+                    timeout_ms=int(self._cfg.lock.wait_timeout_ms) if wait_lock else None,
+                )
+                return self._hold_for_lock(ticket)
 
         try:
-            return self._run_attempt_under_lock(
+            readbar_ms = self._readbar_ms(skill, override_cast_ms)
+            start_mode = (self._cfg.start.mode or "pixel").strip().lower()
+
+            attempt_id = self._store.begin_attempt(skill_id=sid, node_id=nid, start_mode=start_mode, readbar_ms=readbar_ms, lane=lane)
+            self._store.set_stage(attempt_id, "PREPARING", message="preparing")
+
+            p = PendingAttempt(
+                attempt_id=attempt_id,
                 skill=skill,
                 skill_id=sid,
                 node_id=nid,
-                override_cast_ms=override_cast_ms,
+                readbar_ms=int(readbar_ms),
                 start_expr=start_e,
                 complete_expr=complete_e,
+                retries_left=max(0, int(self._cfg.start.max_retries)),
+                cast_bar_points=self._extract_cast_bar_changed_points(start_e),
+                probes=probes,
             )
-        finally:
+            self._lock_holder_attempt = attempt_id
+            return self._send_and_start_wait(p)
+        except BaseException:
             try:
                 self._lock.release()
             except Exception:
                 pass
+            raise
+
+    def resume(self, p: PendingAttempt) -> AttemptStep:
+        """
+        推进进行中的尝试一步（一次检测 / 一个阶段切换），不做任何等待。
+        """
+        try:
+            if p.phase == "START_WAIT":
+                return self._poll_start(p)
+            if p.phase == "RETRY_GAP":
+                return self._send_and_start_wait(p)
+            if p.phase == "COMPLETE_ASSUME":
+                if self._stopped():
+                    return self._finish_stopped(p)
+                return self._finish_assumed(p)
+            if p.phase == "COMPLETE_WAIT":
+                return self._poll_complete(p)
+        except BaseException:
+            self._release_pending(p)
+            raise
+        return self._done(p, ExecutionResult(outcome="ERROR", advance="ADVANCE", next_delay_ms=50, reason=f"bad_phase:{p.phase}"))
+
+    def abort(self, p: PendingAttempt, reason: str = "stopped") -> None:
+        """
+        放弃进行中的尝试（引擎停止 / 轨道被切走）：记为 STOPPED 并释放施法锁。
+        """
+        if not p.lock_held:
+            return
+        try:
+            self._store.finish_stopped(p.attempt_id, reason or "stopped")
+        finally:
+            self._release_pending(p)
 
     # -----------------------
     # Expr decode helper
     # -----------------------
 
-    def _decode_node_expr(self, obj: Any, *, fallback: Optional[Expr]) -> Optional[Expr]:
+    def _decode_node_expr(self, obj: Any, *, fallback: Optional[Expr], node_id: str = "", kind: str = "") -> Optional[Expr]:
         if obj is None:
             return fallback
         if not isinstance(obj, dict) or not obj:
             return fallback
+        e = self._compile_node_expr(obj, node_id=node_id, kind=kind)
+        return fallback if e is None else e
+
+    def _compile_node_expr(self, obj: Dict[str, Any], *, node_id: str = "", kind: str = "") -> Optional[Expr]:
+        key = (node_id, kind)
+        hit = self._node_exprs.get(key) if node_id else None
+        if hit is not None and hit.src == obj:
+            return hit.expr
         e, diags = decode_expr(obj, path="$")
-        if e is None:
-            return fallback
+        if e is not None:
+            # 常量折叠 / 扁平化 / 指标原子优先，短路时少采样
+            e = optimize_expr(e)
+        # 没有节点 id 时不缓存（无法判断是否同一节点）
+        if node_id:
+            self._node_exprs[key] = _NodeExpr(src=copy.deepcopy(obj), expr=e)
         return e
 
     # -----------------------
@@ -357,7 +718,11 @@ class SkillAttemptExecutor:
             return None
 
         from rotation_editor.ast import SnapshotPixelSampler
-        sampler = SnapshotPixelSampler(scanner=self._capman.get_scanner(), snapshot=snap_res.snapshot)
+        sampler = SnapshotPixelSampler(
+            scanner=self._capman.get_scanner(),
+            snapshot=snap_res.snapshot,
+            memo=self._capman.atom_memo_for(snap_res.seq),
+        )
 
         try:
             sample = SampleSpec(mode=p.sample.mode, radius=int(p.sample.radius))
@@ -390,259 +755,336 @@ class SkillAttemptExecutor:
         self._store.mark_key_sent_ok(attempt_id)
         return True
 
-    def _wait_lock_then_attempt(
-        self,
-        *,
-        skill,
-        skill_id: str,
-        node_id: str,
-        override_cast_ms: Optional[int],
-        start_expr: Expr,
-        complete_expr: Optional[Expr],
-    ) -> ExecutionResult:
-        timeout = max(1, int(self._cfg.lock.wait_timeout_ms))
-        poll = max(1, int(self._cfg.lock.wait_poll_ms))
-
-        start = mono_ms()
-        while True:
-            if self._stop_evt is not None and self._stop_evt.is_set():
-                return ExecutionResult(outcome="STOPPED", advance="HOLD", next_delay_ms=0, reason="stopped")
-
-            if self._lock.acquire(timeout=0):
-                try:
-                    return self._run_attempt_under_lock(
-                        skill=skill,
-                        skill_id=skill_id,
-                        node_id=node_id,
-                        override_cast_ms=override_cast_ms,
-                        start_expr=start_expr,
-                        complete_expr=complete_expr,
-                    )
-                finally:
-                    try:
-                        self._lock.release()
-                    except Exception:
-                        pass
-
-            now = mono_ms()
-            if now - start >= timeout:
-                return ExecutionResult(outcome="SKIPPED_LOCK_BUSY", advance="HOLD", next_delay_ms=max(10, int(self._cfg.lock.skip_delay_ms)), reason="wait_lock_timeout")
-            _wait_ms(self._stop_evt, poll)
-
-    def _run_attempt_under_lock(
-        self,
-        *,
-        skill,
-        skill_id: str,
-        node_id: str,
-        override_cast_ms: Optional[int],
-        start_expr: Expr,
-        complete_expr: Optional[Expr],
-    ) -> ExecutionResult:
-        readbar_ms = self._readbar_ms(skill, override_cast_ms)
-        start_mode = (self._cfg.start.mode or "pixel").strip().lower()
-
-        attempt_id = self._store.begin_attempt(skill_id=skill_id, node_id=node_id, start_mode=start_mode, readbar_ms=readbar_ms)
-        self._store.set_stage(attempt_id, "PREPARING", message="preparing")
-
-        retries_left = max(0, int(self._cfg.start.max_retries))
-        retry_index = 0
+    def _should_log(self, last_ms: int) -> bool:
+        now = mono_ms()
+        return (now - int(last_ms)) >= max(0, int(self._cfg.sample_log_throttle_ms))
 
-        cast_bar_points_need_baseline = self._extract_cast_bar_changed_points(start_expr)
+    def _poll_schedule(self, *, skill_id: str, signal: str, base_poll_ms: int) -> PollSchedule:
+        """
+        根据 StateStore 中该技能的历史信号延迟构造轮询节奏；样本不足或关闭时退化为固定间隔。
+        """
+        ap = self._cfg.adaptive_poll
+        expect: Optional[Tuple[int, int]] = None
+        if ap.enabled:
+            try:
+                expect = self._store.get_signal_window(
+                    skill_id,
+                    "start" if signal == "start" else "complete",
+                    min_samples=max(1, int(ap.min_samples)),
+                )
+            except Exception:
+                expect = None
+        max_gap = ap.start_max_gap_ms if signal == "start" else ap.complete_max_gap_ms
+        return PollSchedule(
+            base_poll_ms=base_poll_ms,
+            expect=expect,
+            dense_poll_ms=int(ap.dense_poll_ms),
+            max_gap_ms=int(max_gap),
+            margin_ms=int(ap.margin_ms),
+        )
 
-        while True:
-            if self._stop_evt is not None and self._stop_evt.is_set():
-                self._store.finish_stopped(attempt_id, "stopped")
-                return ExecutionResult(outcome="STOPPED", advance="HOLD", next_delay_ms=0, reason="stopped")
+    # -----------------------
+    # Attempt state machine
+    # -----------------------
 
-            # baseline
-            baseline_map: Dict[str, Tuple[int, int, int]] = {}
-            baseline_ok: list[str] = []
-            baseline_fail: list[str] = []
-            if cast_bar_points_need_baseline:
-                for pid in cast_bar_points_need_baseline:
-                    rgb = self._sample_point_rgb_from_snapshot(pid)
-                    if rgb is not None:
-                        baseline_map[pid] = rgb
-                        baseline_ok.append(pid)
-                    else:
-                        baseline_fail.append(pid)
-
-                # 记录 baseline 采样事件
-                self._store.append_attempt_event(
-                    attempt_id,
-                    type="BASELINE_SAMPLED",
-                    message="baseline_sampled",
-                    extra={
-                        "ok": baseline_ok,
-                        "fail": baseline_fail,
-                    },
-                )
+    def _stopped(self) -> bool:
+        return bool(self._stop_evt is not None and self._stop_evt.is_set())
+
+    def _ensure_attempt_plan(self, p: PendingAttempt) -> None:
+        # 等待期间其它轨道可能已把 plan 切到不含本尝试探针的范围；已覆盖时不切换（保住缓存帧）
+        if p.probes is not None:
+            ensure_plan_for_probes(capman=self._capman, probes=p.probes, keep_if_covered=True)
+
+    def _hold_for_lock(self, ticket: LockTicket) -> AttemptStep:
+        # 正常由调用方在锁释放时唤醒；wait_poll_ms 只是兜底重检（不超过凭证到期时刻）
+        delay = max(1, int(self._cfg.lock.wait_poll_ms))
+        if ticket.deadline is not None:
+            delay = min(delay, max(1, int((ticket.deadline - time.perf_counter()) * 1000.0) + 1))
+        res = ExecutionResult(outcome="SKIPPED_LOCK_BUSY", advance="HOLD", next_delay_ms=delay, reason="wait_lock")
+        return AttemptStep(result=res, lock_ticket=ticket)
+
+    def _release_pending(self, p: PendingAttempt) -> None:
+        if not p.lock_held:
+            return
+        p.lock_held = False
+        if self._lock_holder_attempt == p.attempt_id:
+            self._lock_holder_attempt = ""
+        try:
+            self._lock.release()
+        except Exception:
+            pass
 
-            baseline_provider = DictBaselineProvider(baseline_map)
+    def _done(self, p: PendingAttempt, res: ExecutionResult) -> AttemptStep:
+        self._release_pending(p)
+        return AttemptStep(result=res)
 
-            # send key
-            ok_key = self._send_key(skill, attempt_id)
-            if not ok_key:
-                return ExecutionResult(outcome="FAILED", advance="ADVANCE", next_delay_ms=max(10, int(self._cfg.poll_not_ready_ms)), reason="send_key_failed")
+    def _finish_stopped(self, p: PendingAttempt) -> AttemptStep:
+        self._store.finish_stopped(p.attempt_id, "stopped")
+        return self._done(p, ExecutionResult(outcome="STOPPED", advance="HOLD", next_delay_ms=0, reason="stopped"))
 
-            if int(readbar_ms) <= 0:
-                self._store.finish_success(attempt_id)
-                return ExecutionResult(outcome="SUCCESS", advance="ADVANCE", next_delay_ms=max(0, int(self._cfg.default_gap_ms)), reason="instant")
+    def _wait_until(self, p: PendingAttempt, now: int, delay_ms: int) -> AttemptStep:
+        return AttemptStep(pending=p, wake_ms=int(now + max(1, int(delay_ms))))
 
-            self._store.set_stage(attempt_id, "START_WAIT", message="start_wait")
+    def _send_and_start_wait(self, p: PendingAttempt) -> AttemptStep:
+        """
+        PREPARING / RETRY_GAP -> 采 baseline -> 按键 -> START_WAIT（立即做第一次检测）。
+        """
+        if self._stopped():
+            return self._finish_stopped(p)
 
-            started = self._wait_start_signal(
-                attempt_id=attempt_id,
-                start_expr=start_expr,
-                baseline=baseline_provider,
+        # baseline
+        baseline_map: Dict[str, Tuple[int, int, int]] = {}
+        if p.cast_bar_points:
+            self._ensure_attempt_plan(p)
+            baseline_ok: list[str] = []
+            baseline_fail: list[str] = []
+            for pid in p.cast_bar_points:
+                rgb = self._sample_point_rgb_from_snapshot(pid)
+                if rgb is not None:
+                    baseline_map[pid] = rgb
+                    baseline_ok.append(pid)
+                else:
+                    baseline_fail.append(pid)
+
+            # 记录 baseline 采样事件
+            self._store.append_attempt_event(
+                p.attempt_id,
+                type="BASELINE_SAMPLED",
+                message="baseline_sampled",
+                extra={
+                    "ok": baseline_ok,
+                    "fail": baseline_fail,
+                },
             )
+        p.baseline = DictBaselineProvider(baseline_map)
 
-            if started:
-                self._store.mark_cast_started(attempt_id)
-                ok_complete = self._wait_complete(attempt_id=attempt_id, readbar_ms=readbar_ms, complete_expr=complete_expr)
-                if ok_complete:
-                    self._store.finish_success(attempt_id)
-                    return ExecutionResult(outcome="SUCCESS", advance="ADVANCE", next_delay_ms=max(0, int(self._cfg.default_gap_ms)), reason="success")
-                return ExecutionResult(outcome="FAILED", advance="ADVANCE", next_delay_ms=max(10, int(self._cfg.poll_not_ready_ms)), reason="complete_failed")
+        # send key
+        ok_key = self._send_key(p.skill, p.attempt_id)
+        p.key_sent_ms = mono_ms()
+        if not ok_key:
+            return self._done(p, ExecutionResult(outcome="FAILED", advance="ADVANCE", next_delay_ms=max(10, int(self._cfg.poll_not_ready_ms)), reason="send_key_failed"))
 
-            if retries_left > 0:
-                retries_left -= 1
-                retry_index += 1
-                self._store.schedule_retry(attempt_id, retry_index=retry_index, reason="no_cast_start")
-                _wait_ms(self._stop_evt, int(max(0, self._cfg.start.retry_gap_ms)))
-                continue
+        if int(p.readbar_ms) <= 0:
+            self._store.finish_success(p.attempt_id)
+            return self._done(p, ExecutionResult(outcome="SUCCESS", advance="ADVANCE", next_delay_ms=max(0, int(self._cfg.default_gap_ms)), reason="instant"))
 
-            self._store.finish_fail(attempt_id, "no_cast_start")
-            return ExecutionResult(outcome="FAILED", advance="ADVANCE", next_delay_ms=max(10, int(self._cfg.poll_not_ready_ms)), reason="no_cast_start")
-
-    def _should_log(self, last_ms: int) -> bool:
-        now = mono_ms()
-        return (now - int(last_ms)) >= max(0, int(self._cfg.sample_log_throttle_ms))
+        self._store.set_stage(p.attempt_id, "START_WAIT", message="start_wait")
 
-    def _wait_start_signal(
-        self,
-        *,
-        attempt_id: str,
-        start_expr: Expr,
-        baseline: DictBaselineProvider,
-    ) -> bool:
-        timeout_ms = max(1, int(self._cfg.start.timeout_ms))
         poll = max(5, int(self._cfg.start.poll_ms))
-        deadline = mono_ms() + timeout_ms
-
-        last_log_ms = 0
-
-        while mono_ms() < deadline:
-            if self._stop_evt is not None and self._stop_evt.is_set():
-                self._store.finish_stopped(attempt_id, "stopped")
-                return False
+        p.phase = "START_WAIT"
+        p.t0_ms = mono_ms()
+        p.deadline_ms = p.t0_ms + max(1, int(self._cfg.start.timeout_ms))
+        p.sched = self._poll_schedule(skill_id=p.skill_id, signal="start", base_poll_ms=poll)
+        p.polls = 0
+        p.last_log_ms = 0
+        p.miss_frame_ms = p.key_sent_ms
+        return self._poll_start(p)
+
+    def _poll_start(self, p: PendingAttempt) -> AttemptStep:
+        now = mono_ms()
+        if now >= p.deadline_ms:
+            return self._start_timed_out(p)
+        if self._stopped():
+            return self._finish_stopped(p)
+
+        self._ensure_attempt_plan(p)
+        newer_than = p.key_sent_ms if self._cfg.start.require_frame_after_key else None
+        out = eval_expr_with_capture(
+            p.start_expr,
+            profile=self._ctx,
+            capman=self._capman,
+            metrics=self._store,
+            baseline=p.baseline,
+            newer_than_ms=newer_than,
+        )
+        p.polls += 1
+
+        # 节流记录 start_check
+        if self._should_log(p.last_log_ms):
+            p.last_log_ms = mono_ms()
+            self._store.append_attempt_event(
+                p.attempt_id,
+                type="START_CHECK",
+                message="start_check",
+                detail=out.tri.reason or "",
+                extra={
+                    "tri": out.tri.value,
+                    "snapshot_age_ms": int(out.snapshot_age_ms),
+                    "capture_error": out.capture_error,
+                    "capture_detail": out.capture_detail,
+                },
+            )
 
-            out = eval_expr_with_capture(
-                start_expr,
-                profile=self._ctx,
-                capman=self._capman,
-                metrics=self._store,
-                baseline=baseline,
+        if out.tri.value is True:
+            self._store.append_attempt_event(
+                p.attempt_id,
+                type="START_OBSERVED",
+                message="start_observed",
+                extra={"polls": p.polls, "adaptive": p.sched is not None and p.sched.window is not None},
             )
+            self._store.mark_cast_started(p.attempt_id, changed_ms=self._change_ms(p, mono_ms(), out.snapshot_age_ms))
+            return self._enter_complete(p)
 
-            # 节流记录 start_check
-            if self._should_log(last_log_ms):
-                last_log_ms = mono_ms()
-                self._store.append_attempt_event(
-                    attempt_id,
-                    type="START_CHECK",
-                    message="start_check",
-                    detail=out.tri.reason or "",
-                    extra={
-                        "tri": out.tri.value,
-                        "snapshot_age_ms": int(out.snapshot_age_ms),
-                        "capture_error": out.capture_error,
-                        "capture_detail": out.capture_detail,
-                    },
-                )
+        now = mono_ms()
+        p.miss_frame_ms = max(p.miss_frame_ms, now - int(out.snapshot_age_ms))
+        if now >= p.deadline_ms:
+            return self._start_timed_out(p)
+        sched = p.sched
+        delay = sched.next_delay_ms(now - p.t0_ms) if sched is not None else max(5, int(self._cfg.start.poll_ms))
+        return self._wait_until(p, now, min(delay, p.deadline_ms - now))
+
+    @staticmethod
+    def _change_ms(p: PendingAttempt, now_ms: int, snapshot_age_ms: int) -> int:
+        """
+        信号变化时刻的估计：上一次未命中的帧与命中帧之间的中点。
+        """
+        hit = int(now_ms) - max(0, int(snapshot_age_ms))
+        miss = min(int(p.miss_frame_ms), hit)
+        return (miss + hit) // 2
+
+    def _start_timed_out(self, p: PendingAttempt) -> AttemptStep:
+        if p.retries_left > 0:
+            p.retries_left -= 1
+            p.retry_index += 1
+            self._store.schedule_retry(p.attempt_id, retry_index=p.retry_index, reason="no_cast_start")
+            p.phase = "RETRY_GAP"
+            gap = int(max(0, self._cfg.start.retry_gap_ms))
+            if gap <= 0:
+                return self._send_and_start_wait(p)
+            return self._wait_until(p, mono_ms(), gap)
+
+        self._store.finish_fail(p.attempt_id, "no_cast_start")
+        return self._done(p, ExecutionResult(outcome="FAILED", advance="ADVANCE", next_delay_ms=max(10, int(self._cfg.poll_not_ready_ms)), reason="no_cast_start"))
+
+    def _complete_failed(self, p: PendingAttempt) -> AttemptStep:
+        return self._done(p, ExecutionResult(outcome="FAILED", advance="ADVANCE", next_delay_ms=max(10, int(self._cfg.poll_not_ready_ms)), reason="complete_failed"))
+
+    def _predicted_cast_ms(self, p: PendingAttempt) -> int:
+        """
+        开始信号 -> 读条结束 的预测时长：历史完成延迟的高分位（样本足够时），否则读条时长。
+        """
+        ap = self._cfg.adaptive_poll
+        try:
+            w = self._store.get_signal_window(p.skill_id, "complete", min_samples=max(1, int(ap.min_samples)))
+        except Exception:
+            w = None
+        if w is not None:
+            return int(max(0, w[1]))
+        return int(max(0, p.readbar_ms))
+
+    def _queue_at_ms(self, p: PendingAttempt) -> int:
+        return int(p.cast_end_ms - self.queue_window_ms)
+
+    def _finish_assumed(self, p: PendingAttempt) -> AttemptStep:
+        """
+        不依赖完成信号的成功结算；在预测结束时刻之前结算即为预输入：下一节点立即调度。
+        """
+        queued = self.queue_window_ms > 0 and mono_ms() < p.cast_end_ms
+        if queued:
+            self._store.finish_success(p.attempt_id, cast_end_ms=p.cast_end_ms, queued=True)
+            return self._done(p, ExecutionResult(outcome="SUCCESS", advance="ADVANCE", next_delay_ms=0, reason="queued"))
+        self._store.finish_success(p.attempt_id)
+        return self._done(p, ExecutionResult(outcome="SUCCESS", advance="ADVANCE", next_delay_ms=max(0, int(self._cfg.default_gap_ms)), reason="success"))
+
+    def _enter_complete(self, p: PendingAttempt) -> AttemptStep:
+        """
+        CASTING -> COMPLETE_WAIT（按 CompletionPolicy 选择“等满读条”或“检测完成信号”）。
+        """
+        pol = (self._cfg.complete.policy or "ASSUME_SUCCESS").strip().upper()
+        now = mono_ms()
+        p.cast_end_ms = now + self._predicted_cast_ms(p)
 
-            if out.tri.value is True:
-                self._store.append_attempt_event(attempt_id, type="START_OBSERVED", message="start_observed")
-                return True
+        if pol == "ASSUME_SUCCESS" or (p.complete_expr is None and pol == "HYBRID_ASSUME"):
+            msg = "complete_wait_assume" if pol == "ASSUME_SUCCESS" else "complete_wait_no_expr_fallback_assume"
+            self._store.set_stage(p.attempt_id, "COMPLETE_WAIT", message=msg)
+            p.phase = "COMPLETE_ASSUME"
+            return AttemptStep(pending=p, wake_ms=int(max(now, self._queue_at_ms(p))))
 
-            _wait_ms(self._stop_evt, poll)
+        if p.complete_expr is None:
+            self._store.finish_fail(p.attempt_id, "complete_signal_missing")
+            return self._complete_failed(p)
 
-        return False
+        self._store.set_stage(p.attempt_id, "COMPLETE_WAIT", message="complete_wait_signal")
 
-    def _wait_complete(
-        self,
-        *,
-        attempt_id: str,
-        readbar_ms: int,
-        complete_expr: Optional[Expr],
-    ) -> bool:
-        pol = (self._cfg.complete.policy or "ASSUME_SUCCESS").strip().upper()
         poll = max(10, int(self._cfg.complete.poll_ms))
         factor = _float_clamp(float(self._cfg.complete.max_wait_factor), 0.1, 10.0)
-
-        max_wait_ms = int(max(1, int(readbar_ms) * factor))
+        max_wait_ms = int(max(1, int(p.readbar_ms) * factor))
         if max_wait_ms <= 0:
-            max_wait_ms = max(500, int(readbar_ms))
-
-        if pol == "ASSUME_SUCCESS":
-            self._store.set_stage(attempt_id, "COMPLETE_WAIT", message="complete_wait_assume")
-            if _wait_ms(self._stop_evt, int(max(0, readbar_ms))):
-                self._store.finish_stopped(attempt_id, "stopped")
-                return False
-            return True
-
-        if complete_expr is None:
-            if pol == "HYBRID_ASSUME":
-                self._store.set_stage(attempt_id, "COMPLETE_WAIT", message="complete_wait_no_expr_fallback_assume")
-                if _wait_ms(self._stop_evt, int(max(0, readbar_ms))):
-                    self._store.finish_stopped(attempt_id, "stopped")
-                    return False
-                return True
-            self._store.finish_fail(attempt_id, "complete_signal_missing")
-            return False
-
-        self._store.set_stage(attempt_id, "COMPLETE_WAIT", message="complete_wait_signal")
-
-        last_log_ms = 0
-        deadline = mono_ms() + max_wait_ms
-        while mono_ms() < deadline:
-            if self._stop_evt is not None and self._stop_evt.is_set():
-                self._store.finish_stopped(attempt_id, "stopped")
-                return False
-
-            out = eval_expr_with_capture(
-                complete_expr,
-                profile=self._ctx,
-                capman=self._capman,
-                metrics=self._store,
-                baseline=None,
+            max_wait_ms = max(500, int(p.readbar_ms))
+
+        p.phase = "COMPLETE_WAIT"
+        p.t0_ms = now
+        p.deadline_ms = now + max_wait_ms
+        p.sched = self._poll_schedule(skill_id=p.skill_id, signal="complete", base_poll_ms=poll)
+        p.polls = 0
+        p.last_log_ms = 0
+        p.miss_frame_ms = now
+        return self._poll_complete(p)
+
+    def _poll_complete(self, p: PendingAttempt) -> AttemptStep:
+        now = mono_ms()
+        if now >= p.deadline_ms:
+            return self._complete_timed_out(p)
+        if self._stopped():
+            return self._finish_stopped(p)
+
+        self._ensure_attempt_plan(p)
+        out = eval_expr_with_capture(
+            p.complete_expr,  # type: ignore[arg-type]
+            profile=self._ctx,
+            capman=self._capman,
+            metrics=self._store,
+            baseline=None,
+            max_age_ms=self._cfg.complete.snapshot_max_age_ms,
+        )
+        p.polls += 1
+
+        # 节流记录 complete_check
+        if self._should_log(p.last_log_ms):
+            p.last_log_ms = mono_ms()
+            self._store.append_attempt_event(
+                p.attempt_id,
+                type="COMPLETE_CHECK",
+                message="complete_check",
+                detail=out.tri.reason or "",
+                extra={
+                    "tri": out.tri.value,
+                    "snapshot_age_ms": int(out.snapshot_age_ms),
+                    "capture_error": out.capture_error,
+                    "capture_detail": out.capture_detail,
+                },
             )
 
-            # 节流记录 complete_check
-            if self._should_log(last_log_ms):
-                last_log_ms = mono_ms()
-                self._store.append_attempt_event(
-                    attempt_id,
-                    type="COMPLETE_CHECK",
-                    message="complete_check",
-                    detail=out.tri.reason or "",
-                    extra={
-                        "tri": out.tri.value,
-                        "snapshot_age_ms": int(out.snapshot_age_ms),
-                        "capture_error": out.capture_error,
-                        "capture_detail": out.capture_detail,
-                    },
-                )
-
-            if out.tri.value is True:
-                self._store.append_attempt_event(attempt_id, type="COMPLETE_OBSERVED", message="complete_observed")
-                return True
-
-            _wait_ms(self._stop_evt, poll)
+        if out.tri.value is True:
+            self._store.mark_complete_observed(
+                p.attempt_id,
+                changed_ms=self._change_ms(p, mono_ms(), out.snapshot_age_ms),
+                extra={"polls": p.polls, "adaptive": p.sched is not None and p.sched.window is not None},
+            )
+            self._store.finish_success(p.attempt_id)
+            return self._done(p, ExecutionResult(outcome="SUCCESS", advance="ADVANCE", next_delay_ms=max(0, int(self._cfg.default_gap_ms)), reason="success"))
 
+        now = mono_ms()
+        p.miss_frame_ms = max(p.miss_frame_ms, now - int(out.snapshot_age_ms))
+        if now >= p.deadline_ms:
+            return self._complete_timed_out(p)
+
+        # HYBRID_ASSUME 超时本就按成功结算：预输入窗口内直接提前结算
+        queue = self.queue_window_ms > 0 and (self._cfg.complete.policy or "").strip().upper() == "HYBRID_ASSUME"
+        if queue and now >= self._queue_at_ms(p):
+            return self._finish_assumed(p)
+
+        sched = p.sched
+        delay = sched.next_delay_ms(now - p.t0_ms) if sched is not None else max(10, int(self._cfg.complete.poll_ms))
+        delay = min(delay, p.deadline_ms - now)
+        if queue:
+            delay = min(delay, self._queue_at_ms(p) - now)
+        return self._wait_until(p, now, delay)
+
+    def _complete_timed_out(self, p: PendingAttempt) -> AttemptStep:
+        pol = (self._cfg.complete.policy or "ASSUME_SUCCESS").strip().upper()
         if pol == "HYBRID_ASSUME":
-            return True
-
-        self._store.finish_fail(attempt_id, "timeout")
-        return False
\ No newline at end of file
+            self._store.finish_success(p.attempt_id)
+            return self._done(p, ExecutionResult(outcome="SUCCESS", advance="ADVANCE", next_delay_ms=max(0, int(self._cfg.default_gap_ms)), reason="success"))
+        self._store.finish_fail(p.attempt_id, "timeout")
+        return self._complete_failed(p)
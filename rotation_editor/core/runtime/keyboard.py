@@ -1,11 +1,9 @@
 # rotation_editor/core/runtime/keyboard.py
 from __future__ import annotations
 
-from typing import Protocol, Optional, Dict
+from typing import Any, Iterable, List, Protocol, Optional, Dict
 import logging
 
-from pynput import keyboard
-
 log = logging.getLogger(__name__)
 
 
@@ -14,6 +12,9 @@ class KeySender(Protocol):
     抽象的键盘发送接口：
     - 目前只定义 send_key(key: str)
     - 便于后续替换为其他输入库或做单元测试 mock
+
+    可选 prepare(keys) -> List[str]：引擎启动预热时预先解析将要发送的键（首次发键不再做解析），
+    返回无法发送的键。未实现时引擎跳过这一步。
     """
 
     def send_key(self, key: str) -> None: ...
@@ -30,35 +31,55 @@ class PynputKeySender:
     """
 
     def __init__(self) -> None:
-        self._ctl = keyboard.Controller()
+        from pynput import keyboard
 
-    def send_key(self, key: str) -> None:
-        ks = (key or "").strip().lower()
-        if not ks:
-            return
+        self._ctl = keyboard.Controller()
+        # 键名 -> pynput 可按下的对象（None 表示不支持）；prepare 时预填
+        self._resolved: Dict[str, Any] = {}
 
+    @staticmethod
+    def _resolve(ks: str) -> Any:
         # F1..F12
         if ks.startswith("f") and ks[1:].isdigit():
-            try:
-                n = int(ks[1:])
-            except ValueError:
-                return
-            try:
-                k = getattr(keyboard.Key, f"f{n}")
-            except AttributeError:
-                return
-            self._ctl.press(k)
-            self._ctl.release(k)
-            return
+            from pynput import keyboard
+
+            return getattr(keyboard.Key, f"f{int(ks[1:])}", None)
 
         # 单字符
         if len(ks) == 1:
-            self._ctl.press(ks)
-            self._ctl.release(ks)
-            return
+            return ks
 
         # 其他未处理情况：暂时忽略
-        return
+        return None
+
+    def _key_obj(self, ks: str) -> Any:
+        try:
+            return self._resolved[ks]
+        except KeyError:
+            k = self._resolve(ks)
+            self._resolved[ks] = k
+            return k
+
+    def prepare(self, keys: Iterable[str]) -> List[str]:
+        """
+        预先解析 keys，返回不支持的键。
+        """
+        bad: List[str] = []
+        for key in keys:
+            ks = (key or "").strip().lower()
+            if ks and self._key_obj(ks) is None:
+                bad.append(key)
+        return bad
+
+    def send_key(self, key: str) -> None:
+        ks = (key or "").strip().lower()
+        if not ks:
+            return
+        k = self._key_obj(ks)
+        if k is None:
+            return
+        self._ctl.press(k)
+        self._ctl.release(k)
 
 
 # -----------------------------
@@ -282,6 +303,15 @@ class HidDllKeySender:
             return None
         return self._HID_KEYCODES.get(ks)
 
+    def prepare(self, keys: Iterable[str]) -> List[str]:
+        """
+        检查 keys 是否都有 HID 键码（未映射的键在启动时告警一次，而不是每次发键时），返回未映射的键。
+        """
+        bad = [k for k in keys if (k or "").strip() and self._key_to_hid(k) is None]
+        if bad:
+            log.warning("HidDllKeySender: 未映射的键 %s，发送时将被忽略", ", ".join(bad))
+        return bad
+
     def send_key(self, key: str) -> None:
         """
         发送一次“按下+松开”：
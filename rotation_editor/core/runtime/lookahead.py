@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from rotation_editor.core.models import SkillNode
+from rotation_editor.ast import Expr, ProbeRequirements, TriBool, collect_probes_from_expr
+
+from .runtime_state import GlobalRuntimeState, ModeRuntimeState
+from .scheduler import ScheduleItem
+
+
+@dataclass(frozen=True)
+class LookaheadConfig:
+    enabled: bool = True
+
+    # 每条到期轨道向前看的节点数（含当前节点）
+    window: int = 3
+
+    # 按冷却预测就绪时刻时，单次最多睡多久（预测只是估计，像素判断才是准的）
+    max_predicted_sleep_ms: int = 250
+
+
+@dataclass
+class TrackLookahead:
+    """
+    一条到期轨道的预取结果：
+
+    - skip    : 落点之前需要跳过的未就绪技能节点 [(node_index, node, reason), ...]
+    - runnable: 跳过 skip 之后的当前节点可以直接交给执行器（技能已就绪 / 网关等非技能节点 /
+                技能缺失或禁用，由执行器给出相应结果）
+    - wake_ms : runnable=False 时，窗口内技能按冷却预测的最早就绪时刻（无法预测为 None）
+    """
+    item: ScheduleItem
+    skip: List[Tuple[int, Any, str]] = field(default_factory=list)
+    runnable: bool = False
+    wake_ms: Optional[int] = None
+
+
+class ReadinessPrefetcher:
+    """
+    跨轨道的就绪预取：
+
+    - 对所有到期轨道，各取当前节点起的 window 个候选节点
+    - 把这些技能节点的 ready 表达式放在同一帧 snapshot 上一次性求值（evaluate_batch）
+    - 每条轨道：跳过窗口内未就绪的技能，停在第一个可执行节点；窗口内都未就绪则整体跳过，
+      并给出按冷却预测的最早就绪时刻
+
+    依赖以回调注入，便于测试：
+    - ready_expr_for(skill_id) -> Expr | None（None 表示交给执行器处理）
+    - node_probes(node) -> ProbeRequirements（节点执行时需要的全部 probes；plan 按并集构建，
+      这样落点节点交给执行器时不必再切换 plan）
+    - evaluate_batch(exprs, probes) -> [TriBool]（按 probes 准备 plan 后在同一帧求值）
+    - predict_ready_ms(skill_id) -> int | None（冷却预测）
+    """
+
+    def __init__(
+        self,
+        *,
+        cfg: LookaheadConfig,
+        ready_expr_for: Callable[[str], Optional[Expr]],
+        evaluate_batch: Callable[[Sequence[Expr], ProbeRequirements], List[TriBool]],
+        node_probes: Optional[Callable[[SkillNode], ProbeRequirements]] = None,
+        predict_ready_ms: Optional[Callable[[str], Optional[int]]] = None,
+    ) -> None:
+        self._cfg = cfg
+        self._ready_expr_for = ready_expr_for
+        self._node_probes = node_probes
+        self._evaluate_batch = evaluate_batch
+        self._predict = predict_ready_ms
+
+    @property
+    def config(self) -> LookaheadConfig:
+        return self._cfg
+
+    def _window(
+        self,
+        item: ScheduleItem,
+        *,
+        global_rt: GlobalRuntimeState,
+        mode_rt: Optional[ModeRuntimeState],
+    ) -> List[Tuple[int, Any]]:
+        n = max(1, int(self._cfg.window))
+        if item.scope == "global":
+            rt = global_rt.get(item.track_id)
+            return rt.peek(n) if rt is not None else []
+        if mode_rt is None:
+            return []
+        rt2 = mode_rt.tracks.get(item.track_id)
+        return rt2.peek(n) if rt2 is not None else []
+
+    def prefetch(
+        self,
+        items: Sequence[ScheduleItem],
+        *,
+        global_rt: GlobalRuntimeState,
+        mode_rt: Optional[ModeRuntimeState],
+        now_ms: int,
+    ) -> List[TrackLookahead]:
+        # 1) 收集每条轨道窗口内需要判断的 ready 表达式（遇到非技能节点即停止）
+        windows: List[List[Tuple[int, Any, Optional[int]]]] = []
+        exprs: List[Expr] = []
+        slot_of: Dict[Expr, int] = {}
+        probes = ProbeRequirements()
+
+        for item in items:
+            win: List[Tuple[int, Any, Optional[int]]] = []
+            for idx, node in self._window(item, global_rt=global_rt, mode_rt=mode_rt):
+                if not isinstance(node, SkillNode):
+                    win.append((idx, node, None))
+                    break
+                e = self._ready_expr_for((node.skill_id or "").strip())
+                if e is None:
+                    win.append((idx, node, None))
+                    break
+                slot = slot_of.get(e)
+                if slot is None:
+                    slot = len(exprs)
+                    slot_of[e] = slot
+                    exprs.append(e)
+                probes.merge(self._probes_for(node, e))
+                win.append((idx, node, slot))
+            windows.append(win)
+
+        # 2) 同一帧上批量求值
+        tris: List[TriBool] = list(self._evaluate_batch(exprs, probes)) if exprs else []
+
+        # 3) 逐轨道决定落点
+        out: List[TrackLookahead] = []
+        for item, win in zip(items, windows):
+            look = TrackLookahead(item=item)
+            if not win:
+                # 轨道为空/已结束：交给引擎原有逻辑处理
+                look.runnable = True
+                out.append(look)
+                continue
+
+            no_prediction = False
+            wake: Optional[int] = None
+            for idx, node, slot in win:
+                if slot is None:
+                    look.runnable = True
+                    break
+                tri = tris[slot]
+                if tri.value is True:
+                    look.runnable = True
+                    break
+                reason = "not_ready" if tri.value is False else (tri.reason or "ready_unknown")
+                look.skip.append((idx, node, reason))
+
+                pred = self._predict_for(node, now_ms=now_ms)
+                if pred is None:
+                    no_prediction = True
+                else:
+                    wake = pred if wake is None else min(wake, pred)
+
+            if not look.runnable and not no_prediction:
+                look.wake_ms = wake
+            out.append(look)
+        return out
+
+    def _probes_for(self, node: SkillNode, ready_expr: Expr) -> ProbeRequirements:
+        if self._node_probes is not None:
+            try:
+                return self._node_probes(node)
+            except Exception:
+                pass
+        return collect_probes_from_expr(ready_expr)
+
+    def _predict_for(self, node: SkillNode, *, now_ms: int) -> Optional[int]:
+        if self._predict is None:
+            return None
+        try:
+            t = self._predict((node.skill_id or "").strip())
+        except Exception:
+            return None
+        if t is None or int(t) <= int(now_ms):
+            return None
+        return int(t)
+
+    def idle_delay_ms(self, look: TrackLookahead, *, now_ms: int, poll_not_ready_ms: int) -> int:
+        """
+        窗口内全部未就绪时，轨道下一次检查的延迟：
+        - 有冷却预测：睡到预测时刻（至少 10ms，至多 max_predicted_sleep_ms）
+        - 否则：与单节点 SKIPPED_NOT_READY 相同，poll_not_ready_ms
+        """
+        base = max(10, int(poll_not_ready_ms))
+        if look.wake_ms is None:
+            return base
+        d = int(look.wake_ms) - int(now_ms)
+        cap = max(base, int(self._cfg.max_predicted_sleep_ms))
+        return max(10, min(cap, d))
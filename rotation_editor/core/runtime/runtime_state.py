@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 from rotation_editor.core.models import RotationPreset, Track
 
@@ -50,6 +50,22 @@ class GlobalTrackRuntime:
         if self.index >= len(self.track.nodes):
             self.index = 0
 
+    def peek(self, n: int) -> List[Tuple[int, Any]]:
+        """
+        从当前节点起（含当前）向后看最多 n 个节点（循环轨道，最多看一整圈）。
+        返回 [(node_index, node), ...]
+        """
+        nodes = self.track.nodes
+        if not nodes:
+            return []
+        start = self.current_node_index()
+        cnt = max(0, min(int(n), len(nodes)))
+        out: List[Tuple[int, Any]] = []
+        for k in range(cnt):
+            i = (start + k) % len(nodes)
+            out.append((i, nodes[i]))
+        return out
+
     def jump_to_node_id(self, node_id: str) -> bool:
         nid = (node_id or "").strip()
         if not nid or not self.track.nodes:
@@ -106,6 +122,28 @@ class ModeTrackRuntime:
     def reset(self) -> None:
         self.pos = 0
 
+    def peek(self, n: int) -> List[Tuple[int, Any]]:
+        """
+        从当前节点起（含当前）向后看最多 n 个节点，只看与当前节点同一 step 的节点
+        （跨 step 需要等其它轨道同步，不能提前判断）。
+        返回 [(node_index, node), ...]
+        """
+        if self.done() or not self.track.nodes:
+            return []
+        step = self.current_step()
+        out: List[Tuple[int, Any]] = []
+        p = self.pos
+        while p < len(self.order) and len(out) < int(n):
+            idx = int(self.order[p])
+            if idx < 0 or idx >= len(self.track.nodes):
+                break
+            node = self.track.nodes[idx]
+            if node_step(node) != step:
+                break
+            out.append((idx, node))
+            p += 1
+        return out
+
     def jump_to_node_id(self, node_id: str) -> bool:
         nid = (node_id or "").strip()
         if not nid or not self.track.nodes or not self.order:
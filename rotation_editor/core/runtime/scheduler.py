@@ -19,13 +19,16 @@ class Scheduler:
     - global 优先于 mode（同 due_ms 时）
     - mode 只在 eligible step 下运行
     """
-    def choose_next(
+    def due_items(
         self,
         *,
         now_ms: int,
         global_rt: GlobalRuntimeState,
         mode_rt: Optional[ModeRuntimeState],
-    ) -> Optional[ScheduleItem]:
+    ) -> List[ScheduleItem]:
+        """
+        所有已到期的轨道，按 choose_next 的优先顺序排列（供 lookahead 批量预取）。
+        """
         candidates: List[Tuple[int, int, str, str]] = []
         # tuple: (due, priority, scope, track_id) priority: global=0, mode=1
 
@@ -37,12 +40,18 @@ class Scheduler:
             for due, tid in mode_rt.ready_candidates(now_ms):
                 candidates.append((int(due), 1, "mode", tid))
 
-        if not candidates:
-            return None
-
         candidates.sort(key=lambda x: (x[0], x[1]))
-        due, _prio, scope, tid = candidates[0]
-        return ScheduleItem(scope=scope, track_id=tid, due_ms=int(due))
+        return [ScheduleItem(scope=scope, track_id=tid, due_ms=int(due)) for due, _prio, scope, tid in candidates]
+
+    def choose_next(
+        self,
+        *,
+        now_ms: int,
+        global_rt: GlobalRuntimeState,
+        mode_rt: Optional[ModeRuntimeState],
+    ) -> Optional[ScheduleItem]:
+        items = self.due_items(now_ms=now_ms, global_rt=global_rt, mode_rt=mode_rt)
+        return items[0] if items else None
 
     def next_wakeup_ms(
         self,
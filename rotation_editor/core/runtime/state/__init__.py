@@ -10,10 +10,13 @@ from .events import (
     CaptureEventType,
 )
 from .metrics import SkillMetric
+from .telemetry import TelemetryRecorder, TelemetryRun, TelemetryStats, load_telemetry
 from .store import (
     EngineState,
     AttemptStage,
     AttemptState,
+    InputGapStats,
+    LatencyStats,
     SkillAggregateState,
     StateStore,
 )
@@ -30,6 +33,12 @@ __all__ = [
     "EngineState",
     "AttemptStage",
     "AttemptState",
+    "InputGapStats",
+    "LatencyStats",
     "SkillAggregateState",
     "StateStore",
+    "TelemetryRecorder",
+    "TelemetryRun",
+    "TelemetryStats",
+    "load_telemetry",
 ]
\ No newline at end of file
@@ -8,6 +8,7 @@ log = logging.getLogger(__name__)
 
 EngineEventType = Literal[
     "ENGINE_STARTED",
+    "ENGINE_WARMED",
     "ENGINE_STOPPING",
     "ENGINE_STOPPED",
     "ENGINE_PAUSED",
@@ -43,6 +44,8 @@ CaptureEventType = Literal[
     "CAPTURE_PLAN_UPDATED",
     "CAPTURE_OK",
     "CAPTURE_ERROR",
+    "CAPTURE_RECOVERED",
+    "CAPTURE_SUMMARY",
 ]
 
 
@@ -84,7 +87,7 @@ Event = EngineEvent | AttemptEvent | CaptureEvent
 class EventBus:
     """
     最小可用事件总线：
-    - subscribe(fn) 注册回调（fn(event)）
+    - subscribe(fn) 注册回调（fn(event)）；unsubscribe(fn) 取消
     - publish(event) 逐个调用，吞异常
     """
     def __init__(self) -> None:
@@ -95,6 +98,12 @@ class EventBus:
             return
         self._subs.append(fn)
 
+    def unsubscribe(self, fn: Callable[[Event], None]) -> None:
+        try:
+            self._subs.remove(fn)
+        except ValueError:
+            pass
+
     def publish(self, event: Event) -> None:
         for fn in list(self._subs):
             try:
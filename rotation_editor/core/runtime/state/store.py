@@ -3,8 +3,9 @@ from __future__ import annotations
 import threading
 import uuid
 import time
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Literal
+from typing import Any, Callable, Deque, Dict, List, Optional, Literal, Tuple
 
 from core.profiles import ProfileContext
 
@@ -16,6 +17,8 @@ def mono_ms() -> int:
     return int(time.monotonic() * 1000)
 
 
+SignalKind = Literal["start", "complete"]
+
 AttemptStage = Literal[
     "IDLE",
     "READY_CHECK",
@@ -40,6 +43,12 @@ class EngineState:
     last_error: str = ""
     last_error_detail: str = ""
 
+    # 启动耗时：requested_ms 为 start() 被调用的时刻；warmup_ms 为预热阶段耗时；
+    # first_key_ms 为 requested_ms -> 第一次发键成功 的耗时（尚未发键为 None）
+    requested_ms: int = 0
+    warmup_ms: int = 0
+    first_key_ms: Optional[int] = None
+
 
 @dataclass
 class AttemptState:
@@ -50,6 +59,8 @@ class AttemptState:
     readbar_ms: int
 
     created_ms: int
+    # 发起尝试的轨道（如 "global:t1"），施法间隔按轨道结算
+    lane: str = ""
     stage: AttemptStage = "PREPARING"
     stage_since_ms: int = 0
 
@@ -58,6 +69,10 @@ class AttemptState:
 
     casting_ms: Optional[int] = None
     ended_ms: Optional[int] = None
+    # 最近一次按键发送成功的时刻（重试时更新），用于统计 按键->开始 延迟
+    key_sent_ms: Optional[int] = None
+    # 开始信号的估计变化时刻（检测时刻与上一次未命中之间插值），用于统计 开始->完成 延迟
+    cast_change_ms: Optional[int] = None
 
     result: str = ""          # "success" | "failed" | "stopped" | ""
     fail_reason: str = ""
@@ -70,6 +85,63 @@ class AttemptState:
         return max(0, now - s) if s > 0 else 0
 
 
+@dataclass
+class LatencyStats:
+    """
+    最近若干次观测到的信号延迟（毫秒），用于预测下一次信号出现的时间窗口。
+    """
+    samples: Deque[int] = field(default_factory=lambda: deque(maxlen=32))
+
+    def add(self, ms: int) -> None:
+        self.samples.append(int(max(0, ms)))
+
+    def window(self, *, min_samples: int = 5, lo_q: float = 0.1, hi_q: float = 0.9) -> Optional[Tuple[int, int]]:
+        """
+        返回 (lo, hi) 分位数窗口；样本不足时返回 None。
+        """
+        n = len(self.samples)
+        if n <= 0 or n < int(min_samples):
+            return None
+        xs = sorted(self.samples)
+        lo = xs[min(n - 1, int(lo_q * (n - 1)))]
+        hi = xs[min(n - 1, int(round(hi_q * (n - 1))))]
+        return int(lo), int(hi)
+
+
+@dataclass
+class InputGapStats:
+    """
+    上一次施法结束 -> 下一次按键发送成功 的间隔（毫秒，可为负：预输入在读条结束前就已发出）。
+    """
+    count: int = 0
+    queued: int = 0
+    total_ms: int = 0
+    min_ms: Optional[int] = None
+    max_ms: Optional[int] = None
+    recent: Deque[int] = field(default_factory=lambda: deque(maxlen=64))
+
+    def add(self, gap_ms: int, *, queued: bool) -> None:
+        g = int(gap_ms)
+        self.count += 1
+        if queued:
+            self.queued += 1
+        self.total_ms += g
+        self.min_ms = g if self.min_ms is None else min(self.min_ms, g)
+        self.max_ms = g if self.max_ms is None else max(self.max_ms, g)
+        self.recent.append(g)
+
+    def to_dict(self) -> Dict[str, Any]:
+        xs = sorted(self.recent)
+        return {
+            "count": int(self.count),
+            "queued": int(self.queued),
+            "mean_ms": (self.total_ms / self.count) if self.count > 0 else 0.0,
+            "min_ms": self.min_ms,
+            "max_ms": self.max_ms,
+            "recent_p50_ms": xs[len(xs) // 2] if xs else None,
+        }
+
+
 @dataclass
 class SkillAggregateState:
     skill_id: str
@@ -89,6 +161,13 @@ class SkillAggregateState:
     current_attempt_id: str = ""
     recent_attempt_ids: List[str] = field(default_factory=list)
 
+    # 按键 -> 开始信号 / 开始 -> 完成信号 的观测延迟
+    start_latency: LatencyStats = field(default_factory=LatencyStats)
+    complete_latency: LatencyStats = field(default_factory=LatencyStats)
+
+    # 最近一次开始施法（CASTING_BEGIN；无开始信号时为 SUCCESS）的时刻，用于冷却就绪预测
+    last_cast_ms: Optional[int] = None
+
 
 class StateStore:
     def __init__(
@@ -104,10 +183,21 @@ class StateStore:
         self._engine = EngineState()
         self._skills: Dict[str, SkillAggregateState] = {}
         self._attempts: Dict[str, AttemptState] = {}
+        # 最近一次 CAPTURE_SUMMARY 的内容（UI 查询）
+        self._capture_health: Dict[str, Any] = {}
+
+        # 施法间隔统计：每条轨道最近一次成功施法的（预测）结束时刻与是否排队，
+        # 该轨道下一次按键时结算成一个间隔样本；其它轨道的失败/停止不影响它
+        self._input_gap = InputGapStats()
+        self._last_cast_end: Dict[str, Tuple[int, bool]] = {}
 
         self._max_recent_attempts = int(max(10, max_recent_attempts_per_skill))
         self._max_events_per_attempt = int(max(50, max_events_per_attempt))
 
+        # 变化通知：任何可见状态变化都让版本号 +1，并以新版本号回调监听者
+        self._version = 0
+        self._change_listeners: Tuple[Callable[[int], None], ...] = ()
+
     @property
     def bus(self) -> EventBus:
         return self._bus
@@ -117,12 +207,50 @@ class StateStore:
             self._bus.publish(ev)
         except Exception:
             pass
+        self._changed()
+
+    # -------------------------
+    # 变化通知（UI 推送刷新）
+    # -------------------------
+
+    def version(self) -> int:
+        """
+        状态版本号：每次可见状态变化 +1。UI 可据此跳过“没有变化”的重绘。
+        """
+        with self._lock:
+            return self._version
+
+    def add_change_listener(self, fn: Callable[[int], None]) -> None:
+        """
+        注册变化监听：fn(version) 在发生变化的线程（通常是引擎线程）上同步调用，
+        必须很快返回；需要刷新 UI 的请自行转发并合并（如 QtDispatcher.call_coalesced）。
+        """
+        if fn is None:
+            return
+        with self._lock:
+            if fn not in self._change_listeners:
+                self._change_listeners = self._change_listeners + (fn,)
+
+    def remove_change_listener(self, fn: Callable[[int], None]) -> None:
+        with self._lock:
+            self._change_listeners = tuple(f for f in self._change_listeners if f != fn)
+
+    def _changed(self) -> None:
+        with self._lock:
+            self._version += 1
+            v = self._version
+            listeners = self._change_listeners
+        for fn in listeners:
+            try:
+                fn(v)
+            except Exception:
+                pass
 
     # -------------------------
     # Engine state
     # -------------------------
 
-    def engine_started(self, preset_id: str) -> None:
+    def engine_started(self, preset_id: str, *, requested_ms: Optional[int] = None) -> None:
         now = mono_ms()
         with self._lock:
             self._engine.running = True
@@ -132,8 +260,27 @@ class StateStore:
             self._engine.stop_reason = ""
             self._engine.last_error = ""
             self._engine.last_error_detail = ""
+            self._engine.requested_ms = now if requested_ms is None else int(requested_ms)
+            self._engine.warmup_ms = 0
+            self._engine.first_key_ms = None
+            self._input_gap = InputGapStats()
+            self._last_cast_end.clear()
         self._publish(EngineEvent(t_ms=now, type="ENGINE_STARTED", preset_id=preset_id))
 
+    def engine_warmed(self, warmup_ms: int, *, extra: Optional[Dict[str, Any]] = None) -> None:
+        """
+        预热阶段结束（extra 为各步骤耗时 / 结果明细）。
+        """
+        now = mono_ms()
+        with self._lock:
+            self._engine.warmup_ms = int(max(0, warmup_ms))
+        self._publish(EngineEvent(
+            t_ms=now,
+            type="ENGINE_WARMED",
+            preset_id=self._engine.preset_id,
+            extra={"warmup_ms": int(max(0, warmup_ms)), **(extra or {})},
+        ))
+
     def engine_stopping(self, reason: str) -> None:
         now = mono_ms()
         with self._lock:
@@ -178,6 +325,8 @@ class StateStore:
                 "stop_reason": e.stop_reason,
                 "last_error": e.last_error,
                 "last_error_detail": e.last_error_detail,
+                "warmup_ms": int(e.warmup_ms),
+                "time_to_first_key_ms": e.first_key_ms,
             }
 
     # -------------------------
@@ -199,6 +348,7 @@ class StateStore:
         with self._lock:
             st = self._ensure_skill(sid)
             st.node_exec += 1
+        self._changed()
         # 这里不强制写 attempt event（poll 频率高），由执行器自行决定是否写 START/COMPLETE_CHECK 等
 
     def mark_ready_false(self, skill_id: str, *, node_id: str = "", reason: str = "") -> None:
@@ -244,6 +394,7 @@ class StateStore:
         node_id: str,
         start_mode: str,
         readbar_ms: int,
+        lane: str = "",
     ) -> str:
         now = mono_ms()
         sid = (skill_id or "").strip()
@@ -256,6 +407,7 @@ class StateStore:
             start_mode=(start_mode or ""),
             readbar_ms=int(readbar_ms),
             created_ms=now,
+            lane=(lane or ""),
             stage="PREPARING",
             stage_since_ms=now,
         )
@@ -375,10 +527,23 @@ class StateStore:
             if at is None:
                 return
             at.key_sent_ok += 1
+            at.key_sent_ms = now
             st = self._ensure_skill(at.skill_id)
             st.key_sent_ok += 1
 
-            ev = AttemptEvent(t_ms=now, type="SEND_KEY_OK", attempt_id=aid, skill_id=at.skill_id, node_id=at.node_id)
+            extra: Dict[str, Any] = {}
+            prev = self._last_cast_end.pop(at.lane, None)
+            if prev is not None:
+                end_ms, was_queued = prev
+                gap = now - int(end_ms)
+                self._input_gap.add(gap, queued=was_queued)
+                extra = {"input_gap_ms": int(gap), "queued": bool(was_queued)}
+
+            if self._engine.running and self._engine.first_key_ms is None:
+                self._engine.first_key_ms = max(0, now - int(self._engine.requested_ms))
+                extra["time_to_first_key_ms"] = int(self._engine.first_key_ms)
+
+            ev = AttemptEvent(t_ms=now, type="SEND_KEY_OK", attempt_id=aid, skill_id=at.skill_id, node_id=at.node_id, extra=extra or None)
             at.events.append(ev)
             self._trim_events_locked(at)
 
@@ -407,8 +572,19 @@ class StateStore:
 
         self._publish(ev)
 
-    def mark_cast_started(self, attempt_id: str, *, extra: Optional[Dict[str, Any]] = None) -> None:
+    def mark_cast_started(
+        self,
+        attempt_id: str,
+        *,
+        changed_ms: Optional[int] = None,
+        extra: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        记录进入 CASTING；changed_ms 为信号的估计变化时刻（默认取当前时刻），
+        按键 -> 开始 延迟按它统计，而不是按检测到的时刻（后者偏晚最多一个轮询间隔）。
+        """
         now = mono_ms()
+        change = now if changed_ms is None else min(now, int(changed_ms))
         aid = (attempt_id or "").strip()
         if not aid:
             return
@@ -421,6 +597,10 @@ class StateStore:
             at.casting_ms = now
             st = self._ensure_skill(at.skill_id)
             st.cast_started += 1
+            st.last_cast_ms = now
+            at.cast_change_ms = change
+            if at.key_sent_ms is not None:
+                st.start_latency.add(change - int(at.key_sent_ms))
 
             ev = AttemptEvent(
                 t_ms=now,
@@ -435,6 +615,74 @@ class StateStore:
 
         self._publish(ev)
 
+    def mark_complete_observed(
+        self,
+        attempt_id: str,
+        *,
+        changed_ms: Optional[int] = None,
+        extra: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        记录完成信号被观测到（COMPLETE_OBSERVED），并统计 开始 -> 完成 延迟
+        （两端都用估计的信号变化时刻；changed_ms 默认取当前时刻）。
+        """
+        now = mono_ms()
+        change = now if changed_ms is None else min(now, int(changed_ms))
+        aid = (attempt_id or "").strip()
+        if not aid:
+            return
+        with self._lock:
+            at = self._attempts.get(aid)
+            if at is None:
+                return
+            began = at.cast_change_ms if at.cast_change_ms is not None else at.casting_ms
+            if began is not None:
+                st = self._ensure_skill(at.skill_id)
+                st.complete_latency.add(change - int(began))
+
+            ev = AttemptEvent(
+                t_ms=now,
+                type="COMPLETE_OBSERVED",
+                attempt_id=aid,
+                skill_id=at.skill_id,
+                node_id=at.node_id,
+                message="complete_observed",
+                extra=extra or {},
+            )
+            at.events.append(ev)
+            self._trim_events_locked(at)
+        self._publish(ev)
+
+    def get_signal_window(
+        self,
+        skill_id: str,
+        signal: SignalKind,
+        *,
+        min_samples: int = 5,
+    ) -> Optional[Tuple[int, int]]:
+        """
+        返回某技能 开始(start) / 完成(complete) 信号的预期出现窗口 (lo_ms, hi_ms)：
+        - start   ：相对按键发送成功的时刻
+        - complete：相对开始信号（CASTING_BEGIN）的时刻
+        样本不足时返回 None。
+        """
+        sid = (skill_id or "").strip()
+        with self._lock:
+            st = self._skills.get(sid)
+            if st is None:
+                return None
+            stats = st.start_latency if signal == "start" else st.complete_latency
+            return stats.window(min_samples=min_samples)
+
+    def get_last_cast_ms(self, skill_id: str) -> Optional[int]:
+        """
+        某技能最近一次开始施法的时刻（mono_ms）；从未施放返回 None。
+        """
+        sid = (skill_id or "").strip()
+        with self._lock:
+            st = self._skills.get(sid)
+            return None if st is None else st.last_cast_ms
+
     def schedule_retry(self, attempt_id: str, *, retry_index: int, reason: str = "") -> None:
         now = mono_ms()
         aid = (attempt_id or "").strip()
@@ -458,7 +706,11 @@ class StateStore:
             self._trim_events_locked(at)
         self._publish(ev)
 
-    def finish_success(self, attempt_id: str) -> None:
+    def finish_success(self, attempt_id: str, *, cast_end_ms: Optional[int] = None, queued: bool = False) -> None:
+        """
+        cast_end_ms：预测的读条结束时刻（预输入提前结算时晚于现在）；None 表示现在即结束。
+        queued：本次结算是否为预输入（在读条结束前提前放行下一节点）。
+        """
         now = mono_ms()
         aid = (attempt_id or "").strip()
         if not aid:
@@ -475,10 +727,16 @@ class StateStore:
 
             st = self._ensure_skill(at.skill_id)
             st.success += 1
+            if at.casting_ms is None:
+                st.last_cast_ms = int(at.key_sent_ms) if at.key_sent_ms is not None else now
             if st.current_attempt_id == aid:
                 st.current_attempt_id = ""
 
-            ev = AttemptEvent(t_ms=now, type="ATTEMPT_SUCCESS", attempt_id=aid, skill_id=at.skill_id, node_id=at.node_id)
+            end_ms = int(cast_end_ms) if cast_end_ms is not None else now
+            self._last_cast_end[at.lane] = (end_ms, bool(queued))
+
+            extra: Dict[str, Any] = {"queued": True, "cast_end_ms": end_ms} if queued else {}
+            ev = AttemptEvent(t_ms=now, type="ATTEMPT_SUCCESS", attempt_id=aid, skill_id=at.skill_id, node_id=at.node_id, extra=extra or None)
             at.events.append(ev)
             self._trim_events_locked(at)
         self._publish(ev)
@@ -499,6 +757,7 @@ class StateStore:
             at.ended_ms = now
             at.result = "failed"
             at.fail_reason = r
+            self._last_cast_end.pop(at.lane, None)
 
             st = self._ensure_skill(at.skill_id)
             st.fail += 1
@@ -532,6 +791,7 @@ class StateStore:
             at.ended_ms = now
             at.result = "stopped"
             at.fail_reason = (reason or "stopped")
+            self._last_cast_end.pop(at.lane, None)
 
             st = self._ensure_skill(at.skill_id)
             if st.current_attempt_id == aid:
@@ -569,6 +829,33 @@ class StateStore:
         now = mono_ms()
         self._publish(CaptureEvent(t_ms=now, type="CAPTURE_ERROR", message=error, detail=detail))
 
+    def capture_recovered(self, *, error_streak: int = 0) -> None:
+        now = mono_ms()
+        self._publish(CaptureEvent(t_ms=now, type="CAPTURE_RECOVERED", extra={"error_streak": int(error_streak)}))
+
+    def capture_summary(self, extra: Dict[str, Any]) -> None:
+        now = mono_ms()
+        data = dict(extra or {})
+        with self._lock:
+            self._capture_health = data
+        self._publish(CaptureEvent(t_ms=now, type="CAPTURE_SUMMARY", extra=data))
+
+    def get_capture_health(self) -> Dict[str, Any]:
+        """
+        最近一次 capture 汇总（grabs_per_s / hits_per_s / age_mean_ms / grab_ms_hist / error_streak ...）；
+        尚未汇总时为空 dict。
+        """
+        with self._lock:
+            return dict(self._capture_health)
+
+    def get_input_gap_stats(self) -> Dict[str, Any]:
+        """
+        施法间隔统计（上一次施法结束 -> 下一次按键）：count / queued / mean_ms / min_ms / max_ms / recent_p50_ms。
+        用于对比开启预输入前后的 APM。
+        """
+        with self._lock:
+            return self._input_gap.to_dict()
+
     # -------------------------
     # MetricProvider API (for AST evaluator)
     # -------------------------
@@ -749,4 +1036,7 @@ class StateStore:
                 st.cast_started = 0
             elif m == "fail":
                 st.fail = 0
-                st.fail_by_reason.clear()
\ No newline at end of file
+                st.fail_by_reason.clear()
+            else:
+                return
+        self._changed()
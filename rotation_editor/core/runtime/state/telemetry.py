@@ -0,0 +1,473 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+from array import array
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from .events import AttemptEvent, CaptureEvent, Event, EventBus
+
+log = logging.getLogger(__name__)
+
+# ---------------- file format ----------------
+#
+# 文件头：MAGIC
+# 之后是若干 chunk（只追加）：
+#   b"CHNK" | u32 压缩后长度 | u32 crc32(压缩数据) | zlib(payload)
+# payload：
+#   u32 meta 长度 | meta(JSON) | 各列原始字节（按 meta.columns 顺序拼接）
+# meta：
+#   {"table": "events"|"probes", "rows": n,
+#    "strings": [本 chunk 新增的字符串...],      # 全文件共享的字符串字典，id 从 1 递增（0 = ""）
+#    "columns": [[name, typecode, nbytes], ...]}
+# t_ms 列按 chunk 内差分存储（首行为绝对值），其它列原样存储。
+# 进程崩溃时最后一个 chunk 可能不完整，loader 会忽略。
+
+MAGIC = b"GW2TLM1\n"
+_CHUNK_HDR = struct.Struct("<4sII")
+
+KIND_ENGINE = 0
+KIND_ATTEMPT = 1
+KIND_CAPTURE = 2
+
+_EVENT_STR_COLUMNS = ("type", "attempt_id", "skill_id", "node_id", "preset_id", "reason", "message", "detail", "extra")
+
+
+class _StringTable:
+    def __init__(self) -> None:
+        self._ids: Dict[str, int] = {"": 0}
+        self._pending: List[str] = []
+
+    def id_of(self, s: Any) -> int:
+        v = "" if s is None else str(s)
+        i = self._ids.get(v)
+        if i is None:
+            i = len(self._ids)
+            self._ids[v] = i
+            self._pending.append(v)
+        return i
+
+    def take_pending(self) -> List[str]:
+        out = self._pending
+        self._pending = []
+        return out
+
+
+def _delta(col: array) -> array:
+    out = array("q", col)
+    for i in range(len(out) - 1, 0, -1):
+        out[i] -= out[i - 1]
+    return out
+
+
+def _undelta(col: array) -> array:
+    out = array("q", col)
+    for i in range(1, len(out)):
+        out[i] += out[i - 1]
+    return out
+
+
+def _extra_json(extra: Any) -> str:
+    if not extra:
+        return ""
+    try:
+        return json.dumps(extra, ensure_ascii=False, separators=(",", ":"), sort_keys=True, default=str)
+    except Exception:
+        return ""
+
+
+@dataclass(frozen=True)
+class _ProbeBatch:
+    t_ms: int
+    sample: Callable[[], Iterable[Tuple[str, Optional[Tuple[int, int, int]]]]]
+
+
+@dataclass
+class TelemetryStats:
+    events: int = 0
+    probes: int = 0
+    dropped: int = 0
+    chunks: int = 0
+    bytes_written: int = 0
+
+
+class TelemetryRecorder:
+    """
+    引擎运行遥测记录器（可选启用）：
+
+    - attach(bus)：订阅 EventBus，记录所有 engine / attempt / capture 事件
+    - record_probe(t_ms, key, rgb)：记录探针像素值；record_probe_batch(t_ms, sample) 把取样
+      推迟到后台写线程（引擎按 probe_interval_ms 周期调用，引擎线程上不做像素采样）
+    - 引擎线程侧只做一次 deque.append（环形缓冲，满了丢最旧的并计数）
+    - 后台线程每 flush_interval_s 秒排空环形缓冲；积累满 chunk_rows 行（或距上次写出超过
+      max_chunk_age_s 秒）时，把数据按列编码（字符串字典化、时间差分）并 zlib 压缩，
+      作为一个 chunk 追加写入文件（大 chunk 压缩率更高，max_chunk_age_s 限制崩溃时丢失的数据量）
+    - 用 load_telemetry(path) 读回为按列数组
+    - 同一个 recorder 可反复 start / stop（每次运行一个文件）：构造时的 path 被占用时依次写
+      path.1 / path.2 ...（扩展名保持在最后），每个文件有独立的字符串字典
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        chunk_rows: int = 8192,
+        flush_interval_s: float = 2.0,
+        max_chunk_age_s: float = 30.0,
+        ring_capacity: int = 65536,
+        probe_interval_ms: int = 250,
+        compress_level: int = 6,
+    ) -> None:
+        # 构造时给定的路径（编号基准）；_path 为当前 / 最近一次运行实际写入的文件
+        self._base_path = str(path)
+        self._path = self._base_path
+        self._chunk_rows = max(64, int(chunk_rows))
+        self._flush_interval_s = max(0.05, float(flush_interval_s))
+        self._max_chunk_age_s = max(self._flush_interval_s, float(max_chunk_age_s))
+        self._last_write = time.monotonic()
+        self._ring_capacity = max(1024, int(ring_capacity))
+        self._ring: Deque[Any] = deque(maxlen=self._ring_capacity)
+        self._level = max(1, min(9, int(compress_level)))
+        self.probe_interval_ms = max(10, int(probe_interval_ms))
+
+        self._strings = _StringTable()
+        self._ev_rows: Dict[str, array] = self._new_event_cols()
+        self._pr_rows: Dict[str, array] = self._new_probe_cols()
+
+        self._stats = TelemetryStats()
+        # 引擎线程（dropped）与写线程（其余计数）都会更新 _stats
+        self._stats_lock = threading.Lock()
+        # 列缓冲与文件写入只在持有 _io_lock 时进行（后台线程 / flush() 调用方）
+        self._io_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._fh = None
+        self._bus: Optional[EventBus] = None
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def stats(self) -> TelemetryStats:
+        with self._stats_lock:
+            s = self._stats
+            return TelemetryStats(events=s.events, probes=s.probes, dropped=s.dropped, chunks=s.chunks, bytes_written=s.bytes_written)
+
+    def _count_dropped(self) -> None:
+        with self._stats_lock:
+            self._stats.dropped += 1
+
+    # ---------- producer side (engine thread) ----------
+
+    def attach(self, bus: EventBus) -> None:
+        self._bus = bus
+        bus.subscribe(self.on_event)
+
+    def detach(self) -> None:
+        bus = self._bus
+        self._bus = None
+        if bus is not None:
+            bus.unsubscribe(self.on_event)
+
+    def on_event(self, ev: Event) -> None:
+        if len(self._ring) >= self._ring_capacity:
+            self._count_dropped()
+        self._ring.append(ev)
+
+    def record_probe(self, t_ms: int, key: str, rgb: Optional[Tuple[int, int, int]]) -> None:
+        if len(self._ring) >= self._ring_capacity:
+            self._count_dropped()
+        self._ring.append((int(t_ms), key, rgb))
+
+    def record_probe_batch(self, t_ms: int, sample: Callable[[], Iterable[Tuple[str, Optional[Tuple[int, int, int]]]]]) -> None:
+        """
+        延迟取样：sample() 在后台写线程上调用，返回 (key, rgb) 列表。
+        调用方只需保证 sample 引用的数据（如已抓取的 snapshot）不可变。
+        """
+        if len(self._ring) >= self._ring_capacity:
+            self._count_dropped()
+        self._ring.append(_ProbeBatch(t_ms=int(t_ms), sample=sample))
+
+    # ---------- lifecycle ----------
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        path = self._base_path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            # 字符串字典按 chunk 增量存储，不能续写已有文件：按构造时的路径编号换新文件名
+            base, ext = os.path.splitext(path)
+            n = 1
+            while os.path.exists(f"{base}.{n}{ext}"):
+                n += 1
+            path = f"{base}.{n}{ext}"
+
+        with self._io_lock:
+            # 新文件从空字符串字典开始；上一次运行的列缓冲已在 stop 时写出
+            self._strings = _StringTable()
+            self._ev_rows = self._new_event_cols()
+            self._pr_rows = self._new_probe_cols()
+            self._last_write = time.monotonic()
+            self._path = path
+            self._fh = open(path, "ab")
+            self._fh.write(MAGIC)
+            self._fh.flush()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="telemetry-recorder", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self.detach()
+        self._stop.set()
+        self._wake.set()
+        th = self._thread
+        self._thread = None
+        if th is not None:
+            th.join(timeout=5.0)
+        fh = self._fh
+        self._fh = None
+        if fh is not None:
+            try:
+                fh.close()
+            except Exception:
+                pass
+
+    def flush(self) -> None:
+        """
+        在调用线程上立即排空环形缓冲并写出（测试 / 停止前使用）。
+        """
+        with self._io_lock:
+            self._drain()
+            self._write_chunks(force=True)
+
+    # ---------- background thread ----------
+
+    def _run(self) -> None:
+        try:
+            while not self._stop.is_set():
+                self._wake.wait(self._flush_interval_s)
+                self._wake.clear()
+                with self._io_lock:
+                    self._drain()
+                    self._write_chunks(force=time.monotonic() - self._last_write >= self._max_chunk_age_s)
+            with self._io_lock:
+                self._drain()
+                self._write_chunks(force=True)
+        except Exception:
+            log.exception("telemetry recorder failed")
+
+    @staticmethod
+    def _new_event_cols() -> Dict[str, array]:
+        cols = {"t_ms": array("q"), "kind": array("B")}
+        for c in _EVENT_STR_COLUMNS:
+            cols[c] = array("I")
+        return cols
+
+    @staticmethod
+    def _new_probe_cols() -> Dict[str, array]:
+        return {
+            "t_ms": array("q"),
+            "probe": array("I"),
+            "valid": array("B"),
+            "r": array("B"),
+            "g": array("B"),
+            "b": array("B"),
+        }
+
+    def _append_probe(self, t_ms: int, key: str, rgb: Optional[Tuple[int, int, int]]) -> None:
+        pr = self._pr_rows
+        pr["t_ms"].append(int(t_ms))
+        pr["probe"].append(self._strings.id_of(key))
+        if rgb is None:
+            pr["valid"].append(0)
+            rgb = (0, 0, 0)
+        else:
+            pr["valid"].append(1)
+        pr["r"].append(int(rgb[0]) & 0xFF)
+        pr["g"].append(int(rgb[1]) & 0xFF)
+        pr["b"].append(int(rgb[2]) & 0xFF)
+        if len(pr["t_ms"]) >= self._chunk_rows:
+            self._write_table("probes", pr)
+            self._pr_rows = self._new_probe_cols()
+
+    def _drain(self) -> None:
+        ring = self._ring
+        sid = self._strings.id_of
+        ev = self._ev_rows
+        n_events = 0
+        n_probes = 0
+        while True:
+            try:
+                item = ring.popleft()
+            except IndexError:
+                break
+
+            if isinstance(item, _ProbeBatch):
+                try:
+                    rows = list(item.sample())
+                except Exception:
+                    log.exception("telemetry probe batch failed")
+                    rows = []
+                for key, rgb in rows:
+                    self._append_probe(item.t_ms, key, rgb)
+                n_probes += len(rows)
+                continue
+
+            if isinstance(item, tuple):
+                self._append_probe(*item)
+                n_probes += 1
+                continue
+
+            ev["t_ms"].append(int(getattr(item, "t_ms", 0) or 0))
+            if isinstance(item, AttemptEvent):
+                kind = KIND_ATTEMPT
+            elif isinstance(item, CaptureEvent):
+                kind = KIND_CAPTURE
+            else:
+                kind = KIND_ENGINE
+            ev["kind"].append(kind)
+            ev["type"].append(sid(getattr(item, "type", "")))
+            ev["attempt_id"].append(sid(getattr(item, "attempt_id", "")))
+            ev["skill_id"].append(sid(getattr(item, "skill_id", "")))
+            ev["node_id"].append(sid(getattr(item, "node_id", "")))
+            ev["preset_id"].append(sid(getattr(item, "preset_id", "")))
+            ev["reason"].append(sid(getattr(item, "reason", "")))
+            ev["message"].append(sid(getattr(item, "message", "")))
+            ev["detail"].append(sid(getattr(item, "detail", "")))
+            ev["extra"].append(sid(_extra_json(getattr(item, "extra", None))))
+            n_events += 1
+            if len(ev["t_ms"]) >= self._chunk_rows:
+                self._write_table("events", ev)
+                self._ev_rows = ev = self._new_event_cols()
+
+        if n_events or n_probes:
+            with self._stats_lock:
+                self._stats.events += n_events
+                self._stats.probes += n_probes
+
+    def _write_chunks(self, *, force: bool) -> None:
+        if force:
+            self._last_write = time.monotonic()
+        if len(self._ev_rows["t_ms"]) and (force or len(self._ev_rows["t_ms"]) >= self._chunk_rows):
+            self._write_table("events", self._ev_rows)
+            self._ev_rows = self._new_event_cols()
+        if len(self._pr_rows["t_ms"]) and (force or len(self._pr_rows["t_ms"]) >= self._chunk_rows):
+            self._write_table("probes", self._pr_rows)
+            self._pr_rows = self._new_probe_cols()
+
+    def _write_table(self, table: str, cols: Dict[str, array]) -> None:
+        fh = self._fh
+        if fh is None:
+            return
+        rows = len(cols["t_ms"])
+        if rows <= 0:
+            return
+
+        bodies: List[bytes] = []
+        spec: List[Tuple[str, str, int]] = []
+        for name, col in cols.items():
+            data = _delta(col) if name == "t_ms" else col
+            b = data.tobytes()
+            bodies.append(b)
+            spec.append((name, data.typecode, len(b)))
+
+        meta = json.dumps(
+            {"table": table, "rows": rows, "strings": self._strings.take_pending(), "columns": spec},
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ).encode("utf-8")
+        payload = struct.pack("<I", len(meta)) + meta + b"".join(bodies)
+        comp = zlib.compress(payload, self._level)
+
+        fh.write(_CHUNK_HDR.pack(b"CHNK", len(comp), zlib.crc32(comp) & 0xFFFFFFFF))
+        fh.write(comp)
+        fh.flush()
+        with self._stats_lock:
+            self._stats.chunks += 1
+            self._stats.bytes_written += _CHUNK_HDR.size + len(comp)
+
+
+# ---------------- loader ----------------
+
+
+@dataclass
+class TelemetryRun:
+    """
+    load_telemetry 的结果（按列）：
+
+    - events: t_ms / kind 为数值数组；type / attempt_id / skill_id / node_id / preset_id /
+              reason / message / detail / extra 为字符串列表（extra 为 JSON 文本，空为 ""）
+    - probes: t_ms / valid / r / g / b 为数值数组；probe 为字符串列表（如 "point:xxx" / "skill:xxx"）
+    - truncated: 文件末尾存在不完整 chunk（进程异常退出）
+    """
+    events: Dict[str, Any] = field(default_factory=dict)
+    probes: Dict[str, Any] = field(default_factory=dict)
+    truncated: bool = False
+
+    @property
+    def n_events(self) -> int:
+        return len(self.events.get("t_ms", ()))
+
+    @property
+    def n_probes(self) -> int:
+        return len(self.probes.get("t_ms", ()))
+
+
+def load_telemetry(path: str) -> TelemetryRun:
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(MAGIC):
+        raise ValueError(f"not a telemetry file: {path}")
+
+    strings: List[str] = [""]
+    tables: Dict[str, Dict[str, array]] = {}
+    run = TelemetryRun()
+
+    pos = len(MAGIC)
+    while pos < len(data):
+        if pos + _CHUNK_HDR.size > len(data):
+            run.truncated = True
+            break
+        tag, clen, crc = _CHUNK_HDR.unpack_from(data, pos)
+        body = data[pos + _CHUNK_HDR.size: pos + _CHUNK_HDR.size + clen]
+        if tag != b"CHNK" or len(body) != clen or (zlib.crc32(body) & 0xFFFFFFFF) != crc:
+            run.truncated = True
+            break
+        pos += _CHUNK_HDR.size + clen
+
+        payload = zlib.decompress(body)
+        (mlen,) = struct.unpack_from("<I", payload, 0)
+        meta = json.loads(payload[4:4 + mlen].decode("utf-8"))
+        strings.extend(meta.get("strings") or [])
+
+        off = 4 + mlen
+        dst = tables.setdefault(str(meta["table"]), {})
+        for name, typecode, nbytes in meta["columns"]:
+            col = array(typecode)
+            col.frombytes(payload[off:off + nbytes])
+            off += nbytes
+            if name == "t_ms":
+                col = _undelta(col)
+            if name in dst:
+                dst[name].extend(col)
+            else:
+                dst[name] = col
+
+    def decode(cols: Dict[str, array], str_cols: Tuple[str, ...]) -> Dict[str, Any]:
+        out: Dict[str, Any] = {}
+        for name, col in cols.items():
+            out[name] = [strings[i] for i in col] if name in str_cols else col
+        return out
+
+    run.events = decode(tables.get("events", {}), _EVENT_STR_COLUMNS)
+    run.probes = decode(tables.get("probes", {}), ("probe",))
+    return run
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Callable, List, Dict, Any
+from typing import Callable, List, Dict, Any, Optional
 
 from PySide6.QtCore import QTimer, Qt
 from PySide6.QtWidgets import (
@@ -90,7 +90,11 @@ def _fmt_engine_state(d: Dict[str, Any]) -> str:
     reason = (str(d.get("stop_reason", "") or "")).strip().lower()
 
     if running:
-        return _bi("运行中", "running")
+        ttfk = d.get("time_to_first_key_ms")
+        if ttfk is None:
+            return _bi("运行中", "running")
+        warm = int(d.get("warmup_ms", 0) or 0)
+        return f"{_bi('运行中', 'running')} - {_bi('首键', 'first key')} {int(ttfk)}ms / {_bi('预热', 'warmup')} {warm}ms"
     if paused:
         return _bi("暂停", "paused")
 
@@ -106,6 +110,11 @@ class DebugStatsDialog(QDialog):
     - 顶部：引擎状态（运行中 / 已停止 + 原因） + 施法锁状态
     - 上表：技能统计 + 当前状态
     - 下表：选中技能的最近 attempt 明细
+
+    刷新：
+    - 提供 watch(fn) -> 取消订阅函数 时，状态变化由宿主推送（fn 在 UI 线程上调用，已合并），
+      定时器降为 1s 兜底：只在版本号变化或引擎运行中（“距今ms”需要走动）时重绘
+    - 不提供时保持 200ms 轮询
     """
 
     def __init__(
@@ -114,6 +123,8 @@ class DebugStatsDialog(QDialog):
         get_snapshot: Callable[[], List[Dict[str, Any]]],
         get_lock_state: Callable[[], bool],
         get_engine_state: Callable[[], Dict[str, Any]],
+        watch: Optional[Callable[[Callable[[], None]], Callable[[], None]]] = None,
+        get_version: Optional[Callable[[], int]] = None,
         parent=None,
     ) -> None:
         super().__init__(parent)
@@ -123,8 +134,13 @@ class DebugStatsDialog(QDialog):
         self._get_snapshot = get_snapshot
         self._get_lock_state = get_lock_state
         self._get_engine_state = get_engine_state
+        self._get_version = get_version
         self._rows: List[Dict[str, Any]] = []
 
+        self._seen_version: Optional[int] = None
+        self._last_running = False
+        self._unwatch: Optional[Callable[[], None]] = None
+
         root = QVBoxLayout(self)
         root.setContentsMargins(10, 10, 10, 10)
         root.setSpacing(6)
@@ -206,10 +222,17 @@ class DebugStatsDialog(QDialog):
         splitter.setStretchFactor(1, 2)
 
         self._timer = QTimer(self)
-        self._timer.setInterval(200)
-        self._timer.timeout.connect(self.refresh_now)
+        self._timer.setInterval(200 if watch is None else 1000)
+        self._timer.timeout.connect(self._poll)
         self._timer.start()
 
+        if watch is not None:
+            try:
+                self._unwatch = watch(self.refresh_now)
+            except Exception:
+                self._unwatch = None
+                self._timer.setInterval(200)
+
         self.refresh_now()
 
     def closeEvent(self, event) -> None:  # type: ignore[override]
@@ -217,8 +240,28 @@ class DebugStatsDialog(QDialog):
             self._timer.stop()
         except Exception:
             pass
+        unwatch, self._unwatch = self._unwatch, None
+        if unwatch is not None:
+            try:
+                unwatch()
+            except Exception:
+                pass
         super().closeEvent(event)
 
+    def _version(self) -> Optional[int]:
+        if self._get_version is None:
+            return None
+        try:
+            return int(self._get_version())
+        except Exception:
+            return None
+
+    def _poll(self) -> None:
+        v = self._version()
+        if v is not None and v == self._seen_version and not self._last_running:
+            return
+        self.refresh_now()
+
     def _cell(self, v, *, center: bool = True) -> QTableWidgetItem:
         it = QTableWidgetItem(str(v))
         if center:
@@ -226,11 +269,14 @@ class DebugStatsDialog(QDialog):
         return it
 
     def refresh_now(self) -> None:
+        self._seen_version = self._version()
+
         # 引擎状态
         try:
             state = self._get_engine_state() or {}
         except Exception:
             state = {}
+        self._last_running = bool(state.get("running", False))
         self._lbl_engine.setText(_fmt_engine_state(state))
 
         # 施法锁状态
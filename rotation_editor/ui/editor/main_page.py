@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Optional, Protocol, Callable, Dict, Any
+from typing import Optional, Protocol, Callable, Dict, Any, Hashable, Tuple
 
 from PySide6.QtCore import Qt, QPoint
 from PySide6.QtWidgets import (
@@ -18,6 +18,7 @@ from PySide6.QtWidgets import (
 
 from core.profiles import ProfileContext
 from core.app.session import ProfileSession
+from core.pick.shared_capture import shared_capture_service
 
 from qtui.notify import UiNotify
 from qtui.icons import load_icon
@@ -51,6 +52,8 @@ class SchedulerLike(Protocol):
     简单的调度器协议：
     - MacroEngine 只依赖一个 call_soon(fn) 方法
     - QtDispatcher / 其他实现只要提供同名方法即可作为 dispatcher 使用
+    - 若还提供 call_coalesced(key, fn, *, min_interval_ms=0)，引擎的节点进度回调（on_node_executed）会按最新一条合并，
+      watch_state 的订阅者按 min_interval_ms 限频
     """
     def call_soon(self, fn: Callable[[], None]) -> None: ...
 
@@ -105,6 +108,12 @@ class RotationEditorPage(QWidget):
         self._key_sender_detail: str = ""
         self._last_executed_node_label: str = ""  # 新增：最近执行的节点标签
 
+        # 状态变化推送：引擎 StateStore 变化 + 页面自身状态（最近节点等）都会让版本号 +1
+        # 监听者列表 copy-on-write（引擎线程遍历，UI 线程增删）
+        self._state_version: int = 0
+        self._state_listeners: Tuple[Callable[[], None], ...] = ()
+        self._watch_seq: int = 0
+
         self._build_ui()
         self._subscribe_store_dirty()
         self._rebuild_preset_combo()
@@ -328,9 +337,11 @@ class RotationEditorPage(QWidget):
                 pass
 
         # 丢弃旧引擎实例，保证下一次 _ensure_engine 会用新的 ctx 重建
+        self._detach_engine_store()
         self._engine = None
         self._engine_running = False
         self._engine_paused = False
+        self._notify_state_changed()
 
         # 重置当前选中 preset/mode
         self._current_preset_id = None
@@ -797,6 +808,8 @@ class RotationEditorPage(QWidget):
                 get_snapshot=get_snapshot,
                 get_lock_state=get_lock,
                 get_engine_state=get_engine_state,
+                watch=self.watch_state,
+                get_version=self.get_state_version,
                 parent=self,
             )
             dlg.setAttribute(Qt.WA_DeleteOnClose, True)
@@ -1006,7 +1019,6 @@ class RotationEditorPage(QWidget):
             lock=LockPolicyConfig(
                 policy="SKIP_AND_ADVANCE",
                 wait_timeout_ms=300,
-                wait_poll_ms=15,
                 skip_delay_ms=poll_not_ready,
             ),
             start=StartSignalConfig(
@@ -1053,6 +1065,11 @@ class RotationEditorPage(QWidget):
             self._key_sender_mode_used = "pynput"
             self._key_sender_detail = ""
 
+        # 运行遥测（可选）
+        telemetry_path = ""
+        if bool(getattr(ex, "telemetry_enabled", False)):
+            telemetry_path = _get_str("telemetry_path", "telemetry/run.tlm")
+
         self._engine = MacroEngine(
             ctx=self._ctx,
             scheduler=self._dispatcher,
@@ -1062,11 +1079,25 @@ class RotationEditorPage(QWidget):
                 poll_interval_ms=20,
                 stop_on_error=True,
                 gateway_poll_delay_ms=10,
+                telemetry_path=telemetry_path,
             ),
             attempt_cfg=attempt_cfg,
+            capture_service=shared_capture_service(),
         )
+        try:
+            self._engine.store.add_change_listener(self._notify_state_changed)
+        except Exception:
+            pass
         return self._engine
 
+    def _detach_engine_store(self) -> None:
+        if self._engine is None:
+            return
+        try:
+            self._engine.store.remove_change_listener(self._notify_state_changed)
+        except Exception:
+            pass
+
     def _update_engine_buttons(self) -> None:
         running = bool(self._engine_running)
         paused = bool(self._engine_paused)
@@ -1122,6 +1153,7 @@ class RotationEditorPage(QWidget):
             self._notify.status_msg("循环已继续", ttl_ms=1500)
 
         self._update_engine_buttons()
+        self._notify_state_changed()
 
     def _on_step_clicked(self) -> None:
         if self._engine is None or not self._engine_running:
@@ -1131,6 +1163,7 @@ class RotationEditorPage(QWidget):
         self._engine.step()
         self._notify.status_msg("单步执行一次", ttl_ms=1500)
         self._update_engine_buttons()
+        self._notify_state_changed()
 
     def _on_stop_clicked(self) -> None:
         if self._engine is None or not self._engine.is_running():
@@ -1147,6 +1180,7 @@ class RotationEditorPage(QWidget):
         self._engine_paused = False
         self._update_engine_buttons()
         self._notify.status_msg(f"循环执行已启动: {preset_id}", ttl_ms=2500)
+        self._notify_state_changed()
 
     def on_stopped(self, reason: str) -> None:
         self._engine_running = False
@@ -1154,11 +1188,14 @@ class RotationEditorPage(QWidget):
         self._update_engine_buttons()
         self._timeline_canvas.set_current_node(None, "", -1)
         self._notify.status_msg(f"循环执行已停止: {reason}", ttl_ms=2500)
+        self._notify_state_changed()
 
     def on_node_executed(self, cursor: ExecutionCursor, node) -> None:
+        # 经 QtDispatcher.call_coalesced 调用：高频执行时只处理每帧最新的节点
         label = getattr(node, "label", "") or "(节点)"
         self._last_executed_node_label = label  # 记录最近执行的节点
         self._notify.status_msg(f"执行节点: {label}", ttl_ms=800)
+        self._notify_state_changed()
 
         mode_id = cursor.mode_id or ""
         track_id = cursor.track_id
@@ -1322,4 +1359,55 @@ class RotationEditorPage(QWidget):
         """
         mode = getattr(self, "_key_sender_mode_used", "pynput")
         detail = getattr(self, "_key_sender_detail", "")
-        return {"mode": mode, "detail": detail}
\ No newline at end of file
+        return {"mode": mode, "detail": detail}
+
+    # ---------- 状态变化推送 ----------
+
+    def get_state_version(self) -> int:
+        """
+        引擎 / 页面状态版本号：有变化时递增（供面板的兜底轮询跳过无变化的重绘）。
+        """
+        return int(self._state_version)
+
+    def watch_state(self, fn: Callable[[], None], *, min_interval_ms: int = 100) -> Callable[[], None]:
+        """
+        订阅状态变化：fn 在 UI 线程上调用，经 dispatcher 合并且按 min_interval_ms 限频
+        （引擎每发布一个事件都会通知；面板不需要跟满帧率，最多每 min_interval_ms 刷新一次最新状态）。
+        返回取消订阅函数。
+        """
+        self._watch_seq += 1
+        key: Hashable = ("engine_state_watch", id(self), self._watch_seq)
+
+        def on_change() -> None:
+            self._post_coalesced(key, fn, min_interval_ms=min_interval_ms)
+
+        self._state_listeners = self._state_listeners + (on_change,)
+
+        def unsubscribe() -> None:
+            self._state_listeners = tuple(f for f in self._state_listeners if f is not on_change)
+            discard = getattr(self._dispatcher, "discard_coalesced", None)
+            if discard is not None:
+                try:
+                    discard(key)
+                except Exception:
+                    pass
+
+        return unsubscribe
+
+    def _notify_state_changed(self, *_args: Any) -> None:
+        """
+        任意线程可调用（StateStore 的监听回调在引擎线程上）。
+        """
+        self._state_version += 1
+        for fn in self._state_listeners:
+            try:
+                fn()
+            except Exception:
+                pass
+
+    def _post_coalesced(self, key: Hashable, fn: Callable[[], None], *, min_interval_ms: int = 0) -> None:
+        co = getattr(self._dispatcher, "call_coalesced", None)
+        if co is not None:
+            co(key, fn, min_interval_ms=min_interval_ms)
+        else:
+            self._dispatcher.call_soon(fn)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import Optional, List, Dict, Tuple
+from dataclasses import astuple, dataclass, field
+from typing import Any, Optional, List, Dict, Tuple
 
 from PySide6.QtCore import Qt, QRectF, Signal, QPointF, QVariantAnimation, QEasingCurve
 from PySide6.QtGui import (
@@ -33,6 +34,25 @@ from rotation_editor.ui.editor.timeline_reflow import (
 )
 
 
+@dataclass
+class _SceneState:
+    """
+    单个 mode 的缓存 scene 及其 item 索引（供增量刷新使用）。
+    """
+    scene: QGraphicsScene
+    track_items: Dict[Tuple[str, str], List[QGraphicsRectItem]] = field(default_factory=dict)
+    row_keys: Dict[int, Tuple[str, str]] = field(default_factory=dict)
+    row_labels: Dict[Tuple[str, str], QGraphicsSimpleTextItem] = field(default_factory=dict)
+    # key=((mode_id, track_id), node_key)
+    node_items: Dict[Tuple[Tuple[str, str], str], QGraphicsRectItem] = field(default_factory=dict)
+    node_sigs: Dict[Tuple[Tuple[str, str], str], Tuple[Any, ...]] = field(default_factory=dict)
+    grid_items: List[QGraphicsItem] = field(default_factory=list)
+    grid_sig: Optional[Tuple[Any, ...]] = None
+    add_button: Optional[QGraphicsRectItem] = None
+    layout_sig: Optional[Tuple[Any, ...]] = None
+    empty: bool = False
+
+
 class TimelineCanvas(QGraphicsView):
     """
     多轨时间轴总览（QGraphicsView）：
@@ -43,6 +63,7 @@ class TimelineCanvas(QGraphicsView):
       * 同轨拖拽：若目标 step 已被占用，释放后弹回原 step。
       * 跨轨拖拽：若目标轨道同 step 已被占用，释放后不跨轨，弹回原轨道原 step。
       * 跨轨成功时，会有一个平滑的“飞过去”动画（OutCubic 缓出），增加阻尼感。
+    - 每个 mode 缓存一个 scene，set_data 对已有 item 做增量更新（引擎运行时频繁切换 mode 不重建）。
     """
 
     nodeClicked = Signal(str, str, int)
@@ -59,6 +80,9 @@ class TimelineCanvas(QGraphicsView):
 
     def __init__(self, parent=None) -> None:
         super().__init__(parent)
+        # scene 缓存：key=(preset_id, mode_id)；None 为空数据时使用的 scene
+        self._scene_cache: Dict[Optional[Tuple[str, str]], _SceneState] = {}
+        self._state: Optional[_SceneState] = None
         self._scene = QGraphicsScene(self)
         self.setScene(self._scene)
 
@@ -167,39 +191,65 @@ class TimelineCanvas(QGraphicsView):
         current_mode_id: Optional[str],
     ) -> None:
         """
-        重建场景内容：
+        增量刷新场景内容：
 
         - ctx / preset 为 None 时清空。
         - rows 由 build_timeline_layout 构建：
             * 每个 TrackVisualSpec 包含 nodes 的 start_ms / width / lane。
         - 本方法将节点绘制在每个 step 区间的中点，而不是 step 边界线上。
+        - 每个 mode 各自缓存一个 QGraphicsScene（key=(preset_id, mode_id)）：
+            * 切换 mode 时直接切换 scene，布局未变化则不动任何 item；
+            * 布局变化时按 (轨道, 节点) 对比已有 item，只移动/新增/删除受影响的 item；
+            * 时间尺/网格仅在范围或缩放变化时重画。
         """
-        self._scene.clear()
-        self._track_items.clear()
-        self._row_keys.clear()
+        mode_id = (current_mode_id or "").strip() or None
+
+        if ctx is not self._ctx:
+            self._drop_scene_cache()
+
         self._ctx = ctx
         self._preset = preset
-        self._current_mode_id = (current_mode_id or "").strip() or None
+        self._current_mode_id = mode_id
 
-        # 不清除 key/index，只清除旧的 item 引用，后续重建后会尝试重新应用高亮
-        self._current_item = None
+        # 不清除 key/index，只清除旧的 item 引用，后续刷新后会尝试重新应用高亮
+        self._clear_highlight()
 
         if ctx is None or preset is None:
+            self._activate_state(self._blank_state())
             return
 
         rows: List[TrackVisualSpec] = build_timeline_layout(
             ctx,
             preset,
-            self._current_mode_id,
+            mode_id,
             time_scale_px_per_ms=float(self._time_scale_px_per_ms),
         )
 
+        state = self._state_for(preset, mode_id)
+        self._activate_state(state)
+
+        viewport_w = 0
+        view = self.viewport()
+        if view is not None:
+            viewport_w = int(view.width())
+
+        sig = (
+            tuple(
+                (r.mode_id, r.track_id, r.title, r.total_duration_ms, tuple(astuple(n) for n in r.nodes))
+                for r in rows
+            ),
+            float(self._time_scale_px_per_ms),
+            viewport_w,
+            mode_id,
+        )
+        if state.layout_sig == sig:
+            # 布局完全未变化（例如运行中来回切换 mode）：直接复用缓存 scene
+            self._after_layout()
+            return
+
         font = QFont(self.font())
         font.setPointSize(9)
 
-        row_index = 0
-        x_max = 0.0
-
         # 若有轨道，计算最大总时长（用于时间刻度）；若全为空，则默认 5s 范围
         if rows:
             max_time_ms = max((r.total_duration_ms for r in rows), default=0)
@@ -208,87 +258,180 @@ class TimelineCanvas(QGraphicsView):
         else:
             max_time_ms = 5000
 
+        if not rows:
+            self._build_empty_scene(state, font, max_time_ms)
+            state.layout_sig = sig
+            return
+
+        if state.empty:
+            # 从“无轨道”提示切换回正常布局：提示内容与正常 item 无可复用部分
+            self._reset_state(state)
+
+        x_max = self._sync_rows(state, rows, font)
+
         track_area_top = self._ruler_height
+        last_y_top = track_area_top + (len(rows) - 1) * (self._row_height + self._row_gap)
+        grid_bottom = last_y_top + self._row_height
 
-        # 无轨道
-        if not rows:
-            x_extent = float(self._label_width + 300)
-            view = self.viewport()
-            if view is not None:
-                vw = view.width()
-                if vw > 0:
-                    x_extent = max(x_extent, float(vw))
-
-            self._draw_time_ruler_and_grid(
-                font,
-                max_time_ms,
-                x_extent=x_extent,
-                grid_bottom=self._ruler_height + self._row_height,
-            )
-
-            y_top = track_area_top
-
-            hint = QGraphicsSimpleTextItem("（当前无轨道，点击下方 + 新建全局轨道）")
-            hint.setFont(font)
-            hint.setBrush(QColor(200, 200, 200))
-            hint.setPos(
-                4,
-                y_top + (self._row_height - hint.boundingRect().height()) / 2.0,
-            )
-            self._scene.addItem(hint)
-
-            btn_w, btn_h = 44.0, 20.0
-            btn_x = 6.0
-            btn_y = y_top + self._row_height + self._row_gap / 2.0 - btn_h / 2.0
-            plus_rect = QGraphicsRectItem(0, 0, btn_w, btn_h)
-            plus_rect.setPos(btn_x, btn_y)
-            plus_rect.setBrush(QBrush(QColor(80, 160, 80)))
-            plus_rect.setPen(QPen(QColor(30, 80, 30), 1.0))
-            plus_rect.setData(0, "add_track_button")
-            plus_rect.setData(1, "")  # 空串 => 全局轨道
-            self._scene.addItem(plus_rect)
+        # 最后一条轨道之后的“新增轨道”按钮
+        btn_w, btn_h = 64.0, 22.0
+        btn_x = 6.0
+        btn_y = last_y_top + self._row_height + self._row_gap / 2.0 - btn_h / 2.0
+        if self._current_mode_id:
+            mid_for_plus = self._current_mode_id
+        else:
+            mid_for_plus = rows[-1].mode_id or ""
+        self._sync_add_button(state, font, "+ 新增轨道", btn_w, btn_h, QPointF(btn_x, btn_y), mid_for_plus)
 
-            text_item = QGraphicsSimpleTextItem("+", plus_rect)
-            text_item.setFont(font)
-            tb = text_item.boundingRect()
-            text_x = (btn_w - tb.width()) / 2.0
-            text_y = (btn_h - tb.height()) / 2.0
-            text_item.setPos(text_x, text_y)
-            text_item.setBrush(QColor(255, 255, 255))
+        # 时间尺/网格横向边界
+        x_max_time = self._label_width + max_time_ms * self._time_scale_px_per_ms
+        x_extent = max(x_max + 40, x_max_time + 40, self._label_width + 300)
+
+        # 保证场景宽度至少覆盖当前视口宽度
+        if viewport_w > 0:
+            x_extent = max(x_extent, float(viewport_w))
+
+        total_height = max(btn_y + btn_h + 20.0, grid_bottom + self._row_gap)
+
+        self._sync_ruler_and_grid(state, font, max_time_ms, x_extent, grid_bottom)
+
+        state.scene.setSceneRect(
+            0,
+            0,
+            x_extent,
+            max(total_height, 240),
+        )
+        state.layout_sig = sig
+        self._after_layout()
+
+    # ---------- scene 缓存 / 增量同步 ----------
+
+    def _blank_state(self) -> "_SceneState":
+        st = self._scene_cache.get(None)
+        if st is None:
+            st = _SceneState(scene=QGraphicsScene(self))
+            self._scene_cache[None] = st
+        return st
+
+    def _state_for(self, preset: RotationPreset, mode_id: Optional[str]) -> "_SceneState":
+        pid = (getattr(preset, "id", "") or "").strip()
+        # 切换到另一个方案：其它方案的 scene 不再需要
+        stale = [k for k in self._scene_cache if k is not None and k[0] != pid]
+        for k in stale:
+            self._release_state(self._scene_cache.pop(k))
+
+        key = (pid, mode_id or "")
+        st = self._scene_cache.get(key)
+        if st is None:
+            st = _SceneState(scene=QGraphicsScene(self))
+            self._scene_cache[key] = st
+        return st
+
+    def _activate_state(self, state: "_SceneState") -> None:
+        self._state = state
+        self._scene = state.scene
+        self._track_items = state.track_items
+        self._row_keys = state.row_keys
+        if self.scene() is not state.scene:
+            self.setScene(state.scene)
+
+    def _release_state(self, state: "_SceneState") -> None:
+        if self._drag_item is not None and self._drag_item.scene() is state.scene:
+            self._drag_item = None
+            self._drag_row_key = None
+            self._drag_smoothed_pos = None
+        try:
+            state.scene.deleteLater()
+        except Exception:
+            pass
 
-            total_height = max(
-                track_area_top + self._row_height + self._row_gap + btn_h + 20,
-                240,
-            )
-
-            self._scene.setSceneRect(
-                0,
-                0,
-                max(x_extent, 320.0),
-                total_height,
-            )
+    def _drop_scene_cache(self) -> None:
+        cur = self._state
+        for st in list(self._scene_cache.values()):
+            if st is cur:
+                continue
+            self._release_state(st)
+        self._scene_cache.clear()
+        if cur is not None:
+            # 当前 scene 仍挂在 view 上：清空内容后保留复用
+            self._reset_state(cur)
+            self._scene_cache[None] = cur
+
+    def _reset_state(self, state: "_SceneState") -> None:
+        if self._drag_item is not None and self._drag_item.scene() is state.scene:
+            self._drag_item = None
+            self._drag_row_key = None
+            self._drag_smoothed_pos = None
+        state.scene.clear()
+        state.track_items.clear()
+        state.row_keys.clear()
+        state.row_labels.clear()
+        state.node_items.clear()
+        state.node_sigs.clear()
+        state.grid_items = []
+        state.grid_sig = None
+        state.add_button = None
+        state.empty = False
+        state.layout_sig = None
+
+    def _invalidate_node_item(self, item: QGraphicsRectItem) -> None:
+        """
+        拖拽释放后调用：清掉该节点 item 的签名与布局签名，下次 set_data 即使模型未变化
+        （落在被占用的 step / 原 step、跨轨失败）也会把它放回模型位置。
+        """
+        state = self._state
+        if state is None:
             return
+        state.layout_sig = None
+        for item_key, it in state.node_items.items():
+            if it is item:
+                state.node_sigs.pop(item_key, None)
+                break
+
+    def _after_layout(self) -> None:
+        # 若之前有记忆的 current_key/index，则尝试恢复高亮
+        if self._current_key is not None and self._current_index is not None:
+            self._reapply_highlight()
 
-        # 有轨道
-        for row in rows:
+    def _sync_rows(self, state: "_SceneState", rows: List[TrackVisualSpec], font: QFont) -> float:
+        """
+        按 (mode_id, track_id) / node_id 对比已有 item，只更新有变化的部分。
+        返回节点区域的最大 x（用于计算场景宽度）。
+        """
+        scene = state.scene
+        track_area_top = self._ruler_height
+        x_max = 0.0
+
+        live_rows = set()
+        live_nodes = set()
+        state.row_keys.clear()
+        new_track_items: Dict[Tuple[str, str], List[QGraphicsRectItem]] = {}
+
+        for row_index, row in enumerate(rows):
             y_top = track_area_top + row_index * (self._row_height + self._row_gap)
             y_center = y_top + self._row_height / 2.0
 
-            # 轨道标签
-            label_item = QGraphicsSimpleTextItem(row.title)
-            label_item.setFont(font)
-            label_item.setBrush(QColor(230, 230, 230))
-            label_item.setPos(
-                4,
-                y_top + (self._row_height - label_item.boundingRect().height()) / 2.0,
-            )
-            self._scene.addItem(label_item)
-
             key = (row.mode_id or "", row.track_id or "")
-            self._row_keys[row_index] = key
+            state.row_keys[row_index] = key
+            live_rows.add(key)
+
+            # 轨道标签
+            label_item = state.row_labels.get(key)
+            if label_item is None:
+                label_item = QGraphicsSimpleTextItem(row.title)
+                label_item.setFont(font)
+                label_item.setBrush(QColor(230, 230, 230))
+                scene.addItem(label_item)
+                state.row_labels[key] = label_item
+            elif label_item.text() != row.title:
+                label_item.setText(row.title)
+            label_pos = QPointF(4, y_top + (self._row_height - label_item.boundingRect().height()) / 2.0)
+            if label_item.pos() != label_pos:
+                label_item.setPos(label_pos)
 
             rect_items: List[QGraphicsRectItem] = []
             row_x_max = float(self._label_width)
+            seen_ids: Dict[str, int] = {}
 
             for idx, nvs in enumerate(row.nodes):
                 w = nvs.width
@@ -298,9 +441,6 @@ class TimelineCanvas(QGraphicsView):
                 x_center = float(self._label_width) + center_ms * float(self._time_scale_px_per_ms)
                 x = x_center - w / 2.0
 
-                rect = QRectF(0, -self._node_height / 2.0, w, self._node_height)
-                item = QGraphicsRectItem(rect)
-
                 # 垂直 lane 布局：-1=居中，0=上，1=下
                 lane = getattr(nvs, "lane", -1)
                 if lane < 0:
@@ -310,102 +450,198 @@ class TimelineCanvas(QGraphicsView):
                 else:
                     y_item = y_center + self._lane_offset
 
-                item.setPos(x, y_item)
-
-                kind = (nvs.kind or "").lower()
-
-                # 基础颜色
-                if kind == "skill":
-                    fill = QColor(80, 160, 230)        # 蓝色
-                elif kind == "gateway":
-                    if getattr(nvs, "has_condition", False):
-                        fill = QColor(180, 100, 220)   # 紫色，高亮
-                    else:
-                        fill = QColor(240, 170, 60)    # 橙色
-                else:
-                    fill = QColor(130, 130, 130)
-
-                item.setPen(self._normal_pen)
-                item.setBrush(QBrush(fill))
-                item.setToolTip(self._node_tooltip_meta(nvs))
-
-                item.setData(0, row.mode_id or "")   # mode_id
-                item.setData(1, row.track_id or "")  # track_id
-                item.setData(2, idx)                 # node_index（行内索引）
-                item.setData(3, nvs.node_id)         # node_id
-
-                self._scene.addItem(item)
-
-                text_item2 = QGraphicsSimpleTextItem(nvs.label, parent=item)
-                text_item2.setFont(font)
-                tb2 = text_item2.boundingRect()
-                text_x2 = (w - tb2.width()) / 2.0
-                text_y2 = (-self._node_height / 2.0) + (self._node_height - tb2.height()) / 2.0
-                text_item2.setPos(text_x2, text_y2)
-                text_item2.setBrush(QColor(255, 255, 255))
+                # 同一轨道内 node_id 理论上唯一；重复/为空时追加序号兜底
+                nid = nvs.node_id or ""
+                dup = seen_ids.get(nid, 0)
+                seen_ids[nid] = dup + 1
+                item_key = (key, nid if (nid and dup == 0) else f"{nid}#{dup}")
+                live_nodes.add(item_key)
+
+                node_sig = (x, y_item, w, idx, nvs.label, nvs.kind, nvs.has_condition, self._node_tooltip_meta(nvs))
+                item = state.node_items.get(item_key)
+                if item is None:
+                    item = QGraphicsRectItem()
+                    item.setPen(self._normal_pen)
+                    scene.addItem(item)
+                    text_item2 = QGraphicsSimpleTextItem(nvs.label, parent=item)
+                    text_item2.setFont(font)
+                    text_item2.setBrush(QColor(255, 255, 255))
+                    state.node_items[item_key] = item
+                    state.node_sigs.pop(item_key, None)
+
+                if state.node_sigs.get(item_key) != node_sig or item is self._drag_item:
+                    self._apply_node_visual(item, row, nvs, idx, x, y_item, w)
+                    state.node_sigs[item_key] = node_sig
 
                 rect_items.append(item)
                 row_x_max = max(row_x_max, x + w)
 
-            self._track_items[key] = rect_items
+            new_track_items[key] = rect_items
             x_max = max(x_max, row_x_max)
-            row_index += 1
 
-        last_row_index = len(rows) - 1
-        last_y_top = track_area_top + last_row_index * (self._row_height + self._row_gap)
-        grid_bottom = last_y_top + self._row_height
+        # 删除已不存在的节点与轨道
+        for item_key in [k for k in state.node_items if k not in live_nodes]:
+            item = state.node_items.pop(item_key)
+            state.node_sigs.pop(item_key, None)
+            if item is self._drag_item:
+                self._drag_item = None
+                self._drag_row_key = None
+                self._drag_smoothed_pos = None
+            scene.removeItem(item)
+        for key in [k for k in state.row_labels if k not in live_rows]:
+            scene.removeItem(state.row_labels.pop(key))
 
-        # 最后一条轨道之后的“新增轨道”按钮
-        btn_w, btn_h = 64.0, 22.0
-        btn_x = 6.0
-        btn_y = last_y_top + self._row_height + self._row_gap / 2.0 - btn_h / 2.0
-        plus_rect = QGraphicsRectItem(0, 0, btn_w, btn_h)
-        plus_rect.setPos(btn_x, btn_y)
-        plus_rect.setBrush(QBrush(QColor(80, 160, 80)))
-        plus_rect.setPen(QPen(QColor(30, 80, 30), 1.0))
-        plus_rect.setData(0, "add_track_button")
+        state.track_items.clear()
+        state.track_items.update(new_track_items)
+        return x_max
 
-        if self._current_mode_id:
-            mid_for_plus = self._current_mode_id
+    def _apply_node_visual(
+        self,
+        item: QGraphicsRectItem,
+        row: TrackVisualSpec,
+        nvs: NodeVisualSpec,
+        idx: int,
+        x: float,
+        y: float,
+        w: float,
+    ) -> None:
+        item.setRect(QRectF(0, -self._node_height / 2.0, w, self._node_height))
+        item.setPos(x, y)
+
+        kind = (nvs.kind or "").lower()
+
+        # 基础颜色
+        if kind == "skill":
+            fill = QColor(80, 160, 230)        # 蓝色
+        elif kind == "gateway":
+            if getattr(nvs, "has_condition", False):
+                fill = QColor(180, 100, 220)   # 紫色，高亮
+            else:
+                fill = QColor(240, 170, 60)    # 橙色
         else:
-            mid_for_plus = rows[-1].mode_id or ""
-        plus_rect.setData(1, mid_for_plus)
-        self._scene.addItem(plus_rect)
+            fill = QColor(130, 130, 130)
+
+        item.setPen(self._normal_pen)
+        item.setZValue(0)
+        item.setBrush(QBrush(fill))
+        item.setToolTip(self._node_tooltip_meta(nvs))
+
+        item.setData(0, row.mode_id or "")   # mode_id
+        item.setData(1, row.track_id or "")  # track_id
+        item.setData(2, idx)                 # node_index（行内索引）
+        item.setData(3, nvs.node_id)         # node_id
+
+        children = item.childItems()
+        if children and isinstance(children[0], QGraphicsSimpleTextItem):
+            text_item2 = children[0]
+            if text_item2.text() != nvs.label:
+                text_item2.setText(nvs.label)
+            tb2 = text_item2.boundingRect()
+            text_x2 = (w - tb2.width()) / 2.0
+            text_y2 = (-self._node_height / 2.0) + (self._node_height - tb2.height()) / 2.0
+            text_item2.setPos(text_x2, text_y2)
+
+    def _sync_add_button(
+        self,
+        state: "_SceneState",
+        font: QFont,
+        text: str,
+        btn_w: float,
+        btn_h: float,
+        pos: QPointF,
+        mode_id: str,
+    ) -> None:
+        plus_rect = state.add_button
+        if plus_rect is None or plus_rect.rect().width() != btn_w:
+            if plus_rect is not None:
+                state.scene.removeItem(plus_rect)
+            plus_rect = QGraphicsRectItem(0, 0, btn_w, btn_h)
+            plus_rect.setBrush(QBrush(QColor(80, 160, 80)))
+            plus_rect.setPen(QPen(QColor(30, 80, 30), 1.0))
+            plus_rect.setData(0, "add_track_button")
+            state.scene.addItem(plus_rect)
 
-        text_item = QGraphicsSimpleTextItem("+ 新增轨道", plus_rect)
-        text_item.setFont(font)
-        tb = text_item.boundingRect()
-        text_x = (btn_w - tb.width()) / 2.0
-        text_y = (btn_h - tb.height()) / 2.0
-        text_item.setPos(text_x, text_y)
-        text_item.setBrush(QColor(255, 255, 255))
+            text_item = QGraphicsSimpleTextItem(text, plus_rect)
+            text_item.setFont(font)
+            tb = text_item.boundingRect()
+            text_item.setPos((btn_w - tb.width()) / 2.0, (btn_h - tb.height()) / 2.0)
+            text_item.setBrush(QColor(255, 255, 255))
+            state.add_button = plus_rect
 
-        # 时间尺/网格横向边界
-        x_max_time = self._label_width + max_time_ms * self._time_scale_px_per_ms
-        x_extent = max(x_max + 40, x_max_time + 40, self._label_width + 300)
+        plus_rect.setPos(pos)
+        plus_rect.setData(1, mode_id)
 
-        # 保证场景宽度至少覆盖当前视口宽度
+    def _sync_ruler_and_grid(
+        self,
+        state: "_SceneState",
+        font: QFont,
+        max_time_ms: int,
+        x_extent: float,
+        grid_bottom: float,
+    ) -> None:
+        grid_sig = (int(max_time_ms), float(x_extent), float(grid_bottom), float(self._time_scale_px_per_ms))
+        if state.grid_sig == grid_sig:
+            return
+        for it in state.grid_items:
+            state.scene.removeItem(it)
+        state.grid_items = self._draw_time_ruler_and_grid(
+            font, max_time_ms, x_extent, grid_bottom, scene=state.scene
+        )
+        state.grid_sig = grid_sig
+
+    def _build_empty_scene(self, state: "_SceneState", font: QFont, max_time_ms: int) -> None:
+        """
+        无轨道时的提示场景（内容很少，直接整体重建）。
+        """
+        self._reset_state(state)
+        state.empty = True
+        scene = state.scene
+        track_area_top = self._ruler_height
+
+        x_extent = float(self._label_width + 300)
         view = self.viewport()
         if view is not None:
             vw = view.width()
             if vw > 0:
                 x_extent = max(x_extent, float(vw))
 
-        total_height = max(btn_y + btn_h + 20.0, grid_bottom + self._row_gap)
+        self._draw_time_ruler_and_grid(
+            font,
+            max_time_ms,
+            x_extent=x_extent,
+            grid_bottom=self._ruler_height + self._row_height,
+            scene=scene,
+        )
 
-        self._draw_time_ruler_and_grid(font, max_time_ms, x_extent, grid_bottom)
+        y_top = track_area_top
 
-        self._scene.setSceneRect(
+        hint = QGraphicsSimpleTextItem("（当前无轨道，点击下方 + 新建全局轨道）")
+        hint.setFont(font)
+        hint.setBrush(QColor(200, 200, 200))
+        hint.setPos(
+            4,
+            y_top + (self._row_height - hint.boundingRect().height()) / 2.0,
+        )
+        scene.addItem(hint)
+
+        btn_w, btn_h = 44.0, 20.0
+        btn_x = 6.0
+        btn_y = y_top + self._row_height + self._row_gap / 2.0 - btn_h / 2.0
+        # 空串 => 全局轨道
+        self._sync_add_button(state, font, "+", btn_w, btn_h, QPointF(btn_x, btn_y), "")
+
+        total_height = max(
+            track_area_top + self._row_height + self._row_gap + btn_h + 20,
+            240,
+        )
+
+        scene.setSceneRect(
             0,
             0,
-            x_extent,
-            max(total_height, 240),
+            max(x_extent, 320.0),
+            total_height,
         )
 
-        # 若之前有记忆的 current_key/index，则尝试恢复高亮
-        if self._current_key is not None and self._current_index is not None:
-            self._reapply_highlight()
-
     # ---------- 高亮当前节点 ----------
 
     def _clear_highlight(self) -> None:
@@ -467,10 +703,17 @@ class TimelineCanvas(QGraphicsView):
         max_time_ms: int,
         x_extent: float,
         grid_bottom: float,
-    ) -> None:
+        *,
+        scene: Optional[QGraphicsScene] = None,
+    ) -> List[QGraphicsItem]:
+        """
+        画时间尺与 step 网格，返回创建的 item（便于之后整体移除）。
+        """
+        scene = scene if scene is not None else self._scene
+        items: List[QGraphicsItem] = []
         scale = float(self._time_scale_px_per_ms)
         if scale <= 0:
-            return
+            return items
 
         try:
             step_ms = int(getattr(self, "_step_ms", 1000) or 1000)
@@ -498,13 +741,13 @@ class TimelineCanvas(QGraphicsView):
         font_small.setPointSize(max(font.pointSize() - 1, 6))
 
         # 顶部横线
-        self._scene.addLine(
+        items.append(scene.addLine(
             start_x,
             ruler_bottom,
             x_extent,
             ruler_bottom,
             pen_ruler,
-        )
+        ))
 
         # 1) 画所有竖线（step 边界）+ 小刻度
         tick_len = 6.0
@@ -518,21 +761,21 @@ class TimelineCanvas(QGraphicsView):
 
             step_x_positions.append(x)
 
-            self._scene.addLine(
+            items.append(scene.addLine(
                 x,
                 ruler_bottom,
                 x,
                 grid_bottom,
                 pen_grid,
-            )
+            ))
 
-            self._scene.addLine(
+            items.append(scene.addLine(
                 x,
                 ruler_bottom,
                 x,
                 ruler_bottom - tick_len,
                 pen_ruler,
-            )
+            ))
 
         # 2) 区间数字：1..N，画在两个 step_x_positions 之间的中点
         for step in range(1, len(step_x_positions)):
@@ -553,7 +796,10 @@ class TimelineCanvas(QGraphicsView):
             text_item.setFlag(QGraphicsItem.ItemIsSelectable, False)
             text_item.setFlag(QGraphicsItem.ItemIsFocusable, False)
 
-            self._scene.addItem(text_item)
+            scene.addItem(text_item)
+            items.append(text_item)
+
+        return items
 
     # ---------- 拖拽 & 缩放 ----------
 
@@ -568,6 +814,10 @@ class TimelineCanvas(QGraphicsView):
         # 点击“裸的”文字（轨道名 / 步骤数字）时，仅刷新，不参与拖拽
         if isinstance(item, QGraphicsSimpleTextItem) and item.parentItem() is None:
             try:
+                # 强制重新同步所有节点位置（例如拖拽后残留的偏移）
+                if self._state is not None:
+                    self._state.layout_sig = None
+                    self._state.node_sigs.clear()
                 self.set_data(self._ctx, self._preset, self._current_mode_id)
             except Exception:
                 pass
@@ -703,8 +953,11 @@ class TimelineCanvas(QGraphicsView):
     def mouseReleaseEvent(self, event) -> None:
         if event.button() == Qt.LeftButton and self._drag_item is not None and self._drag_row_key is not None:
             src_key = self._drag_row_key
-            rect = self._drag_item.rect()
-            item_pos = self._drag_item.pos()
+            drag_item = self._drag_item
+            rect = drag_item.rect()
+            item_pos = drag_item.pos()
+            # 释放后的位置由模型决定：处理函数调用 set_data 时一定重新摆放该节点
+            self._invalidate_node_item(drag_item)
 
             # 使用节点中心 Y 判定落入哪条轨道
             center_y = float(item_pos.y())
@@ -800,6 +1053,8 @@ class TimelineCanvas(QGraphicsView):
 
                         # 做一次 OutCubic 的动画，然后再真正发 nodeCrossMoved
                         def _on_finished():
+                            # 跨轨可能失败（模型不变）：动画期间的刷新不算数，再次作废以便弹回
+                            self._invalidate_node_item(drag_item)
                             self.nodeCrossMoved.emit(
                                 src_mid or "",
                                 src_tid or "",
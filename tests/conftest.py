@@ -1,6 +1,7 @@
 # tests/conftest.py
 from __future__ import annotations
 
+import os
 import sys
 from pathlib import Path
 
@@ -10,4 +11,7 @@ ROOT = Path(__file__).resolve().parents[1]
 # 确保项目根在 sys.path 中，方便 `import core` 等绝对导入
 root_str = str(ROOT)
 if root_str not in sys.path:
-    sys.path.insert(0, root_str)
\ No newline at end of file
+    sys.path.insert(0, root_str)
+
+# Qt 控件测试不需要显示器
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
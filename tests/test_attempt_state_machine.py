@@ -0,0 +1,286 @@
+# tests/test_attempt_state_machine.py
+from __future__ import annotations
+
+import threading
+from typing import List, Optional, Tuple
+
+from core.models.point import PointsFile
+from core.models.skill import CastConfig, Skill, SkillsFile, TriggerConfig
+
+from rotation_editor.ast import Const
+from rotation_editor.core.models import EntryPoint, RotationPreset, SkillNode
+from rotation_editor.core.models.track import Track
+from rotation_editor.core.runtime import MacroEngine
+from rotation_editor.core.runtime.engine import EngineConfig
+from rotation_editor.core.runtime.executor import LockPolicyConfig, SkillAttemptConfig, SkillAttemptExecutor
+from rotation_editor.core.runtime.executor import skill_attempt as skill_attempt_mod
+from rotation_editor.core.runtime.executor.skill_attempt import StartSignalConfig
+from rotation_editor.core.runtime.state import load_telemetry
+from rotation_editor.core.runtime.state import store as store_mod
+
+
+class FakeClock:
+    """虚拟 mono_ms 时钟：只在引擎等待时推进，断言不受机器负载影响。"""
+
+    def __init__(self) -> None:
+        self.ms = 1_000_000.0
+
+    def mono_ms(self) -> int:
+        return int(self.ms)
+
+
+class FakeStopEvent(threading.Event):
+    def __init__(self, clock: FakeClock) -> None:
+        super().__init__()
+        self._clock = clock
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        if not self.is_set() and timeout:
+            self._clock.ms += float(timeout) * 1000.0
+        return self.is_set()
+
+
+class SyncScheduler:
+    def call_soon(self, fn) -> None:
+        fn()
+
+
+class Callbacks:
+    def __init__(self, clock: FakeClock) -> None:
+        self._clock = clock
+        self.nodes: List[Tuple[str, int]] = []
+
+    def on_started(self, preset_id: str) -> None:
+        pass
+
+    def on_stopped(self, reason: str) -> None:
+        pass
+
+    def on_error(self, msg: str, detail: str) -> None:
+        pass
+
+    def on_node_executed(self, cursor, node) -> None:
+        self.nodes.append((cursor.track_id, self._clock.mono_ms()))
+
+
+class Keys:
+    def __init__(self, clock: FakeClock) -> None:
+        self._clock = clock
+        self.sent: List[Tuple[str, int]] = []
+
+    def send_key(self, key: str) -> None:
+        self.sent.append((key, self._clock.mono_ms()))
+
+
+class Ctx:
+    def __init__(self) -> None:
+        self.skills = SkillsFile(skills=[
+            Skill(id="slow", name="Slow", trigger=TriggerConfig(key="1"), cast=CastConfig(readbar_ms=300)),
+            Skill(id="fast", name="Fast", trigger=TriggerConfig(key="2")),
+        ])
+        self.points = PointsFile(points=[])
+        self.base = None
+
+
+def run_engine(
+    monkeypatch,
+    *,
+    nonblocking: bool = True,
+    with_fast_track: bool = True,
+    queue_window_ms: int = 0,
+    max_exec_nodes: int = 16,
+    telemetry_path: str = "",
+) -> Tuple[MacroEngine, Callbacks, Keys]:
+    # 测试环境没有技能像素：就绪一律成立，开始信号用 mode="none"
+    monkeypatch.setattr(SkillAttemptExecutor, "_default_ready_expr", lambda self, *, skill_id: Const(True))
+
+    p = RotationPreset(id="p", name="p", description="", entry=EntryPoint(scope="global", mode_id="", track_id="t1", node_id="n1"))
+    p.global_tracks = [Track(id="t1", nodes=[SkillNode(id="n1", skill_id="slow")])]
+    if with_fast_track:
+        p.global_tracks.append(Track(id="t2", nodes=[SkillNode(id="m1", skill_id="fast")]))
+    p.max_exec_nodes = max_exec_nodes
+
+    clock = FakeClock()
+    monkeypatch.setattr(store_mod, "mono_ms", clock.mono_ms)
+    monkeypatch.setattr(skill_attempt_mod, "mono_ms", clock.mono_ms)
+
+    cb, keys = Callbacks(clock), Keys(clock)
+    e = MacroEngine(
+        ctx=Ctx(),
+        scheduler=SyncScheduler(),
+        callbacks=cb,
+        key_sender=keys,
+        config=EngineConfig(nonblocking_attempts=nonblocking, telemetry_path=telemetry_path),
+        attempt_cfg=SkillAttemptConfig(start=StartSignalConfig(mode="none"), queue_window_ms=queue_window_ms),
+    )
+    stop_evt = FakeStopEvent(clock)
+    e._stop_evt = stop_evt
+    e._attempt_exec._stop_evt = stop_evt
+    e._run_loop(p)
+    return e, cb, keys
+
+
+def test_other_tracks_run_while_attempt_is_casting(monkeypatch) -> None:
+    e, cb, keys = run_engine(monkeypatch, nonblocking=True)
+
+    t_cast = next(t for k, t in keys.sent if k == "1")
+    during = [tid for tid, t in cb.nodes if tid == "t2" and t_cast < t < t_cast + 250]
+    assert during, "读条期间其它轨道应被调度"
+
+    # 施法锁被读条占用：t2 的技能节点排队等锁而不是被跳过，读条期间不发任何按键
+    assert not [k for k, t in keys.sent if t_cast < t < t_cast + 300]
+    t_fast = next(t for k, t in keys.sent if k == "2")
+    assert t_cast + 300 <= t_fast < t_cast + 300 + 100
+    assert not e.store.get_metric("fast", "skipped_lock")
+    assert e.store.get_metric("fast", "success") >= 1
+
+    # 读条完成后尝试按成功结算，施法锁已释放
+    assert e.store.get_metric("slow", "success") >= 1
+    assert e._cast_lock.try_acquire(owner="test")
+
+
+def test_queued_window_lets_other_track_key_into_cast(monkeypatch) -> None:
+    _e, _cb, keys = run_engine(monkeypatch, nonblocking=True, queue_window_ms=100)
+
+    t_cast = next(t for k, t in keys.sent if k == "1")
+    t_fast = next(t for k, t in keys.sent if k == "2")
+    # 预输入窗口内提前结算读条，等锁的 t2 立即接手
+    assert t_cast + 200 <= t_fast < t_cast + 300
+
+
+def test_blocking_mode_keeps_engine_thread_during_cast(monkeypatch) -> None:
+    e, cb, keys = run_engine(monkeypatch, nonblocking=False)
+
+    t_cast = next(t for k, t in keys.sent if k == "1")
+    during = [tid for tid, t in cb.nodes if tid == "t2" and t_cast < t < t_cast + 250]
+    assert not during
+    assert e.store.get_metric("slow", "success") >= 1
+
+
+def test_queued_input_sends_next_key_before_cast_end(monkeypatch) -> None:
+    e, _cb, keys = run_engine(monkeypatch, with_fast_track=False, max_exec_nodes=3)
+    base = e.store.get_input_gap_stats()
+    assert base["count"] == 2 and base["queued"] == 0
+    assert base["min_ms"] >= 40  # 至少 default_gap_ms
+
+    e, _cb, keys = run_engine(monkeypatch, with_fast_track=False, max_exec_nodes=3, queue_window_ms=100)
+    q = e.store.get_input_gap_stats()
+    assert q["count"] == 2 and q["queued"] == 2
+    # 虚拟时钟下结果确定：下一次按键恰好在预测的读条结束前一个预输入窗口发出
+    assert q["min_ms"] == q["max_ms"] == -100
+
+    # 相邻两次按键的间隔 = 读条时长 - 预输入窗口（FakeSender 记录的虚拟时刻）
+    (_, t1), (_, t2) = keys.sent[0], keys.sent[1]
+    assert t2 - t1 == 300 - 100
+
+
+def test_warm_start_reports_time_to_first_key(monkeypatch) -> None:
+    e, _cb, keys = run_engine(monkeypatch, with_fast_track=False, max_exec_nodes=2)
+    st = e.store.get_engine_state()
+    assert st["warmup_ms"] >= 0
+    # 第一次按键在启动后很快发生：预热完成后首个 tick 即发键
+    assert st["time_to_first_key_ms"] is not None and 0 <= st["time_to_first_key_ms"] < 200
+    assert len(keys.sent) >= 1
+
+
+def test_telemetry_recorder_follows_run_lifecycle(monkeypatch, tmp_path) -> None:
+    path = str(tmp_path / "run.tlm")
+    e, _cb, _keys = run_engine(monkeypatch, with_fast_track=False, max_exec_nodes=2, telemetry_path=path)
+    rec = e._recorder
+    assert rec is not None and rec._thread is None and rec._fh is None
+
+    run = load_telemetry(path)
+    types = list(run.events["type"])
+    assert types[0] == "ENGINE_STARTED" and types[-1] == "ENGINE_STOPPED"
+    assert len(types) == rec.stats().events
+
+    # 下一次运行写入新文件（顺延编号），上一轮的文件保持完整
+    run_engine(monkeypatch, with_fast_track=False, max_exec_nodes=2, telemetry_path=path)
+    assert load_telemetry(str(tmp_path / "run.1.tlm")).n_events > 0
+    assert load_telemetry(path).n_events == run.n_events
+
+
+def test_node_expr_cache_follows_in_place_edits() -> None:
+    from rotation_editor.ast import PixelMatchPoint
+    from rotation_editor.core.runtime.executor import CastLock
+    from rotation_editor.core.runtime.state import StateStore
+
+    ex = SkillAttemptExecutor(
+        ctx=Ctx(), store=StateStore(), key_sender=Keys(FakeClock()), cast_lock=CastLock(),
+        capman=None, cfg=SkillAttemptConfig(),  # type: ignore[arg-type]
+    )
+    node = SkillNode(id="n1", skill_id="slow")
+    node.start_expr = {"type": "pixel_point", "point_id": "a", "tolerance": 5}
+    assert ex.precompile_nodes([node]) == 1
+
+    probes = ex.node_probes(skill_id="slow", node_id="n1", node_start_expr_json=node.start_expr)
+    assert probes.point_ids == {"a"}
+
+    # 就地修改同一个 dict：缓存按内容比对，重新编译
+    node.start_expr["point_id"] = "b"
+    probes = ex.node_probes(skill_id="slow", node_id="n1", node_start_expr_json=node.start_expr)
+    assert probes.point_ids == {"b"}
+    assert ex._node_exprs[("n1", "start")].expr == PixelMatchPoint(point_id="b", tolerance=5)
+
+    ex.clear_node_exprs()
+    assert not ex._node_exprs
+
+
+def test_input_gap_is_tracked_per_lane(monkeypatch) -> None:
+    clock = FakeClock()
+    monkeypatch.setattr(store_mod, "mono_ms", clock.mono_ms)
+    store = store_mod.StateStore()
+    store.engine_started("p")
+
+    a = store.begin_attempt(skill_id="slow", node_id="n1", start_mode="key", readbar_ms=300, lane="global:t1")
+    store.finish_success(a)
+
+    # 另一条轨道的失败不应清掉 t1 的施法结束时刻
+    clock.ms += 10
+    b = store.begin_attempt(skill_id="fast", node_id="n2", start_mode="key", readbar_ms=0, lane="global:t2")
+    store.finish_fail(b, "no_start")
+
+    clock.ms += 30
+    c = store.begin_attempt(skill_id="slow", node_id="n1", start_mode="key", readbar_ms=300, lane="global:t1")
+    store.mark_key_sent_ok(c)
+    gap = store.get_input_gap_stats()
+    assert gap["count"] == 1 and gap["min_ms"] == 40
+
+
+def test_cursor_leaving_queued_node_drops_its_lock_ticket(monkeypatch) -> None:
+    monkeypatch.setattr(SkillAttemptExecutor, "_default_ready_expr", lambda self, *, skill_id: Const(True))
+    p = RotationPreset(id="p", name="p", description="", entry=EntryPoint(scope="global", mode_id="", track_id="t2", node_id="m1"))
+    m1, m2 = SkillNode(id="m1", skill_id="fast"), SkillNode(id="m2", skill_id="slow")
+    p.global_tracks = [Track(id="t2", nodes=[m1, m2])]
+
+    clock = FakeClock()
+    e = MacroEngine(
+        ctx=Ctx(), scheduler=SyncScheduler(), callbacks=Callbacks(clock), key_sender=Keys(clock),
+        attempt_cfg=SkillAttemptConfig(start=StartSignalConfig(mode="none"), lock=LockPolicyConfig(policy="WAIT_LOCK", wait_timeout_ms=60_000)),
+    )
+    e._apply_entry(p, now_ms=0)
+    assert e._cast_lock.try_acquire(owner="other")
+    key = ("global", "t2")
+
+    def run(idx: int, node: SkillNode) -> None:
+        e._run_skill_attempt(
+            scope="global", track_id="t2", node_index=idx, now_ms=0, skill_id=node.skill_id, node_id=node.id,
+            override_cast_ms=None, node_start_expr_json=None, node_complete_expr_json=None,
+        )
+
+    def node_exec(sid: str) -> int:
+        return next(d["node_exec"] for d in e.store.snapshot_skills() if d["skill_id"] == sid)
+
+    run(0, m1)
+    assert key in e._lock_waiters
+    # 网关跳转让 cursor 离开排队的节点：凭证作废
+    e._jump_same_scope(scope="global", track_id="t2", node_id="m2")
+    assert key not in e._lock_waiters
+    run(1, m2)
+    assert node_exec("slow") == 1 and e._lock_waiters[key][0] == 1
+
+    # cursor 被其它途径移走后执行另一个节点：旧凭证不被复用，新节点照常计数
+    e._global_rt.get("t2").jump_to_node_id("m1")
+    run(0, m1)
+    assert node_exec("fast") == 2 and e._lock_waiters[key][0] == 0
+    e._cast_lock.release()
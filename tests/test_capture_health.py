@@ -0,0 +1,54 @@
+# tests/test_capture_health.py
+from __future__ import annotations
+
+from typing import List
+
+from rotation_editor.core.runtime.capture import CaptureHealth, StateStoreCaptureSink
+from rotation_editor.core.runtime.state import StateStore
+
+
+def test_health_window_summary_and_histogram() -> None:
+    h = CaptureHealth(summary_interval_ms=1000)
+    t0 = h.peek().t_ms
+
+    for age in (0, 10, 20):
+        h.record_ok(age, grabbed=False)
+    h.record_ok(0, grabbed=True, grab_ms=0.5)
+    h.record_ok(0, grabbed=True, grab_ms=7.0)
+    h.record_ok(0, grabbed=True, grab_ms=500.0)
+
+    assert h.due_summary(t0 + 10) is None
+    s = h.due_summary(t0 + 2000)
+    assert s is not None
+    assert (s.hits, s.grabs, s.errors) == (3, 3, 0)
+    assert s.age_max_ms == 20 and s.age_mean_ms == 5.0
+    assert s.grab_ms_hist[0] == 1 and s.grab_ms_hist[3] == 1 and s.grab_ms_hist[-1] == 1
+    assert s.grab_ms_max == 500.0
+
+    # 新窗口从零开始，累计值保留
+    h.record_ok(0)
+    s2 = h.flush(t0 + 2500)
+    assert s2 is not None and s2.hits == 1 and s2.total_hits == 4 and s2.total_grabs == 3
+
+
+def test_sink_publishes_transitions_immediately_and_summaries_periodically() -> None:
+    store = StateStore()
+    seen: List[str] = []
+    store.bus.subscribe(lambda ev: seen.append(ev.type))
+    sink = StateStoreCaptureSink(store=store, summary_interval_ms=60_000)
+
+    for _ in range(200):
+        sink.on_capture_ok(1)
+    for _ in range(5):
+        sink.on_capture_error("capture_failed", "boom")
+    sink.on_capture_ok(0, grabbed=True, grab_ms=3.0)
+    sink.on_capture_ok(0)
+
+    # 逐次 ok / 重复的 error 不再发事件，只有状态转换
+    assert seen == ["CAPTURE_ERROR", "CAPTURE_RECOVERED"]
+
+    sink.flush()
+    assert seen[-1] == "CAPTURE_SUMMARY"
+    hs = store.get_capture_health()
+    assert hs["hits"] == 201 and hs["grabs"] == 1 and hs["errors"] == 5
+    assert hs["max_error_streak"] == 5 and hs["error_streak"] == 0
@@ -0,0 +1,142 @@
+# tests/test_capture_plan_cache.py
+from __future__ import annotations
+
+from typing import Dict, List, Tuple
+
+from core.pick.scanner import CapturePlan, FrameSnapshot, MonitorCapturePlan
+
+from rotation_editor.ast import ProbeRequirements
+from rotation_editor.core.runtime.capture import CaptureManager, PlanBuildResult, SnapshotOk
+
+# 点位 id -> (x, y)
+POINTS: Dict[str, Tuple[int, int]] = {"a": (10, 10), "b": (50, 10), "c": (30, 40)}
+
+
+class FakeBuilder:
+    """
+    按点位坐标的包围矩形构建 ROI plan，并记录 build 次数。
+    """
+    def __init__(self) -> None:
+        self.builds = 0
+
+    def build(self, *, ctx, probes: ProbeRequirements, capture) -> PlanBuildResult:
+        self.builds += 1
+        xs = [POINTS[p][0] for p in probes.point_ids]
+        ys = [POINTS[p][1] for p in probes.point_ids]
+        mp = MonitorCapturePlan(
+            monitor="primary",
+            mode="roi",
+            roi_left=min(xs),
+            roi_top=min(ys),
+            roi_width=max(xs) - min(xs) + 1,
+            roi_height=max(ys) - min(ys) + 1,
+        )
+        return PlanBuildResult(plan=CapturePlan(plans={"primary": mp}, topology_gen=1), probes_by_monitor={})
+
+
+class FakeCapture:
+    def topology_generation(self) -> int:
+        return 1
+
+    def invalidate_topology(self) -> None:
+        pass
+
+    def close_current_thread(self) -> None:
+        pass
+
+
+class FakeScanner:
+    def __init__(self) -> None:
+        self.grabs: List[CapturePlan] = []
+
+    def capture_with_plan(self, plan: CapturePlan) -> FrameSnapshot:
+        self.grabs.append(plan)
+        return FrameSnapshot(frames={}, ts=0.0)
+
+
+def probes(*ids: str) -> ProbeRequirements:
+    return ProbeRequirements(point_ids=set(ids))
+
+
+def make_manager(**kw) -> Tuple[CaptureManager, FakeBuilder, FakeScanner]:
+    builder, scanner = FakeBuilder(), FakeScanner()
+    cm = CaptureManager(
+        ctx=None,  # type: ignore[arg-type]
+        capture=FakeCapture(),  # type: ignore[arg-type]
+        scanner=scanner,  # type: ignore[arg-type]
+        plan_builder=builder,  # type: ignore[arg-type]
+        snapshot_cache_ttl_ms=10_000,
+        **kw,
+    )
+    return cm, builder, scanner
+
+
+def test_plan_lru_reuses_built_plans_when_alternating() -> None:
+    cm, builder, _scanner = make_manager(plan_cache_size=2)
+    for _ in range(5):
+        cm.update_plan(probes("a"))
+        cm.update_plan(probes("b"))
+    assert builder.builds == 2
+
+    cm.update_plan(probes("c"))  # 淘汰最久未用的 "a"
+    cm.update_plan(probes("a"))
+    st = cm.get_plan_cache_stats()
+    assert builder.builds == 4
+    assert st.evictions == 2
+    assert st.hits == 8
+
+    cm.invalidate_plan()
+    cm.update_plan(probes("a"))
+    assert builder.builds == 5
+
+
+def test_snapshot_reused_across_covered_plans() -> None:
+    cm, _builder, scanner = make_manager()
+    cm.update_plan(probes("a", "b", "c"))
+    s1 = cm.get_snapshot()
+    assert isinstance(s1, SnapshotOk)
+
+    # 切到被旧帧 ROI 覆盖的子 plan：不重抓，复用同一帧
+    cm.update_plan(probes("a"))
+    s2 = cm.get_snapshot()
+    assert isinstance(s2, SnapshotOk) and s2.seq == s1.seq
+    assert len(scanner.grabs) == 1
+    assert cm.get_plan_cache_stats().snapshot_reuses == 1
+
+
+def test_pinned_union_plan_ignores_covered_updates() -> None:
+    cm, builder, scanner = make_manager()
+    cm.pin_plan(probes("a", "b"))
+    plan = cm.get_plan()
+    for ids in (("a",), ("b",), ("a", "b")):
+        cm.update_plan(probes(*ids))
+        assert cm.get_plan() is plan
+        assert isinstance(cm.get_snapshot(), SnapshotOk)
+    assert builder.builds == 1
+    assert len(scanner.grabs) == 1
+    assert cm.get_plan_cache_stats().pinned_skips == 3
+
+    # 未覆盖的 probes 并入并集（只增不减）
+    cm.update_plan(probes("c"))
+    assert builder.builds == 2
+    assert cm.get_plan().plans["primary"].roi_width == 41
+
+
+def test_snapshot_freshness_per_call() -> None:
+    cm, _builder, scanner = make_manager()
+    cm.update_plan(probes("a"))
+    s1 = cm.get_snapshot()
+    assert isinstance(s1, SnapshotOk)
+
+    # 能容忍旧帧的调用复用缓存
+    s2 = cm.get_snapshot(max_age_ms=5_000)
+    assert isinstance(s2, SnapshotOk) and s2.seq == s1.seq
+
+    # 要求“在某时刻之后抓取”的帧：缓存帧不满足，必须重抓
+    s3 = cm.get_snapshot(newer_than_ms=s1.captured_ms)
+    assert isinstance(s3, SnapshotOk) and s3.seq > s1.seq
+    assert s3.captured_ms >= s1.captured_ms
+
+    s4 = cm.get_snapshot(max_age_ms=0)
+    assert isinstance(s4, SnapshotOk) and s4.seq > s3.seq
+    assert len(scanner.grabs) == 3
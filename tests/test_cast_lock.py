@@ -0,0 +1,99 @@
+# tests/test_cast_lock.py
+from __future__ import annotations
+
+import threading
+import time
+from typing import List
+
+from rotation_editor.core.runtime.executor import CastLock, PRIORITY_GLOBAL, PRIORITY_MODE
+
+
+def _wait_for_waiters(lock: CastLock, n: int) -> None:
+    t_end = time.time() + 2.0
+    while lock.stats().waiters < n and time.time() < t_end:
+        time.sleep(0.001)
+
+
+def test_cast_lock_priority_then_fifo_handover() -> None:
+    """
+    锁释放后按 (priority, 到达顺序) 交接：global 等待者先于先到的 mode 等待者。
+    """
+    lock = CastLock()
+    assert lock.try_acquire(owner="holder")
+
+    order: List[str] = []
+
+    def waiter(name: str, prio: int) -> None:
+        assert lock.acquire(priority=prio, timeout_ms=2000, owner=name)
+        order.append(name)
+        lock.release()
+
+    threads = []
+    for i, (name, prio) in enumerate([("mode1", PRIORITY_MODE), ("mode2", PRIORITY_MODE), ("global1", PRIORITY_GLOBAL)]):
+        th = threading.Thread(target=waiter, args=(name, prio))
+        th.start()
+        threads.append(th)
+        _wait_for_waiters(lock, i + 1)
+
+    # 有人排队时 try_acquire 不插队
+    assert not lock.try_acquire()
+
+    lock.release()
+    for th in threads:
+        th.join(timeout=2.0)
+
+    assert order == ["global1", "mode1", "mode2"]
+    st = lock.stats()
+    assert st.contended == 3
+    assert st.timeouts == 0
+    assert st.waiters == 0
+    assert not lock.locked()
+
+
+def test_cast_lock_timeout_and_interrupt() -> None:
+    lock = CastLock()
+    assert lock.try_acquire()
+
+    assert lock.acquire(timeout_ms=20) is False
+
+    stop = threading.Event()
+    result: List[bool] = []
+    th = threading.Thread(target=lambda: result.append(lock.acquire(timeout_ms=5000, stop_evt=stop)))
+    th.start()
+    _wait_for_waiters(lock, 1)
+    stop.set()
+    lock.interrupt()
+    th.join(timeout=1.0)
+
+    assert result == [False]
+    assert lock.stats().timeouts == 2
+    lock.release()
+    assert lock.try_acquire()
+
+
+def test_cast_lock_tickets_follow_priority_and_deadline() -> None:
+    """
+    非阻塞凭证与阻塞等待者共用同一队列：按优先级交接，到期凭证自动出队。
+    """
+    lock = CastLock()
+    assert lock.try_acquire(owner="holder")
+
+    mode = lock.enqueue(priority=PRIORITY_MODE)
+    short = lock.enqueue(priority=PRIORITY_GLOBAL, timeout_ms=1)
+    glob = lock.enqueue(priority=PRIORITY_GLOBAL)
+    assert lock.try_acquire_ticket(glob) == "WAITING"
+
+    time.sleep(0.01)
+    assert lock.try_acquire_ticket(short) == "EXPIRED"
+    assert lock.is_next(glob) and not lock.is_next(mode)
+
+    lock.release()
+    assert lock.try_acquire_ticket(mode) == "WAITING"
+    assert lock.try_acquire_ticket(glob, owner="glob") == "ACQUIRED"
+    lock.release()
+
+    lock.cancel(mode)
+    lock.cancel(mode)
+    assert lock.try_acquire_ticket(mode) == "EXPIRED"
+    assert lock.try_acquire(owner="free")
+    assert lock.stats().timeouts == 1
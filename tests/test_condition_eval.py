@@ -1,6 +1,8 @@
 # tests/test_condition_eval.py
 from __future__ import annotations
 
+import itertools
+import random
 from dataclasses import dataclass
 from typing import Optional, Tuple
 
@@ -10,10 +12,20 @@ from core.models.point import Point, PointsFile
 from core.models.skill import Skill, SkillsFile, ColorRGB
 
 from rotation_editor.ast import (
+    And,
+    AtomMemo,
+    Const,
+    DictMetricProvider,
+    Not,
+    Or,
+    PixelMatchSkill,
+    SelectivityStats,
+    SkillMetricGE,
     decode_expr,
     evaluate,
     EvalContext,
     TriBool,
+    optimize_expr,
 )
 
 
@@ -202,4 +214,107 @@ def test_pixel_skill_tolerance() -> None:
     assert tri_is_true(r_match)
 
     r_miss = evaluate(expr, ctx_miss)
-    assert tri_is_false(r_miss)
\ No newline at end of file
+    assert tri_is_false(r_miss)
+
+
+@dataclass
+class CountingSampler(DummySampler):
+    calls: int = 0
+
+    def sample_rgb_abs(self, **kwargs) -> Optional[RGB]:
+        self.calls += 1
+        return super().sample_rgb_abs(**kwargs)
+
+
+def test_atom_memo_shared_across_evaluations() -> None:
+    """
+    同一 AtomMemo 下，多个表达式中重复出现的像素原子只采样一次。
+    """
+    prof = make_profile_with_point_and_skill()
+    sampler = CountingSampler(100, 150, 200)
+    memo = AtomMemo(1)
+    ctx = EvalContext(profile=prof, sampler=sampler, memo=memo)  # type: ignore[arg-type]
+
+    atom = {"type": "pixel_point", "point_id": "pt1", "tolerance": 20}
+    e1, _ = decode_expr({"type": "and", "children": [atom, {"type": "const", "value": True}]})
+    e2, _ = decode_expr({"type": "not", "child": atom})
+    assert e1 is not None and e2 is not None
+
+    assert tri_is_true(evaluate(e1, ctx))
+    assert tri_is_false(evaluate(e2, ctx))
+    assert sampler.calls == 1
+    assert memo.stats.atom_hits == 1
+    assert memo.stats.atom_misses == 1
+
+
+def test_optimizer_folds_flattens_and_orders_by_cost() -> None:
+    px = PixelMatchSkill(skill_id="sk1", tolerance=10)
+    m = SkillMetricGE(skill_id="sk1", metric="success", count=1)
+
+    e = And(children=(px, Const(True), And(children=(Not(Not(m)), px))))
+    assert optimize_expr(e) == And(children=(m, px))
+
+    assert optimize_expr(Or(children=(px, Not(Const(False))))) == Const(True)
+    assert optimize_expr(And(children=(Const(True), Const(True)))) == Const(True)
+    assert optimize_expr(Or(children=(Const(False), px))) == px
+
+
+def test_optimizer_preserves_kleene_results() -> None:
+    """
+    随机表达式：优化前后（含按选择性统计重排）在所有 True/False/Unknown 赋值下结果一致。
+    """
+    atoms = [SkillMetricGE(skill_id=f"s{i}", metric="success", count=1) for i in range(3)]
+    rnd = random.Random(7)
+
+    def gen(depth: int):
+        k = rnd.randrange(6 if depth > 0 else 2)
+        if k == 0:
+            return rnd.choice(atoms)
+        if k == 1:
+            return Const(rnd.random() < 0.5)
+        if k == 2:
+            return Not(gen(depth - 1))
+        kids = tuple(gen(depth - 1) for _ in range(rnd.randrange(1, 4)))
+        return And(children=kids) if k in (3, 4) else Or(children=kids)
+
+    prof = make_profile_with_point_and_skill()
+    # 值：None -> Unknown，0 -> False，1 -> True
+    envs = []
+    for vals in itertools.product((None, 0, 1), repeat=len(atoms)):
+        mm = {f"s{i}": {"success": v} for i, v in enumerate(vals) if v is not None}
+        envs.append(EvalContext(profile=prof, sampler=DummySampler(0, 0, 0), metrics=DictMetricProvider(mm)))  # type: ignore[arg-type]
+
+    for _ in range(200):
+        e = gen(4)
+        sel = SelectivityStats(min_samples=1)
+        for ctx in envs:
+            evaluate(e, EvalContext(profile=ctx.profile, sampler=ctx.sampler, metrics=ctx.metrics, selectivity=sel))
+        for opt in (optimize_expr(e), optimize_expr(e, selectivity=sel)):
+            for ctx in envs:
+                assert evaluate(opt, ctx).value == evaluate(e, ctx).value
+
+
+def test_selectivity_record_does_not_rehash_subtrees(monkeypatch) -> None:
+    m1 = SkillMetricGE(skill_id="s1", metric="success", count=1)
+    m2 = SkillMetricGE(skill_id="s2", metric="success", count=1)
+    sel = SelectivityStats(min_samples=1)
+    e = optimize_expr(And(children=(Not(m1), Or(children=(m2, Not(m2))))), selectivity=sel)
+
+    hashes = {"n": 0}
+    orig = Not.__hash__
+
+    def counting_hash(self) -> int:
+        hashes["n"] += 1
+        return orig(self)
+
+    monkeypatch.setattr(Not, "__hash__", counting_hash)
+    ctx = EvalContext(profile=make_profile_with_point_and_skill(), sampler=DummySampler(0, 0, 0),  # type: ignore[arg-type]
+                      metrics=DictMetricProvider({"s1": {"success": 0}, "s2": {"success": 1}}), selectivity=sel)
+    for _ in range(50):
+        assert evaluate(e, ctx).is_true()
+    # 子项在 optimize 时已登记：求值热路径上不再对子树计算哈希
+    assert hashes["n"] == 0
+    assert sel.samples(e.children[0]) == 50
+
+    # 重新优化顺序不变时返回同一对象，登记继续有效
+    assert optimize_expr(e, selectivity=sel) is e
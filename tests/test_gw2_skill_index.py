@@ -0,0 +1,72 @@
+# tests/test_gw2_skill_index.py
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from qtui.extensions import gw2_skill_index
+from qtui.extensions.gw2_skill_index import INDEX_FILE_NAME, load_skill_index
+
+
+SKILLS = [
+    {"id": 101, "name": "Fire Strike", "description": "Burn foes", "professions": ["Guardian"],
+     "slot": "Weapon_1", "type": "Weapon", "facts": [{"type": "Recharge", "value": 4}, {"type": "Damage"}]},
+    {"id": 102, "name": "Shield of Wrath", "description": "Block attacks", "professions": ["Guardian"],
+     "slot": "Utility", "type": "Utility"},
+    {"id": 201, "name": "火焰打击", "description": "strike with fire", "professions": ["Warrior"],
+     "slot": "Weapon_2", "type": "Weapon"},
+    {"id": 202, "name": "Banner", "description": "", "professions": ["Warrior"], "slot": "Elite", "type": "Elite"},
+]
+
+PROFESSIONS = {
+    "Guardian": {"weapons": {"Sword": {"skills": [{"id": 101, "slot": "Weapon_1"}]}}},
+    "Warrior": {"weapons": {"Axe": {"skills": [{"id": 201, "slot": "Weapon_2"}]}}},
+}
+
+
+def _write_sources(tmp_path: Path) -> tuple[Path, Path]:
+    sp = tmp_path / "skills_all.json"
+    pp = tmp_path / "professions_all.json"
+    sp.write_text(json.dumps(SKILLS), encoding="utf-8")
+    pp.write_text(json.dumps(PROFESSIONS), encoding="utf-8")
+    return sp, pp
+
+
+def _ids(idx, **kw) -> list[int]:
+    return [idx.skills[i]["id"] for i in idx.query(**kw)]
+
+
+def test_skill_index_query_and_cache(tmp_path: Path) -> None:
+    sp, pp = _write_sources(tmp_path)
+    cache_dir = tmp_path / "cache"
+
+    idx = load_skill_index(sp, pp, cache_dir=cache_dir, rebuild=True)
+    assert (cache_dir / INDEX_FILE_NAME).exists()
+
+    assert _ids(idx) == [101, 102, 201, 202]
+    assert _ids(idx, profession="Guardian") == [101, 102]
+    assert _ids(idx, kind="weapon") == [101, 201]
+    assert _ids(idx, profession="Warrior", kind="weapon", weapon="Axe") == [201]
+    assert _ids(idx, profession="Warrior", weapon="Sword") == []
+    # 名称 / ID / 描述子串匹配（大小写不敏感）
+    assert _ids(idx, text="STRIKE") == [101, 201]
+    assert _ids(idx, text="火焰") == [201]
+    assert _ids(idx, text="20") == [201, 202]
+    assert _ids(idx, text="block", profession="Guardian") == [102]
+    # 描述走倒排索引，不逐条扫描
+    assert idx.desc_grams["bl"] == [1]
+    assert _ids(idx, text="foes") == [101]
+    assert _ids(idx, text="with fire") == [201]
+
+    assert idx.get("101")["facts"] == [{"type": "Recharge", "value": 4}]
+    assert idx.profession_names() == ["Guardian", "Warrior"]
+    assert idx.weapons_for("Guardian") == ["Sword"]
+
+    # 缓存文件读出的索引与重新构建的结果一致；源文件变化后缓存失效
+    gw2_skill_index._MEMO.clear()
+    cached = load_skill_index(sp, pp, cache_dir=cache_dir, rebuild=False)
+    assert cached.to_dict() == idx.to_dict()
+
+    sp.write_text(json.dumps(SKILLS[:2]), encoding="utf-8")
+    idx2 = load_skill_index(sp, pp, cache_dir=cache_dir)
+    assert _ids(idx2) == [101, 102]
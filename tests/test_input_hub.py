@@ -0,0 +1,60 @@
+# tests/test_input_hub.py
+from __future__ import annotations
+
+from typing import List
+
+from core.input.hub import InputHub
+
+
+class FakeListener:
+    """
+    代替 pynput keyboard.Listener：只记录启动 / 停止。
+    """
+    created: List["FakeListener"] = []
+
+    def __init__(self, *, on_press, on_release) -> None:
+        self.on_press = on_press
+        self.on_release = on_release
+        self.started = False
+        self.stopped = False
+        FakeListener.created.append(self)
+
+    def start(self) -> None:
+        self.started = True
+
+    def stop(self) -> None:
+        self.stopped = True
+
+
+def test_single_listener_dispatches_by_mods_and_main() -> None:
+    FakeListener.created = []
+    hub = InputHub(listener_factory=FakeListener)
+    fired: List[str] = []
+
+    h1 = hub.register_hotkey("ctrl+f9", lambda: fired.append("toggle"))
+    h2 = hub.register_hotkey("esc", lambda: fired.append("cancel"), any_mods=True)
+    h3 = hub.register_hotkey("F8", lambda: fired.append("confirm"))
+    assert len(FakeListener.created) == 1 and FakeListener.created[0].started
+    assert hub.hotkey_count() == 3
+
+    hub.feed_press("f9")                # 缺修饰键：不匹配
+    hub.feed_press("ctrl")
+    hub.feed_press("f9")                # 主键仍按着：视为自动连发
+    hub.feed_release("f9")
+    hub.feed_press("f9")
+    hub.feed_press("f9")                # 自动连发不重复触发
+    hub.feed_release("f9")
+    hub.feed_press("f8")                # 修饰键不完全一致：不匹配
+    hub.feed_release("f8")
+    hub.feed_press("esc")               # any_mods：带 ctrl 也匹配
+    hub.feed_release("esc")
+    hub.feed_release("ctrl")
+    hub.feed_press("f8")
+    assert fired == ["toggle", "cancel", "confirm"]
+
+    # 最后一个注册注销后停止系统钩子；再次注册时重新启动
+    for h in (h1, h2, h3):
+        hub.unregister(h)
+    assert FakeListener.created[0].stopped and not hub.is_listening()
+    hub.register_hotkey("f9", lambda: None)
+    assert len(FakeListener.created) == 2 and hub.is_listening()
@@ -0,0 +1,79 @@
+# tests/test_lookahead.py
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Sequence
+
+from rotation_editor.ast import Expr, PixelMatchSkill, ProbeRequirements, TriBool
+from rotation_editor.core.models import SkillNode, GatewayNode
+from rotation_editor.core.models.track import Track
+from rotation_editor.core.runtime.lookahead import LookaheadConfig, ReadinessPrefetcher
+from rotation_editor.core.runtime.runtime_state import GlobalRuntimeState, GlobalTrackRuntime
+from rotation_editor.core.runtime.scheduler import Scheduler
+
+
+def make_prefetcher(ready: Dict[str, bool], calls: List[int], *, window: int = 3, predict=None) -> ReadinessPrefetcher:
+    def ready_expr_for(sid: str) -> Optional[Expr]:
+        return PixelMatchSkill(skill_id=sid, tolerance=0)
+
+    def evaluate_batch(exprs: Sequence[Expr], probes: ProbeRequirements) -> List[TriBool]:
+        calls.append(len(exprs))
+        return [TriBool.t() if ready.get(e.skill_id) else TriBool.f() for e in exprs]  # type: ignore[attr-defined]
+
+    return ReadinessPrefetcher(
+        cfg=LookaheadConfig(window=window),
+        ready_expr_for=ready_expr_for,
+        evaluate_batch=evaluate_batch,
+        predict_ready_ms=predict,
+    )
+
+
+def make_global(tracks: Dict[str, List]) -> GlobalRuntimeState:
+    return GlobalRuntimeState(
+        tracks={tid: GlobalTrackRuntime(track=Track(id=tid, nodes=nodes), next_time_ms=0) for tid, nodes in tracks.items()}
+    )
+
+
+def test_lookahead_batches_tracks_and_skips_not_ready() -> None:
+    """
+    两条到期轨道在一次批量求值中完成判断：
+    - t1: a(未就绪) -> b(就绪)：跳过 a，落在 b
+    - t2: c(未就绪) -> d(未就绪)：整体跳过，不可执行
+    """
+    g = make_global({
+        "t1": [SkillNode(id="n1", skill_id="a"), SkillNode(id="n2", skill_id="b")],
+        "t2": [SkillNode(id="n3", skill_id="c"), SkillNode(id="n4", skill_id="d")],
+    })
+    calls: List[int] = []
+    pf = make_prefetcher({"b": True}, calls)
+
+    items = Scheduler().due_items(now_ms=0, global_rt=g, mode_rt=None)
+    looks = pf.prefetch(items, global_rt=g, mode_rt=None, now_ms=0)
+
+    assert calls == [4]
+    by_tid = {lk.item.track_id: lk for lk in looks}
+    assert by_tid["t1"].runnable is True
+    assert [idx for idx, _n, _r in by_tid["t1"].skip] == [0]
+    assert by_tid["t2"].runnable is False
+    assert [idx for idx, _n, _r in by_tid["t2"].skip] == [0, 1]
+    assert pf.idle_delay_ms(by_tid["t2"], now_ms=0, poll_not_ready_ms=50) == 50
+
+
+def test_lookahead_stops_at_gateway_and_uses_prediction() -> None:
+    g = make_global({
+        "t1": [SkillNode(id="n1", skill_id="a"), GatewayNode(id="gw"), SkillNode(id="n2", skill_id="b")],
+        "t2": [SkillNode(id="n3", skill_id="c")],
+    })
+    calls: List[int] = []
+    pf = make_prefetcher({}, calls, predict=lambda sid: 120)
+
+    items = Scheduler().due_items(now_ms=100, global_rt=g, mode_rt=None)
+    looks = {lk.item.track_id: lk for lk in pf.prefetch(items, global_rt=g, mode_rt=None, now_ms=100)}
+
+    # 网关节点不做预判，直接作为落点
+    assert looks["t1"].runnable is True
+    assert len(looks["t1"].skip) == 1
+
+    # 冷却预测 120 -> 20ms 后再检查（短于 poll_not_ready_ms）
+    assert looks["t2"].runnable is False
+    assert looks["t2"].wake_ms == 120
+    assert pf.idle_delay_ms(looks["t2"], now_ms=100, poll_not_ready_ms=50) == 20
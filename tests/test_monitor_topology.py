@@ -0,0 +1,67 @@
+# tests/test_monitor_topology.py
+from __future__ import annotations
+
+import time
+
+from core.pick import capture as capture_mod
+from core.pick.capture import MonitorTopology, Rect, ScreenCapture
+
+
+def _m(left: int, top: int, width: int, height: int) -> dict:
+    return {"left": left, "top": top, "width": width, "height": height}
+
+
+def test_monitor_topology_lookup() -> None:
+    monitors = [
+        _m(-1920, -100, 5120, 1540),
+        _m(0, 0, 1920, 1080),        # primary
+        _m(-1920, 200, 1920, 1080),  # 左侧副屏
+        _m(1920, -100, 1280, 1440),  # 右侧竖屏
+    ]
+    topo = MonitorTopology.from_monitors(monitors, generation=1)
+
+    assert topo.rect_for("all") == Rect(-1920, -100, 5120, 1540)
+    assert topo.rect_for(" Primary ") == Rect(0, 0, 1920, 1080)
+    assert topo.rect_for("monitor_3") == Rect(1920, -100, 1280, 1440)
+    # 非法 / 越界 key 回落到 all
+    assert topo.rect_for("monitor_9") == topo.rect_for("all")
+
+    assert topo.key_for_abs(100, 100) == "primary"
+    assert topo.key_for_abs(-1, 200) == "monitor_2"
+    assert topo.key_for_abs(-1, 199) is None
+    assert topo.key_for_abs(1920, -100) == "monitor_3"
+    assert topo.key_for_abs(3200, 0) is None
+
+    assert topo.same_layout(monitors)
+    assert not topo.same_layout(monitors[:2])
+
+
+def test_topology_checked_in_background(monkeypatch) -> None:
+    layouts = [[_m(0, 0, 1920, 1080), _m(0, 0, 1920, 1080)]]
+    calls = []
+
+    def enumerate_monitors():
+        calls.append(1)
+        return layouts[-1]
+
+    monkeypatch.setattr(capture_mod, "_enumerate_monitors", enumerate_monitors)
+    monkeypatch.setattr(capture_mod, "TOPOLOGY_CHECK_INTERVAL_S", 0.01)
+    monkeypatch.setattr(capture_mod, "_TOPO", None)
+    monkeypatch.setattr(capture_mod, "_TOPO_STALE", False)
+    monkeypatch.setattr(capture_mod, "_TOPO_WATCHER", None)
+
+    sc = ScreenCapture()
+    first = sc.topology()
+    n = len(calls)
+    # 调用方只读缓存，不在截屏路径上枚举
+    for _ in range(100):
+        assert sc.topology() is first
+    assert len(calls) - n < 100
+
+    # 热插拔：后台线程发现布局变化，生成新 generation
+    layouts.append([_m(0, 0, 3840, 1080), _m(0, 0, 1920, 1080), _m(1920, 0, 1920, 1080)])
+    deadline = time.monotonic() + 2.0
+    while sc.topology_generation() == first.generation and time.monotonic() < deadline:
+        time.sleep(0.005)
+    assert sc.topology().generation == first.generation + 1
+    assert sc.get_monitor_rect("monitor_2") == Rect(1920, 0, 1920, 1080)
@@ -0,0 +1,66 @@
+# tests/test_pixel_scanner.py
+from __future__ import annotations
+
+import threading
+from types import SimpleNamespace
+from typing import Dict, List
+
+from core.pick import scanner as scanner_mod
+from core.pick.scanner import CapturePlan, MonitorCapturePlan, PixelScanner
+
+
+class FakeImage:
+    def __init__(self, box: Dict[str, int]) -> None:
+        self.raw = bytes([0, 0, 0, 255]) * (box["width"] * box["height"])
+
+
+class SkewedGrabber:
+    """
+    mss 替身：按 (显示器 left, 第几次抓取) 给出抓取完成时间，time.time() 返回本线程最近一次抓取的时间。
+    """
+
+    def __init__(self, stamps: Dict[int, List[float]]) -> None:
+        self._stamps = stamps
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.grabs: List[int] = []
+
+    def grab(self, box: Dict[str, int]) -> FakeImage:
+        with self._lock:
+            n = self.grabs.count(box["left"])
+            self.grabs.append(box["left"])
+        self._local.ts = self._stamps[box["left"]][n]
+        return FakeImage(box)
+
+    def time(self) -> float:
+        return getattr(self._local, "ts", 0.0)
+
+    # ScreenCapture 替身
+    def _get_sct(self) -> "SkewedGrabber":
+        return self
+
+    def close_current_thread(self) -> None:
+        pass
+
+
+def two_monitor_plan() -> CapturePlan:
+    def mp(mk: str, left: int) -> MonitorCapturePlan:
+        return MonitorCapturePlan(monitor=mk, mode="roi", roi_left=left, roi_top=0, roi_width=2, roi_height=2)
+
+    return CapturePlan(plans={"m1": mp("m1", 0), "m2": mp("m2", 1000)})
+
+
+def test_parallel_grab_regrabs_stale_frame_when_skew_exceeds_bound(monkeypatch) -> None:
+    # m1 第一次抓取比 m2 早 50ms（超出 8ms），重抓后与 m2 对齐
+    fake = SkewedGrabber({0: [10.000, 10.050], 1000: [10.050]})
+    monkeypatch.setattr(scanner_mod, "time", SimpleNamespace(time=fake.time))
+
+    sc = PixelScanner(fake, parallel=True, max_skew_ms=8.0)  # type: ignore[arg-type]
+    try:
+        snap = sc.capture_with_plan(two_monitor_plan())
+    finally:
+        sc.close()
+
+    assert sorted(fake.grabs) == [0, 0, 1000]
+    assert snap.parallel and snap.skew_ms == 0.0
+    assert snap.frames["m1"].ts == snap.frames["m2"].ts == 10.050
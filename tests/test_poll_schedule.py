@@ -0,0 +1,81 @@
+# tests/test_poll_schedule.py
+from __future__ import annotations
+
+from typing import List, Optional, Tuple
+
+from rotation_editor.core.runtime.executor import AdaptivePollConfig, PollSchedule
+from rotation_editor.core.runtime.state import LatencyStats, StateStore
+from rotation_editor.core.runtime.state import store as store_mod
+
+
+def poll_times(sched: PollSchedule, until_ms: int) -> List[int]:
+    t, out = 0, [0]
+    while True:
+        t += sched.next_delay_ms(t)
+        if t > until_ms:
+            return out
+        out.append(t)
+
+
+def default_start_schedule(expect: Optional[Tuple[int, int]]) -> PollSchedule:
+    ap = AdaptivePollConfig()
+    return PollSchedule(
+        base_poll_ms=10,  # StartSignalConfig 默认 poll_ms
+        expect=expect,
+        dense_poll_ms=ap.dense_poll_ms,
+        max_gap_ms=ap.start_max_gap_ms,
+        margin_ms=ap.margin_ms,
+    )
+
+
+def test_fixed_poll_without_window() -> None:
+    assert poll_times(default_start_schedule(None), 20) == [0, 10, 20]
+
+
+def test_default_start_window_skips_ahead_instead_of_collapsing() -> None:
+    # 默认开始信号超时 20ms：学到的窗口 [12, 14] 不应把整个等待期都变成密集 / 固定轮询
+    sched = default_start_schedule((12, 14))
+    assert sched.window == (7, 19)
+    assert poll_times(sched, 20) == [0, 7, 12, 17]
+
+
+def test_sparse_dense_then_base_poll() -> None:
+    sched = PollSchedule(base_poll_ms=10, expect=(40, 50), dense_poll_ms=5, max_gap_ms=20, margin_ms=5)
+    assert sched.window == (35, 55)
+    assert poll_times(sched, 80) == [0, 20, 35, 40, 45, 50, 55, 60, 70, 80]
+
+
+def test_latency_window_quantiles_and_min_samples() -> None:
+    st = LatencyStats()
+    for ms in (30, 10, 20, 40):
+        st.add(ms)
+    assert st.window(min_samples=5) is None
+    st.add(-3)  # 负值按 0 记
+    assert st.window(min_samples=5) == (0, 40)
+    for ms in range(100, 140):
+        st.add(ms)
+    lo, hi = st.window()  # 只保留最近 32 个样本
+    assert (lo, hi) == (111, 136)
+
+
+def test_signal_window_uses_interpolated_change_time(monkeypatch) -> None:
+    now = [1000]
+    monkeypatch.setattr(store_mod, "mono_ms", lambda: now[0])
+    store = StateStore()
+
+    for _ in range(5):
+        aid = store.begin_attempt(skill_id="s1", node_id="n1", start_mode="pixel", readbar_ms=500)
+        store.mark_key_sent_ok(aid)
+        # 按键后 20ms 检测到开始（上一次未命中在 +10ms）：变化时刻按 +15ms 记
+        now[0] += 20
+        store.mark_cast_started(aid, changed_ms=now[0] - 5)
+        now[0] += 500
+        store.mark_complete_observed(aid, changed_ms=now[0] - 10)
+        store.finish_success(aid)
+        now[0] += 100
+
+    assert store.get_signal_window("s1", "start") == (15, 15)
+    # 开始 -> 完成 两端都用插值时刻：(+510) - (+15)
+    assert store.get_signal_window("s1", "complete") == (495, 495)
+    assert store.get_signal_window("s1", "start", min_samples=6) is None
+    assert store.get_signal_window("nope", "start") is None
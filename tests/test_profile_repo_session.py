@@ -97,4 +97,142 @@ def test_profile_session_dirty_commit_reload(tmp_profiles_root: Path, idgen: Sno
     # reload_parts({"skills"}) 应丢弃刚刚追加的 skill
     session.reload_parts({"skills"})
     assert len(session.profile.skills.skills) == old_len
-    assert "skills" not in session.dirty_parts()
\ No newline at end of file
+    assert "skills" not in session.dirty_parts()
+
+
+def test_profile_session_deferred_commit_coalesces(tmp_profiles_root: Path, idgen: SnowflakeGenerator) -> None:
+    from core.io.save_worker import SaveWorker
+
+    ctx = make_profile_context(tmp_profiles_root, idgen, "P2")
+    # 较长的合并窗口，确保连续提交被合并为一次写盘
+    worker = SaveWorker(coalesce_ms=200)
+    session = ProfileSession(ctx, save_worker=worker)
+
+    for theme in ("a", "b", "c", "flatly"):
+        session.profile.base.ui.theme = theme
+        session.mark_dirty("base")
+        session.commit(parts={"base"}, backup=False, touch_meta=False, deferred=True)
+        # dirty 在排队时即清除
+        assert not session.is_dirty()
+
+    assert session.flush(timeout_s=5.0)
+    path = ctx.repo.path_for(ctx.profile_name)
+    data = json.loads(path.read_text(encoding="utf-8"))
+    assert data["base"]["ui"]["theme"] == "flatly"
+    assert worker.stats.written == 1
+    assert worker.stats.coalesced == 3
+
+    # 同步提交取代尚未写出的后台任务，后台线程不会再用旧快照覆盖
+    session.profile.base.ui.theme = "stale"
+    session.mark_dirty("base")
+    session.commit(parts={"base"}, backup=False, touch_meta=False, deferred=True)
+    session.profile.base.ui.theme = "final"
+    session.mark_dirty("base")
+    session.commit(parts={"base"}, backup=False, touch_meta=False)
+    assert session.flush(timeout_s=5.0)
+    data = json.loads(path.read_text(encoding="utf-8"))
+    assert data["base"]["ui"]["theme"] == "final"
+
+    worker.close()
+
+
+def test_profile_session_deferred_commit_failure_marks_dirty(tmp_profiles_root: Path, idgen: SnowflakeGenerator) -> None:
+    from core.io.save_worker import SaveWorker
+
+    ctx = make_profile_context(tmp_profiles_root, idgen, "P3")
+    worker = SaveWorker(coalesce_ms=0)
+    session = ProfileSession(ctx, save_worker=worker)
+
+    errors = []
+    session.subscribe_save_result(lambda parts, err: errors.append((parts, err)))
+
+    def boom(*_a, **_kw) -> None:
+        raise OSError("disk full")
+
+    ctx.repo.save_dict = boom  # type: ignore[method-assign]
+
+    session.profile.points.points.clear()
+    session.mark_dirty("points")
+    session.commit(parts={"points"}, backup=False, touch_meta=False, deferred=True)
+    assert session.flush(timeout_s=5.0)
+
+    assert len(errors) == 1
+    parts, err = errors[0]
+    assert parts == {"points"}
+    assert isinstance(err, OSError)
+    assert "points" in session.dirty_parts()
+    worker.close()
+
+
+def test_profile_repository_split_layout_migrates_and_writes_dirty_parts(
+    tmp_profiles_root: Path, idgen: SnowflakeGenerator
+) -> None:
+    # 先用 single 布局写出旧格式 profile.json
+    single = ProfileRepository(tmp_profiles_root)
+    prof0 = single.load_or_create("P4", idgen)
+    legacy = single.path_for("P4")
+    assert legacy.exists()
+
+    repo = ProfileRepository(tmp_profiles_root, layout="split")
+    prof1 = repo.load_or_create("P4", idgen)
+    assert prof1.meta.profile_id == prof0.meta.profile_id
+    assert not legacy.exists()
+    assert legacy.with_name("profile.json.migrated").exists()
+
+    manifest_path = repo.manifest_path_for("P4")
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    assert set(manifest["parts"]) == {"meta", "base", "skills", "points", "rotations"}
+    gen0 = manifest["generation"]
+
+    ctx = ProfileContext(
+        profile_name="P4",
+        profile_dir=tmp_profiles_root / "P4",
+        idgen=idgen,
+        repo=repo,
+        profile=prof1,
+    )
+    session = ProfileSession(ctx)
+    session.profile.base.ui.theme = "flatly"
+    session.mark_dirty("base")
+    session.commit(parts={"base"}, backup=True, touch_meta=False)
+
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    assert manifest["generation"] == gen0 + 1
+    assert manifest["parts"]["base"]["version"] == 2
+    # 未提交的分区不重写
+    for part in ("meta", "skills", "points", "rotations"):
+        assert manifest["parts"][part]["version"] == 1
+
+    # backup=True 保留上一版本分区文件
+    parts_dir = repo.parts_dir_for("P4")
+    assert (parts_dir / "base.1.json").exists()
+    assert (parts_dir / "base.2.json").exists()
+
+    prof2 = repo.load_or_create("P4", idgen)
+    assert prof2.base.ui.theme == "flatly"
+    assert prof2.meta.profile_id == prof0.meta.profile_id
+
+
+def test_profile_session_snapshot_shares_clean_parts(tmp_profiles_root: Path, idgen: SnowflakeGenerator) -> None:
+    ctx = make_profile_context(tmp_profiles_root, idgen, "P5")
+    session = ProfileSession(ctx)
+    snap0 = session._snap
+
+    session.profile.base.ui.theme = "flatly"
+    session.mark_dirty("base")
+    session.commit(parts={"base"}, backup=False, touch_meta=False)
+
+    snap1 = session._snap
+    assert snap1.base is not snap0.base
+    # 未修改的部分直接复用上一个快照的 dict
+    assert snap1.rotations is snap0.rotations
+    assert snap1.skills is snap0.skills
+
+    # rollback 只还原脏部分
+    skills_obj = session.profile.skills
+    session.profile.base.ui.theme = "darkly"
+    session.mark_dirty("base")
+    session.rollback()
+    assert session.profile.base.ui.theme == "flatly"
+    assert session.profile.skills is skills_obj
+    assert not session.is_dirty()
@@ -0,0 +1,72 @@
+# tests/test_qt_dispatcher.py
+from __future__ import annotations
+
+import threading
+import time
+from typing import List
+
+from PySide6.QtCore import QCoreApplication, QEventLoop, QTimer
+from PySide6.QtWidgets import QApplication
+
+from qtui.dispatcher import QtDispatcher
+
+
+def _app() -> QCoreApplication:
+    # 用 QApplication：同一进程里后续的控件测试也共用这个实例
+    return QCoreApplication.instance() or QApplication([])
+
+
+def _pump(ms: int) -> None:
+    loop = QEventLoop()
+    QTimer.singleShot(ms, loop.quit)
+    loop.exec()
+
+
+def test_coalesced_latest_wins_and_ordered_before_call_soon() -> None:
+    _app()
+    d = QtDispatcher(max_fps=30)
+    seen: List[str] = []
+
+    def worker() -> None:
+        for i in range(500):
+            d.call_coalesced("node", lambda i=i: seen.append(f"node{i}"))
+            d.call_coalesced("status", lambda i=i: seen.append(f"status{i}"))
+        d.call_soon(lambda: seen.append("stopped"))
+
+    th = threading.Thread(target=worker)
+    th.start()
+    th.join()
+    _pump(100)
+
+    # 合并后的最新更新先于之后提交的 call_soon 执行
+    assert seen[-3:] == ["node499", "status499", "stopped"]
+    st = d.coalesce_stats()
+    assert st.submitted == 1000
+    assert st.executed == len(seen) - 1
+    assert st.merged == st.submitted - st.executed
+    assert st.executed < 100
+
+    d.call_coalesced("node", lambda: seen.append("late"))
+    assert d.discard_coalesced("node")
+    _pump(100)
+    assert seen[-1] == "stopped" and d.coalesce_stats().dropped == 1
+
+
+def test_coalesced_min_interval_throttles_per_key() -> None:
+    _app()
+    d = QtDispatcher(max_fps=1000)
+    slow: List[int] = []
+    fast: List[int] = []
+
+    # 约 300ms 内持续提交：限频 key 首次立即执行，之后最多每 100ms 一次，最后一条不丢
+    t0 = time.monotonic()
+    for i in range(30):
+        d.call_coalesced("panel", lambda i=i: slow.append(i), min_interval_ms=100)
+        d.call_coalesced("node", lambda i=i: fast.append(i))
+        _pump(10)
+    elapsed_ms = (time.monotonic() - t0) * 1000.0
+    _pump(150)
+
+    assert slow[0] == 0 and slow[-1] == 29
+    assert 2 <= len(slow) <= elapsed_ms / 100.0 + 2
+    assert fast[-1] == 29 and len(fast) > len(slow)
@@ -0,0 +1,195 @@
+# tests/test_shared_capture.py
+from __future__ import annotations
+
+import threading
+from typing import List
+
+from core.input.hub import InputHub
+from core.pick.capture import Rect, SampleSpec
+from core.pick.engine import PickEngine
+from core.pick.models import PickSessionConfig
+from core.pick.scanner import CapturePlan, FrameSnapshot, MonitorCapturePlan, MonitorFrame
+from core.pick.shared_capture import CaptureService, SharedFrameBuffer, union_plans
+
+
+class FakeScanner:
+    """
+    按 plan 生成纯色帧的 PixelScanner 替身，并记录抓取次数。
+    """
+    def __init__(self) -> None:
+        self.grabs: List[CapturePlan] = []
+        self._lock = threading.Lock()
+
+    def capture_with_plan(self, plan: CapturePlan) -> FrameSnapshot:
+        with self._lock:
+            self.grabs.append(plan)
+            n = len(self.grabs)
+        frames = {}
+        for mk, mp in plan.plans.items():
+            raw = bytes([n % 256, 0, 0, 255]) * (mp.roi_width * mp.roi_height)
+            frames[mk] = MonitorFrame(mk, mp.roi_left, mp.roi_top, mp.roi_width, mp.roi_height, raw, ts=1.0)
+        return FrameSnapshot(frames=frames, ts=1.0)
+
+    def close(self) -> None:
+        pass
+
+
+class FakeCapture:
+    def invalidate_topology(self) -> None:
+        pass
+
+    def get_monitor_rect(self, monitor_key: str) -> Rect:
+        return Rect(left=0, top=0, width=100, height=100)
+
+    def close_current_thread(self) -> None:
+        pass
+
+
+def roi(mk: str, left: int, top: int, w: int, h: int) -> CapturePlan:
+    return CapturePlan(plans={mk: MonitorCapturePlan(monitor=mk, mode="roi", roi_left=left, roi_top=top, roi_width=w, roi_height=h)})
+
+
+def test_union_plans_bounding_box_per_monitor() -> None:
+    u = union_plans([roi("primary", 10, 10, 5, 5), roi("primary", 0, 12, 4, 10), roi("2", 100, 0, 1, 1)])
+    p = u.plans["primary"]
+    assert (p.roi_left, p.roi_top, p.roi_width, p.roi_height) == (0, 10, 15, 12)
+    assert set(u.plans) == {"primary", "2"}
+
+
+def test_shared_buffer_roundtrip() -> None:
+    buf = SharedFrameBuffer.create(1024)
+    try:
+        assert buf.read() is None
+        raw = bytes(range(16))
+        snap = FrameSnapshot(frames={"primary": MonitorFrame("primary", 3, 4, 2, 2, raw, ts=2.5)}, ts=2.0, skew_ms=0.5)
+        buf.write(snap, frame_id=7, plan_gen=3)
+
+        other = SharedFrameBuffer.attach(buf.name)
+        fr = other.read()
+        assert fr is not None
+        assert (fr.frame_id, fr.plan_gen) == (7, 3)
+        mf = fr.snapshot.frames["primary"]
+        assert (mf.left, mf.top, mf.width, mf.height, mf.raw, mf.ts) == (3, 4, 2, 2, raw, 2.5)
+        other.close()
+    finally:
+        buf.close()
+
+
+def test_service_one_grab_serves_all_consumers() -> None:
+    scanner = FakeScanner()
+    svc = CaptureService(capture=FakeCapture(), scanner=scanner, initial_capacity=1024)  # type: ignore[arg-type]
+    svc.start()
+    try:
+        svc.subscribe("a", roi("primary", 0, 0, 2, 2))
+        svc.subscribe("b", roi("primary", 4, 0, 2, 2))
+
+        fa = svc.get_frame("a", max_age_ms=1000)
+        fb = svc.get_frame("b", max_age_ms=1000)
+
+        assert len(scanner.grabs) == 1
+        assert fa.frame_id == fb.frame_id
+        p = scanner.grabs[0].plans["primary"]
+        assert (p.roi_left, p.roi_width) == (0, 6)
+
+        stats = svc.consumer_stats()
+        assert stats["a"].reads == 1 and stats["a"].waits == 1
+        assert stats["b"].reads == 1 and stats["b"].waits == 0
+
+        # 订阅变大 -> 旧帧不覆盖新 plan，需要重新抓取（且超出容量时换新段）
+        svc.subscribe("b", roi("primary", 0, 0, 30, 30))
+        fb2 = svc.get_frame("b", max_age_ms=1000)
+        assert len(scanner.grabs) == 2
+        assert fb2.frame_id > fb.frame_id
+        assert fb2.snapshot.frames["primary"].width == 30
+        assert svc._retired == []  # 换段时旧段无读端，立即释放
+    finally:
+        svc.stop()
+
+
+def test_retired_segment_freed_after_last_reader() -> None:
+    scanner = FakeScanner()
+    svc = CaptureService(capture=FakeCapture(), scanner=scanner, initial_capacity=1024)  # type: ignore[arg-type]
+    svc.start()
+    try:
+        svc.subscribe("a", roi("primary", 0, 0, 2, 2))
+        svc.get_frame("a", max_age_ms=1000)
+
+        # 让 a 的下一次读取停在旧段上（不持服务锁）
+        old = svc._buf
+        assert old is not None
+        entered, release = threading.Event(), threading.Event()
+        orig_read = old.read
+
+        def slow_read(**kw):
+            if not entered.is_set():
+                entered.set()
+                release.wait(2.0)
+            return orig_read(**kw)
+
+        old.read = slow_read  # type: ignore[method-assign]
+        out = []
+        th = threading.Thread(target=lambda: out.append(svc.get_frame("a", max_age_ms=1000)))
+        th.start()
+        assert entered.wait(2.0)
+
+        # a 读取期间，其它订阅者照常订阅、取帧并触发换段
+        svc.subscribe("b", roi("primary", 0, 0, 30, 30))
+        fb = svc.get_frame("b", max_age_ms=1000)
+        assert fb.snapshot.frames["primary"].width == 30
+        assert svc._retired == [old]
+
+        release.set()
+        th.join(2.0)
+        assert out and out[0].frame_id >= fb.frame_id
+        assert svc._retired == [] and svc._readers == {}
+    finally:
+        svc.stop()
+
+
+class NoListener:
+    def __init__(self, *, on_press, on_release) -> None:
+        pass
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+
+def test_engine_and_pick_preview_share_one_grab() -> None:
+    scanner = FakeScanner()
+    svc = CaptureService(capture=FakeCapture(), scanner=scanner, initial_capacity=1024)  # type: ignore[arg-type]
+    pick = PickEngine(
+        scheduler=None,  # type: ignore[arg-type]
+        hub=InputHub(listener_factory=NoListener),
+        capture=FakeCapture(),  # type: ignore[arg-type]
+        capture_service=svc,
+    )
+    cfg = PickSessionConfig(
+        record_type="skill", record_id="s1", monitor_requested="primary",
+        sample=SampleSpec(mode="mean_square", radius=1), delay_ms=0, preview_throttle_ms=1000,
+        error_throttle_ms=1000, confirm_hotkey="f8", mouse_avoid=False, mouse_avoid_offset_y=0,
+        mouse_avoid_settle_ms=0,
+    )
+    try:
+        # 引擎侧订阅技能图标 ROI；取色预览订阅光标周围 3x3
+        svc.subscribe("engine", roi("primary", 0, 0, 4, 4))
+        rgb = pick._sample_preview(20, 30, cfg, "primary")
+        fe = svc.get_frame("engine", max_age_ms=1000)
+
+        assert len(scanner.grabs) == 1
+        p = scanner.grabs[0].plans["primary"]
+        assert (p.roi_left, p.roi_top, p.roi_width, p.roi_height) == (0, 0, 22, 32)
+        assert rgb == (0, 0, 1)  # FakeScanner 第 1 帧：B=1
+        assert set(svc.consumer_stats()) == {"engine", pick._consumer_id}
+        assert fe.snapshot.frames["primary"].width == 22
+
+        # 光标不动：不重新订阅，也不重新抓取
+        pick._sample_preview(20, 30, cfg, "primary")
+        assert len(scanner.grabs) == 1
+
+        pick._release_service()
+        assert set(svc.consumer_stats()) == {"engine"}
+    finally:
+        svc.stop()
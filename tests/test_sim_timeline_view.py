@@ -0,0 +1,37 @@
+# tests/test_sim_timeline_view.py
+from __future__ import annotations
+
+from PySide6.QtWidgets import QApplication
+
+from qtui.extensions.sim_timeline_view import SimulationTimelineView
+from rotation_editor.sim import SimEvent
+
+
+def _app() -> QApplication:
+    return QApplication.instance() or QApplication([])
+
+
+def ev(i: int, t_ms: int) -> SimEvent:
+    return SimEvent(
+        index=i, t_ms=t_ms, scope="global", mode_id="", track_id="t1",
+        node_id=f"n{i}", node_kind="skill", label=f"s{i}", outcome="SUCCESS", reason="",
+    )
+
+
+def test_hit_test_follows_paint_order() -> None:
+    _app()
+    view = SimulationTimelineView()
+    view.resize(800, 200)
+    # 100ms * 0.08 = 8px：两个 40px 宽的块大部分重叠
+    view.set_events([ev(0, 0), ev(1, 100)])
+
+    x = view._x_for_time(100) + 10.0
+    y = view._row_y + view._block_h / 2.0
+    assert view._hit_test(x, y) == 1  # 时间较晚的块在上层
+
+    view.highlight_index(0)
+    assert view._hit_test(x, y) == 0  # 高亮块盖住相邻块，点击应命中它
+
+    view.highlight_index(1)
+    assert view._hit_test(x, y) == 1
+    assert view._hit_test(view._x_for_time(0) + 2.0, y) == 0
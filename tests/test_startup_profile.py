@@ -0,0 +1,37 @@
+# tests/test_startup_profile.py
+from __future__ import annotations
+
+import logging
+
+from core.startup_profile import StartupProfiler
+
+
+def test_marks_spans_and_summary_output(caplog) -> None:
+    prof = StartupProfiler()
+    with prof.span("build", "MainWindow"):
+        with prof.span("page", "rotation"):
+            pass
+    t = prof.mark("window_shown")
+
+    recs = prof.records
+    assert [(r.kind, r.name, r.depth) for r in recs] == [
+        ("page", "rotation", 1), ("build", "MainWindow", 0), ("mark", "window_shown", 0),
+    ]
+    assert recs[2].start_ms == t and recs[2].dur_ms == 0.0
+
+    lg = logging.getLogger("test.startup")
+    with caplog.at_level(logging.INFO, logger="test.startup"):
+        prof.report(lg)
+        prof.report(lg)  # 只输出一次
+    lines = [r.getMessage() for r in caplog.records if r.name == "test.startup"]
+    assert lines[0].startswith("startup-profile: 3 records")
+    # 按开始时间输出：外层 span 在前，嵌套的缩进一级
+    assert "build" in lines[1] and "MainWindow" in lines[1]
+    assert "  @" in lines[2] and "rotation" in lines[2]
+    assert lines[3].endswith("mark window_shown")
+    assert len(lines) == 4
+
+    # report 之后的记录逐条写入本模块日志
+    with caplog.at_level(logging.INFO, logger="core.startup_profile"):
+        prof.mark("first_nav")
+    assert any("(late) mark first_nav" in r.getMessage() for r in caplog.records)
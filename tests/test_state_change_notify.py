@@ -0,0 +1,30 @@
+# tests/test_state_change_notify.py
+from __future__ import annotations
+
+from typing import List
+
+from rotation_editor.core.runtime.state import StateStore
+
+
+def test_version_bumps_and_listeners_receive_it() -> None:
+    store = StateStore()
+    seen: List[int] = []
+
+    def broken(_v: int) -> None:
+        raise RuntimeError("listener error")
+
+    store.add_change_listener(broken)
+    store.add_change_listener(seen.append)
+    store.add_change_listener(seen.append)   # 重复注册忽略
+
+    v0 = store.version()
+    store.engine_started("p")
+    store.mark_node_exec("s1")
+    store.reset_metric("s1", "success")
+    store.reset_metric("s1", "no_such_metric")  # 没有变化：不通知
+    assert seen == [v0 + 1, v0 + 2, v0 + 3]
+    assert store.version() == v0 + 3
+
+    store.remove_change_listener(seen.append)
+    store.engine_paused()
+    assert len(seen) == 3 and store.version() == v0 + 4
@@ -0,0 +1,106 @@
+# tests/test_telemetry.py
+from __future__ import annotations
+
+import os
+
+from rotation_editor.core.runtime.state import (
+    AttemptEvent,
+    CaptureEvent,
+    EngineEvent,
+    EventBus,
+    TelemetryRecorder,
+    load_telemetry,
+)
+
+
+def test_telemetry_roundtrip_and_truncated_tail(tmp_path) -> None:
+    path = str(tmp_path / "run.tlm")
+    bus = EventBus()
+    rec = TelemetryRecorder(path, chunk_rows=100)
+    rec.attach(bus)
+    rec.start()
+
+    bus.publish(EngineEvent(t_ms=1000, type="ENGINE_STARTED", preset_id="p1"))
+    for i in range(250):
+        bus.publish(AttemptEvent(t_ms=1001 + i, type="READY_CHECK", attempt_id=f"a{i % 7}", skill_id="sk1", extra={"i": i}))
+    bus.publish(CaptureEvent(t_ms=1300, type="CAPTURE_ERROR", message="capture_failed", detail="boom"))
+    rec.record_probe(1301, "point:cb", (1, 2, 3))
+    rec.record_probe(1302, "skill:sk1", None)
+    rec.stop()
+
+    # stop 后不再接收事件
+    bus.publish(EngineEvent(t_ms=2000, type="ENGINE_STOPPED"))
+
+    run = load_telemetry(path)
+    assert not run.truncated
+    assert run.n_events == 252
+    assert run.events["t_ms"][0] == 1000 and run.events["t_ms"][-1] == 1300
+    assert run.events["type"][0] == "ENGINE_STARTED"
+    assert run.events["preset_id"][0] == "p1"
+    assert run.events["attempt_id"][8] == "a0"
+    assert run.events["extra"][3] == '{"i":2}'
+    assert run.events["detail"][-1] == "boom"
+    assert list(run.events["kind"][:2]) == [0, 1]
+
+    assert run.n_probes == 2
+    assert run.probes["probe"] == ["point:cb", "skill:sk1"]
+    assert list(run.probes["valid"]) == [1, 0]
+    assert (run.probes["r"][0], run.probes["g"][0], run.probes["b"][0]) == (1, 2, 3)
+
+    # 模拟异常退出：截掉最后几个字节，loader 忽略不完整的尾部 chunk
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 3)
+    run2 = load_telemetry(path)
+    assert run2.truncated
+    assert run2.n_events <= run.n_events
+
+
+def test_probe_batch_is_sampled_on_writer_thread(tmp_path) -> None:
+    import threading
+
+    path = str(tmp_path / "batch.tlm")
+    rec = TelemetryRecorder(path, flush_interval_s=0.05)
+    rec.start()
+    threads = []
+
+    def sample():
+        threads.append(threading.current_thread())
+        return [("point:a", (9, 8, 7)), ("skill:b", None)]
+
+    rec.record_probe_batch(500, sample)
+    assert threads == []  # 入队时不取样
+    rec.stop()
+
+    assert threads and threads[0] is not threading.current_thread()
+    run = load_telemetry(path)
+    assert run.probes["probe"] == ["point:a", "skill:b"]
+    assert list(run.probes["t_ms"]) == [500, 500]
+    assert list(run.probes["valid"]) == [1, 0]
+
+
+def test_recorder_reused_across_runs_writes_self_contained_files(tmp_path) -> None:
+    path = str(tmp_path / "run.tlm")
+    bus = EventBus()
+    rec = TelemetryRecorder(path, chunk_rows=64)
+    files = []
+    for run_i in range(3):
+        rec.attach(bus)
+        rec.start()
+        files.append(rec.path)
+        bus.publish(EngineEvent(t_ms=100 * run_i, type="ENGINE_STARTED", preset_id="p1"))
+        bus.publish(AttemptEvent(t_ms=100 * run_i + 1, type="READY_CHECK", attempt_id="a1", skill_id=f"sk{run_i}"))
+        rec.record_probe(100 * run_i + 2, "point:cb", (run_i, 0, 0))
+        rec.flush()
+        rec.stop()
+
+    # 编号始终基于构造时的路径，不会嵌套成 run.1.1.tlm
+    assert [os.path.basename(f) for f in files] == ["run.tlm", "run.1.tlm", "run.2.tlm"]
+    for run_i, f in enumerate(files):
+        run = load_telemetry(f)
+        assert run.events["type"] == ["ENGINE_STARTED", "READY_CHECK"]
+        assert run.events["preset_id"][0] == "p1"
+        assert run.events["skill_id"][1] == f"sk{run_i}"
+        assert run.probes["probe"] == ["point:cb"] and run.probes["r"][0] == run_i
+
+    st = rec.stats()
+    assert st.events == 6 and st.probes == 3 and st.dropped == 0
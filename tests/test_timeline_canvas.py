@@ -0,0 +1,62 @@
+# tests/test_timeline_canvas.py
+from __future__ import annotations
+
+from PySide6.QtCore import QEvent, QPointF, Qt
+from PySide6.QtGui import QMouseEvent
+from PySide6.QtWidgets import QApplication
+
+from core.models.point import PointsFile
+from core.models.skill import Skill, SkillsFile, TriggerConfig
+
+from rotation_editor.core.models import RotationPreset, SkillNode
+from rotation_editor.core.models.track import Track
+from rotation_editor.ui.editor.timeline_canvas import TimelineCanvas
+
+
+def _app() -> QApplication:
+    return QApplication.instance() or QApplication([])
+
+
+class Ctx:
+    def __init__(self) -> None:
+        self.skills = SkillsFile(skills=[Skill(id="s1", name="S1", trigger=TriggerConfig(key="1"))])
+        self.points = PointsFile(points=[])
+        self.base = None
+
+
+def test_drop_on_occupied_step_snaps_item_back() -> None:
+    _app()
+    ctx = Ctx()
+    p = RotationPreset(id="p", name="p", description="")
+    p.global_tracks = [Track(id="t1", nodes=[
+        SkillNode(id="n1", skill_id="s1", step_index=1),
+        SkillNode(id="n2", skill_id="s1", step_index=2),
+    ])]
+
+    canvas = TimelineCanvas()
+    canvas.resize(800, 300)
+    canvas.set_data(ctx, p, None)  # type: ignore[arg-type]
+
+    items = {it.data(3): it for it in canvas._track_items[("", "t1")]}
+    n1, n2 = items["n1"], items["n2"]
+    home = QPointF(n1.pos())
+
+    # 模拟 MainPage：目标 step 已占用时模型不变，直接按模型重绘
+    steps = []
+
+    def on_step_changed(mid: str, tid: str, nid: str, step: int) -> None:
+        steps.append((nid, step))
+        canvas.set_data(ctx, p, None)  # type: ignore[arg-type]
+
+    canvas.stepChanged.connect(on_step_changed)
+
+    # 把 n1 拖到 n2 所在的 step 上释放
+    canvas._drag_item = n1
+    canvas._drag_row_key = ("", "t1")
+    n1.setPos(n2.pos())
+    ev = QMouseEvent(QEvent.MouseButtonRelease, QPointF(0, 0), QPointF(0, 0), Qt.LeftButton, Qt.NoButton, Qt.NoModifier)
+    canvas.mouseReleaseEvent(ev)
+
+    assert steps == [("n1", 1)]
+    assert n1.pos() == home
+    assert canvas._track_items[("", "t1")][0] is n1